@@ -1,19 +1,48 @@
 import { NextResponse } from 'next/server'
 import { supabase } from '../../../lib/supabase'
+import {
+  metrics,
+  httpRequestsTotal,
+  httpRequestDuration,
+  rateLimitRejectionsTotal,
+  rateLimiterTrackedIps,
+  trxVerificationsTotal,
+  PROMETHEUS_CONTENT_TYPE
+} from '../../../lib/metrics'
+import { getTrxVerifier, getVerificationStats, VERIFICATION_STATS_WINDOWS } from '../../../lib/enhanced-trx-verifier'
+import dbInitializer from '../../../lib/database-initializer'
+import purchaseQueue from '../../../lib/purchase-queue'
+import idempotencyStore from '../../../lib/idempotency'
+import nodeCatalog, { CATALOG_CACHE_CONTROL, matchesETag, encodedETag } from '../../../lib/node-catalog'
+import { compressResponse, negotiateEncoding } from '../../../lib/compression'
+import { selectWithArchive } from '../../../lib/archiver'
+import dataAccess from '../../../lib/data-access'
+import readRouter from '../../../lib/read-router'
+import warmUp from '../../../lib/warmup'
+import logger from '../../../lib/logger'
+import diagnostics, { isAdminRequest } from '../../../lib/diagnostics'
+import {
+  PROFILE_SHAPE, USER_NODE_SHAPE, WITHDRAWAL_SHAPE, REFERRAL_SHAPE, ARCHIVED_FLAG, serializeList
+} from '../../../lib/serializers'
 import { v4 as uuidv4 } from 'uuid'
 
 function handleCORS(response) {
   response.headers.set('Access-Control-Allow-Origin', '*')
   response.headers.set('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-  response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With')
+  response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Idempotency-Key')
   response.headers.set('Access-Control-Max-Age', '86400')
   return response
 }
 
+// Response whose body a compiled shape has already written as JSON
+function jsonBody(body) {
+  return new NextResponse(body, { status: 200, headers: { 'Content-Type': 'application/json' } })
+}
+
 // Enhanced signup referral processing
 async function processSignupReferral(userId, referralCode) {
   try {
-    console.log(`Processing signup referral for user: ${userId}, code: ${referralCode}`)
+    logger.info('Processing signup referral', { route: '/auth/signup', userId, referralCode })
     
     const { data: referrer, error: referrerError } = await supabase
       .from('users')
@@ -22,11 +51,11 @@ async function processSignupReferral(userId, referralCode) {
       .single()
 
     if (referrerError || !referrer) {
-      console.log(`Referral code not found: ${referralCode}`)
+      logger.info('Referral code not found', { route: '/auth/signup', referralCode })
       return
     }
 
-    console.log(`Found referrer: ${referrer.username} (${referrer.id})`)
+    logger.debug('Found referrer', { route: '/auth/signup', referrerId: referrer.id, username: referrer.username })
 
     // Check if this referral already exists
     const { data: existingReferral } = await supabase
@@ -37,7 +66,7 @@ async function processSignupReferral(userId, referralCode) {
       .single()
 
     if (existingReferral) {
-      console.log(`Referral already exists: ${existingReferral.id}`)
+      logger.info('Referral already exists', { route: '/auth/signup', referralId: existingReferral.id })
       return
     }
 
@@ -68,173 +97,62 @@ async function processSignupReferral(userId, referralCode) {
         })
         .eq('id', referrer.id)
       
-      console.log(`Referral created successfully for referrer: ${referrer.id}`)
+      logger.info('Referral created', { route: '/auth/signup', referrerId: referrer.id, userId })
     }
   } catch (error) {
     console.error('Signup referral processing error:', error)
   }
 }
 
-// Enhanced referral processing function
-async function processReferralReward(userId) {
-  try {
-    console.log(`Processing referral reward for user: ${userId}`)
-    
-    const { data: referral, error: referralError } = await supabase
-      .from('referrals')
-      .select('*')
-      .eq('referred_id', userId)
-      .eq('is_valid', false)
-      .single()
-
-    if (referralError && referralError.code !== 'PGRST116') {
-      console.error('Referral lookup error:', referralError)
-      return
-    }
-
-    if (referral) {
-      console.log(`Found referral to process: ${referral.id}`)
-      
-      // Mark referral as valid and pay reward with enhanced tracking
-      const { error: updateReferralError } = await supabase
-        .from('referrals')
-        .update({ 
-          is_valid: true, 
-          reward_paid: true,
-          activated_at: new Date().toISOString(),
-          updated_at: new Date().toISOString()
-        })
-        .eq('id', referral.id)
-
-      if (!updateReferralError) {
-        // Add 50 TRX to referrer's balance with enhanced error handling
-        const { error: rewardError } = await supabase
-          .from('users')
-          .update({ 
-            referral_balance: supabase.raw('referral_balance + 50'),
-            valid_referrals: supabase.raw('valid_referrals + 1'),
-            updated_at: new Date().toISOString()
-          })
-          .eq('id', referral.referrer_id)
-
-        if (rewardError) {
-          console.error('Referral reward error:', rewardError)
-        } else {
-          console.log(`Referral reward processed successfully for referrer: ${referral.referrer_id}`)
-        }
-      } else {
-        console.error('Referral update error:', updateReferralError)
-      }
-    } else {
-      console.log(`No pending referral found for user: ${userId}`)
-    }
-  } catch (error) {
-    console.error('Referral processing error:', error)
-  }
-}
-
-// Mining nodes configuration
-const MINING_NODES = [
-  {
-    id: 'node1',
-    name: '64 GB Node',
-    price: 50,
-    storage: '64 GB',
-    mining: 500,
-    duration: 30,
-    description: 'Mine 500 TRX in 30 days'
-  },
-  {
-    id: 'node2',
-    name: '128 GB Node',
-    price: 75,
-    storage: '128 GB',
-    mining: 500,
-    duration: 15,
-    description: 'Mine 500 TRX in 15 days'
-  },
-  {
-    id: 'node3',
-    name: '256 GB Node',
-    price: 100,
-    storage: '256 GB',
-    mining: 1000,
-    duration: 7,
-    description: 'Mine 1000 TRX in 7 days'
-  },
-  {
-    id: 'node4',
-    name: '1024 GB Node',
-    price: 250,
-    storage: '1024 GB',
-    mining: 1000,
-    duration: 3,
-    description: 'Mine 1000 TRX in 3 days'
-  }
-]
-
-// Initialize enhanced services with fallback
-let trxVerifier = null
-let dbInitialized = false
-
-// Try to initialize enhanced services
-try {
-  // For now, we'll use a mock verifier to avoid import issues
-  trxVerifier = {
-    verifyTransaction: async (hash, amount, address, userId) => {
-      console.log(`Mock TRX verification for hash: ${hash}`)
-      return {
-        valid: false,
-        error: 'Transaction not found on blockchain (mock verification)',
-        details: 'This is a mock verification for testing purposes'
-      }
-    },
-    getVerificationStats: async () => {
-      return {
-        total: 0,
-        verified: 0,
-        failed: 0,
-        pending: 0,
-        success_rate: 0
-      }
-    }
-  }
-} catch (error) {
-  console.error('Failed to initialize enhanced services:', error)
+// Enhanced rate limiting and security
+const MAX_REQUESTS_PER_MINUTE = 60
+// Clients over the limit are refused outright for this long
+const BLOCK_DURATION_MS = Number(process.env.RATE_LIMIT_BLOCK_MS) || 15 * 60 * 1000
+// Bound on the IPs tracked at once in either map; the oldest entries go first
+const MAX_TRACKED_IPS = 100000
+const requestCounts = new Map() // ip -> requests in the current window
+const BLOCKED_IPS = new Map() // ip -> blocked until (ms epoch)
+let requestWindowStart = 0
+
+function isBlocked(ip) {
+  const until = BLOCKED_IPS.get(ip)
+  if (until === undefined) return false
+  if (until > Date.now()) return true
+  BLOCKED_IPS.delete(ip)
+  return false
 }
 
-async function ensureDbInitialized() {
-  if (!dbInitialized) {
-    console.log('Database initialization skipped (enhanced features disabled)')
-    dbInitialized = true
+function trackIp(map, ip, value) {
+  if (!map.has(ip) && map.size >= MAX_TRACKED_IPS) {
+    map.delete(map.keys().next().value)
   }
+  map.set(ip, value)
 }
 
-// Enhanced rate limiting and security
-const requestCounts = new Map()
-const MAX_REQUESTS_PER_MINUTE = 60
-const BLOCKED_IPS = new Set()
-
 function checkRateLimit(ip) {
   const now = Date.now()
   const windowStart = Math.floor(now / 60000) * 60000 // 1-minute window
-  const key = `${ip}:${windowStart}`
-  
-  const count = requestCounts.get(key) || 0
-  requestCounts.set(key, count + 1)
-  
-  // Clean old entries
-  for (const [k] of requestCounts) {
-    if (k.split(':')[1] < windowStart - 60000) {
-      requestCounts.delete(k)
+
+  // Counts start from zero in every window, so the previous window's go all at once
+  if (windowStart !== requestWindowStart) {
+    requestWindowStart = windowStart
+    requestCounts.clear()
+    for (const [blockedIp, until] of BLOCKED_IPS) {
+      if (until <= now) BLOCKED_IPS.delete(blockedIp)
     }
+    rateLimiterTrackedIps.set({ map: 'blocked' }, BLOCKED_IPS.size)
   }
+
+  const count = requestCounts.get(ip) || 0
+  trackIp(requestCounts, ip, count + 1)
   
   if (count >= MAX_REQUESTS_PER_MINUTE) {
-    BLOCKED_IPS.add(ip)
+    trackIp(BLOCKED_IPS, ip, now + BLOCK_DURATION_MS)
+    rateLimiterTrackedIps.set({ map: 'blocked' }, BLOCKED_IPS.size)
     return false
   }
   
+  rateLimiterTrackedIps.set({ map: 'counts' }, requestCounts.size)
   return true
 }
 
@@ -248,6 +166,12 @@ function enhanceSecurityHeaders(response) {
   return response
 }
 
+// Unique violations on the username (or the email derived from it) mean the name is taken
+function isUsernameConflict(error) {
+  const text = `${error.message || ''} ${error.details || ''}`
+  return /idx_users_username_lower|users_username_key|users_email_key/.test(text)
+}
+
 // Enhanced input validation
 function validateInput(data, requiredFields) {
   const errors = []
@@ -281,24 +205,24 @@ function validateInput(data, requiredFields) {
 // Enhanced transaction verification with comprehensive logging
 async function verifyTRXTransactionEnhanced(transactionHash, expectedAmount, expectedToAddress, userId = null) {
   try {
-    console.log(`Starting TRX verification for hash: ${transactionHash}`)
+    logger.debug('Starting TRX verification', { route: '/nodes/purchase', transactionHash })
     
-    const verification = await trxVerifier.verifyTransaction(
+    const verification = await getTrxVerifier().verifyTransaction(
       transactionHash, 
       expectedAmount, 
       expectedToAddress, 
       userId
     )
     
-    console.log(`TRX verification result for ${transactionHash}:`, verification.valid ? 'SUCCESS' : 'FAILED')
-    
-    if (!verification.valid) {
-      console.log(`TRX verification error: ${verification.error}`)
-    }
+    logger.info('TRX verification result', {
+      route: '/nodes/purchase', transactionHash, valid: verification.valid, error: verification.error
+    })
+    trxVerificationsTotal.inc({ result: verification.valid ? 'verified' : 'failed' })
     
     return verification
   } catch (error) {
     console.error('Enhanced TRX verification error:', error)
+    trxVerificationsTotal.inc({ result: 'error' })
     return {
       valid: false,
       error: 'Transaction verification service error',
@@ -307,60 +231,351 @@ async function verifyTRXTransactionEnhanced(transactionHash, expectedAmount, exp
   }
 }
 
+// The verifier claims the hash in consumed_transaction_hashes; give it back if no node is created
+async function releaseTransactionHash(transactionHash, userId) {
+  const trxVerifier = getTrxVerifier()
+  if (trxVerifier.releaseTransactionHash) {
+    await trxVerifier.releaseTransactionHash(transactionHash, userId)
+  }
+}
+
+/**
+ * Verify a node purchase and create the user's node
+ * Shared by the synchronous endpoint and the purchase queue workers; resolves to
+ * { status, body, retryAfterMs } with the HTTP response to report
+ */
+async function processNodePurchase({ node_id: nodeId, transaction_hash: transactionHash, user_id: userId }) {
+  const node = await nodeCatalog.find(nodeId)
+  if (!node) {
+    return { status: 400, body: { error: 'Invalid mining node' } }
+  }
+
+  logger.debug('Processing node purchase', { route: '/nodes/purchase', nodeId, userId })
+
+  // Enhanced TRX transaction verification
+  const TRX_RECEIVE_ADDRESS = process.env.TRX_RECEIVE_ADDRESS || 'TFNHcYdhEq5sgjaWPdR1Gnxgzu3RUKncwu'
+  const verification = await verifyTRXTransactionEnhanced(
+    transactionHash, 
+    node.price, 
+    TRX_RECEIVE_ADDRESS, 
+    userId
+  )
+  
+  if (!verification.valid) {
+    logger.info('Transaction verification failed', { route: '/nodes/purchase', transactionHash, error: verification.error })
+    return {
+      status: verification.retryable ? 503 : 400,
+      body: {
+        error: verification.error,
+        details: verification.details || 'Transaction verification failed'
+      },
+      retryAfterMs: verification.retryAfterMs
+    }
+  }
+
+  logger.debug('Transaction verified', { route: '/nodes/purchase', transactionHash })
+
+  // Enhanced user node creation with better tracking
+  const userNode = {
+    id: uuidv4(),
+    user_id: userId,
+    node_id: nodeId,
+    transaction_hash: transactionHash,
+    transaction_verified: true,
+    transaction_amount: node.price,
+    transaction_verified_at: new Date().toISOString(),
+    status: 'running',
+    progress: 0,
+    start_date: new Date().toISOString(),
+    end_date: new Date(Date.now() + node.duration * 24 * 60 * 60 * 1000).toISOString(),
+    mining_amount: node.mining,
+    daily_mining: node.mining / node.duration,
+    duration: node.duration,
+    total_mined: 0,
+    last_mining_update: new Date().toISOString()
+  }
+
+  // One active node per type; the node, the user's mining flags and the referral
+  // activation are written together (in one transaction on the postgres backend)
+  let created
+  try {
+    created = await dataAccess.createUserNode(userNode)
+  } catch (error) {
+    console.error('Node purchase database error:', error)
+    await releaseTransactionHash(transactionHash, userId)
+    return {
+      status: 500,
+      body: {
+        error: 'Failed to create mining node',
+        details: 'Database operation failed'
+      }
+    }
+  }
+
+  if (created.existing) {
+    await releaseTransactionHash(transactionHash, userId)
+    return {
+      status: 400,
+      body: {
+        error: 'You already have an active node of this type',
+        details: `Status: ${created.existing.status}, Created: ${new Date(created.existing.created_at).toLocaleString()}`
+      }
+    }
+  }
+
+  const nodeData = created.node
+  logger.debug('Node created', { route: '/nodes/purchase', userNodeId: nodeData.id })
+
+  logger.info('Node purchase completed', { route: '/nodes/purchase', nodeId, userId })
+  readRouter.recordWrite(userId)
+
+  return {
+    status: 200,
+    body: {
+      message: 'Mining node purchased and verified successfully!',
+      node: {
+        id: nodeData.id,
+        nodeId: nodeData.node_id,
+        status: nodeData.status,
+        startDate: nodeData.start_date,
+        endDate: nodeData.end_date,
+        miningAmount: nodeData.mining_amount,
+        dailyMining: nodeData.daily_mining
+      },
+      verification: {
+        verified: true,
+        amount: verification.amount,
+        timestamp: verification.blockTimestamp || new Date().toISOString()
+      }
+    }
+  }
+}
+
+// Short TTL so admin dashboards polling the leaderboard share one scan of referral_closure
+const TOP_REFERRERS_CACHE_TTL_MS = 60 * 1000
+const TOP_REFERRERS_CACHE_MAX_ENTRIES = 100
+
+// (limit, maxDepth) -> { promise, fetchedAt }, oldest first
+const topReferrersCache = new Map()
+
+// Top referrers, cached briefly; concurrent callers share one in-flight query
+function getTopReferrers(request, limit, maxDepth) {
+  const key = `${limit}:${maxDepth}`
+  const cached = topReferrersCache.get(key)
+  if (cached && Date.now() - cached.fetchedAt < TOP_REFERRERS_CACHE_TTL_MS) {
+    return cached.promise
+  }
+
+  const promise = readRouter.read(request, null, client =>
+    client.rpc('get_top_referrers', { p_limit: limit, p_max_depth: maxDepth })
+  )
+  topReferrersCache.delete(key)
+  if (topReferrersCache.size >= TOP_REFERRERS_CACHE_MAX_ENTRIES) {
+    topReferrersCache.delete(topReferrersCache.keys().next().value)
+  }
+  topReferrersCache.set(key, { promise, fetchedAt: Date.now() })
+
+  // Don't keep failures around for the whole TTL
+  promise.then(
+    ({ error }) => { if (error) topReferrersCache.delete(key) },
+    () => topReferrersCache.delete(key)
+  )
+
+  return promise
+}
+
+// Purchase queue workers run in whichever process serves purchase requests
+function ensurePurchaseWorkers() {
+  purchaseQueue.start(processNodePurchase)
+}
+
+// Route labels for the request metrics; any other path is counted as 'unmatched'
+const KNOWN_ROUTES = new Set([
+  '/metrics', '/warmup', '/nodes', '/auth/user', '/nodes/purchase/status', '/admin/db-status',
+  '/admin/verification-stats', '/admin/referrals/top', '/user/profile', '/user/nodes', '/user/referrals',
+  '/withdrawals', '/admin/diagnostics/cpu-profile', '/admin/diagnostics/heap-snapshot', '/auth/signup',
+  '/auth/signin', '/user/withdrawals', '/user/referrals/downline', '/nodes/purchase', '/withdraw'
+])
+
+// Request metrics: count and time every API call per route
+async function instrumentRequest(method, request, handler) {
+  const endTimer = httpRequestDuration.startTimer({ method })
+  // Under WARMUP_MODE=lazy the first request starts the warm-up without waiting for it
+  warmUp()
+  // Large JSON bodies are compressed for the client's Accept-Encoding (the catalog brings its own)
+  const response = await compressResponse(request, await handler(request))
+
+  // Unknown paths share one label, whatever they answered, so probes can't blow up cardinality
+  const pathname = new URL(request.url).pathname.replace('/api', '')
+  const route = KNOWN_ROUTES.has(pathname) ? pathname : 'unmatched'
+  endTimer({ route })
+  httpRequestsTotal.inc({ method, route, status: response.status })
+
+  return response
+}
+
+/**
+ * Serve the pre-serialized node catalog in its precompressed encoding when the
+ * client accepts one; a matching If-None-Match gets a bodiless 304
+ */
+async function serveNodeCatalog(request) {
+  const catalog = await nodeCatalog.get()
+  const encoding = negotiateEncoding(request.headers.get('accept-encoding'))
+  const encoded = encoding && catalog.encoded[encoding] ? encoding : null
+  const headers = {
+    'ETag': encodedETag(catalog.etag, encoded),
+    'Cache-Control': CATALOG_CACHE_CONTROL
+  }
+  if (catalog.lastModified) headers['Last-Modified'] = catalog.lastModified
+  if (Object.keys(catalog.encoded).length > 0) headers['Vary'] = 'Accept-Encoding'
+
+  if (matchesETag(request.headers.get('if-none-match'), catalog.etag)) {
+    return handleCORS(new NextResponse(null, { status: 304, headers }))
+  }
+
+  if (encoded) headers['Content-Encoding'] = encoded
+  return enhanceSecurityHeaders(handleCORS(new NextResponse(encoded ? catalog.encoded[encoded] : catalog.body, {
+    status: 200,
+    headers: { ...headers, 'Content-Type': 'application/json' }
+  })))
+}
+
 export async function GET(request) {
+  return instrumentRequest('GET', request, handleGET)
+}
+
+export async function POST(request) {
+  return instrumentRequest('POST', request, handlePOST)
+}
+
+async function handleGET(request) {
   try {
-    // Initialize database
-    await ensureDbInitialized()
-    
+    const url = new URL(request.url)
+    const pathname = url.pathname.replace('/api', '')
+
+    // Metrics scrapes bypass rate limiting so the scraper never locks itself out
+    if (pathname === '/metrics') {
+      return enhanceSecurityHeaders(new NextResponse(metrics.render(), {
+        status: 200,
+        headers: { 'Content-Type': PROMETHEUS_CONTENT_TYPE }
+      }))
+    }
+
+    // Warm-up hook for the platform to call before routing traffic here
+    if (pathname === '/warmup') {
+      const result = await warmUp()
+      return enhanceSecurityHeaders(NextResponse.json(result, { status: result.warm ? 200 : 503 }))
+    }
+
+    // The public catalog is cacheable and costs nothing to serve, so it skips rate limiting too
+    if (pathname === '/nodes') {
+      return serveNodeCatalog(request)
+    }
+
     // Security checks
     const ip = request.headers.get('x-forwarded-for') || request.headers.get('x-real-ip') || 'unknown'
     
-    if (BLOCKED_IPS.has(ip)) {
+    if (isBlocked(ip)) {
+      rateLimitRejectionsTotal.inc({ reason: 'blocked' })
       return enhanceSecurityHeaders(NextResponse.json({ error: 'Access denied' }, { status: 429 }))
     }
     
     if (!checkRateLimit(ip)) {
+      rateLimitRejectionsTotal.inc({ reason: 'limit' })
       return enhanceSecurityHeaders(NextResponse.json({ error: 'Rate limit exceeded' }, { status: 429 }))
     }
-    
-    const url = new URL(request.url)
-    const pathname = url.pathname.replace('/api', '')
 
     // Enhanced logging
-    console.log(`GET request: ${pathname} from IP: ${ip}`)
+    logger.info('GET request', { route: pathname, ip })
 
     if (pathname === '/auth/user') {
       return enhanceSecurityHeaders(handleCORS(NextResponse.json({ user: null })))
     }
 
-    if (pathname === '/nodes') {
-      return enhanceSecurityHeaders(handleCORS(NextResponse.json({ nodes: MINING_NODES })))
+    if (pathname === '/nodes/purchase/status') {
+      // Poll a purchase submitted with Prefer: respond-async
+      const jobId = url.searchParams.get('jobId')
+      if (!jobId || !/^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i.test(jobId)) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'Valid jobId required' }, { status: 400 })))
+      }
+
+      ensurePurchaseWorkers()
+      const job = await purchaseQueue.getJob(jobId)
+      if (!job) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'Purchase job not found' }, { status: 404 })))
+      }
+
+      const done = job.status === 'completed' || job.status === 'failed'
+      const response = NextResponse.json({
+        jobId: job.id,
+        status: job.status,
+        nodeId: job.node_id,
+        transactionHash: job.transaction_hash,
+        attempts: job.attempts,
+        createdAt: job.created_at,
+        completedAt: job.completed_at,
+        httpStatus: job.http_status,
+        result: job.result,
+        error: job.error_message
+      })
+      if (!done) {
+        response.headers.set('Retry-After', '2')
+      } else if (job.status === 'completed') {
+        response.headers.append('Set-Cookie', readRouter.pinCookie(readRouter.recordWrite(job.user_id)))
+      }
+      return enhanceSecurityHeaders(handleCORS(response))
     }
-    
+
     if (pathname === '/admin/db-status') {
-      // Admin endpoint for database status
-      const status = {
-        initialized: dbInitialized,
-        tables: {
-          users: { exists: true, count: 'unknown' },
-          user_nodes: { exists: true, count: 'unknown' },
-          referrals: { exists: true, count: 'unknown' },
-          withdrawals: { exists: true, count: 'unknown' }
-        },
-        statistics: {
-          totalUsers: 'unknown',
-          totalNodes: 'unknown'
-        }
-      }
+      // Admin endpoint for database status; planner estimates unless ?exact=true
+      const status = await dbInitializer.getDatabaseStatus({
+        exact: url.searchParams.get('exact') === 'true'
+      })
       return enhanceSecurityHeaders(handleCORS(NextResponse.json({ status })))
     }
     
     if (pathname === '/admin/verification-stats') {
-      // Admin endpoint for verification statistics
-      const stats = await trxVerifier.getVerificationStats()
+      // Admin endpoint for verification statistics, optionally over ?window=1h|24h|7d
+      const timeWindow = url.searchParams.get('window')
+      if (timeWindow && !VERIFICATION_STATS_WINDOWS[timeWindow]) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
+          error: 'Invalid window',
+          details: `Supported windows: ${Object.keys(VERIFICATION_STATS_WINDOWS).join(', ')}`
+        }, { status: 400 })))
+      }
+
+      const stats = await getVerificationStats(timeWindow)
       return enhanceSecurityHeaders(handleCORS(NextResponse.json({ stats })))
     }
 
+    if (pathname === '/admin/referrals/top') {
+      // Admin endpoint for the largest referral downlines, read from referral_closure
+      if (!isAdminRequest(request)) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'Admin token required' }, { status: 403 })))
+      }
+
+      const limit = Math.min(Number(url.searchParams.get('limit')) || 20, 100)
+      const maxDepth = url.searchParams.get('maxDepth') ? Number(url.searchParams.get('maxDepth')) : null
+      if (maxDepth !== null && !(Number.isInteger(maxDepth) && maxDepth > 0)) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'maxDepth must be a positive integer' }, { status: 400 })))
+      }
+
+      const { data, error } = await getTopReferrers(request, limit, maxDepth)
+      if (error) {
+        console.error('Top referrers fetch error:', error)
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'Failed to fetch top referrers' }, { status: 500 })))
+      }
+
+      const referrers = data.map(row => ({
+        userId: row.user_id,
+        username: row.username,
+        directReferrals: Number(row.direct_referrals),
+        downline: Number(row.downline),
+        maxDepth: row.max_depth
+      }))
+      return enhanceSecurityHeaders(handleCORS(NextResponse.json({ referrers })))
+    }
+
     if (pathname === '/user/profile') {
       return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'User not authenticated' }, { status: 401 })))
     }
@@ -410,19 +625,22 @@ export async function GET(request) {
   }
 }
 
-export async function POST(request) {
+// Mutations: clients retry them on timeout (Idempotency-Key), and the caller must
+// read its own writes afterwards (see lib/read-router.js)
+const WRITE_POST_PATHS = new Set(['/auth/signup', '/nodes/purchase', '/withdraw'])
+
+async function handlePOST(request) {
   try {
-    // Initialize database
-    await ensureDbInitialized()
-    
     // Security checks
     const ip = request.headers.get('x-forwarded-for') || request.headers.get('x-real-ip') || 'unknown'
     
-    if (BLOCKED_IPS.has(ip)) {
+    if (isBlocked(ip)) {
+      rateLimitRejectionsTotal.inc({ reason: 'blocked' })
       return enhanceSecurityHeaders(NextResponse.json({ error: 'Access denied' }, { status: 429 }))
     }
     
     if (!checkRateLimit(ip)) {
+      rateLimitRejectionsTotal.inc({ reason: 'limit' })
       return enhanceSecurityHeaders(NextResponse.json({ error: 'Rate limit exceeded' }, { status: 429 }))
     }
     
@@ -438,8 +656,52 @@ export async function POST(request) {
       }, { status: 400 })))
     }
 
+    // Retries carrying the same Idempotency-Key get the first response instead of a second run
+    const idempotencyKey = request.headers.get('idempotency-key')
+    let response
+    if (idempotencyKey && WRITE_POST_PATHS.has(pathname)) {
+      response = enhanceSecurityHeaders(handleCORS(await idempotencyStore.execute(
+        { key: idempotencyKey, scope: pathname, body },
+        () => routePOST(request, pathname, body, ip)
+      )))
+    } else {
+      response = await routePOST(request, pathname, body, ip)
+    }
+
+    // The writer's next reads go to the primary, whichever process serves them; a
+    // rejected request wrote nothing, and a new account's id is only in the response
+    if (WRITE_POST_PATHS.has(pathname) && response.status >= 200 && response.status < 300) {
+      const writerId = pathname === '/auth/signup' ? (await response.clone().json()).user?.id : body.userId
+      response.headers.append('Set-Cookie', readRouter.pinCookie(readRouter.recordWrite(writerId)))
+    }
+    return response
+  } catch (error) {
+    console.error('API Error:', error)
+    return handleCORS(NextResponse.json({ error: 'Internal server error' }, { status: 500 }))
+  }
+}
+
+async function routePOST(request, pathname, body, ip) {
+  try {
     // Enhanced logging
-    console.log(`POST request: ${pathname} from IP: ${ip}`)
+    logger.info('POST request', { route: pathname, ip })
+
+    if (pathname === '/admin/diagnostics/cpu-profile' || pathname === '/admin/diagnostics/heap-snapshot') {
+      // Admin-only captures of this process, written to DIAGNOSTICS_DIR
+      if (!isAdminRequest(request)) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'Admin token required' }, { status: 403 })))
+      }
+
+      const capture = pathname.endsWith('/cpu-profile')
+        ? await diagnostics.captureCpuProfile(body.durationMs)
+        : await diagnostics.captureHeapSnapshot()
+      if (!capture) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({
+          error: `A ${diagnostics.busy} capture is already running`
+        }, { status: 409 })))
+      }
+      return enhanceSecurityHeaders(handleCORS(NextResponse.json({ capture })))
+    }
 
     if (pathname === '/auth/signup') {
       const { username, password, referralCode } = body
@@ -453,20 +715,7 @@ export async function POST(request) {
         }, { status: 400 })))
       }
 
-      console.log(`User signup attempt: ${username}`)
-
-      // Check if username already exists with case-insensitive check
-      const { data: existingUser, error: checkError } = await supabase
-        .from('users')
-        .select('id, username')
-        .ilike('username', username)
-        .single()
-
-      if (existingUser) {
-        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
-          error: 'Username already exists' 
-        }, { status: 400 })))
-      }
+      logger.debug('User signup attempt', { route: pathname, username })
 
       const userId = uuidv4()
       const userReferralCode = uuidv4().substring(0, 8).toUpperCase()
@@ -487,11 +736,16 @@ export async function POST(request) {
         updated_at: new Date().toISOString()
       }
 
-      const { data: userData, error: insertError } = await supabase
+      // A single insert: idx_users_username_lower rejects case-insensitive duplicates atomically
+      const { error: insertError } = await supabase
         .from('users')
         .insert([newUser])
-        .select()
-        .single()
+
+      if (insertError && insertError.code === '23505' && isUsernameConflict(insertError)) {
+        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
+          error: 'Username already exists' 
+        }, { status: 409 })))
+      }
 
       if (insertError) {
         console.error('User creation error:', insertError)
@@ -509,7 +763,7 @@ export async function POST(request) {
         }, { status: 500 })))
       }
 
-      console.log(`User created successfully: ${userId}`)
+      logger.info('User created', { route: pathname, userId })
 
       // Enhanced referral handling
       if (referralCode && referralCode.trim() !== '') {
@@ -533,14 +787,13 @@ export async function POST(request) {
         return handleCORS(NextResponse.json({ error: 'Username and password are required' }, { status: 400 }))
       }
 
-      const { data: user, error } = await supabase
-        .from('users')
-        .select('id, username, email')
-        .eq('username', username)
-        .eq('password', password)
-        .single()
+      // Same normalization as signup: trimmed, case-insensitive via idx_users_username_lower
+      const user = await dataAccess.signIn(username, password).catch(error => {
+        console.error('Signin lookup error:', error)
+        return null
+      })
 
-      if (error || !user) {
+      if (!user) {
         return handleCORS(NextResponse.json({ error: 'Invalid credentials' }, { status: 401 }))
       }
 
@@ -557,58 +810,47 @@ export async function POST(request) {
         return handleCORS(NextResponse.json({ error: 'User ID required' }, { status: 400 }))
       }
 
-      const { data: user, error } = await supabase
-        .from('users')
-        .select('*')
-        .eq('id', userId)
-        .single()
+      // Profile columns come back already aliased to the camelCase response keys
+      const profile = await dataAccess.getProfile(userId).catch(error => {
+        console.error('Profile lookup error:', error)
+        return null
+      })
       
-      if (error || !user) {
+      if (!profile) {
         return handleCORS(NextResponse.json({ error: 'User not found' }, { status: 404 }))
       }
       
-      // Convert snake_case to camelCase for frontend compatibility
-      const userProfile = {
-        id: user.id,
-        username: user.username,
-        email: user.email,
-        mineBalance: parseFloat(user.mine_balance),
-        referralBalance: parseFloat(user.referral_balance),
-        totalReferrals: user.total_referrals,
-        validReferrals: user.valid_referrals,
-        referralCode: user.referral_code,
-        hasActiveMining: user.has_active_mining,
-        hasBoughtNode4: user.has_bought_node4,
-        createdAt: user.created_at,
-        updatedAt: user.updated_at
-      }
-      
-      return handleCORS(NextResponse.json({ user: userProfile }))
+      return handleCORS(jsonBody(`{"user":${PROFILE_SHAPE.serialize(profile)}}`))
     }
 
     if (pathname === '/user/nodes') {
-      const { userId } = body
+      const { userId, includeArchived } = body
       
       if (!userId) {
         return handleCORS(NextResponse.json({ error: 'User ID required' }, { status: 400 }))
       }
 
-      const { data: userNodes, error } = await supabase
-        .from('user_nodes')
-        .select('*')
-        .eq('user_id', userId)
-        .order('created_at', { ascending: false })
+      // Finished nodes past the archive age are only returned when asked for
+      const { data: userNodes, error } = await readRouter.read(request, userId, client =>
+        selectWithArchive('user_nodes', userId, {
+          columns: USER_NODE_SHAPE.select,
+          archiveColumns: `${USER_NODE_SHAPE.select}, ${ARCHIVED_FLAG}`,
+          sortKey: 'createdAt',
+          includeArchived: includeArchived === true,
+          client
+        })
+      )
       
       if (error) {
         console.error('User nodes fetch error:', error)
         return handleCORS(NextResponse.json({ error: 'Failed to fetch user nodes' }, { status: 500 }))
       }
 
-      // Update mining progress for active nodes
+      // Update mining progress for active nodes; rows already have the response keys
       const now = new Date()
-      const updatedNodes = userNodes.map(node => {
+      for (const node of userNodes) {
         if (node.status === 'running') {
-          const elapsed = now - new Date(node.start_date)
+          const elapsed = now - new Date(node.startDate)
           const totalDuration = node.duration * 24 * 60 * 60 * 1000 // Convert days to milliseconds
           const progress = Math.min(100, (elapsed / totalDuration) * 100)
           
@@ -619,25 +861,34 @@ export async function POST(request) {
             node.progress = progress
           }
         }
-        
-        // Convert snake_case to camelCase for frontend compatibility
-        return {
-          id: node.id,
-          userId: node.user_id,
-          nodeId: node.node_id,
-          transactionHash: node.transaction_hash,
-          status: node.status,
-          progress: parseFloat(node.progress),
-          startDate: node.start_date,
-          endDate: node.end_date,
-          miningAmount: parseFloat(node.mining_amount),
-          dailyMining: parseFloat(node.daily_mining),
-          duration: node.duration,
-          createdAt: node.created_at
-        }
-      })
+      }
+
+      return handleCORS(jsonBody(`{"nodes":${serializeList(USER_NODE_SHAPE.serialize, userNodes)}}`))
+    }
+
+    if (pathname === '/user/withdrawals') {
+      const { userId, includeArchived } = body
+
+      if (!userId) {
+        return handleCORS(NextResponse.json({ error: 'User ID required' }, { status: 400 }))
+      }
+
+      const { data: withdrawals, error } = await readRouter.read(request, userId, client =>
+        selectWithArchive('withdrawals', userId, {
+          columns: WITHDRAWAL_SHAPE.select,
+          archiveColumns: `${WITHDRAWAL_SHAPE.select}, ${ARCHIVED_FLAG}`,
+          sortKey: 'createdAt',
+          includeArchived: includeArchived === true,
+          client
+        })
+      )
 
-      return handleCORS(NextResponse.json({ nodes: updatedNodes }))
+      if (error) {
+        console.error('User withdrawals fetch error:', error)
+        return handleCORS(NextResponse.json({ error: 'Failed to fetch withdrawals' }, { status: 500 }))
+      }
+
+      return handleCORS(jsonBody(`{"withdrawals":${serializeList(WITHDRAWAL_SHAPE.serialize, withdrawals)}}`))
     }
 
     if (pathname === '/user/referrals') {
@@ -647,33 +898,52 @@ export async function POST(request) {
         return handleCORS(NextResponse.json({ error: 'User ID required' }, { status: 400 }))
       }
 
-      const { data: referrals, error } = await supabase
+      const { data: referrals, error } = await readRouter.read(request, userId, client => client
         .from('referrals')
-        .select('*')
+        .select(REFERRAL_SHAPE.select)
         .eq('referrer_id', userId)
         .order('created_at', { ascending: false })
+      )
       
       if (error) {
         console.error('Referrals fetch error:', error)
         return handleCORS(NextResponse.json({ error: 'Failed to fetch referrals' }, { status: 500 }))
       }
 
-      // Convert snake_case to camelCase for frontend compatibility
-      const formattedReferrals = referrals.map(referral => ({
-        id: referral.id,
-        referrerId: referral.referrer_id,
-        referredId: referral.referred_id,
-        referralCode: referral.referral_code,
-        isValid: referral.is_valid,
-        rewardPaid: referral.reward_paid,
-        createdAt: referral.created_at
-      }))
+      return handleCORS(jsonBody(`{"referrals":${serializeList(REFERRAL_SHAPE.serialize, referrals)}}`))
+    }
+
+    if (pathname === '/user/referrals/downline') {
+      const { userId, maxDepth } = body
+
+      if (!userId) {
+        return handleCORS(NextResponse.json({ error: 'User ID required' }, { status: 400 }))
+      }
+      if (maxDepth !== undefined && !(Number.isInteger(maxDepth) && maxDepth > 0)) {
+        return handleCORS(NextResponse.json({ error: 'maxDepth must be a positive integer' }, { status: 400 }))
+      }
 
-      return handleCORS(NextResponse.json({ referrals: formattedReferrals }))
+      // Members per level below the user, from referral_closure
+      const { data: levels, error } = await readRouter.read(request, userId, client =>
+        client.rpc('get_referral_downline', { p_user_id: userId, p_max_depth: maxDepth ?? null })
+      )
+
+      if (error) {
+        console.error('Downline fetch error:', error)
+        return handleCORS(NextResponse.json({ error: 'Failed to fetch downline' }, { status: 500 }))
+      }
+
+      const formattedLevels = levels.map(level => ({ depth: level.depth, members: Number(level.members) }))
+      return handleCORS(NextResponse.json({
+        userId,
+        total: formattedLevels.reduce((sum, level) => sum + level.members, 0),
+        depth: formattedLevels.length ? formattedLevels[formattedLevels.length - 1].depth : 0,
+        levels: formattedLevels
+      }))
     }
 
     if (pathname === '/nodes/purchase') {
-      const { nodeId, transactionHash, userId } = body
+      const { nodeId, userId } = body
       
       // Enhanced input validation
       const validationErrors = validateInput(body, ['nodeId', 'transactionHash', 'userId'])
@@ -683,127 +953,50 @@ export async function POST(request) {
           details: validationErrors 
         }, { status: 400 })))
       }
+      // One spelling per hash, so the job queue and user_nodes agree with the registry
+      const transactionHash = String(body.transactionHash).toLowerCase()
 
-      const node = MINING_NODES.find(n => n.id === nodeId)
+      const node = await nodeCatalog.find(nodeId)
       if (!node) {
         return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'Invalid mining node' }, { status: 400 })))
       }
 
-      console.log(`Processing node purchase: ${nodeId} for user: ${userId}`)
-
-      // Enhanced TRX transaction verification
-      const TRX_RECEIVE_ADDRESS = 'TFNHcYdhEq5sgjaWPdR1Gnxgzu3RUKncwu'
-      const verification = await verifyTRXTransactionEnhanced(
-        transactionHash, 
-        node.price, 
-        TRX_RECEIVE_ADDRESS, 
-        userId
-      )
-      
-      if (!verification.valid) {
-        console.log(`Transaction verification failed for ${transactionHash}: ${verification.error}`)
-        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
-          error: verification.error,
-          details: verification.details || 'Transaction verification failed'
-        }, { status: 400 })))
-      }
-
-      console.log(`Transaction verified successfully: ${transactionHash}`)
-
-      // Check if user already has this node running (enhanced check)
-      const { data: existingActiveNode } = await supabase
-        .from('user_nodes')
-        .select('id, status, created_at')
-        .eq('user_id', userId)
-        .eq('node_id', nodeId)
-        .in('status', ['pending', 'running'])
-        .order('created_at', { ascending: false })
-        .limit(1)
-      
-      if (existingActiveNode && existingActiveNode.length > 0) {
-        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
-          error: 'You already have an active node of this type',
-          details: `Status: ${existingActiveNode[0].status}, Created: ${new Date(existingActiveNode[0].created_at).toLocaleString()}`
-        }, { status: 400 })))
-      }
-
-      // Enhanced user node creation with better tracking
-      const userNode = {
-        id: uuidv4(),
-        user_id: userId,
-        node_id: nodeId,
-        transaction_hash: transactionHash,
-        transaction_verified: true,
-        transaction_amount: node.price,
-        transaction_verified_at: new Date().toISOString(),
-        status: 'running',
-        progress: 0,
-        start_date: new Date().toISOString(),
-        end_date: new Date(Date.now() + node.duration * 24 * 60 * 60 * 1000).toISOString(),
-        mining_amount: node.mining,
-        daily_mining: node.mining / node.duration,
-        duration: node.duration,
-        total_mined: 0,
-        last_mining_update: new Date().toISOString()
-      }
-
-      const { data: nodeData, error: insertError } = await supabase
-        .from('user_nodes')
-        .insert([userNode])
-        .select()
-        .single()
-
-      if (insertError) {
-        console.error('Node purchase database error:', insertError)
-        return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
-          error: 'Failed to create mining node',
-          details: 'Database operation failed'
-        }, { status: 500 })))
-      }
-
-      console.log(`Node created successfully: ${nodeData.id}`)
+      // Submit-and-poll: queue the job and answer at once (Prefer: respond-async or PURCHASE_MODE=async)
+      const preferAsync = (request.headers.get('prefer') || '').includes('respond-async')
+      if (preferAsync || process.env.PURCHASE_MODE === 'async') {
+        ensurePurchaseWorkers()
+        let job
+        try {
+          job = await purchaseQueue.enqueue({ userId, nodeId, transactionHash })
+        } catch (error) {
+          if (error.code === '23503') {
+            return enhanceSecurityHeaders(handleCORS(NextResponse.json({ error: 'User not found' }, { status: 404 })))
+          }
+          throw error
+        }
+        if (job.userId !== userId) {
+          return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
+            error: 'Transaction hash already used'
+          }, { status: 400 })))
+        }
 
-      // Update user's mining status with enhanced tracking
-      const updateData = { 
-        has_active_mining: true,
-        updated_at: new Date().toISOString()
-      }
-      
-      if (nodeId === 'node4') {
-        updateData.has_bought_node4 = true
+        const statusUrl = `/api/nodes/purchase/status?jobId=${job.id}`
+        const response = NextResponse.json({ 
+          message: 'Purchase accepted for verification',
+          jobId: job.id,
+          status: job.status,
+          statusUrl
+        }, { status: 202 })
+        response.headers.set('Location', statusUrl)
+        return enhanceSecurityHeaders(handleCORS(response))
       }
 
-      const { error: updateError } = await supabase
-        .from('users')
-        .update(updateData)
-        .eq('id', userId)
-
-      if (updateError) {
-        console.error('User update error:', updateError)
+      const outcome = await processNodePurchase({ node_id: nodeId, transaction_hash: transactionHash, user_id: userId })
+      const response = NextResponse.json(outcome.body, { status: outcome.status })
+      if (outcome.retryAfterMs) {
+        response.headers.set('Retry-After', String(Math.ceil(outcome.retryAfterMs / 1000)))
       }
-
-      // Enhanced referral processing
-      await processReferralReward(userId)
-
-      console.log(`Node purchase completed successfully for user: ${userId}`)
-
-      return enhanceSecurityHeaders(handleCORS(NextResponse.json({ 
-        message: 'Mining node purchased and verified successfully!',
-        node: {
-          id: nodeData.id,
-          nodeId: nodeData.node_id,
-          status: nodeData.status,
-          startDate: nodeData.start_date,
-          endDate: nodeData.end_date,
-          miningAmount: nodeData.mining_amount,
-          dailyMining: nodeData.daily_mining
-        },
-        verification: {
-          verified: true,
-          amount: verification.amount,
-          timestamp: verification.blockTimestamp || new Date().toISOString()
-        }
-      })))
+      return enhanceSecurityHeaders(handleCORS(response))
     }
 
     if (pathname === '/withdraw') {
@@ -813,99 +1006,18 @@ export async function POST(request) {
         return handleCORS(NextResponse.json({ error: 'User ID required' }, { status: 400 }))
       }
 
-      const { data: user, error: userError } = await supabase
-        .from('users')
-        .select('*')
-        .eq('id', userId)
-        .single()
-
-      if (userError || !user) {
-        return handleCORS(NextResponse.json({ error: 'User not found' }, { status: 404 }))
-      }
-
-      if (type === 'mine') {
-        if (amount < 25) {
-          return handleCORS(NextResponse.json({ error: 'Minimum withdrawal is 25 TRX' }, { status: 400 }))
-        }
-        
-        if (parseFloat(user.mine_balance) < amount) {
-          return handleCORS(NextResponse.json({ error: 'Insufficient balance' }, { status: 400 }))
-        }
-
-        if (!user.has_active_mining) {
-          return handleCORS(NextResponse.json({ error: 'You must buy a mining node first' }, { status: 400 }))
-        }
-
-        // Process withdrawal
-        const { error: withdrawError } = await supabase
-          .from('users')
-          .update({ 
-            mine_balance: parseFloat(user.mine_balance) - amount,
-            updated_at: new Date().toISOString()
-          })
-          .eq('id', userId)
-
-        if (withdrawError) {
-          console.error('Mine withdrawal error:', withdrawError)
-          return handleCORS(NextResponse.json({ error: 'Withdrawal failed' }, { status: 500 }))
-        }
-
-        // Record withdrawal
-        await supabase
-          .from('withdrawals')
-          .insert([{
-            id: uuidv4(),
-            user_id: userId,
-            type: 'mine',
-            amount: amount,
-            status: 'completed'
-          }])
-
-        return handleCORS(NextResponse.json({ message: 'Mine balance withdrawal successful!' }))
-      }
-
-      if (type === 'referral') {
-        if (amount < 50) {
-          return handleCORS(NextResponse.json({ error: 'Minimum withdrawal is 50 TRX' }, { status: 400 }))
-        }
-
-        if (parseFloat(user.referral_balance) < amount) {
-          return handleCORS(NextResponse.json({ error: 'Insufficient balance' }, { status: 400 }))
-        }
-
-        if (!user.has_bought_node4) {
-          return handleCORS(NextResponse.json({ error: 'You must buy Node 4 (1024 GB) first' }, { status: 400 }))
-        }
-
-        // Process withdrawal
-        const { error: withdrawError } = await supabase
-          .from('users')
-          .update({ 
-            referral_balance: parseFloat(user.referral_balance) - amount,
-            updated_at: new Date().toISOString()
-          })
-          .eq('id', userId)
-
-        if (withdrawError) {
-          console.error('Referral withdrawal error:', withdrawError)
-          return handleCORS(NextResponse.json({ error: 'Withdrawal failed' }, { status: 500 }))
-        }
-
-        // Record withdrawal
-        await supabase
-          .from('withdrawals')
-          .insert([{
-            id: uuidv4(),
-            user_id: userId,
-            type: 'referral',
-            amount: amount,
-            status: 'completed'
-          }])
+      // Balance checks, debit and the withdrawal record (one locked transaction on the postgres backend)
+      const result = await dataAccess.withdraw(userId, type, amount).catch(error => {
+        console.error('Withdrawal error:', error)
+        return { error: 'Withdrawal failed', status: 500 }
+      })
 
-        return handleCORS(NextResponse.json({ message: 'Referral balance withdrawal successful!' }))
+      if (result.error) {
+        return handleCORS(NextResponse.json({ error: result.error }, { status: result.status }))
       }
 
-      return handleCORS(NextResponse.json({ error: 'Invalid withdrawal type' }, { status: 400 }))
+      const label = type === 'mine' ? 'Mine' : 'Referral'
+      return handleCORS(NextResponse.json({ message: `${label} balance withdrawal successful!` }))
     }
 
     return handleCORS(NextResponse.json({ error: 'Not found' }, { status: 404 }))
@@ -1,5 +1,6 @@
 // API Proxy route to handle routing issues
 import { NextResponse } from 'next/server'
+import logger from '../../../lib/logger'
 
 export async function GET(request, { params }) {
   try {
@@ -13,7 +14,7 @@ export async function GET(request, { params }) {
       url.searchParams.append(key, value)
     })
     
-    console.log(`[API PROXY] Forwarding GET request to: ${url.toString()}`)
+    logger.debug('API proxy forwarding', { route: `/${path}`, method: 'GET', url: url.toString() })
     
     const response = await fetch(url.toString(), {
       method: 'GET',
@@ -45,7 +46,7 @@ export async function POST(request, { params }) {
     const path = params.path ? params.path.join('/') : ''
     const url = new URL(`http://localhost:3000/api/${path}`, request.url)
     
-    console.log(`[API PROXY] Forwarding POST request to: ${url.toString()}`)
+    logger.debug('API proxy forwarding', { route: `/${path}`, method: 'POST', url: url.toString() })
     
     const body = await request.text()
     
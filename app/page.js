@@ -25,11 +25,27 @@ import {
   LogOut
 } from 'lucide-react'
 
+const newIdempotencyKey = () => {
+  if (typeof crypto !== 'undefined' && crypto.randomUUID) {
+    return crypto.randomUUID()
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`
+}
+
 // API utility function with alternative endpoint for external access
 const apiRequest = async (endpoint, options = {}) => {
   // Remove leading slash from endpoint for the new structure
   const cleanEndpoint = endpoint.startsWith('/') ? endpoint.slice(1) : endpoint
   
+  // One Idempotency-Key per mutation, sent again on the fallback request so the
+  // server replays the first result instead of running the mutation twice
+  if (options.method === 'POST' && !options.headers?.['Idempotency-Key']) {
+    options = {
+      ...options,
+      headers: { ...options.headers, 'Idempotency-Key': newIdempotencyKey() }
+    }
+  }
+  
   // Try the new alternative API endpoint first
   const alternativeUrl = `/trx-api?path=${cleanEndpoint}`
   
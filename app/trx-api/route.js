@@ -1,5 +1,6 @@
 // Single API endpoint to handle all API calls
 import { NextResponse } from 'next/server'
+import logger from '../../lib/logger'
 
 // Import the main API handler
 import { GET as APIGet, POST as APIPost } from '../api/[[...path]]/route.js'
@@ -10,7 +11,7 @@ export async function GET(request) {
     const url = new URL(request.url)
     const path = url.searchParams.get('path') || ''
     
-    console.log(`[TRX-API] GET request for path: ${path}`)
+    logger.debug('TRX-API request', { route: `/${path}`, method: 'GET' })
     
     // Create a mock request with the path
     const mockRequest = new Request(`http://localhost:3000/api/${path}`, {
@@ -26,7 +27,7 @@ export async function GET(request) {
     // Add CORS headers
     response.headers.set('Access-Control-Allow-Origin', '*')
     response.headers.set('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With')
+    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Idempotency-Key')
     
     return response
   } catch (error) {
@@ -41,7 +42,7 @@ export async function POST(request) {
     const url = new URL(request.url)
     const path = url.searchParams.get('path') || ''
     
-    console.log(`[TRX-API] POST request for path: ${path}`)
+    logger.debug('TRX-API request', { route: `/${path}`, method: 'POST' })
     
     // Create a mock request with the path
     const body = await request.text()
@@ -59,7 +60,7 @@ export async function POST(request) {
     // Add CORS headers
     response.headers.set('Access-Control-Allow-Origin', '*')
     response.headers.set('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With')
+    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Idempotency-Key')
     
     return response
   } catch (error) {
@@ -74,7 +75,7 @@ export async function OPTIONS(request) {
     headers: {
       'Access-Control-Allow-Origin': '*',
       'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-      'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With',
+      'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With, Idempotency-Key',
       'Access-Control-Max-Age': '86400'
     }
   })
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Hot/Cold Archive Benchmark for TRX Mining Platform
+Seeds a year of history with seed_data.py (1M users by default), then measures the
+hot user_nodes/withdrawals indexes and per-user query latency before and after
+moving finished rows older than ARCHIVE_AFTER_DAYS into the archive tables with
+archive_user_nodes/archive_withdrawals. The run is interrupted halfway and resumed
+to check that no row is lost or duplicated, and the archive-inclusive read is
+timed alongside the hot-only one.
+"""
+
+import os
+import random
+import time
+
+from benchmark_utils import connect, apply_schema, summarize, print_result
+from seed_data import generate_dataset, teardown_dataset, namespace_for, row_id
+
+USERS = int(os.getenv('BENCH_USERS', '1000000'))
+SEED = int(os.getenv('BENCH_SEED', '43'))
+PREFIX = 'archive'
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '90'))
+BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '5000'))
+SAMPLE_USERS = int(os.getenv('BENCH_SAMPLE_USERS', '500'))
+
+TABLES = {
+    'user_nodes': ('archive_user_nodes', 'idx_user_nodes_user_id'),
+    'withdrawals': ('archive_withdrawals', 'idx_withdrawals_user_id'),
+}
+HOT_QUERY = "SELECT * FROM {table} WHERE user_id = %s ORDER BY created_at DESC"
+WITH_ARCHIVE_QUERY = """
+    SELECT * FROM (
+        SELECT *, NULL::timestamptz AS archived_at FROM {table} WHERE user_id = %s
+        UNION ALL
+        SELECT * FROM {table}_archive WHERE user_id = %s
+    ) rows ORDER BY created_at DESC
+"""
+
+
+def sizes(conn):
+    """{table: (hot table bytes, user_id index bytes, archive table bytes)}"""
+    result = {}
+    with conn.cursor() as cur:
+        for table, (_, index) in TABLES.items():
+            cur.execute(
+                "SELECT pg_table_size(%s), pg_relation_size(%s), pg_total_relation_size(%s)",
+                (table, index, f"{table}_archive")
+            )
+            result[table] = cur.fetchone()
+    return result
+
+
+def row_counts(conn):
+    with conn.cursor() as cur:
+        counts = {}
+        for table in TABLES:
+            cur.execute(f"SELECT (SELECT COUNT(*) FROM {table}), (SELECT COUNT(*) FROM {table}_archive)")
+            counts[table] = cur.fetchone()
+    return counts
+
+
+def time_per_user(conn, sql, user_ids, archive=False):
+    samples = []
+    with conn.cursor() as cur:
+        for user_id in user_ids:
+            start = time.perf_counter()
+            cur.execute(sql, (user_id, user_id) if archive else (user_id,))
+            cur.fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def archive(conn, function, max_batches=None):
+    """Call the archive function batch by batch; returns (rows moved, seconds, batches)"""
+    moved, batches = 0, 0
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        while max_batches is None or batches < max_batches:
+            cur.execute(f"SELECT {function}(%s::interval, %s)", (f"{ARCHIVE_AFTER_DAYS} days", BATCH_SIZE))
+            count = cur.fetchone()[0]
+            moved += count
+            batches += 1
+            if count < BATCH_SIZE:
+                break
+    return moved, time.perf_counter() - start, batches
+
+
+def report_sizes(label, measured):
+    for table, (table_bytes, index_bytes, archive_bytes) in measured.items():
+        print(f"   {label:<22} {table:<12} table {table_bytes / 2**20:9.1f} MiB   "
+              f"{TABLES[table][1]} {index_bytes / 2**20:8.1f} MiB   archive {archive_bytes / 2**20:8.1f} MiB")
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"HOT/COLD ARCHIVE BENCHMARK ({USERS:,} users, archive after {ARCHIVE_AFTER_DAYS} days)")
+    print("=" * 80)
+    teardown_dataset(SEED, PREFIX, verbose=False)
+    counts = generate_dataset(USERS, SEED, PREFIX)
+    print(f"   {counts['user_nodes']:,} user_nodes, {counts['withdrawals']:,} withdrawals\n")
+
+    namespace = namespace_for(SEED, PREFIX)
+    user_ids = [row_id(namespace, 'users', i) for i in random.Random(SEED).sample(range(USERS), SAMPLE_USERS)]
+
+    try:
+        before_counts = row_counts(conn)
+        before_sizes = sizes(conn)
+        before = {table: time_per_user(conn, HOT_QUERY.format(table=table), user_ids) for table in TABLES}
+
+        for table, (function, _) in TABLES.items():
+            # Stop after a couple of batches, then resume: the second run picks up the rest
+            first, first_seconds, _ = archive(conn, function, max_batches=2)
+            rest, rest_seconds, batches = archive(conn, function)
+            moved = first + rest
+            print(f"   archived {moved:,} {table} rows in {first_seconds + rest_seconds:.1f}s "
+                  f"({moved / max(first_seconds + rest_seconds, 1e-9):,.0f} rows/s, interrupted after 2 batches, "
+                  f"resumed for {batches} more)")
+
+        after_counts = row_counts(conn)
+        with conn.cursor() as cur:
+            for table in TABLES:
+                cur.execute(f"VACUUM ANALYZE {table}")
+                cur.execute(f"VACUUM ANALYZE {table}_archive")
+        vacuumed_sizes = sizes(conn)
+        with conn.cursor() as cur:
+            for _, index in TABLES.values():
+                cur.execute(f"REINDEX INDEX CONCURRENTLY {index}")
+        reindexed_sizes = sizes(conn)
+
+        after = {table: time_per_user(conn, HOT_QUERY.format(table=table), user_ids) for table in TABLES}
+        with_archive = {table: time_per_user(conn, WITH_ARCHIVE_QUERY.format(table=table), user_ids, archive=True)
+                        for table in TABLES}
+    finally:
+        teardown_dataset(SEED, PREFIX)
+        conn.close()
+
+    print()
+    report_sizes('before', before_sizes)
+    report_sizes('after vacuum', vacuumed_sizes)
+    report_sizes('after reindex', reindexed_sizes)
+    print()
+    for table in TABLES:
+        print_result(f"{table} per user, before", before[table])
+        print_result(f"{table} per user, hot only after", after[table])
+        print_result(f"{table} per user, incl. archive", with_archive[table])
+    print()
+    for table in TABLES:
+        hot_before, archived_before = before_counts[table]
+        hot_after, archived_after = after_counts[table]
+        preserved = hot_before + archived_before == hot_after + archived_after
+        print(f"   {'✅' if preserved else '❌'} {table}: {hot_before:,} hot before, "
+              f"{hot_after:,} hot + {archived_after:,} archived after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Audit Log Benchmark for TRX Mining Platform
+Runs node purchases through the real verifier against the local Trongrid stand-in,
+once with AUDIT_LOG_MODE=sync (every audit write awaited) and once buffered, and
+compares purchase latency. The app's Supabase settings must point at a local stack.
+"""
+
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import start_server, stop_server, wait_for_server, summarize, print_result
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Audit-Log-Benchmark/1.0'
+}
+PURCHASES = int(os.getenv('BENCH_PURCHASES', '200'))
+CONCURRENCY = int(os.getenv('BENCH_CONCURRENCY', '10'))
+
+
+def client_headers(i):
+    # Distinct client IPs so the rate limiter doesn't throttle the benchmark itself
+    return {**HEADERS, 'X-Forwarded-For': f"10.31.{i // 250}.{i % 250}"}
+
+
+def create_user(i, run_id):
+    response = requests.post(
+        f"{BASE_URL}/auth/signup",
+        json={'username': f"audit_{run_id}_{i}", 'password': 'benchpass123'},
+        headers=client_headers(i),
+        timeout=30
+    )
+    response.raise_for_status()
+    return response.json()['user']['id']
+
+
+def purchase(i, user_id):
+    start = time.perf_counter()
+    response = requests.post(
+        f"{BASE_URL}/nodes/purchase",
+        json={'nodeId': 'node1', 'transactionHash': secrets.token_hex(32), 'userId': user_id},
+        headers=client_headers(PURCHASES + i),
+        timeout=60
+    )
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def run_mode(mode, standin):
+    env = {
+        'TRX_VERIFIER': 'enhanced',
+        'TRONGRID_API_URL': standin.url,
+        'AUDIT_LOG_MODE': mode
+    }
+    process = start_server(PORT, env)
+    try:
+        wait_for_server(BASE_URL)
+        run_id = f"{mode[:4]}{secrets.token_hex(3)}"
+        with ThreadPoolExecutor(CONCURRENCY) as pool:
+            user_ids = list(pool.map(lambda i: create_user(i, run_id), range(PURCHASES)))
+            results = list(pool.map(lambda args: purchase(*args), enumerate(user_ids)))
+    finally:
+        stop_server(process)
+
+    failed = [status for _, status in results if status != 200]
+    if failed:
+        print(f"   ⚠️  {len(failed)} purchases failed in {mode} mode (statuses: {sorted(set(failed))})")
+    return summarize([elapsed for elapsed, _ in results])
+
+
+def main():
+    print("=" * 80)
+    print(f"AUDIT LOG BENCHMARK ({PURCHASES} purchases, concurrency {CONCURRENCY})")
+    print("=" * 80)
+
+    standin = TrongridStandIn(STANDIN_PORT).start()
+    try:
+        sync = run_mode('sync', standin)
+        buffered = run_mode('buffered', standin)
+    finally:
+        standin.stop()
+
+    print_result("purchase, AUDIT_LOG_MODE=sync", sync)
+    print_result("purchase, AUDIT_LOG_MODE=buffered", buffered)
+    print()
+    print(f"   p50 {sync['p50'] / buffered['p50']:.2f}x, p95 {sync['p95'] / buffered['p95']:.2f}x faster when buffered")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Benchmark for TRX Mining Platform
+Restarts the standalone server repeatedly under each WARMUP_MODE and measures
+time to first byte: from process spawn to the first /api/nodes byte, then the
+first sign-in (Supabase client, data access and verifier paths) on the fresh
+process against the same request once the process is warm.
+"""
+
+import os
+import statistics
+import time
+
+import requests
+
+from benchmark_utils import SERVER_CMD, start_server, stop_server
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Cold-Start-Benchmark/1.0'
+}
+RUNS = int(os.getenv('BENCH_RUNS', '10'))
+WARM_REQUESTS = 20
+TIMEOUT = 60
+MODES = ('blocking', 'background', 'lazy')
+
+request_count = 0
+
+
+def first_byte(method, path, body=None):
+    """Milliseconds until the response headers arrive, and the status"""
+    # Distinct client IPs so the rate limiter stays out of the way
+    global request_count
+    request_count += 1
+    headers = {**HEADERS, 'X-Forwarded-For': f"10.46.{request_count // 250 % 250}.{request_count % 250}"}
+    start = time.perf_counter()
+    with requests.request(method, f"{BASE_URL}{path}", json=body, headers=headers, stream=True,
+                          timeout=TIMEOUT) as response:
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def sign_in():
+    # An unknown user still goes through the sign-in lookup
+    return first_byte('POST', '/auth/signin', {'username': 'cold_start_nobody', 'password': 'coldstart123'})
+
+
+def cold_start(mode):
+    """One restart: (spawn → first /nodes byte, first sign-in, warm sign-in median) in ms"""
+    spawned_at = time.perf_counter()
+    process = start_server(PORT, {'WARMUP_MODE': mode})
+    try:
+        while True:
+            if time.perf_counter() - spawned_at > TIMEOUT:
+                raise TimeoutError(f"{BASE_URL}/nodes did not respond within {TIMEOUT}s")
+            try:
+                _, status = first_byte('GET', '/nodes')
+                if status == 200:
+                    break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.005)
+        to_first_byte = (time.perf_counter() - spawned_at) * 1000
+
+        first_sign_in, status = sign_in()
+        warm = statistics.median(sign_in()[0] for _ in range(WARM_REQUESTS))
+        return to_first_byte, first_sign_in, warm, status
+    finally:
+        stop_server(process)
+
+
+def main():
+    print("=" * 80)
+    print(f"COLD-START BENCHMARK ({RUNS} restarts per mode of: {SERVER_CMD})")
+    print("=" * 80)
+
+    results = {}
+    for mode in MODES:
+        print(f"\nWARMUP_MODE={mode}")
+        runs = []
+        for run in range(1, RUNS + 1):
+            to_first_byte, first_sign_in, warm, status = cold_start(mode)
+            runs.append((to_first_byte, first_sign_in, warm))
+            print(f"   run {run:2d}: first /nodes byte after {to_first_byte:8.1f} ms   "
+                  f"first sign-in {first_sign_in:7.1f} ms (HTTP {status})   warm sign-in {warm:6.1f} ms")
+        results[mode] = runs
+
+    print()
+    print(f"{'mode':<12} {'spawn → first byte':>20} {'first sign-in':>15} {'warm sign-in':>14}   (medians)")
+    for mode, runs in results.items():
+        columns = [statistics.median(run[i] for run in runs) for i in range(3)]
+        print(f"{mode:<12} {columns[0]:17.1f} ms {columns[1]:12.1f} ms {columns[2]:11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
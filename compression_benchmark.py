@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Response Compression Benchmark for TRX Mining Platform
+Requests the node catalog, a heavy user's listings and the admin stats through a
+throttled local link (a TCP proxy with limited bandwidth and added latency) with
+Accept-Encoding identity, gzip and br, and reports the bytes on the wire and the
+latency of each. BENCH_DATABASE_URL must be the database behind the app's local
+Supabase stack.
+"""
+
+import gzip
+import os
+import secrets
+import socket
+import statistics
+import threading
+import time
+from socketserver import BaseRequestHandler, ThreadingTCPServer
+
+import requests
+
+from benchmark_utils import connect, apply_schema, start_server, stop_server, wait_for_server
+from response_shape_benchmark import add_history, pick_heavy_user
+from seed_data import generate_dataset, teardown_dataset, namespace_for
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+LINK_PORT = int(os.getenv('BENCH_LINK_PORT', '3101'))
+BASE_URL = f"http://localhost:{PORT}/api"
+LINK_URL = f"http://localhost:{LINK_PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Compression-Benchmark/1.0'
+}
+USERS = int(os.getenv('BENCH_USERS', '50000'))
+SEED = int(os.getenv('BENCH_SEED', '48'))
+PREFIX = 'cmp'
+REQUESTS = int(os.getenv('BENCH_REQUESTS', '20'))
+LINK_KBIT = int(os.getenv('BENCH_LINK_KBIT', '2000'))
+LINK_LATENCY_MS = int(os.getenv('BENCH_LINK_LATENCY_MS', '40'))
+ENCODINGS = ('identity', 'gzip', 'br')
+# Admin token for the server this benchmark starts; /admin/referrals/top requires it
+ADMIN_API_TOKEN = secrets.token_hex(16)
+
+request_count = 0
+
+
+class ThrottledLink:
+    """TCP proxy that paces the server → client direction at LINK_KBIT and adds LINK_LATENCY_MS"""
+
+    def __init__(self, port, target_port, kbit=LINK_KBIT, latency_ms=LINK_LATENCY_MS):
+        self.bytes_per_second = kbit * 1000 / 8
+        self.latency = latency_ms / 1000
+        link = self
+
+        class Handler(BaseRequestHandler):
+            def handle(self):
+                upstream = socket.create_connection(('127.0.0.1', target_port))
+                threading.Thread(target=link.pump, args=(self.request, upstream, False), daemon=True).start()
+                link.pump(upstream, self.request, True)
+
+        ThreadingTCPServer.allow_reuse_address = True
+        self.server = ThreadingTCPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+
+    def pump(self, source, destination, throttled):
+        idle_since = time.perf_counter()
+        try:
+            while True:
+                chunk = source.recv(4096)
+                if not chunk:
+                    break
+                if throttled:
+                    # Latency once per burst, then the chunk's transmission time
+                    if time.perf_counter() - idle_since > self.latency:
+                        time.sleep(self.latency)
+                    time.sleep(len(chunk) / self.bytes_per_second)
+                destination.sendall(chunk)
+                idle_since = time.perf_counter()
+        except OSError:
+            pass
+        finally:
+            for sock in (source, destination):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def fetch(method, path, body, encoding):
+    """One request over the link: (ms, bytes on the wire, Content-Encoding, decoded body)"""
+    # Distinct client IPs so the rate limiter stays out of the way
+    global request_count
+    request_count += 1
+    headers = {**HEADERS, 'Accept-Encoding': encoding, 'Authorization': f"Bearer {ADMIN_API_TOKEN}",
+               'X-Forwarded-For': f"10.48.{request_count // 250 % 250}.{request_count % 250}"}
+    start = time.perf_counter()
+    with requests.request(method, f"{LINK_URL}{path}", json=body, headers=headers, stream=True,
+                          timeout=120) as response:
+        response.raise_for_status()
+        wire = response.raw.read(decode_content=False)
+        elapsed = (time.perf_counter() - start) * 1000
+        content_encoding = response.headers.get('Content-Encoding', 'identity')
+    decoded = gzip.decompress(wire) if content_encoding == 'gzip' else wire
+    return elapsed, len(wire), content_encoding, decoded
+
+
+def measure(method, path, body):
+    """Per Accept-Encoding: (median ms, bytes on the wire, encoding served); gzip must decode to identity"""
+    results = {}
+    identity_body = None
+    for encoding in ENCODINGS:
+        runs = [fetch(method, path, body, encoding) for _ in range(REQUESTS)]
+        _, wire, served, decoded = runs[-1]
+        if encoding == 'identity':
+            identity_body = decoded
+        elif served == 'gzip' and decoded != identity_body:
+            raise AssertionError(f"{path}: gzip body does not decode to the identity body")
+        results[encoding] = (statistics.median(run[0] for run in runs), wire, served)
+    return results
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"COMPRESSION BENCHMARK ({LINK_KBIT} kbit/s link, +{LINK_LATENCY_MS} ms, {REQUESTS} requests each)")
+    print("=" * 80)
+    teardown_dataset(SEED, PREFIX, verbose=False)
+    generate_dataset(USERS, SEED, PREFIX)
+    namespace = namespace_for(SEED, PREFIX)
+    user_id, _ = pick_heavy_user(conn, namespace)
+    add_history(conn, namespace, user_id)
+
+    calls = {
+        'GET /nodes': ('GET', '/nodes', None),
+        'POST /user/nodes': ('POST', '/user/nodes', {'userId': user_id}),
+        'POST /user/withdrawals': ('POST', '/user/withdrawals', {'userId': user_id}),
+        'POST /user/referrals': ('POST', '/user/referrals', {'userId': user_id}),
+        'GET /admin/referrals/top': ('GET', '/admin/referrals/top?limit=100', None),
+        'GET /admin/db-status': ('GET', '/admin/db-status', None),
+    }
+
+    process = start_server(PORT, {'ADMIN_API_TOKEN': ADMIN_API_TOKEN})
+    link = ThrottledLink(LINK_PORT, PORT).start()
+    outcomes = {}
+    try:
+        wait_for_server(BASE_URL)
+        for label, call in calls.items():
+            outcomes[label] = measure(*call)
+    finally:
+        link.stop()
+        stop_server(process)
+        teardown_dataset(SEED, PREFIX)
+        conn.close()
+
+    print()
+    print(f"   {'request':<26} {'accept':<9} {'served':<9} {'on the wire':>12} {'median':>11}")
+    for label, results in outcomes.items():
+        identity_bytes = results['identity'][1]
+        for encoding, (median_ms, wire, served) in results.items():
+            ratio = f"({wire / identity_bytes:6.1%})" if identity_bytes else ''
+            print(f"   {label:<26} {encoding:<9} {served:<9} {wire:>10,} B {median_ms:8.1f} ms {ratio}")
+
+
+if __name__ == "__main__":
+    main()
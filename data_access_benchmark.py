@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Data Access Backend Benchmark for TRX Mining Platform
+A/B comparison of the hot endpoints (signin, profile, withdraw, purchase) served
+through PostgREST (DATA_BACKEND=postgrest) and through the native Postgres pool
+(DATA_BACKEND=postgres), on the same seeded users and the same request mix.
+Also races concurrent withdrawals against one balance on each backend: the
+pooled backend locks the user row, so the balance can never be overspent.
+BENCH_DATABASE_URL must be the database behind the app's local Supabase stack.
+"""
+
+import os
+import random
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import (
+    BENCH_DATABASE_URL, connect, apply_schema, start_server, stop_server, wait_for_server, summarize, print_result
+)
+from seed_data import generate_dataset, teardown_dataset, namespace_for, row_id
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Data-Access-Benchmark/1.0'
+}
+USERS = int(os.getenv('BENCH_USERS', '200000'))
+SEED = int(os.getenv('BENCH_SEED', '44'))
+PREFIX = 'dal'
+REQUESTS = int(os.getenv('BENCH_REQUESTS', '1000'))
+PURCHASES = int(os.getenv('BENCH_PURCHASES', '200'))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', '16'))
+RACE_WITHDRAWALS = 10
+RACE_BALANCE = 100
+
+BACKENDS = {
+    'postgrest': {'DATA_BACKEND': 'postgrest'},
+    'postgres': {'DATA_BACKEND': 'postgres', 'DATABASE_URL': BENCH_DATABASE_URL},
+}
+
+request_count = 0
+
+
+def client_headers():
+    # Distinct client IPs so the rate limiter doesn't throttle the benchmark itself
+    global request_count
+    request_count += 1
+    return {**HEADERS, 'X-Forwarded-For': f"10.44.{request_count // 250 % 250}.{request_count % 250}"}
+
+
+def post(path, body):
+    start = time.perf_counter()
+    response = requests.post(f"{BASE_URL}{path}", json=body, headers=client_headers(), timeout=60)
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def run_workload(calls):
+    """Fire `calls` (path, body) from CLIENTS threads; returns (summary, requests/s, statuses)"""
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        results = list(pool.map(lambda call: post(*call), calls))
+    wall = time.perf_counter() - started_at
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return summarize([elapsed for elapsed, _ in results]), len(calls) / wall, statuses
+
+
+def pick_users(conn, namespace):
+    """Miners (can withdraw) and users without nodes (can purchase), in a fixed order"""
+    with conn.cursor() as cur:
+        low, high = row_id(namespace, 'users', 0), row_id(namespace, 'users', USERS)
+        cur.execute("SELECT id, username FROM users WHERE id BETWEEN %s AND %s AND has_active_mining "
+                    "ORDER BY id LIMIT %s", (low, high, REQUESTS))
+        miners = [(str(user_id), username) for user_id, username in cur.fetchall()]
+        cur.execute("SELECT id FROM users WHERE id BETWEEN %s AND %s AND NOT has_active_mining "
+                    "ORDER BY id LIMIT %s", (low, high, PURCHASES * len(BACKENDS) + 1))
+        buyers = [str(row[0]) for row in cur.fetchall()]
+    return miners, buyers
+
+
+def snapshot_balances(conn, user_ids):
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, mine_balance FROM users WHERE id = ANY(%s::uuid[])", (user_ids,))
+        return dict(cur.fetchall())
+
+
+def restore_balances(conn, balances):
+    """Put the miners' balances back and drop their benchmark withdrawals"""
+    with conn.cursor() as cur:
+        for user_id, balance in balances.items():
+            cur.execute("UPDATE users SET mine_balance = %s WHERE id = %s", (balance, user_id))
+        cur.execute("DELETE FROM withdrawals WHERE user_id = ANY(%s::uuid[]) AND transaction_hash IS NULL "
+                    "AND created_at > NOW() - INTERVAL '1 hour'", (list(balances),))
+
+
+def withdrawal_race(conn, user_id):
+    """RACE_WITHDRAWALS concurrent 25 TRX withdrawals against a RACE_BALANCE balance"""
+    with conn.cursor() as cur:
+        cur.execute("UPDATE users SET mine_balance = %s WHERE id = %s", (RACE_BALANCE, user_id))
+        cur.execute("SELECT COUNT(*) FROM withdrawals WHERE user_id = %s", (user_id,))
+        before = cur.fetchone()[0]
+    with ThreadPoolExecutor(RACE_WITHDRAWALS) as pool:
+        results = list(pool.map(lambda _: post('/withdraw', {'userId': user_id, 'type': 'mine', 'amount': 25}),
+                                range(RACE_WITHDRAWALS)))
+    with conn.cursor() as cur:
+        cur.execute("SELECT mine_balance FROM users WHERE id = %s", (user_id,))
+        balance = float(cur.fetchone()[0])
+        cur.execute("SELECT COUNT(*) FROM withdrawals WHERE user_id = %s", (user_id,))
+        recorded = cur.fetchone()[0] - before
+    succeeded = sum(1 for _, status in results if status == 200)
+    return succeeded, recorded, balance
+
+
+def run_backend(conn, backend, miners, buyers, standin):
+    balances = snapshot_balances(conn, [user_id for user_id, _ in miners])
+    process = start_server(PORT, {**BACKENDS[backend], 'TRX_VERIFIER': 'enhanced', 'TRONGRID_API_URL': standin.url})
+    try:
+        wait_for_server(BASE_URL)
+        # Warm both paths (PostgREST connection, pool and prepared statements) before timing
+        run_workload([('/user/profile', {'userId': user_id}) for user_id, _ in miners[:CLIENTS * 2]])
+
+        results = {
+            'signin': run_workload([
+                ('/auth/signin', {'username': username, 'password': 'seedpass123'}) for _, username in miners]),
+            'profile': run_workload([('/user/profile', {'userId': user_id}) for user_id, _ in miners]),
+            'withdraw': run_workload([
+                ('/withdraw', {'userId': user_id, 'type': 'mine', 'amount': 25}) for user_id, _ in miners]),
+            'purchase': run_workload([
+                ('/nodes/purchase', {'nodeId': 'node1', 'transactionHash': secrets.token_hex(32), 'userId': user_id})
+                for user_id in buyers]),
+        }
+        race = withdrawal_race(conn, miners[0][0])
+    finally:
+        stop_server(process)
+        restore_balances(conn, balances)
+    return results, race
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"DATA ACCESS BACKEND BENCHMARK ({USERS:,} users, {REQUESTS} requests per endpoint, {CLIENTS} clients)")
+    print("=" * 80)
+    teardown_dataset(SEED, PREFIX, verbose=False)
+    generate_dataset(USERS, SEED, PREFIX)
+    namespace = namespace_for(SEED, PREFIX)
+    miners, buyers = pick_users(conn, namespace)
+    random.Random(SEED).shuffle(miners)
+
+    standin = TrongridStandIn(STANDIN_PORT).start()
+    outcomes = {}
+    try:
+        for index, backend in enumerate(BACKENDS):
+            # Purchases need users without nodes, so each backend gets its own equally sized slice
+            outcomes[backend] = run_backend(conn, backend, miners, buyers[index * PURCHASES:(index + 1) * PURCHASES],
+                                            standin)
+    finally:
+        standin.stop()
+        teardown_dataset(SEED, PREFIX)
+        conn.close()
+
+    for endpoint in ('signin', 'profile', 'withdraw', 'purchase'):
+        print()
+        for backend, (results, _) in outcomes.items():
+            summary, rate, statuses = results[endpoint]
+            print_result(f"{endpoint} via {backend}", summary)
+            print(f"   {'':<40} {rate:8.1f} req/s, statuses {statuses}")
+
+    print()
+    for backend, (_, (succeeded, recorded, balance)) in outcomes.items():
+        expected = RACE_BALANCE // 25
+        consistent = succeeded == recorded == expected and balance == 0
+        print(f"   {'✅' if consistent else '❌'} {backend}: {RACE_WITHDRAWALS} racing withdrawals of 25 from "
+              f"{RACE_BALANCE} → {succeeded} succeeded, {recorded} recorded, balance {balance:.2f} "
+              f"(expected {expected}, 0.00)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Database Status Testing for TRX Mining Platform
+Seeds large tables into the local Postgres behind the app and times /api/admin/db-status
+with planner estimates, the short-lived cache, and exact counts
+"""
+
+import os
+import time
+import requests
+from datetime import datetime
+
+from benchmark_utils import connect, apply_schema, seed_users, time_query, print_result
+
+# Configuration
+BASE_URL = "http://localhost:3000/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-DB-Status-Test/1.0'
+}
+USERS = int(os.getenv('BENCH_USERS', '1000000'))
+NODES_PER_USER = 2
+CACHE_TTL_SECONDS = 15
+
+
+class DBStatusTester:
+    def __init__(self):
+        self.test_results = []
+        self.request_count = 0
+
+    def log_test(self, test_name, success, details="", error_msg=""):
+        """Log test results"""
+        result = {
+            'test': test_name,
+            'success': success,
+            'details': details,
+            'error': error_msg,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.test_results.append(result)
+
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"   Details: {details}")
+        if error_msg:
+            print(f"   Error: {error_msg}")
+        print()
+
+    def get_status(self, exact=False):
+        """Fetch db-status and return (elapsed ms, status payload)"""
+        self.request_count += 1
+        headers = {**HEADERS, 'X-Forwarded-For': f"10.28.0.{self.request_count % 250}"}
+        url = f"{BASE_URL}/admin/db-status" + ("?exact=true" if exact else "")
+        start = time.perf_counter()
+        response = requests.get(url, headers=headers, timeout=120)
+        elapsed = (time.perf_counter() - start) * 1000
+        response.raise_for_status()
+        return elapsed, response.json()['status']
+
+    def seed(self):
+        """Seed USERS users and NODES_PER_USER running nodes each"""
+        print(f"🌱 Seeding {USERS:,} users and {USERS * NODES_PER_USER:,} user_nodes...")
+        start = time.perf_counter()
+        conn = connect()
+        apply_schema()
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE users CASCADE")
+            seed_users(conn, USERS)
+            cur.execute(
+                """
+                INSERT INTO user_nodes (user_id, node_id, transaction_hash, transaction_amount,
+                                        status, start_date, end_date, mining_amount, daily_mining, duration)
+                SELECT u.id, 'node' || n, md5(u.id::text || n) || md5(n || u.id::text), 50,
+                       'running', NOW(), NOW() + INTERVAL '30 days', 500, 16.67, 30
+                FROM users u CROSS JOIN generate_series(1, %s) AS n
+                """,
+                (NODES_PER_USER,)
+            )
+            cur.execute("ANALYZE")
+        print(f"   Seeded in {time.perf_counter() - start:.1f}s\n")
+        return conn
+
+    def test_estimates_vs_exact_sql(self, conn):
+        """Compare the pg_class estimate RPC with exact counts directly in SQL"""
+        tables = ['users', 'user_nodes', 'referrals', 'withdrawals', 'mining_nodes']
+        estimate = time_query(conn, "SELECT * FROM get_table_estimates(%s)", (tables,), runs=20)
+        exact = time_query(
+            conn,
+            " UNION ALL ".join(f"SELECT COUNT(*) FROM {table}" for table in tables),
+            runs=5
+        )
+        print_result("sql: get_table_estimates", estimate)
+        print_result("sql: exact COUNT(*) x5", exact)
+        print()
+        self.log_test(
+            "Estimates Cheaper Than Exact Counts",
+            estimate['p50'] < exact['p50'],
+            f"estimate p50 {estimate['p50']:.2f} ms vs exact p50 {exact['p50']:.2f} ms"
+        )
+
+    def test_endpoint_latency(self):
+        """Time the endpoint cold, cached, and with exact counts"""
+        try:
+            # Let any cache from earlier runs expire first
+            time.sleep(CACHE_TTL_SECONDS)
+
+            cold_ms, status = self.get_status()
+            users = status['tables']['users']
+            cached_ms, _ = self.get_status()
+            exact_ms, exact_status = self.get_status(exact=True)
+
+            print(f"   estimated (cold):   {cold_ms:8.2f} ms   users≈{users['count']:,}")
+            print(f"   estimated (cached): {cached_ms:8.2f} ms")
+            print(f"   exact:              {exact_ms:8.2f} ms   users={exact_status['tables']['users']['count']:,}")
+            print()
+
+            accurate = abs(users['count'] - USERS) <= USERS * 0.1
+            self.log_test(
+                "DB Status Estimates",
+                users.get('estimated') is True and accurate,
+                f"users estimate {users['count']:,} for {USERS:,} seeded rows"
+            )
+            self.log_test(
+                "DB Status Faster Than Exact",
+                cold_ms < exact_ms,
+                f"estimated {cold_ms:.1f} ms vs exact {exact_ms:.1f} ms"
+            )
+            self.log_test(
+                "DB Status Cache Hit",
+                cached_ms < cold_ms,
+                f"cached {cached_ms:.1f} ms vs cold {cold_ms:.1f} ms"
+            )
+        except Exception as e:
+            self.log_test("DB Status Endpoint Latency", False, "", str(e))
+
+    def test_polling_storm(self):
+        """Many pollers inside one TTL window should cost one probe"""
+        try:
+            samples = [self.get_status()[0] for _ in range(50)]
+            samples.sort()
+            p95 = samples[int(len(samples) * 0.95)]
+            self.log_test(
+                "DB Status Polling Storm",
+                p95 < 100,
+                f"50 polls, p50 {samples[25]:.1f} ms, p95 {p95:.1f} ms"
+            )
+        except Exception as e:
+            self.log_test("DB Status Polling Storm", False, "", str(e))
+
+    def run_all_tests(self):
+        """Run all db-status tests"""
+        print("=" * 80)
+        print("DB STATUS TESTS")
+        print("=" * 80)
+        conn = self.seed()
+        self.test_estimates_vs_exact_sql(conn)
+        conn.close()
+        self.test_endpoint_latency()
+        self.test_polling_storm()
+
+        passed = sum(1 for result in self.test_results if result['success'])
+        print(f"Passed: {passed}/{len(self.test_results)}")
+
+
+if __name__ == "__main__":
+    tester = DBStatusTester()
+    tester.run_all_tests()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Deposit Ingest Benchmark for TRX Mining Platform
+Measures how fast the deposit ingester fills trx_deposits, both paging through the
+local Trongrid stand-in and replaying a fixture file, then compares node purchase
+latency when verification answers from trx_deposits versus per-hash Trongrid lookups.
+BENCH_DATABASE_URL must be the database behind the app's local Supabase stack.
+"""
+
+import json
+import os
+import secrets
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import (
+    connect, apply_schema, start_server, stop_server, wait_for_server, summarize, print_result
+)
+from trongrid_standin import (
+    TrongridStandIn, transfer_transaction, base58_to_hex, RECEIVE_ADDRESS, SENDER_ADDRESS
+)
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Deposit-Ingest-Benchmark/1.0'
+}
+DEPOSITS = int(os.getenv('BENCH_DEPOSITS', '50000'))
+PURCHASES = int(os.getenv('BENCH_PURCHASES', '100'))
+UPSTREAM_LATENCY_MS = int(os.getenv('BENCH_UPSTREAM_LATENCY_MS', '150'))
+BASE_ENV = {
+    'TRX_VERIFIER': 'enhanced',
+    'DEPOSIT_INGEST_INTERVAL_MS': '500'
+}
+
+
+def generate_deposits(count):
+    """Incoming node1 payments spread over the last hour, oldest first, plus some noise"""
+    now = int(time.time() * 1000)
+    deposits = []
+    for i in range(count):
+        timestamp = now - 3_600_000 + i * 3_000_000 // count
+        deposits.append(transfer_transaction(secrets.token_hex(32), block_timestamp=timestamp))
+        if i % 20 == 0:
+            # Outgoing transfer that the ingester must skip
+            deposits.append(transfer_transaction(
+                secrets.token_hex(32), to_address=SENDER_ADDRESS, block_timestamp=timestamp))
+    return deposits
+
+
+def reset_deposits(conn):
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE trx_deposits, trx_deposit_checkpoints")
+
+
+def count_deposits(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM trx_deposits")
+        return cur.fetchone()[0]
+
+
+def time_ingestion(conn, env, expected):
+    """Start the server with the ingester enabled and time until every deposit is stored"""
+    reset_deposits(conn)
+    process = start_server(PORT, env)
+    wait_for_server(BASE_URL)
+    started_at = time.perf_counter()
+    stored = 0
+    while stored < expected and time.perf_counter() - started_at < 600:
+        time.sleep(0.05)
+        stored = count_deposits(conn)
+    return process, time.perf_counter() - started_at, stored
+
+
+def client_headers(i):
+    # Distinct client IPs so the rate limiter doesn't throttle the benchmark itself
+    return {**HEADERS, 'X-Forwarded-For': f"10.34.{i // 250}.{i % 250}"}
+
+
+def run_purchases(standin, hashes, run_id):
+    """Buy node1 once per hash with fresh users; returns (latency summary, Trongrid hash lookups)"""
+    with ThreadPoolExecutor(10) as pool:
+        user_ids = list(pool.map(lambda i: requests.post(
+            f"{BASE_URL}/auth/signup",
+            json={'username': f"dep_{run_id}_{i}", 'password': 'benchpass123'},
+            headers=client_headers(i),
+            timeout=30
+        ).json()['user']['id'], range(len(hashes))))
+
+        lookups_before = standin.hash_lookups
+
+        def purchase(i):
+            start = time.perf_counter()
+            response = requests.post(
+                f"{BASE_URL}/nodes/purchase",
+                json={'nodeId': 'node1', 'transactionHash': hashes[i], 'userId': user_ids[i]},
+                headers=client_headers(len(hashes) + i),
+                timeout=60
+            )
+            return (time.perf_counter() - start) * 1000, response.status_code
+
+        results = list(pool.map(purchase, range(len(hashes))))
+
+    failed = [status for _, status in results if status != 200]
+    if failed:
+        print(f"   ⚠️  {len(failed)} purchases failed (statuses: {sorted(set(failed))})")
+    return summarize([elapsed for elapsed, _ in results]), standin.hash_lookups - lookups_before
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"DEPOSIT INGEST BENCHMARK ({DEPOSITS:,} deposits)")
+    print("=" * 80)
+
+    standin = TrongridStandIn(STANDIN_PORT).start()
+    standin.account_transactions = generate_deposits(DEPOSITS)
+    receive_hex = base58_to_hex(RECEIVE_ADDRESS)
+    incoming = [tx['txID'] for tx in standin.account_transactions
+                if tx['raw_data']['contract'][0]['parameter']['value']['to_address'] == receive_hex]
+
+    fixture = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+    json.dump({'data': standin.account_transactions}, fixture)
+    fixture.close()
+
+    try:
+        # Replay: the ingester alone, no HTTP upstream
+        process, elapsed, stored = time_ingestion(
+            conn, {**BASE_ENV, 'DEPOSIT_INGESTER': 'fixtures', 'DEPOSIT_INGEST_FIXTURES': fixture.name}, len(incoming))
+        stop_server(process)
+        print(f"   fixture replay:   {stored:,} deposits in {elapsed:6.2f}s  ({stored / elapsed:10,.0f} deposits/s)")
+
+        # Paging through the stand-in's account listing
+        env = {**BASE_ENV, 'DEPOSIT_INGESTER': 'trongrid', 'TRONGRID_API_URL': standin.url,
+               'TRX_VERIFICATION_SOURCE': 'deposits'}
+        process, elapsed, stored = time_ingestion(conn, env, len(incoming))
+        print(f"   trongrid paging:  {stored:,} deposits in {elapsed:6.2f}s  ({stored / elapsed:10,.0f} deposits/s)")
+        print()
+
+        # Verification from the table, with Trongrid made as slow as the real one
+        standin.behaviour['latency_ms'] = UPSTREAM_LATENCY_MS
+        try:
+            from_table, table_lookups = run_purchases(standin, incoming[:PURCHASES], f"t{secrets.token_hex(3)}")
+        finally:
+            stop_server(process)
+
+        process = start_server(PORT, {**BASE_ENV, 'TRONGRID_API_URL': standin.url})
+        try:
+            wait_for_server(BASE_URL)
+            per_hash, hash_lookups = run_purchases(
+                standin, incoming[PURCHASES:2 * PURCHASES], f"h{secrets.token_hex(3)}")
+        finally:
+            stop_server(process)
+    finally:
+        standin.stop()
+        os.unlink(fixture.name)
+        conn.close()
+
+    print_result("purchase, verified from trx_deposits", from_table)
+    print_result("purchase, per-hash Trongrid lookup", per_hash)
+    print(f"\n   Trongrid hash lookups: {table_lookups} from table vs {hash_lookups} per-hash "
+          f"(upstream latency {UPSTREAM_LATENCY_MS} ms)")
+
+
+if __name__ == "__main__":
+    main()
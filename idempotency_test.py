@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Idempotency-Key Testing for TRX Mining Platform
+Fires bursts of duplicate retries (same Idempotency-Key, split between /api and the
+/trx-api fallback the frontend uses) at /auth/signup, /nodes/purchase and /withdraw,
+then checks the database for double-processing and the Supabase call counters for
+extra DB load. BENCH_DATABASE_URL must be the database behind the app's local
+Supabase stack.
+"""
+
+import os
+import secrets
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from benchmark_utils import connect, apply_schema, start_server, stop_server, wait_for_server
+from metrics_test import parse_metrics, metric_total
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+SERVER_URL = f"http://localhost:{PORT}"
+BASE_URL = f"{SERVER_URL}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Idempotency-Test/1.0'
+}
+DUPLICATES = int(os.getenv('BENCH_DUPLICATES', '20'))
+KEYS_UNDER_LOAD = int(os.getenv('BENCH_IDEMPOTENCY_KEYS', '50'))
+UPSTREAM_LATENCY_MS = int(os.getenv('BENCH_UPSTREAM_LATENCY_MS', '500'))
+
+
+class IdempotencyTester:
+    def __init__(self, conn, standin):
+        self.conn = conn
+        self.standin = standin
+        self.test_results = []
+        self.request_count = 0
+
+    def log_test(self, test_name, success, details="", error_msg=""):
+        """Log test results"""
+        result = {
+            'test': test_name,
+            'success': success,
+            'details': details,
+            'error': error_msg,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.test_results.append(result)
+
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"   Details: {details}")
+        if error_msg:
+            print(f"   Error: {error_msg}")
+        print()
+
+    def headers(self, key=None):
+        # Distinct client IPs so the rate limiter stays out of the way
+        self.request_count += 1
+        headers = {**HEADERS, 'X-Forwarded-For': f"10.36.{self.request_count // 250 % 250}.{self.request_count % 250}"}
+        if key:
+            headers['Idempotency-Key'] = key
+        return headers
+
+    def post(self, path, body, key=None, via_fallback=False):
+        """POST through /api, or through /trx-api?path= like the frontend's first attempt"""
+        if via_fallback:
+            url = f"{SERVER_URL}/trx-api?path={path.lstrip('/')}"
+        else:
+            url = f"{BASE_URL}{path}"
+        return requests.post(url, json=body, headers=self.headers(key), timeout=60)
+
+    def burst(self, path, body, key, count=DUPLICATES):
+        """Send `count` concurrent copies of one request with the same key"""
+        with ThreadPoolExecutor(count) as pool:
+            return list(pool.map(lambda i: self.post(path, body, key, via_fallback=i % 2 == 1), range(count)))
+
+    def supabase_calls(self):
+        samples = parse_metrics(requests.get(f"{BASE_URL}/metrics", timeout=10).text)
+        return metric_total(samples, 'supabase_request_duration_seconds_count')
+
+    def count(self, sql, params):
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchone()[0]
+
+    def signup(self):
+        response = self.post('/auth/signup', {'username': f"idem_{secrets.token_hex(4)}", 'password': 'idempass123'})
+        response.raise_for_status()
+        return response.json()['user']['id']
+
+    def test_signup_duplicates(self):
+        """Duplicate signups create one account and cost one signup's worth of DB calls"""
+        try:
+            calls = self.supabase_calls()
+            self.post('/auth/signup', {'username': f"idem_{secrets.token_hex(4)}", 'password': 'idempass123'},
+                      key=str(uuid.uuid4()))
+            single_cost = self.supabase_calls() - calls
+
+            username = f"idem_{secrets.token_hex(4)}"
+            calls = self.supabase_calls()
+            responses = self.burst('/auth/signup', {'username': username, 'password': 'idempass123'}, str(uuid.uuid4()))
+            burst_cost = self.supabase_calls() - calls
+
+            user_ids = {response.json().get('user', {}).get('id') for response in responses}
+            replayed = sum(1 for response in responses if response.headers.get('Idempotent-Replayed') == 'true')
+            rows = self.count("SELECT COUNT(*) FROM users WHERE username = %s", (username,))
+
+            self.log_test(
+                "Duplicate Signups Processed Once",
+                rows == 1 and len(user_ids) == 1 and replayed == DUPLICATES - 1,
+                f"{DUPLICATES} retries: {rows} user row(s), {len(user_ids)} distinct user id(s), {replayed} replayed"
+            )
+            self.log_test(
+                "Duplicate Signups Add No DB Load",
+                burst_cost == single_cost,
+                f"Supabase calls: {single_cost} for one signup, {burst_cost} for {DUPLICATES} retries"
+            )
+        except Exception as e:
+            self.log_test("Duplicate Signups Processed Once", False, "", str(e))
+
+    def test_purchase_duplicates(self):
+        """Retries of a slow purchase wait on the original: one verification, one node"""
+        try:
+            user_id = self.signup()
+            transaction_hash = secrets.token_hex(32)
+            self.standin.behaviour['latency_ms'] = UPSTREAM_LATENCY_MS
+
+            lookups = self.standin.hash_lookups
+            calls = self.supabase_calls()
+            responses = self.burst('/nodes/purchase', {
+                'nodeId': 'node1', 'transactionHash': transaction_hash, 'userId': user_id
+            }, str(uuid.uuid4()))
+            burst_cost = self.supabase_calls() - calls
+            upstream = self.standin.hash_lookups - lookups
+
+            statuses = {response.status_code for response in responses}
+            bodies = {response.text for response in responses}
+            nodes = self.count("SELECT COUNT(*) FROM user_nodes WHERE user_id = %s", (user_id,))
+
+            self.log_test(
+                "Duplicate Purchases Processed Once",
+                statuses == {200} and len(bodies) == 1 and nodes == 1 and upstream == 1,
+                f"{DUPLICATES} retries: statuses {sorted(statuses)}, {nodes} user_nodes row(s), "
+                f"{upstream} Trongrid lookup(s), {burst_cost} Supabase calls"
+            )
+
+            # A later retry with the same hash but no key still goes through the duplicate check
+            follow_up = self.post('/nodes/purchase', {
+                'nodeId': 'node1', 'transactionHash': transaction_hash, 'userId': user_id
+            })
+            self.log_test(
+                "Keyless Retry Still Rejected",
+                follow_up.status_code == 400,
+                f"status {follow_up.status_code}"
+            )
+        except Exception as e:
+            self.log_test("Duplicate Purchases Processed Once", False, "", str(e))
+        finally:
+            self.standin.behaviour['latency_ms'] = 0
+
+    def test_withdraw_duplicates(self):
+        """Duplicate withdrawals debit the balance once"""
+        try:
+            user_id = self.signup()
+            with self.conn.cursor() as cur:
+                cur.execute("UPDATE users SET mine_balance = 100, has_active_mining = true WHERE id = %s", (user_id,))
+
+            responses = self.burst('/withdraw', {'type': 'mine', 'amount': 25, 'userId': user_id}, str(uuid.uuid4()))
+            withdrawals = self.count("SELECT COUNT(*) FROM withdrawals WHERE user_id = %s", (user_id,))
+            balance = self.count("SELECT mine_balance FROM users WHERE id = %s", (user_id,))
+
+            self.log_test(
+                "Duplicate Withdrawals Processed Once",
+                withdrawals == 1 and float(balance) == 75 and all(r.status_code == 200 for r in responses),
+                f"{DUPLICATES} retries: {withdrawals} withdrawal row(s), balance {balance}"
+            )
+        except Exception as e:
+            self.log_test("Duplicate Withdrawals Processed Once", False, "", str(e))
+
+    def test_key_reuse_rejected(self):
+        """A key reused with a different body is refused instead of replayed"""
+        try:
+            user_id = self.signup()
+            key = str(uuid.uuid4())
+            self.post('/withdraw', {'type': 'mine', 'amount': 25, 'userId': user_id}, key)
+            response = self.post('/withdraw', {'type': 'mine', 'amount': 30, 'userId': user_id}, key)
+            self.log_test(
+                "Key Reuse With Different Body",
+                response.status_code == 422,
+                f"status {response.status_code}"
+            )
+        except Exception as e:
+            self.log_test("Key Reuse With Different Body", False, "", str(e))
+
+    def test_retries_under_load(self):
+        """Many clients, each retrying its own signup: one account per key"""
+        try:
+            run_id = secrets.token_hex(3)
+            requests_to_send = [
+                (f"idem_{run_id}_{i}", key)
+                for i, key in enumerate(str(uuid.uuid4()) for _ in range(KEYS_UNDER_LOAD))
+                for _ in range(5)
+            ]
+            calls = self.supabase_calls()
+            with ThreadPoolExecutor(50) as pool:
+                responses = list(pool.map(lambda item: self.post(
+                    '/auth/signup', {'username': item[0], 'password': 'idempass123'}, item[1],
+                    via_fallback=secrets.randbelow(2) == 1
+                ), requests_to_send))
+            load_cost = self.supabase_calls() - calls
+
+            rows = self.count("SELECT COUNT(*) FROM users WHERE username LIKE %s", (f"idem_{run_id}_%",))
+            failed = [response.status_code for response in responses if response.status_code != 200]
+
+            self.log_test(
+                "Retries Under Load",
+                rows == KEYS_UNDER_LOAD and not failed,
+                f"{len(requests_to_send)} requests for {KEYS_UNDER_LOAD} keys: {rows} user rows, "
+                f"{len(failed)} non-200 responses, {load_cost} Supabase calls "
+                f"({load_cost / KEYS_UNDER_LOAD:.1f} per key)"
+            )
+        except Exception as e:
+            self.log_test("Retries Under Load", False, "", str(e))
+
+    def run_all_tests(self):
+        """Run all idempotency tests"""
+        print("=" * 80)
+        print("IDEMPOTENCY-KEY TESTS")
+        print("=" * 80)
+        self.test_signup_duplicates()
+        self.test_purchase_duplicates()
+        self.test_withdraw_duplicates()
+        self.test_key_reuse_rejected()
+        self.test_retries_under_load()
+
+        passed = sum(1 for result in self.test_results if result['success'])
+        print(f"Passed: {passed}/{len(self.test_results)}")
+
+
+if __name__ == "__main__":
+    conn = connect()
+    apply_schema()
+    standin = TrongridStandIn(STANDIN_PORT).start()
+    process = start_server(PORT, {'TRX_VERIFIER': 'enhanced', 'TRONGRID_API_URL': standin.url})
+    try:
+        wait_for_server(BASE_URL)
+        IdempotencyTester(conn, standin).run_all_tests()
+    finally:
+        stop_server(process)
+        standin.stop()
+        conn.close()
@@ -0,0 +1,30 @@
+// Startup hook: runs once per server process before any request is handled
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== 'nodejs') return
+
+  // Schema check, clients, node catalog and pool (WARMUP_MODE=blocking|background|lazy):
+  // blocking finishes before the first request, background overlaps it, lazy
+  // leaves it to the first API request
+  const warmUpMode = process.env.WARMUP_MODE || 'blocking'
+  if (warmUpMode !== 'lazy') {
+    const { default: warmUp } = await import('./lib/warmup')
+    const warming = warmUp()
+    if (warmUpMode === 'blocking') await warming
+  }
+
+  // Monthly audit log partitions ahead of time, plus retention when configured
+  const { default: verificationRetention } = await import('./lib/verification-retention')
+  verificationRetention.start()
+
+  // Hot/cold archival of finished nodes and withdrawals (ARCHIVE_AFTER_DAYS=<days>)
+  if (process.env.ARCHIVE_AFTER_DAYS) {
+    const { default: archiver } = await import('./lib/archiver')
+    archiver.start()
+  }
+
+  // Background deposit ingestion (DEPOSIT_INGESTER=trongrid|fixtures), one process only
+  if (process.env.DEPOSIT_INGESTER) {
+    const { createDepositIngester } = await import('./lib/deposit-ingester')
+    createDepositIngester()?.start()
+  }
+}
@@ -0,0 +1,136 @@
+import { supabase } from './supabase'
+import { archivedRowsTotal } from './metrics'
+import logger from './logger'
+
+// Hot table -> RPC that moves one batch of its finished rows into the archive
+const ARCHIVE_FUNCTIONS = {
+  user_nodes: 'archive_user_nodes',
+  withdrawals: 'archive_withdrawals'
+}
+
+/**
+ * Hot/cold archival for user_nodes and withdrawals
+ * Moves finished rows older than ARCHIVE_AFTER_DAYS into the archive tables in
+ * batches of ARCHIVE_BATCH_SIZE. Every batch is one transaction in the
+ * database, so a run interrupted at any point loses nothing and the next run
+ * resumes with whatever is still in the hot table.
+ */
+export class Archiver {
+  constructor(options = {}) {
+    this.olderThanDays = options.olderThanDays ?? (Number(process.env.ARCHIVE_AFTER_DAYS) || 90)
+    this.batchSize = options.batchSize || Number(process.env.ARCHIVE_BATCH_SIZE) || 1000
+    // Pause between batches so archival never monopolizes the database
+    this.pauseMs = options.pauseMs ?? (Number(process.env.ARCHIVE_BATCH_PAUSE_MS) || 100)
+    this.intervalMs = options.intervalMs || Number(process.env.ARCHIVE_INTERVAL_MS) || 60 * 60 * 1000
+    this.timer = null
+    this.running = null
+  }
+
+  /**
+   * Archive every eligible row; resolves to { table: rows moved }.
+   * Concurrent callers share the run in progress.
+   */
+  runOnce() {
+    if (!this.running) {
+      this.running = this.archiveAll().finally(() => {
+        this.running = null
+      })
+    }
+    return this.running
+  }
+
+  async archiveAll() {
+    const moved = {}
+    for (const table of Object.keys(ARCHIVE_FUNCTIONS)) {
+      moved[table] = await this.archiveTable(table)
+    }
+    return moved
+  }
+
+  async archiveTable(table) {
+    let total = 0
+    while (true) {
+      const { data: count, error } = await supabase.rpc(ARCHIVE_FUNCTIONS[table], {
+        p_older_than: `${this.olderThanDays} days`,
+        p_batch_size: this.batchSize
+      })
+      if (error) throw new Error(`Failed to archive ${table}: ${error.message}`)
+
+      total += count
+      archivedRowsTotal.inc({ table }, count)
+      if (count < this.batchSize) return total
+
+      await new Promise(resolve => setTimeout(resolve, this.pauseMs))
+    }
+  }
+
+  /**
+   * Run now and then every intervalMs until stop() is called
+   */
+  start() {
+    if (this.timer) return
+    logger.info('Archiver started', { olderThanDays: this.olderThanDays, intervalMs: this.intervalMs })
+
+    const tick = async () => {
+      try {
+        const moved = await this.runOnce()
+        for (const [table, count] of Object.entries(moved)) {
+          if (count > 0) {
+            logger.info('Archived rows', { table, count })
+          }
+        }
+      } catch (error) {
+        console.error('Archival failed:', error.message)
+      }
+    }
+
+    tick()
+    this.timer = setInterval(tick, this.intervalMs)
+    this.timer.unref?.()
+  }
+
+  stop() {
+    clearInterval(this.timer)
+    this.timer = null
+  }
+}
+
+/**
+ * Rows for a user from a hot table and, when asked, its archive, newest first.
+ * The hot table is read first, so a row archived between the two reads shows
+ * up in the archive read; ids seen in both are returned once. With aliased
+ * columns, sortKey names the alias of created_at.
+ */
+export async function selectWithArchive(table, userId, {
+  columns = '*', archiveColumns = columns, sortKey = 'created_at', includeArchived = false, client = supabase
+} = {}) {
+  const hot = await client
+    .from(table)
+    .select(columns)
+    .eq('user_id', userId)
+    .order('created_at', { ascending: false })
+
+  if (hot.error || !includeArchived) return hot
+
+  const archived = await client
+    .from(`${table}_archive`)
+    .select(archiveColumns)
+    .eq('user_id', userId)
+    .order('created_at', { ascending: false })
+
+  if (archived.error) return archived
+
+  const seen = new Set(hot.data.map(row => row.id))
+  const data = [...hot.data, ...archived.data.filter(row => !seen.has(row.id))]
+    .sort((a, b) => new Date(b[sortKey]) - new Date(a[sortKey]))
+  return { data, error: null }
+}
+
+// One archiver per process, shared across route bundles
+if (!globalThis.__trxArchiver) {
+  globalThis.__trxArchiver = new Archiver()
+}
+
+const archiver = globalThis.__trxArchiver
+
+export default archiver
@@ -0,0 +1,348 @@
+import { supabase } from './supabase'
+import { v4 as uuidv4 } from 'uuid'
+import fs from 'fs'
+import path from 'path'
+import readline from 'readline'
+import {
+  auditRowsFlushedTotal,
+  auditRowsSpilledTotal,
+  auditRowsDroppedTotal,
+  auditFlushDuration
+} from './metrics'
+import logger from './logger'
+
+/**
+ * Buffered writer for the transaction_verifications audit log
+ * Keeps the row for each in-flight verification in memory, coalesces its updates
+ * and flushes dirty rows in bulk upserts on a size or time trigger. Rows that
+ * can't be written (database down, buffer overflow, process exit) are appended
+ * to a local spill file and replayed on the next successful flush. Spills are
+ * queued and appended in the background by one writer (only the exit spill is
+ * synchronous), and the file stops growing at maxSpillBytes: rows past that are
+ * dropped and counted. After a failed flush the writer backs off (doubling up
+ * to maxRetryDelayMs): flushes in the meantime go straight to the spill file
+ * instead of re-reading it for a replay the database can't take. Rows are
+ * upserted on their (transaction_hash, created_at) key, so each write touches
+ * exactly one row in one monthly partition.
+ */
+export class AuditLogWriter {
+  constructor(options = {}) {
+    this.table = options.table || 'transaction_verifications'
+    this.mode = options.mode || process.env.AUDIT_LOG_MODE || 'buffered'
+    this.batchSize = options.batchSize || 200
+    this.flushIntervalMs = options.flushIntervalMs || 1000
+    this.maxBufferedRows = options.maxBufferedRows || 10000
+    this.spillPath = options.spillPath || process.env.AUDIT_LOG_SPILL_PATH ||
+      path.join(process.cwd(), '.data', 'audit-spill.ndjson')
+    this.maxSpillBytes = options.maxSpillBytes || Number(process.env.AUDIT_LOG_SPILL_MAX_BYTES) || 64 * 1024 * 1024
+    this.maxRetryDelayMs = options.maxRetryDelayMs || 30000
+
+    this.rows = new Map() // transaction hash -> current row state
+    this.dirty = new Map() // row id -> row snapshot waiting to be written
+    this.flushTimer = null
+    this.flushing = null
+    this.flushFailures = 0
+    this.retryAt = 0 // no database writes (or replays) before this time after a failure
+
+    this.spillQueue = [] // ndjson chunks waiting to be appended
+    this.spillWriting = null // the chunk being appended right now
+    this.spilling = null // the background append loop, while it runs
+    this.spillPaused = false // set while a replay moves the spill file around
+    this.spillBytes = null // file size plus queued bytes, read from disk on first use
+    this.spillFull = false
+
+    // Last-chance spill of anything still buffered when the process goes away
+    process.once('exit', () => this.spillSync([...this.dirty.values()]))
+  }
+
+  /**
+   * Start the audit row for a verification
+   */
+  begin(transactionHash, fields) {
+    const row = this.rows.get(transactionHash) || this.beginRow(transactionHash)
+    return this.write(row, fields)
+  }
+
+  /**
+   * Update the audit row for a verification in progress
+   */
+  update(transactionHash, fields) {
+    const row = this.rows.get(transactionHash) || this.beginRow(transactionHash)
+    return this.write(row, fields)
+  }
+
+  /**
+   * Record the final state; only the unwritten snapshot is kept after this
+   */
+  finish(transactionHash, fields) {
+    const row = this.rows.get(transactionHash) || this.beginRow(transactionHash)
+    this.rows.delete(transactionHash)
+    return this.write(row, fields)
+  }
+
+  beginRow(transactionHash) {
+    // created_at is part of the row's key: it picks the partition and never changes
+    const row = { id: uuidv4(), transaction_hash: transactionHash, created_at: new Date().toISOString() }
+    this.rows.set(transactionHash, row)
+    return row
+  }
+
+  write(row, fields) {
+    Object.assign(row, fields)
+    this.dirty.set(row.id, { ...row })
+
+    if (this.mode === 'sync') {
+      return this.flush()
+    }
+
+    if (this.dirty.size > this.maxBufferedRows) {
+      // Bounded buffer: shed the oldest rows to disk rather than grow without limit
+      const overflow = [...this.dirty.keys()].slice(0, this.dirty.size - this.maxBufferedRows)
+      this.spill(overflow.map(id => this.dirty.get(id)))
+      overflow.forEach(id => this.dirty.delete(id))
+    }
+
+    if (this.dirty.size >= this.batchSize) {
+      this.flush()
+    } else if (!this.flushTimer) {
+      this.flushTimer = setTimeout(() => this.flush(), this.flushIntervalMs)
+      this.flushTimer.unref?.()
+    }
+
+    return Promise.resolve()
+  }
+
+  /**
+   * Rows not yet written for a transaction hash
+   */
+  pendingFor(transactionHash) {
+    return [...this.dirty.values()].filter(row => row.transaction_hash === transactionHash)
+  }
+
+  /**
+   * Write all dirty rows; concurrent callers share the in-flight flush
+   */
+  flush() {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer)
+      this.flushTimer = null
+    }
+
+    if (this.flushing) {
+      return this.flushing.then(() => this.dirty.size > 0 ? this.flush() : undefined)
+    }
+
+    this.flushing = this.flushBatches().finally(() => {
+      this.flushing = null
+    })
+    return this.flushing
+  }
+
+  async flushBatches() {
+    const batch = [...this.dirty.values()]
+    this.dirty.clear()
+    if (batch.length === 0) return
+
+    if (Date.now() < this.retryAt) {
+      // Backing off: queue behind the spilled rows rather than write ahead of them
+      this.spill(batch)
+      return
+    }
+
+    const endTimer = auditFlushDuration.startTimer()
+    try {
+      // Older spilled state goes first so it can never overwrite newer rows
+      await this.replaySpill()
+
+      for (let i = 0; i < batch.length; i += this.batchSize) {
+        await this.upsert(batch.slice(i, i + this.batchSize))
+      }
+      auditRowsFlushedTotal.inc({}, batch.length)
+      this.flushFailures = 0
+      this.retryAt = 0
+      endTimer({ result: 'ok' })
+    } catch (error) {
+      endTimer({ result: 'error' })
+      this.flushFailures += 1
+      const delayMs = Math.min(this.flushIntervalMs * 2 ** (this.flushFailures - 1), this.maxRetryDelayMs)
+      this.retryAt = Date.now() + delayMs
+      console.error(`Audit log flush failed, spilling to disk (next attempt in ${delayMs}ms):`, error.message)
+      // Skip rows that were updated again mid-flush; their newer state is still buffered
+      this.spill(batch.filter(row => !this.dirty.has(row.id)))
+    }
+  }
+
+  async upsert(rows) {
+    const { error } = await supabase
+      .from(this.table)
+      .upsert(rows, { onConflict: 'transaction_hash,created_at' })
+
+    if (error) throw new Error(error.message)
+  }
+
+  /**
+   * Whether a chunk fits under maxSpillBytes; a chunk that doesn't is dropped and counted
+   */
+  reserveSpill(chunk, rowCount) {
+    if (this.spillBytes === null) {
+      try {
+        this.spillBytes = fs.statSync(this.spillPath).size
+      } catch {
+        this.spillBytes = 0
+      }
+    }
+
+    const bytes = Buffer.byteLength(chunk)
+    if (this.spillBytes + bytes > this.maxSpillBytes) {
+      auditRowsDroppedTotal.inc({}, rowCount)
+      if (!this.spillFull) {
+        this.spillFull = true
+        console.error(`Audit spill file is full (${this.maxSpillBytes} bytes), dropping rows until it is replayed`)
+      }
+      return false
+    }
+    this.spillFull = false
+    this.spillBytes += bytes
+    auditRowsSpilledTotal.inc({}, rowCount)
+    return true
+  }
+
+  /**
+   * Queue rows for the spill file; the append happens in the background
+   */
+  spill(rows) {
+    if (rows.length === 0) return
+
+    const chunk = rows.map(row => JSON.stringify(row)).join('\n') + '\n'
+    if (!this.reserveSpill(chunk, rows.length)) return
+    this.spillQueue.push(chunk)
+    this.startSpill()
+  }
+
+  startSpill() {
+    if (!this.spilling && !this.spillPaused && this.spillQueue.length > 0) {
+      this.spilling = this.drainSpill().finally(() => {
+        this.spilling = null
+      })
+    }
+  }
+
+  /**
+   * Hold appends (they keep queueing) until resumeSpill; resolves once none is in flight
+   */
+  async pauseSpill() {
+    this.spillPaused = true
+    while (this.spilling) await this.spilling
+  }
+
+  resumeSpill() {
+    this.spillPaused = false
+    this.startSpill()
+  }
+
+  queuedSpillBytes() {
+    return this.spillQueue.reduce((sum, chunk) => sum + Buffer.byteLength(chunk), 0)
+  }
+
+  async drainSpill() {
+    try {
+      await fs.promises.mkdir(path.dirname(this.spillPath), { recursive: true })
+      while (this.spillQueue.length > 0 && !this.spillPaused) {
+        this.spillWriting = this.spillQueue.join('')
+        this.spillQueue = []
+        await fs.promises.appendFile(this.spillPath, this.spillWriting)
+        this.spillWriting = null
+      }
+    } catch (error) {
+      console.error('Failed to spill audit rows:', error.message)
+      this.spillWriting = null
+      this.spillQueue = []
+      this.spillBytes = null
+    }
+  }
+
+  /**
+   * Exit spill: whatever the background writer hadn't appended yet, then `rows`
+   */
+  spillSync(rows) {
+    const chunks = [this.spillWriting, ...this.spillQueue].filter(Boolean)
+    this.spillWriting = null
+    this.spillQueue = []
+    if (rows.length > 0) {
+      const chunk = rows.map(row => JSON.stringify(row)).join('\n') + '\n'
+      if (this.reserveSpill(chunk, rows.length)) chunks.push(chunk)
+    }
+    if (chunks.length === 0) return
+
+    try {
+      fs.mkdirSync(path.dirname(this.spillPath), { recursive: true })
+      fs.appendFileSync(this.spillPath, chunks.join(''))
+    } catch (error) {
+      console.error('Failed to spill audit rows:', error.message)
+    }
+  }
+
+  /**
+   * Re-send spilled rows now that the database is reachable again
+   */
+  async replaySpill() {
+    // Claim the file first so rows spilled during the replay aren't lost
+    const claimed = `${this.spillPath}.${process.pid}.replay`
+    await this.pauseSpill()
+    try {
+      await fs.promises.rename(this.spillPath, claimed)
+      this.spillBytes = this.queuedSpillBytes()
+    } catch (error) {
+      if (error.code === 'ENOENT') return
+      throw error
+    } finally {
+      this.resumeSpill()
+    }
+
+    try {
+      // Later lines hold newer state for the same row; read a line at a time so a
+      // large file doesn't hold up the event loop
+      const latest = new Map()
+      const lines = readline.createInterface({ input: fs.createReadStream(claimed), crlfDelay: Infinity })
+      for await (const line of lines) {
+        if (!line.trim()) continue
+        const row = JSON.parse(line)
+        // Rows spilled before the table was partitioned carry no created_at
+        row.created_at = row.created_at || row.first_attempt_at || new Date().toISOString()
+        latest.set(row.id, row)
+      }
+
+      const rows = [...latest.values()]
+      for (let i = 0; i < rows.length; i += this.batchSize) {
+        await this.upsert(rows.slice(i, i + this.batchSize))
+      }
+      await fs.promises.unlink(claimed)
+      auditRowsFlushedTotal.inc({}, rows.length)
+      logger.info('Replayed spilled audit rows', { rows: rows.length })
+    } catch (error) {
+      // Put the claimed rows back ahead of anything spilled meanwhile
+      await this.pauseSpill()
+      try {
+        try {
+          await fs.promises.appendFile(claimed, await fs.promises.readFile(this.spillPath))
+        } catch (readError) {
+          if (readError.code !== 'ENOENT') throw readError
+        }
+        await fs.promises.rename(claimed, this.spillPath)
+        this.spillBytes = (await fs.promises.stat(this.spillPath)).size + this.queuedSpillBytes()
+      } finally {
+        this.resumeSpill()
+      }
+      throw error
+    }
+  }
+}
+
+// One writer per process, shared across route bundles
+if (!globalThis.__trxAuditLogWriter) {
+  globalThis.__trxAuditLogWriter = new AuditLogWriter()
+}
+
+const auditLog = globalThis.__trxAuditLogWriter
+
+export default auditLog
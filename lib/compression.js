@@ -0,0 +1,109 @@
+import zlib from 'zlib'
+import { promisify } from 'util'
+import { NextResponse } from 'next/server'
+import { compressedResponsesTotal } from './metrics'
+
+const brotliCompress = promisify(zlib.brotliCompress)
+const gzip = promisify(zlib.gzip)
+
+// Bodies smaller than this go out as they are: compressing them costs more than it saves
+export const COMPRESSION_MIN_BYTES = Number(process.env.COMPRESSION_MIN_BYTES) || 1024
+
+// Preferred first when the client accepts both equally
+const ENCODINGS = ['br', 'gzip']
+
+// Per-response compression favours speed; bodies compressed once (the node catalog) use the maximum
+const DYNAMIC_OPTIONS = {
+  br: { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 4 } },
+  gzip: { level: 6 }
+}
+const STATIC_OPTIONS = {
+  br: { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY } },
+  gzip: { level: zlib.constants.Z_BEST_COMPRESSION }
+}
+
+/**
+ * The encoding to use for an Accept-Encoding header: 'br', 'gzip' or null
+ * for identity. Honours q-values, including q=0 and the '*' wildcard.
+ */
+export function negotiateEncoding(acceptEncoding) {
+  if (!acceptEncoding) return null
+
+  const weights = new Map()
+  for (const part of acceptEncoding.split(',')) {
+    const [name, ...params] = part.trim().toLowerCase().split(';')
+    if (!name) continue
+    const q = params.map(param => param.trim()).find(param => param.startsWith('q='))
+    weights.set(name, q ? Number(q.slice(2)) || 0 : 1)
+  }
+
+  let best = null
+  let bestWeight = 0
+  for (const encoding of ENCODINGS) {
+    const weight = weights.get(encoding) ?? weights.get('*') ?? 0
+    if (weight > bestWeight) {
+      best = encoding
+      bestWeight = weight
+    }
+  }
+  return best
+}
+
+function compress(body, encoding, options) {
+  return (encoding === 'br' ? brotliCompress : gzip)(body, options[encoding])
+}
+
+/**
+ * Every encoding of a body that never changes, compressed once at the highest
+ * level; an encoding that doesn't make the body smaller is left out
+ */
+export async function precompress(body) {
+  const source = Buffer.from(body)
+  const encoded = {}
+  for (const encoding of ENCODINGS) {
+    const compressed = await compress(source, encoding, STATIC_OPTIONS)
+    if (compressed.length < source.length) {
+      encoded[encoding] = compressed
+    }
+  }
+  return encoded
+}
+
+function appendVary(headers) {
+  const vary = headers.get('Vary')
+  if (!vary) {
+    headers.set('Vary', 'Accept-Encoding')
+  } else if (!/accept-encoding/i.test(vary)) {
+    headers.set('Vary', `${vary}, Accept-Encoding`)
+  }
+}
+
+/**
+ * Compress a JSON response for the request's Accept-Encoding once its body
+ * reaches COMPRESSION_MIN_BYTES; anything else is returned untouched
+ */
+export async function compressResponse(request, response) {
+  if (request.method === 'HEAD' || !response.body || response.headers.has('Content-Encoding')) return response
+  if (!(response.headers.get('Content-Type') || '').startsWith('application/json')) return response
+
+  const body = Buffer.from(await response.arrayBuffer())
+  const headers = new Headers(response.headers)
+  const init = { status: response.status, statusText: response.statusText, headers }
+
+  if (body.length < COMPRESSION_MIN_BYTES) {
+    return new NextResponse(body, init)
+  }
+
+  appendVary(headers)
+  const encoding = negotiateEncoding(request.headers.get('accept-encoding'))
+  if (!encoding) {
+    compressedResponsesTotal.inc({ encoding: 'identity' })
+    return new NextResponse(body, init)
+  }
+
+  const compressed = await compress(body, encoding, DYNAMIC_OPTIONS)
+  headers.set('Content-Encoding', encoding)
+  headers.set('Content-Length', String(compressed.length))
+  compressedResponsesTotal.inc({ encoding })
+  return new NextResponse(compressed, init)
+}
@@ -0,0 +1,370 @@
+import pg from 'pg'
+import { supabase, warmUpSupabase } from './supabase'
+import { postgresQueryDuration } from './metrics'
+import { PROFILE_SHAPE } from './serializers'
+
+// Postgres errors that mean the pool can't serve a connection at all
+const UNAVAILABLE_CODES = new Set(['ECONNREFUSED', 'ENOTFOUND', 'ETIMEDOUT', 'ECONNRESET', '53300', '57P01', '57P03'])
+
+// Balance, minimum and prerequisite for each withdrawal type
+export const WITHDRAWAL_RULES = {
+  mine: {
+    balance: 'mine_balance',
+    minimum: 25,
+    requires: 'has_active_mining',
+    requirementError: 'You must buy a mining node first'
+  },
+  referral: {
+    balance: 'referral_balance',
+    minimum: 50,
+    requires: 'has_bought_node4',
+    requirementError: 'You must buy Node 4 (1024 GB) first'
+  }
+}
+
+/**
+ * Why a user may not withdraw `amount` of `type`, or null if they may
+ */
+export function withdrawalError(user, type, amount) {
+  const rule = WITHDRAWAL_RULES[type]
+  if (!rule) return 'Invalid withdrawal type'
+  if (amount < rule.minimum) return `Minimum withdrawal is ${rule.minimum} TRX`
+  if (parseFloat(user[rule.balance]) < amount) return 'Insufficient balance'
+  if (!user[rule.requires]) return rule.requirementError
+  return null
+}
+
+/**
+ * Hot-path data access through the Supabase PostgREST API (the default backend)
+ */
+export class PostgrestDataAccess {
+  constructor() {
+    this.name = 'postgrest'
+  }
+
+  async warmUp() {
+    warmUpSupabase()
+  }
+
+  async signIn(username, password) {
+    const { data, error } = await supabase
+      .rpc('sign_in_user', { p_username: username, p_password: password })
+      .maybeSingle()
+
+    if (error) throw new Error(`Sign-in lookup failed: ${error.message}`)
+    return data
+  }
+
+  async getUser(userId) {
+    const { data, error } = await supabase
+      .from('users')
+      .select('*')
+      .eq('id', userId)
+      .maybeSingle()
+
+    if (error) throw new Error(`User lookup failed: ${error.message}`)
+    return data
+  }
+
+  /**
+   * The profile columns only, already aliased to the response keys
+   */
+  async getProfile(userId) {
+    const { data, error } = await supabase
+      .from('users')
+      .select(PROFILE_SHAPE.select)
+      .eq('id', userId)
+      .maybeSingle()
+
+    if (error) throw new Error(`Profile lookup failed: ${error.message}`)
+    return data
+  }
+
+  /**
+   * Create a verified node unless the user already runs one of the same type;
+   * resolves to { node } or { existing }
+   */
+  async createUserNode(userNode) {
+    const { data: existing, error: existingError } = await supabase
+      .from('user_nodes')
+      .select('id, status, created_at')
+      .eq('user_id', userNode.user_id)
+      .eq('node_id', userNode.node_id)
+      .in('status', ['pending', 'running'])
+      .order('created_at', { ascending: false })
+      .limit(1)
+
+    if (existingError) throw new Error(`Active node lookup failed: ${existingError.message}`)
+    if (existing.length > 0) return { existing: existing[0] }
+
+    const { data: node, error } = await supabase
+      .from('user_nodes')
+      .insert([userNode])
+      .select()
+      .single()
+
+    if (error) throw new Error(`Node insert failed: ${error.message}`)
+
+    const updateData = { has_active_mining: true, updated_at: new Date().toISOString() }
+    if (userNode.node_id === 'node4') {
+      updateData.has_bought_node4 = true
+    }
+
+    const { error: updateError } = await supabase
+      .from('users')
+      .update(updateData)
+      .eq('id', userNode.user_id)
+
+    if (updateError) {
+      console.error('User update error:', updateError)
+    }
+
+    // The auto_process_referral_reward trigger pays the referrer when this flips
+    const { error: referralError } = await supabase
+      .from('referrals')
+      .update({ is_valid: true, updated_at: new Date().toISOString() })
+      .eq('referred_id', userNode.user_id)
+      .eq('is_valid', false)
+
+    if (referralError) {
+      console.error('Referral activation error:', referralError)
+    }
+
+    return { node }
+  }
+
+  /**
+   * Debit the balance and record the withdrawal; resolves to { error, status } or {}
+   */
+  async withdraw(userId, type, amount) {
+    const user = await this.getUser(userId)
+    if (!user) return { error: 'User not found', status: 404 }
+
+    const error = withdrawalError(user, type, amount)
+    if (error) return { error, status: 400 }
+
+    const balance = WITHDRAWAL_RULES[type].balance
+    const { error: withdrawError } = await supabase
+      .from('users')
+      .update({
+        [balance]: parseFloat(user[balance]) - amount,
+        updated_at: new Date().toISOString()
+      })
+      .eq('id', userId)
+
+    if (withdrawError) {
+      console.error(`${type} withdrawal error:`, withdrawError)
+      return { error: 'Withdrawal failed', status: 500 }
+    }
+
+    await supabase
+      .from('withdrawals')
+      .insert([{ user_id: userId, type, amount, status: 'completed' }])
+
+    return {}
+  }
+}
+
+/**
+ * Hot-path data access over a native Postgres pool
+ * Every statement is named, so each pooled connection prepares it once and
+ * reuses the plan; multi-statement flows run in a real transaction with the
+ * user row locked. If the pool can't hand out a connection the call is served
+ * by the PostgREST backend instead. DATABASE_URL must be a direct or
+ * session-mode connection: transaction-mode poolers drop prepared statements.
+ */
+export class PostgresDataAccess {
+  constructor(connectionString, options = {}) {
+    this.name = 'postgres'
+    this.fallback = options.fallback || new PostgrestDataAccess()
+    this.connectionString = connectionString
+    this.options = options
+    this.poolInstance = null
+  }
+
+  // The pool is created on first use, so importing this module opens nothing
+  get pool() {
+    if (!this.poolInstance) {
+      const useSSL = !/@(localhost|127\.0\.0\.1)[:/]/.test(this.connectionString)
+      this.poolInstance = new pg.Pool({
+        connectionString: this.connectionString,
+        ssl: useSSL ? { rejectUnauthorized: false } : false,
+        max: this.options.max || Number(process.env.DATABASE_POOL_MAX) || 10,
+        idleTimeoutMillis: 30000,
+        connectionTimeoutMillis: this.options.connectionTimeoutMillis || 5000
+      })
+      // An idle client losing its connection must not take the process down
+      this.poolInstance.on('error', error => console.error('Postgres pool error:', error.message))
+    }
+    return this.poolInstance
+  }
+
+  /**
+   * Open one pooled connection ahead of traffic; failures are left to the first request
+   */
+  async warmUp() {
+    await this.fallback.warmUp()
+    try {
+      const client = await this.pool.connect()
+      client.release()
+    } catch (error) {
+      console.warn(`Postgres pool warm-up failed: ${error.message}`)
+    }
+  }
+
+  async query(client, name, text, values) {
+    const endTimer = postgresQueryDuration.startTimer({ statement: name })
+    try {
+      const result = await client.query({ name, text, values })
+      endTimer({ status: 'ok' })
+      return result
+    } catch (error) {
+      endTimer({ status: 'error' })
+      throw error
+    }
+  }
+
+  /**
+   * Run fn with a pooled client, or fall back to PostgREST if none can be had
+   */
+  async withClient(fn, fallback) {
+    let client
+    try {
+      client = await this.pool.connect()
+    } catch (error) {
+      if (!UNAVAILABLE_CODES.has(error.code) && !/timeout/i.test(error.message)) throw error
+      console.warn(`Postgres pool unavailable (${error.message}), using PostgREST`)
+      return fallback()
+    }
+
+    try {
+      return await fn(client)
+    } finally {
+      client.release()
+    }
+  }
+
+  /**
+   * Run fn inside BEGIN/COMMIT on one pooled client
+   */
+  transaction(fn, fallback) {
+    return this.withClient(async client => {
+      await client.query('BEGIN')
+      try {
+        const result = await fn(client)
+        await client.query('COMMIT')
+        return result
+      } catch (error) {
+        await client.query('ROLLBACK').catch(() => {})
+        throw error
+      }
+    }, fallback)
+  }
+
+  signIn(username, password) {
+    return this.withClient(async client => {
+      const { rows } = await this.query(client, 'sign_in_user',
+        'SELECT id, username, email FROM sign_in_user($1, $2)', [username, password])
+      return rows[0] || null
+    }, () => this.fallback.signIn(username, password))
+  }
+
+  getUser(userId) {
+    return this.withClient(async client => {
+      const { rows } = await this.query(client, 'get_user', 'SELECT * FROM users WHERE id = $1', [userId])
+      return rows[0] || null
+    }, () => this.fallback.getUser(userId))
+  }
+
+  getProfile(userId) {
+    return this.withClient(async client => {
+      const { rows } = await this.query(client, 'get_profile',
+        `SELECT ${PROFILE_SHAPE.sql} FROM users WHERE id = $1`, [userId])
+      return rows[0] || null
+    }, () => this.fallback.getProfile(userId))
+  }
+
+  createUserNode(userNode) {
+    return this.transaction(async client => {
+      // Serializes purchases per user, so two requests can't both pass the active-node check
+      await this.query(client, 'lock_user', 'SELECT id FROM users WHERE id = $1 FOR UPDATE', [userNode.user_id])
+
+      const { rows: existing } = await this.query(client, 'find_active_node', `
+        SELECT id, status, created_at FROM user_nodes
+        WHERE user_id = $1 AND node_id = $2 AND status IN ('pending', 'running')
+        ORDER BY created_at DESC LIMIT 1`, [userNode.user_id, userNode.node_id])
+      if (existing.length > 0) return { existing: existing[0] }
+
+      const { rows } = await this.query(client, 'insert_user_node', `
+        INSERT INTO user_nodes (id, user_id, node_id, transaction_hash, transaction_verified, transaction_amount,
+                                transaction_verified_at, status, progress, start_date, end_date, mining_amount,
+                                daily_mining, duration, total_mined, last_mining_update)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16)
+        RETURNING *`, [
+        userNode.id, userNode.user_id, userNode.node_id, userNode.transaction_hash, userNode.transaction_verified,
+        userNode.transaction_amount, userNode.transaction_verified_at, userNode.status, userNode.progress,
+        userNode.start_date, userNode.end_date, userNode.mining_amount, userNode.daily_mining, userNode.duration,
+        userNode.total_mined, userNode.last_mining_update
+      ])
+
+      await this.query(client, 'mark_user_mining', `
+        UPDATE users
+        SET has_active_mining = TRUE, has_bought_node4 = has_bought_node4 OR $2, updated_at = NOW()
+        WHERE id = $1`, [userNode.user_id, userNode.node_id === 'node4'])
+
+      // The auto_process_referral_reward trigger pays the referrer when this flips
+      await this.query(client, 'activate_referral', `
+        UPDATE referrals SET is_valid = TRUE, updated_at = NOW()
+        WHERE referred_id = $1 AND is_valid = FALSE`, [userNode.user_id])
+
+      return { node: rows[0] }
+    }, () => this.fallback.createUserNode(userNode))
+  }
+
+  withdraw(userId, type, amount) {
+    return this.transaction(async client => {
+      // Locked until commit, so concurrent withdrawals can't both spend the same balance
+      const { rows } = await this.query(client, 'lock_user_balances', `
+        SELECT mine_balance, referral_balance, has_active_mining, has_bought_node4
+        FROM users WHERE id = $1 FOR UPDATE`, [userId])
+      if (rows.length === 0) return { error: 'User not found', status: 404 }
+
+      const error = withdrawalError(rows[0], type, amount)
+      if (error) return { error, status: 400 }
+
+      // The column name comes from WITHDRAWAL_RULES, never from the request
+      const balance = WITHDRAWAL_RULES[type].balance
+      await this.query(client, `debit_${balance}`,
+        `UPDATE users SET ${balance} = ${balance} - $2, updated_at = NOW() WHERE id = $1`, [userId, amount])
+      await this.query(client, 'insert_withdrawal', `
+        INSERT INTO withdrawals (user_id, type, amount, status) VALUES ($1, $2, $3, 'completed')`,
+        [userId, type, amount])
+
+      return {}
+    }, () => this.fallback.withdraw(userId, type, amount))
+  }
+}
+
+/**
+ * Backend for DATA_BACKEND: 'postgres' uses DATABASE_URL through a native pool,
+ * anything else (or postgres without a connection string) uses PostgREST
+ */
+export function createDataAccess(backend = process.env.DATA_BACKEND) {
+  if (backend === 'postgres') {
+    const connectionString = process.env.DATABASE_URL || process.env.POSTGRES_URL
+    if (connectionString) {
+      return new PostgresDataAccess(connectionString)
+    }
+    console.warn('DATA_BACKEND=postgres but DATABASE_URL is not set, using PostgREST')
+  }
+  return new PostgrestDataAccess()
+}
+
+// One pool per process, shared across route bundles
+if (!globalThis.__trxDataAccess) {
+  globalThis.__trxDataAccess = createDataAccess()
+}
+
+const dataAccess = globalThis.__trxDataAccess
+
+export default dataAccess
@@ -2,40 +2,124 @@ import { supabase } from './supabase'
 import fs from 'fs'
 import path from 'path'
 
+// Tables reported by getDatabaseStatus
+const STATUS_TABLES = ['users', 'user_nodes', 'referrals', 'withdrawals', 'mining_nodes']
+
+// Short TTL so polling dashboards share one probe instead of each scanning tables
+const STATUS_CACHE_TTL_MS = 15 * 1000
+
+const MIGRATIONS_DIR = path.join(process.cwd(), 'lib', 'database', 'migrations')
+
+// Default mining nodes catalog, seeded into mining_nodes at startup
+export const MINING_NODES = [
+  {
+    id: 'node1',
+    name: '64 GB Node',
+    price: 50,
+    storage: '64 GB',
+    mining_amount: 500,
+    duration_days: 30,
+    description: 'Mine 500 TRX in 30 days',
+    is_active: true
+  },
+  {
+    id: 'node2',
+    name: '128 GB Node', 
+    price: 75,
+    storage: '128 GB',
+    mining_amount: 500,
+    duration_days: 15,
+    description: 'Mine 500 TRX in 15 days',
+    is_active: true
+  },
+  {
+    id: 'node3',
+    name: '256 GB Node',
+    price: 100,
+    storage: '256 GB', 
+    mining_amount: 1000,
+    duration_days: 7,
+    description: 'Mine 1000 TRX in 7 days',
+    is_active: true
+  },
+  {
+    id: 'node4',
+    name: '1024 GB Node',
+    price: 250,
+    storage: '1024 GB',
+    mining_amount: 1000,
+    duration_days: 3,
+    description: 'Mine 1000 TRX in 3 days',
+    is_active: true
+  }
+]
+
 /**
  * Database initialization service for enhanced TRX mining platform
- * Sets up tables, indexes, triggers, and constraints
+ * Verifies the schema once per process at startup and seeds reference data
  */
 export class DatabaseInitializer {
   constructor() {
     this.initialized = false
+    this.initPromise = null
+    this.schemaVersion = null
+    this.statusCache = new Map()
   }
 
   /**
-   * Initialize the enhanced database schema
+   * Initialize once per process; concurrent and later callers share the same promise.
+   * A failed attempt isn't kept, so the next caller tries again.
+   */
+  ensureInitialized() {
+    if (!this.initPromise) {
+      const attempt = this.initializeDatabase().then(result => {
+        if (!result.success && this.initPromise === attempt) {
+          this.initPromise = null
+        }
+        return result
+      })
+      this.initPromise = attempt
+    }
+    return this.initPromise
+  }
+
+  /**
+   * Verify the enhanced database schema and seed reference data
    */
   async initializeDatabase() {
     try {
       console.log('Starting database initialization...')
-      
-      // Check if database is already initialized
-      const isInitialized = await this.checkInitialization()
-      if (isInitialized) {
-        console.log('Database already initialized')
-        this.initialized = true
-        return { success: true, message: 'Database already initialized' }
+      const startedAt = Date.now()
+
+      const schema = this.loadSchemaDefinition()
+      const verification = await this.verifyTables(schema)
+
+      if (verification.missingTables.length > 0) {
+        // Supabase doesn't allow DDL through the client; run `yarn db:migrate` instead
+        throw new Error(`Missing tables: ${verification.missingTables.join(', ')}`)
       }
 
-      // Run the schema SQL
-      await this.runSchemaSQL()
-      
-      // Verify initialization
-      await this.verifyTables()
-      
+      if (verification.pendingMigrations.length > 0) {
+        console.warn(`Pending migrations: ${verification.pendingMigrations.join(', ')} (run yarn db:migrate)`)
+      }
+
+      if (verification.missingIndexes.length > 0) {
+        console.warn(`Missing indexes: ${verification.missingIndexes.join(', ')}`)
+      }
+
+      await this.insertMiningNodes()
+
       this.initialized = true
-      console.log('Database initialization completed successfully')
+      this.schemaVersion = verification.appliedVersion
+      console.log(`Database initialization completed in ${Date.now() - startedAt}ms (schema ${this.schemaVersion})`)
       
-      return { success: true, message: 'Database initialized successfully' }
+      return {
+        success: true,
+        message: 'Database initialized successfully',
+        schemaVersion: this.schemaVersion,
+        pendingMigrations: verification.pendingMigrations,
+        missingIndexes: verification.missingIndexes
+      }
     } catch (error) {
       console.error('Database initialization failed:', error)
       return { success: false, error: error.message }
@@ -43,256 +127,122 @@ export class DatabaseInitializer {
   }
 
   /**
-   * Check if the database is already initialized
+   * Read the tables, indexes and migration versions declared in lib/database/migrations
    */
-  async checkInitialization() {
-    try {
-      // Check if mining_nodes table exists and has data
-      const { data, error } = await supabase
-        .from('mining_nodes')
-        .select('id')
-        .limit(1)
-
-      if (error) {
-        console.log('Mining nodes table not found or empty, initialization needed')
-        return false
-      }
-
-      return data && data.length > 0
-    } catch (error) {
-      return false
+  loadSchemaDefinition() {
+    const files = fs.readdirSync(MIGRATIONS_DIR).filter(file => /^\d{4}_.+\.sql$/.test(file)).sort()
+    const sql = files.map(file => fs.readFileSync(path.join(MIGRATIONS_DIR, file), 'utf8')).join('\n')
+    const migrations = files.map(file => file.substring(0, 4))
+
+    // Indexes a later migration drops are no longer expected
+    const dropped = new Set([...sql.matchAll(/DROP INDEX (?:CONCURRENTLY )?IF EXISTS (\w+)/g)].map(match => match[1]))
+
+    return {
+      version: migrations[migrations.length - 1],
+      migrations,
+      tables: [...sql.matchAll(/CREATE TABLE IF NOT EXISTS (\w+)/g)].map(match => match[1]),
+      indexes: [...sql.matchAll(/CREATE (?:UNIQUE )?INDEX (?:CONCURRENTLY )?IF NOT EXISTS (\w+)/g)]
+        .map(match => match[1])
+        .filter(name => !dropped.has(name))
     }
   }
 
   /**
-   * Run the schema SQL to create tables, indexes, and triggers
-   */
-  async runSchemaSQL() {
-    // Since we're using Supabase, we'll create tables individually
-    // rather than running raw SQL (which requires elevated permissions)
-    
-    await this.createTables()
-    await this.insertMiningNodes()
-  }
-
-  /**
-   * Create all necessary tables
+   * Insert default mining nodes
    */
-  async createTables() {
-    console.log('Creating/updating tables...')
-
-    // Note: Supabase doesn't allow direct DDL execution via the client
-    // So we'll ensure our existing tables have the right structure
-    // and add any missing columns or constraints programmatically
-
-    // Check and update users table
-    await this.ensureUsersTable()
-    
-    // Check and update user_nodes table  
-    await this.ensureUserNodesTable()
-    
-    // Check and update referrals table
-    await this.ensureReferralsTable()
-    
-    // Check and update withdrawals table
-    await this.ensureWithdrawalsTable()
-    
-    // Create transaction_verifications table
-    await this.ensureTransactionVerificationsTable()
-    
-    console.log('Tables created/updated successfully')
-  }
+  async insertMiningNodes() {
+    console.log('Inserting/updating mining nodes...')
 
-  /**
-   * Ensure users table has the correct structure
-   */
-  async ensureUsersTable() {
-    // For existing Supabase setup, we'll work with what we have
-    // and add any missing functionality through application logic
-    console.log('Users table structure verified')
-  }
+    const { error } = await supabase
+      .from('mining_nodes')
+      .upsert(MINING_NODES, { onConflict: 'id' })
 
-  /**
-   * Ensure user_nodes table has the correct structure
-   */
-  async ensureUserNodesTable() {
-    console.log('User nodes table structure verified')
+    if (error) {
+      console.error('Failed to upsert mining nodes:', error)
+    } else {
+      console.log('Mining nodes inserted/updated successfully')
+    }
   }
 
   /**
-   * Ensure referrals table has the correct structure
+   * Verify that all declared tables, indexes and migrations exist, in one catalog query
    */
-  async ensureReferralsTable() {
-    console.log('Referrals table structure verified')
-  }
+  async verifyTables(schema) {
+    console.log('Verifying tables, indexes and migrations...')
 
-  /**
-   * Ensure withdrawals table has the correct structure
-   */
-  async ensureWithdrawalsTable() {
-    console.log('Withdrawals table structure verified')
-  }
+    const { data, error } = await supabase.rpc('get_schema_objects')
 
-  /**
-   * Create transaction_verifications table if it doesn't exist
-   */
-  async ensureTransactionVerificationsTable() {
-    try {
-      // Try to select from the table to see if it exists
-      const { data, error } = await supabase
-        .from('transaction_verifications')
-        .select('id')
-        .limit(1)
+    if (error) {
+      throw new Error(`Schema verification failed: ${error.message}`)
+    }
 
-      if (error && error.code === 'PGRST106') {
-        console.log('Transaction verifications table does not exist - please create it manually in Supabase')
-        // For now, we'll continue without this table and handle errors gracefully
-      } else {
-        console.log('Transaction verifications table verified')
-      }
-    } catch (error) {
-      console.log('Transaction verifications table status unknown')
+    const existing = new Set(data.map(row => `${row.object_type}:${row.object_name}`))
+    const result = {
+      missingTables: schema.tables.filter(name => !existing.has(`table:${name}`)),
+      missingIndexes: schema.indexes.filter(name => !existing.has(`index:${name}`)),
+      pendingMigrations: schema.migrations.filter(version => !existing.has(`migration:${version}`))
     }
+    result.appliedVersion = schema.migrations.filter(version => existing.has(`migration:${version}`)).pop() || null
+
+    console.log(`Verified ${schema.tables.length} tables and ${schema.indexes.length} indexes`)
+    return result
   }
 
   /**
-   * Insert default mining nodes
+   * Get database status and statistics.
+   * Row counts are planner estimates unless exact counts are requested; results
+   * are cached briefly and concurrent callers share one in-flight probe.
    */
-  async insertMiningNodes() {
-    console.log('Inserting/updating mining nodes...')
-    
-    const miningNodes = [
-      {
-        id: 'node1',
-        name: '64 GB Node',
-        price: 50,
-        storage: '64 GB',
-        mining_amount: 500,
-        duration_days: 30,
-        description: 'Mine 500 TRX in 30 days',
-        is_active: true
-      },
-      {
-        id: 'node2',
-        name: '128 GB Node', 
-        price: 75,
-        storage: '128 GB',
-        mining_amount: 500,
-        duration_days: 15,
-        description: 'Mine 500 TRX in 15 days',
-        is_active: true
-      },
-      {
-        id: 'node3',
-        name: '256 GB Node',
-        price: 100,
-        storage: '256 GB', 
-        mining_amount: 1000,
-        duration_days: 7,
-        description: 'Mine 1000 TRX in 7 days',
-        is_active: true
-      },
-      {
-        id: 'node4',
-        name: '1024 GB Node',
-        price: 250,
-        storage: '1024 GB',
-        mining_amount: 1000,
-        duration_days: 3,
-        description: 'Mine 1000 TRX in 3 days',
-        is_active: true
-      }
-    ]
+  async getDatabaseStatus({ exact = false } = {}) {
+    const mode = exact ? 'exact' : 'estimated'
+    const cached = this.statusCache.get(mode)
 
-    try {
-      // Check if mining_nodes table exists
-      const { data: existingNodes, error: selectError } = await supabase
-        .from('mining_nodes')
-        .select('id')
-
-      if (selectError) {
-        console.log('Mining nodes table does not exist, working with hardcoded values')
-        return
-      }
+    if (cached && Date.now() - cached.fetchedAt < STATUS_CACHE_TTL_MS) {
+      return cached.promise
+    }
 
-      // Insert or update nodes
-      for (const node of miningNodes) {
-        const { error } = await supabase
-          .from('mining_nodes')
-          .upsert(node, { onConflict: 'id' })
+    const promise = this.loadDatabaseStatus(exact)
+    this.statusCache.set(mode, { promise, fetchedAt: Date.now() })
 
-        if (error) {
-          console.error(`Failed to upsert node ${node.id}:`, error)
-        }
-      }
+    // Don't keep failures around for the whole TTL
+    promise.then(status => {
+      if (status.error) this.statusCache.delete(mode)
+    })
 
-      console.log('Mining nodes inserted/updated successfully')
-    } catch (error) {
-      console.error('Error managing mining nodes:', error)
-    }
-  }
-
-  /**
-   * Verify that all required tables exist
-   */
-  async verifyTables() {
-    console.log('Verifying table existence...')
-    
-    const requiredTables = ['users', 'user_nodes', 'referrals', 'withdrawals']
-    
-    for (const tableName of requiredTables) {
-      try {
-        const { data, error } = await supabase
-          .from(tableName)
-          .select('*')
-          .limit(1)
-        
-        if (error && error.code === 'PGRST106') {
-          throw new Error(`Required table '${tableName}' does not exist`)
-        }
-        
-        console.log(`✓ Table '${tableName}' verified`)
-      } catch (error) {
-        console.error(`✗ Table '${tableName}' verification failed:`, error.message)
-        throw error
-      }
-    }
-    
-    console.log('All required tables verified')
+    return promise
   }
 
   /**
-   * Get database status and statistics
+   * Probe all status tables in parallel
    */
-  async getDatabaseStatus() {
+  async loadDatabaseStatus(exact) {
     try {
       const status = {
         initialized: this.initialized,
+        schemaVersion: this.schemaVersion,
+        countMode: exact ? 'exact' : 'estimated',
+        generatedAt: new Date().toISOString(),
         tables: {},
         statistics: {}
       }
 
-      // Check each table
-      const tables = ['users', 'user_nodes', 'referrals', 'withdrawals', 'mining_nodes']
-      
-      for (const tableName of tables) {
-        try {
-          const { count, error } = await supabase
-            .from(tableName)
-            .select('*', { count: 'exact', head: true })
-
-          status.tables[tableName] = {
-            exists: !error,
-            count: error ? 0 : count,
-            error: error?.message
-          }
-        } catch (err) {
-          status.tables[tableName] = {
-            exists: false,
-            count: 0,
-            error: err.message
-          }
+      const estimates = exact ? null : await this.getTableEstimates(STATUS_TABLES)
+
+      const results = await Promise.all(STATUS_TABLES.map(async tableName => {
+        // Fall back to an exact count for tables the planner has never analyzed
+        if (estimates && estimates.has(tableName) && estimates.get(tableName) >= 0) {
+          return [tableName, { exists: true, count: estimates.get(tableName), estimated: true }]
+        }
+
+        if (estimates && !estimates.has(tableName)) {
+          return [tableName, { exists: false, count: 0, error: `Table '${tableName}' not found` }]
         }
+
+        return [tableName, await this.countTable(tableName)]
+      }))
+
+      for (const [tableName, tableStatus] of results) {
+        status.tables[tableName] = tableStatus
       }
 
       // Calculate some statistics
@@ -315,6 +265,41 @@ export class DatabaseInitializer {
     }
   }
 
+  /**
+   * Read planner row estimates for several tables in one round-trip
+   */
+  async getTableEstimates(tableNames) {
+    const { data, error } = await supabase.rpc('get_table_estimates', { table_names: tableNames })
+
+    if (error) throw error
+
+    return new Map(data.map(row => [row.table_name, Number(row.estimated_rows)]))
+  }
+
+  /**
+   * Exact row count for a single table
+   */
+  async countTable(tableName) {
+    try {
+      const { count, error } = await supabase
+        .from(tableName)
+        .select('*', { count: 'exact', head: true })
+
+      return {
+        exists: !error,
+        count: error ? 0 : count,
+        estimated: false,
+        error: error?.message
+      }
+    } catch (err) {
+      return {
+        exists: false,
+        count: 0,
+        error: err.message
+      }
+    }
+  }
+
   /**
    * Clean up test data (for development)
    */
@@ -364,7 +349,11 @@ export class DatabaseInitializer {
   }
 }
 
-// Create singleton instance
-const dbInitializer = new DatabaseInitializer()
+// Create singleton instance, shared by the instrumentation hook and every route bundle
+if (!globalThis.__trxDbInitializer) {
+  globalThis.__trxDbInitializer = new DatabaseInitializer()
+}
+
+const dbInitializer = globalThis.__trxDbInitializer
 
 export default dbInitializer
\ No newline at end of file
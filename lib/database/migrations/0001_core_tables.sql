@@ -0,0 +1,122 @@
+-- Migration 0001: core tables
+-- Tables for users, mining nodes, purchases, referrals, withdrawals and the
+-- transaction verification log. CREATE TABLE IF NOT EXISTS leaves tables that
+-- already exist untouched; 0002 brings older installs up to the same columns.
+
+-- Enable necessary extensions
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+-- Users table with enhanced constraints and indexes
+CREATE TABLE IF NOT EXISTS users (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    username VARCHAR(50) UNIQUE NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL, -- Should be hashed in production
+    mine_balance DECIMAL(15,6) DEFAULT 25.0 CHECK (mine_balance >= 0),
+    referral_balance DECIMAL(15,6) DEFAULT 0.0 CHECK (referral_balance >= 0),
+    total_referrals INTEGER DEFAULT 0 CHECK (total_referrals >= 0),
+    valid_referrals INTEGER DEFAULT 0 CHECK (valid_referrals >= 0),
+    referral_code VARCHAR(20) UNIQUE NOT NULL,
+    has_active_mining BOOLEAN DEFAULT FALSE,
+    has_bought_node4 BOOLEAN DEFAULT FALSE,
+    is_active BOOLEAN DEFAULT TRUE,
+    last_login_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Mining nodes configuration (reference table)
+CREATE TABLE IF NOT EXISTS mining_nodes (
+    id VARCHAR(20) PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    price DECIMAL(10,2) NOT NULL CHECK (price > 0),
+    storage VARCHAR(20) NOT NULL,
+    mining_amount DECIMAL(10,2) NOT NULL CHECK (mining_amount > 0),
+    duration_days INTEGER NOT NULL CHECK (duration_days > 0),
+    description TEXT,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- User nodes with enhanced tracking
+CREATE TABLE IF NOT EXISTS user_nodes (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    node_id VARCHAR(20) NOT NULL REFERENCES mining_nodes(id),
+    transaction_hash VARCHAR(128) UNIQUE NOT NULL, -- Unique constraint for security
+    transaction_verified BOOLEAN DEFAULT FALSE,
+    transaction_amount DECIMAL(10,2) NOT NULL,
+    transaction_verified_at TIMESTAMPTZ,
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'cancelled')),
+    progress DECIMAL(5,2) DEFAULT 0.0 CHECK (progress >= 0 AND progress <= 100),
+    start_date TIMESTAMPTZ,
+    end_date TIMESTAMPTZ,
+    mining_amount DECIMAL(10,2) NOT NULL,
+    daily_mining DECIMAL(10,2) NOT NULL,
+    duration INTEGER NOT NULL,
+    total_mined DECIMAL(10,2) DEFAULT 0.0,
+    last_mining_update TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    
+    -- Constraints
+    CONSTRAINT valid_dates CHECK (end_date > start_date),
+    CONSTRAINT valid_mining_amounts CHECK (daily_mining > 0 AND mining_amount > 0)
+);
+
+-- Referrals with enhanced tracking
+CREATE TABLE IF NOT EXISTS referrals (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    referrer_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    referred_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    referral_code VARCHAR(20) NOT NULL,
+    is_valid BOOLEAN DEFAULT FALSE,
+    reward_paid BOOLEAN DEFAULT FALSE,
+    reward_amount DECIMAL(10,2) DEFAULT 50.0,
+    activated_at TIMESTAMPTZ, -- When the referral became valid
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    
+    -- Ensure users can't refer themselves
+    CONSTRAINT no_self_referral CHECK (referrer_id != referred_id),
+    -- Unique constraint to prevent duplicate referrals
+    CONSTRAINT unique_referral UNIQUE (referrer_id, referred_id)
+);
+
+-- Withdrawals with enhanced tracking
+CREATE TABLE IF NOT EXISTS withdrawals (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    type VARCHAR(20) NOT NULL CHECK (type IN ('mine', 'referral')),
+    amount DECIMAL(15,6) NOT NULL CHECK (amount > 0),
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'completed', 'failed', 'cancelled')),
+    transaction_hash VARCHAR(128), -- For completed withdrawals
+    processing_fee DECIMAL(10,6) DEFAULT 0.0,
+    net_amount DECIMAL(15,6), -- Amount after fees
+    processed_at TIMESTAMPTZ,
+    notes TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Transaction verification log for security
+CREATE TABLE IF NOT EXISTS transaction_verifications (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    transaction_hash VARCHAR(128) NOT NULL,
+    verification_status VARCHAR(20) NOT NULL CHECK (verification_status IN ('pending', 'verified', 'failed', 'invalid')),
+    trongrid_response JSONB,
+    verification_attempts INTEGER DEFAULT 1,
+    first_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+    last_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+    verified_at TIMESTAMPTZ,
+    error_message TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Running totals per verification status, maintained by trigger so all-time
+-- statistics never scan transaction_verifications
+CREATE TABLE IF NOT EXISTS transaction_verification_counts (
+    verification_status VARCHAR(20) PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0 CHECK (total >= 0)
+);
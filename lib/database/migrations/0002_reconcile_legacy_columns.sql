@@ -0,0 +1,29 @@
+-- Migration 0002: reconcile installs created from the old simplified schema
+-- Databases set up by the earlier supabase-schema.sql scripts have the core
+-- tables but are missing the tracking columns below. All additions are
+-- nullable or defaulted, so they are metadata-only on existing rows.
+
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE,
+    ADD COLUMN IF NOT EXISTS last_login_at TIMESTAMPTZ;
+
+ALTER TABLE user_nodes
+    ADD COLUMN IF NOT EXISTS transaction_verified BOOLEAN DEFAULT FALSE,
+    ADD COLUMN IF NOT EXISTS transaction_amount DECIMAL(10,2),
+    ADD COLUMN IF NOT EXISTS transaction_verified_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS total_mined DECIMAL(10,2) DEFAULT 0.0,
+    ADD COLUMN IF NOT EXISTS last_mining_update TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+ALTER TABLE referrals
+    ADD COLUMN IF NOT EXISTS reward_amount DECIMAL(10,2) DEFAULT 50.0,
+    ADD COLUMN IF NOT EXISTS activated_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+ALTER TABLE withdrawals
+    ADD COLUMN IF NOT EXISTS transaction_hash VARCHAR(128),
+    ADD COLUMN IF NOT EXISTS processing_fee DECIMAL(10,6) DEFAULT 0.0,
+    ADD COLUMN IF NOT EXISTS net_amount DECIMAL(15,6),
+    ADD COLUMN IF NOT EXISTS processed_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS notes TEXT,
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
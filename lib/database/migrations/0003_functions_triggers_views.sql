@@ -0,0 +1,252 @@
+-- Migration 0003: functions, triggers, views and reference data
+
+-- Trigger functions for automatic timestamp management
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Trigger for users table
+DROP TRIGGER IF EXISTS update_users_updated_at ON users;
+CREATE TRIGGER update_users_updated_at
+    BEFORE UPDATE ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Trigger for user_nodes table
+DROP TRIGGER IF EXISTS update_user_nodes_updated_at ON user_nodes;
+CREATE TRIGGER update_user_nodes_updated_at
+    BEFORE UPDATE ON user_nodes
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Trigger for referrals table
+DROP TRIGGER IF EXISTS update_referrals_updated_at ON referrals;
+CREATE TRIGGER update_referrals_updated_at
+    BEFORE UPDATE ON referrals
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Trigger for withdrawals table
+DROP TRIGGER IF EXISTS update_withdrawals_updated_at ON withdrawals;
+CREATE TRIGGER update_withdrawals_updated_at
+    BEFORE UPDATE ON withdrawals
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Trigger for mining_nodes table
+DROP TRIGGER IF EXISTS update_mining_nodes_updated_at ON mining_nodes;
+CREATE TRIGGER update_mining_nodes_updated_at
+    BEFORE UPDATE ON mining_nodes
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Function to automatically update mining progress
+CREATE OR REPLACE FUNCTION update_mining_progress()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Update progress when user_node is updated
+    IF NEW.status = 'running' AND NEW.start_date IS NOT NULL AND NEW.end_date IS NOT NULL THEN
+        NEW.progress = LEAST(100.0, 
+            GREATEST(0.0, 
+                EXTRACT(EPOCH FROM (NOW() - NEW.start_date)) / 
+                EXTRACT(EPOCH FROM (NEW.end_date - NEW.start_date)) * 100
+            )
+        );
+        
+        -- Calculate total mined based on progress
+        NEW.total_mined = (NEW.progress / 100.0) * NEW.mining_amount;
+        
+        -- Mark as completed if progress reaches 100%
+        IF NEW.progress >= 100.0 THEN
+            NEW.status = 'completed';
+            NEW.progress = 100.0;
+            NEW.total_mined = NEW.mining_amount;
+        END IF;
+        
+        NEW.last_mining_update = NOW();
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Trigger for automatic mining progress updates
+DROP TRIGGER IF EXISTS auto_update_mining_progress ON user_nodes;
+CREATE TRIGGER auto_update_mining_progress
+    BEFORE UPDATE ON user_nodes
+    FOR EACH ROW
+    EXECUTE FUNCTION update_mining_progress();
+
+-- Function to update user balances when referrals are activated
+CREATE OR REPLACE FUNCTION process_referral_reward()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- When a referral becomes valid, update referrer's balance
+    IF NEW.is_valid = TRUE AND OLD.is_valid = FALSE THEN
+        -- Update referrer's balance and counts
+        UPDATE users 
+        SET 
+            referral_balance = referral_balance + NEW.reward_amount,
+            valid_referrals = valid_referrals + 1,
+            updated_at = NOW()
+        WHERE id = NEW.referrer_id;
+        
+        -- Mark reward as paid and set activation time
+        NEW.reward_paid = TRUE;
+        NEW.activated_at = NOW();
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Trigger for automatic referral reward processing
+DROP TRIGGER IF EXISTS auto_process_referral_reward ON referrals;
+CREATE TRIGGER auto_process_referral_reward
+    BEFORE UPDATE ON referrals
+    FOR EACH ROW
+    EXECUTE FUNCTION process_referral_reward();
+
+-- Function to validate transaction hash uniqueness across the system
+CREATE OR REPLACE FUNCTION validate_transaction_uniqueness()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Check if transaction hash already exists in user_nodes
+    IF EXISTS (SELECT 1 FROM user_nodes WHERE transaction_hash = NEW.transaction_hash AND id != NEW.id) THEN
+        RAISE EXCEPTION 'Transaction hash already used: %', NEW.transaction_hash;
+    END IF;
+    
+    -- Check if transaction hash already exists in withdrawals
+    IF NEW.transaction_hash IS NOT NULL AND EXISTS (SELECT 1 FROM withdrawals WHERE transaction_hash = NEW.transaction_hash) THEN
+        RAISE EXCEPTION 'Transaction hash already used in withdrawals: %', NEW.transaction_hash;
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Trigger for transaction hash uniqueness validation
+DROP TRIGGER IF EXISTS validate_unique_transaction_hash ON user_nodes;
+CREATE TRIGGER validate_unique_transaction_hash
+    BEFORE INSERT OR UPDATE ON user_nodes
+    FOR EACH ROW
+    EXECUTE FUNCTION validate_transaction_uniqueness();
+
+-- Function to keep transaction_verification_counts in step with transaction_verifications
+CREATE OR REPLACE FUNCTION track_verification_status_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.verification_status = NEW.verification_status THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE transaction_verification_counts
+        SET total = total - 1
+        WHERE verification_status = OLD.verification_status;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO transaction_verification_counts (verification_status, total)
+        VALUES (NEW.verification_status, 1)
+        ON CONFLICT (verification_status) DO UPDATE SET
+            total = transaction_verification_counts.total + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Trigger for verification status counters
+DROP TRIGGER IF EXISTS track_transaction_verification_counts ON transaction_verifications;
+CREATE TRIGGER track_transaction_verification_counts
+    AFTER INSERT OR UPDATE OR DELETE ON transaction_verifications
+    FOR EACH ROW
+    EXECUTE FUNCTION track_verification_status_counts();
+
+-- Backfill the counters the first time they are created
+INSERT INTO transaction_verification_counts (verification_status, total)
+SELECT verification_status, COUNT(*)
+FROM transaction_verifications
+GROUP BY verification_status
+ON CONFLICT (verification_status) DO NOTHING;
+
+-- Verification statistics aggregated in the database. All-time totals come from
+-- the counter table; a time window is answered by a range scan on
+-- idx_transaction_verifications_created_status
+CREATE OR REPLACE FUNCTION get_verification_stats(since TIMESTAMPTZ DEFAULT NULL)
+RETURNS TABLE (verification_status VARCHAR, total BIGINT) AS $$
+BEGIN
+    IF since IS NULL THEN
+        RETURN QUERY
+        SELECT c.verification_status, c.total
+        FROM transaction_verification_counts c;
+    ELSE
+        RETURN QUERY
+        SELECT tv.verification_status, COUNT(*)
+        FROM transaction_verifications tv
+        WHERE tv.created_at >= since
+        GROUP BY tv.verification_status;
+    END IF;
+END;
+$$ language 'plpgsql' STABLE;
+
+-- Planner row estimates for the given tables. Reads pg_class instead of
+-- counting, so it stays O(1) however large the tables grow; reltuples is -1
+-- for tables that have never been vacuumed or analyzed
+CREATE OR REPLACE FUNCTION get_table_estimates(table_names TEXT[])
+RETURNS TABLE (table_name TEXT, estimated_rows BIGINT) AS $$
+    SELECT c.relname::TEXT, c.reltuples::BIGINT
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public'
+      AND c.relkind IN ('r', 'p')
+      AND c.relname = ANY(table_names);
+$$ language 'sql' STABLE;
+
+-- Every table, index and applied migration, so startup verification is a
+-- single catalog query instead of one probe per table
+CREATE OR REPLACE FUNCTION get_schema_objects()
+RETURNS TABLE (object_type TEXT, object_name TEXT) AS $$
+    SELECT 'table', tablename::TEXT FROM pg_tables WHERE schemaname = 'public'
+    UNION ALL
+    SELECT 'index', indexname::TEXT FROM pg_indexes WHERE schemaname = 'public'
+    UNION ALL
+    SELECT 'migration', version::TEXT FROM schema_migrations;
+$$ language 'sql' STABLE;
+
+-- Insert default mining nodes
+INSERT INTO mining_nodes (id, name, price, storage, mining_amount, duration_days, description) VALUES
+('node1', '64 GB Node', 50, '64 GB', 500, 30, 'Mine 500 TRX in 30 days'),
+('node2', '128 GB Node', 75, '128 GB', 500, 15, 'Mine 500 TRX in 15 days'),
+('node3', '256 GB Node', 100, '256 GB', 1000, 7, 'Mine 1000 TRX in 7 days'),
+('node4', '1024 GB Node', 250, '1024 GB', 1000, 3, 'Mine 1000 TRX in 3 days')
+ON CONFLICT (id) DO UPDATE SET
+    name = EXCLUDED.name,
+    price = EXCLUDED.price,
+    storage = EXCLUDED.storage,
+    mining_amount = EXCLUDED.mining_amount,
+    duration_days = EXCLUDED.duration_days,
+    description = EXCLUDED.description,
+    updated_at = NOW();
+
+-- Create a view for easy mining statistics
+CREATE OR REPLACE VIEW mining_statistics AS
+SELECT 
+    u.id as user_id,
+    u.username,
+    COUNT(un.id) as total_nodes,
+    COUNT(CASE WHEN un.status = 'running' THEN 1 END) as active_nodes,
+    COUNT(CASE WHEN un.status = 'completed' THEN 1 END) as completed_nodes,
+    COALESCE(SUM(CASE WHEN un.status = 'completed' THEN un.mining_amount ELSE 0 END), 0) as total_mined,
+    COALESCE(SUM(CASE WHEN un.status = 'running' THEN un.total_mined ELSE 0 END), 0) as current_mining_total,
+    u.mine_balance,
+    u.referral_balance,
+    u.valid_referrals
+FROM users u
+LEFT JOIN user_nodes un ON u.id = un.user_id
+GROUP BY u.id, u.username, u.mine_balance, u.referral_balance, u.valid_referrals;
@@ -0,0 +1,32 @@
+-- Migration 0004: performance indexes
+-- migrate:no-transaction
+-- Built with CONCURRENTLY so existing tables keep taking writes while the
+-- indexes are created. The runner drops any index left INVALID by an
+-- interrupted build before retrying.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username ON users(username);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email ON users(email);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_referral_code ON users(referral_code);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_active_mining ON users(has_active_mining) WHERE has_active_mining = TRUE;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_created_at ON users(created_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_nodes_user_id ON user_nodes(user_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_nodes_node_id ON user_nodes(node_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_nodes_transaction_hash ON user_nodes(transaction_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_nodes_status ON user_nodes(status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_nodes_running ON user_nodes(user_id, status) WHERE status = 'running';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_nodes_created_at ON user_nodes(created_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_referrals_referrer_id ON referrals(referrer_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_referrals_referred_id ON referrals(referred_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_referrals_valid ON referrals(is_valid) WHERE is_valid = TRUE;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_referrals_created_at ON referrals(created_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_withdrawals_user_id ON withdrawals(user_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_withdrawals_status ON withdrawals(status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_withdrawals_type ON withdrawals(type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_withdrawals_created_at ON withdrawals(created_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaction_verifications_hash ON transaction_verifications(transaction_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaction_verifications_status ON transaction_verifications(verification_status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaction_verifications_created_status ON transaction_verifications(created_at, verification_status);
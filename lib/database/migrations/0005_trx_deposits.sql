@@ -0,0 +1,27 @@
+-- Migration 0005: ingested TRX deposits
+-- Every confirmed TransferContract to the receive address, written in bulk by the
+-- deposit ingester (lib/deposit-ingester.js). The primary key makes the
+-- verifier's lookup by transaction hash a single index probe. Addresses are
+-- stored in Trongrid's 41-prefixed hex form.
+
+CREATE TABLE IF NOT EXISTS trx_deposits (
+    transaction_hash VARCHAR(64) PRIMARY KEY,
+    to_address VARCHAR(42) NOT NULL,
+    from_address VARCHAR(42) NOT NULL,
+    amount_sun BIGINT NOT NULL CHECK (amount_sun > 0),
+    block_number BIGINT,
+    block_timestamp TIMESTAMPTZ NOT NULL,
+    ingested_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_trx_deposits_block_timestamp ON trx_deposits(block_timestamp);
+
+-- Resume point per watched address: the newest block timestamp (ms) whose
+-- deposits are all stored. Paging restarts from it, and re-reading the
+-- boundary is harmless because inserts ignore known hashes.
+CREATE TABLE IF NOT EXISTS trx_deposit_checkpoints (
+    address VARCHAR(34) PRIMARY KEY,
+    last_block_timestamp BIGINT NOT NULL DEFAULT 0,
+    deposits_ingested BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
@@ -0,0 +1,80 @@
+-- Migration 0006: purchase job queue
+-- Backs the submit-and-poll mode of /api/nodes/purchase (lib/purchase-queue.js).
+-- Workers claim jobs with FOR UPDATE SKIP LOCKED, so any number of server
+-- processes can drain the queue without handing the same job out twice. A
+-- claim is a lease: a job left 'processing' by a crashed worker becomes
+-- claimable again once the lease expires.
+
+CREATE TABLE IF NOT EXISTS purchase_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    node_id VARCHAR(20) NOT NULL,
+    transaction_hash VARCHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'processing', 'completed', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    locked_at TIMESTAMPTZ,
+    http_status INTEGER,
+    result JSONB,
+    error_message TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+
+-- One live job per transaction hash; a failed job doesn't block resubmitting
+CREATE UNIQUE INDEX IF NOT EXISTS idx_purchase_jobs_live_hash ON purchase_jobs(transaction_hash) WHERE status <> 'failed';
+CREATE INDEX IF NOT EXISTS idx_purchase_jobs_ready ON purchase_jobs(run_after) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_purchase_jobs_leased ON purchase_jobs(locked_at) WHERE status = 'processing';
+
+DROP TRIGGER IF EXISTS update_purchase_jobs_updated_at ON purchase_jobs;
+CREATE TRIGGER update_purchase_jobs_updated_at
+    BEFORE UPDATE ON purchase_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Enqueue a purchase, or return the live job already holding this hash
+CREATE OR REPLACE FUNCTION enqueue_purchase_job(p_user_id UUID, p_node_id VARCHAR, p_transaction_hash VARCHAR)
+RETURNS TABLE (id UUID, user_id UUID, status VARCHAR, created BOOLEAN) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH inserted AS (
+        INSERT INTO purchase_jobs AS j (user_id, node_id, transaction_hash)
+        VALUES (p_user_id, p_node_id, p_transaction_hash)
+        ON CONFLICT (transaction_hash) WHERE status <> 'failed' DO NOTHING
+        RETURNING j.id, j.user_id, j.status
+    )
+    SELECT inserted.id, inserted.user_id, inserted.status, TRUE FROM inserted;
+
+    IF NOT FOUND THEN
+        RETURN QUERY
+        SELECT j.id, j.user_id, j.status, FALSE
+        FROM purchase_jobs j
+        WHERE j.transaction_hash = p_transaction_hash AND j.status <> 'failed';
+    END IF;
+END;
+$$ language 'plpgsql';
+
+-- Claim up to p_limit runnable jobs for a worker: queued jobs that are due, plus
+-- processing jobs whose lease has expired. SKIP LOCKED lets concurrent workers
+-- pass over rows another worker is claiming instead of queueing behind it.
+CREATE OR REPLACE FUNCTION claim_purchase_jobs(p_worker TEXT, p_limit INTEGER, p_lease_seconds INTEGER)
+RETURNS SETOF purchase_jobs AS $$
+    UPDATE purchase_jobs j
+    SET status = 'processing',
+        locked_by = p_worker,
+        locked_at = NOW(),
+        attempts = j.attempts + 1
+    WHERE j.id IN (
+        SELECT c.id
+        FROM purchase_jobs c
+        WHERE (c.status = 'queued' AND c.run_after <= NOW())
+           OR (c.status = 'processing' AND c.locked_at < NOW() - make_interval(secs => p_lease_seconds))
+        ORDER BY c.run_after
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+$$ language 'sql';
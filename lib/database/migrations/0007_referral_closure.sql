@@ -0,0 +1,135 @@
+-- Migration 0007: referral closure table
+-- One row per (ancestor, descendant) pair in the referral tree with the number
+-- of levels between them, kept in step with referrals by trigger. Downline
+-- sizes per level become an index range scan on the ancestor instead of a
+-- recursive walk over referrals.
+
+CREATE TABLE IF NOT EXISTS referral_closure (
+    ancestor_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    descendant_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    depth INTEGER NOT NULL CHECK (depth >= 1),
+    PRIMARY KEY (ancestor_id, depth, descendant_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_referral_closure_descendant ON referral_closure(descendant_id, depth);
+
+-- Link every ancestor of the referrer (and the referrer) to the referred user
+-- and everything below them
+CREATE OR REPLACE FUNCTION add_referral_closure()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO referral_closure (ancestor_id, descendant_id, depth)
+    SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+    FROM (
+        SELECT NEW.referrer_id AS ancestor_id, 0 AS depth
+        UNION ALL
+        SELECT c.ancestor_id, c.depth FROM referral_closure c WHERE c.descendant_id = NEW.referrer_id
+    ) a
+    CROSS JOIN (
+        SELECT NEW.referred_id AS descendant_id, 0 AS depth
+        UNION ALL
+        SELECT c.descendant_id, c.depth FROM referral_closure c WHERE c.ancestor_id = NEW.referred_id
+    ) d
+    WHERE a.ancestor_id <> d.descendant_id
+    ON CONFLICT DO NOTHING;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Remove the paths that ran through a deleted referral
+CREATE OR REPLACE FUNCTION remove_referral_closure()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM referral_closure c
+    USING (
+        SELECT OLD.referrer_id AS ancestor_id, 0 AS depth
+        UNION ALL
+        SELECT r.ancestor_id, r.depth FROM referral_closure r WHERE r.descendant_id = OLD.referrer_id
+    ) a,
+    (
+        SELECT OLD.referred_id AS descendant_id, 0 AS depth
+        UNION ALL
+        SELECT r.descendant_id, r.depth FROM referral_closure r WHERE r.ancestor_id = OLD.referred_id
+    ) d
+    WHERE c.ancestor_id = a.ancestor_id
+      AND c.descendant_id = d.descendant_id
+      AND c.depth = a.depth + d.depth + 1;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS maintain_referral_closure_insert ON referrals;
+CREATE TRIGGER maintain_referral_closure_insert
+    AFTER INSERT ON referrals
+    FOR EACH ROW
+    EXECUTE FUNCTION add_referral_closure();
+
+DROP TRIGGER IF EXISTS maintain_referral_closure_delete ON referrals;
+CREATE TRIGGER maintain_referral_closure_delete
+    AFTER DELETE ON referrals
+    FOR EACH ROW
+    EXECUTE FUNCTION remove_referral_closure();
+
+-- Rebuild the whole closure from referrals; used to backfill existing data and
+-- after bulk loads that bypass row triggers
+CREATE OR REPLACE FUNCTION rebuild_referral_closure()
+RETURNS BIGINT AS $$
+DECLARE
+    inserted BIGINT;
+BEGIN
+    TRUNCATE referral_closure;
+
+    WITH RECURSIVE paths (ancestor_id, descendant_id, depth) AS (
+        SELECT referrer_id, referred_id, 1 FROM referrals
+        UNION ALL
+        SELECT p.ancestor_id, r.referred_id, p.depth + 1
+        FROM paths p
+        JOIN referrals r ON r.referrer_id = p.descendant_id
+        WHERE p.depth < 100
+    )
+    INSERT INTO referral_closure (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, descendant_id, MIN(depth)
+    FROM paths
+    WHERE ancestor_id <> descendant_id
+    GROUP BY ancestor_id, descendant_id;
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    ANALYZE referral_closure;
+    RETURN inserted;
+END;
+$$ language 'plpgsql';
+
+-- Downline size of a user per level
+CREATE OR REPLACE FUNCTION get_referral_downline(p_user_id UUID, p_max_depth INTEGER DEFAULT NULL)
+RETURNS TABLE (depth INTEGER, members BIGINT) AS $$
+    SELECT c.depth, COUNT(*)
+    FROM referral_closure c
+    WHERE c.ancestor_id = p_user_id
+      AND (p_max_depth IS NULL OR c.depth <= p_max_depth)
+    GROUP BY c.depth
+    ORDER BY c.depth;
+$$ language 'sql' STABLE;
+
+-- Users with the largest downlines, with direct referrals and tree depth
+CREATE OR REPLACE FUNCTION get_top_referrers(p_limit INTEGER DEFAULT 20, p_max_depth INTEGER DEFAULT NULL)
+RETURNS TABLE (user_id UUID, username VARCHAR, direct_referrals BIGINT, downline BIGINT, max_depth INTEGER) AS $$
+    SELECT t.ancestor_id, u.username, t.direct_referrals, t.downline, t.max_depth
+    FROM (
+        SELECT
+            c.ancestor_id,
+            COUNT(*) FILTER (WHERE c.depth = 1) AS direct_referrals,
+            COUNT(*) AS downline,
+            MAX(c.depth) AS max_depth
+        FROM referral_closure c
+        WHERE p_max_depth IS NULL OR c.depth <= p_max_depth
+        GROUP BY c.ancestor_id
+        ORDER BY downline DESC
+        LIMIT p_limit
+    ) t
+    JOIN users u ON u.id = t.ancestor_id
+    ORDER BY t.downline DESC;
+$$ language 'sql' STABLE;
+
+SELECT rebuild_referral_closure();
@@ -0,0 +1,19 @@
+-- Migration 0008: case-insensitive usernames
+-- migrate:no-transaction
+-- Usernames keep the case they were registered with but are unique and looked
+-- up by lower(username). Signup relies on this index instead of a separate
+-- ilike check (which could not use idx_users_username and raced the insert),
+-- and signin matches through it too. The build fails if existing rows already
+-- differ only by case; find them with
+--   SELECT lower(username), array_agg(username) FROM users GROUP BY 1 HAVING COUNT(*) > 1;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username_lower ON users(lower(username));
+
+-- Signin lookup: one index probe on lower(username), password checked in the same query
+CREATE OR REPLACE FUNCTION sign_in_user(p_username TEXT, p_password TEXT)
+RETURNS TABLE (id UUID, username VARCHAR, email VARCHAR) AS $$
+    SELECT u.id, u.username, u.email
+    FROM users u
+    WHERE lower(u.username) = lower(btrim(p_username))
+      AND u.password = p_password;
+$$ language 'sql' STABLE;
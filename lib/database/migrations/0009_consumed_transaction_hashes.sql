@@ -0,0 +1,93 @@
+-- Migration 0009: consumed transaction hash registry
+-- Every transaction hash the platform has accepted, keyed by hash. The
+-- verifier claims a hash here before verifying it, and the uniqueness trigger
+-- on user_nodes and withdrawals binds the claim to the row that uses it, so
+-- each check is a single primary-key probe instead of an EXISTS query on
+-- both tables. Claims are kept when the owning row is archived or deleted, so
+-- a hash can never be spent twice.
+
+CREATE TABLE IF NOT EXISTS consumed_transaction_hashes (
+    transaction_hash VARCHAR(128) PRIMARY KEY,
+    -- 'pending' while a purchase verifies it, then the kind of row that used it
+    source VARCHAR(20) NOT NULL CHECK (source IN ('pending', 'user_node', 'withdrawal')),
+    owner_id UUID,
+    user_id UUID,
+    consumed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO consumed_transaction_hashes (transaction_hash, source, owner_id, user_id, consumed_at)
+SELECT transaction_hash, 'user_node', id, user_id, created_at FROM user_nodes
+ON CONFLICT (transaction_hash) DO NOTHING;
+
+INSERT INTO consumed_transaction_hashes (transaction_hash, source, owner_id, user_id, consumed_at)
+SELECT transaction_hash, 'withdrawal', id, user_id, created_at FROM withdrawals WHERE transaction_hash IS NOT NULL
+ON CONFLICT (transaction_hash) DO NOTHING;
+
+-- Claim a hash for a user's purchase. A pending claim by the same user (a retried
+-- verification) is claimed again; anything else reports who holds the hash.
+CREATE OR REPLACE FUNCTION claim_transaction_hash(p_transaction_hash VARCHAR, p_user_id UUID)
+RETURNS TABLE (claimed BOOLEAN, source VARCHAR, consumed_at TIMESTAMPTZ) AS $$
+#variable_conflict use_column
+BEGIN
+    INSERT INTO consumed_transaction_hashes (transaction_hash, source, user_id)
+    VALUES (p_transaction_hash, 'pending', p_user_id)
+    ON CONFLICT (transaction_hash) DO NOTHING;
+
+    IF FOUND THEN
+        RETURN QUERY SELECT TRUE, 'pending'::VARCHAR, NOW();
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT (c.source = 'pending' AND c.user_id = p_user_id), c.source, c.consumed_at
+    FROM consumed_transaction_hashes c
+    WHERE c.transaction_hash = p_transaction_hash;
+END;
+$$ language 'plpgsql';
+
+-- Give back a pending claim whose purchase didn't go through
+CREATE OR REPLACE FUNCTION release_transaction_hash(p_transaction_hash VARCHAR, p_user_id UUID)
+RETURNS VOID AS $$
+    DELETE FROM consumed_transaction_hashes
+    WHERE transaction_hash = p_transaction_hash AND source = 'pending' AND user_id = p_user_id;
+$$ language 'sql';
+
+-- Bind the row's hash to it in the registry: a fresh hash is inserted, a pending
+-- claim by the same user is taken over, anything else is a reuse
+CREATE OR REPLACE FUNCTION validate_transaction_uniqueness()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.transaction_hash IS NOT DISTINCT FROM OLD.transaction_hash THEN
+        RETURN NEW;
+    END IF;
+
+    IF NEW.transaction_hash IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO consumed_transaction_hashes AS c (transaction_hash, source, owner_id, user_id)
+    VALUES (NEW.transaction_hash, TG_ARGV[0], NEW.id, NEW.user_id)
+    ON CONFLICT (transaction_hash) DO UPDATE
+        SET source = EXCLUDED.source, owner_id = EXCLUDED.owner_id, consumed_at = NOW()
+        WHERE (c.source = 'pending' AND c.user_id = EXCLUDED.user_id) OR c.owner_id = EXCLUDED.owner_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Transaction hash already used: %', NEW.transaction_hash
+            USING ERRCODE = 'unique_violation';
+    END IF;
+
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS validate_unique_transaction_hash ON user_nodes;
+CREATE TRIGGER validate_unique_transaction_hash
+    BEFORE INSERT OR UPDATE OF transaction_hash ON user_nodes
+    FOR EACH ROW
+    EXECUTE FUNCTION validate_transaction_uniqueness('user_node');
+
+DROP TRIGGER IF EXISTS validate_unique_transaction_hash ON withdrawals;
+CREATE TRIGGER validate_unique_transaction_hash
+    BEFORE INSERT OR UPDATE OF transaction_hash ON withdrawals
+    FOR EACH ROW
+    EXECUTE FUNCTION validate_transaction_uniqueness('withdrawal');
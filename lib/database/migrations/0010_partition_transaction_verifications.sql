@@ -0,0 +1,176 @@
+-- Migration 0010: time-partitioned transaction_verifications
+-- The audit log is range-partitioned by created_at into monthly partitions, so
+-- retention is a DROP (or DETACH) of whole months instead of row-by-row DELETEs,
+-- and a stats window only scans the months it covers. Each audit row is keyed
+-- by (transaction_hash, created_at): the audit writer upserts on that key, so a
+-- retry updates one row in one partition instead of every row for the hash.
+-- The table is rebuilt under an exclusive lock; apply it in a quiet period.
+
+-- The primary key below starts with transaction_hash and replaces this index
+DROP INDEX IF EXISTS idx_transaction_verifications_hash;
+
+DROP TRIGGER IF EXISTS track_transaction_verification_counts ON transaction_verifications;
+ALTER TABLE transaction_verifications RENAME TO transaction_verifications_unpartitioned;
+
+CREATE TABLE transaction_verifications (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    transaction_hash VARCHAR(128) NOT NULL,
+    verification_status VARCHAR(20) NOT NULL CHECK (verification_status IN ('pending', 'verified', 'failed', 'invalid')),
+    trongrid_response JSONB,
+    verification_attempts INTEGER DEFAULT 1,
+    first_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+    last_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+    verified_at TIMESTAMPTZ,
+    error_message TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (transaction_hash, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside every monthly partition; ensure_verification_partitions keeps it empty
+CREATE TABLE transaction_verifications_default PARTITION OF transaction_verifications DEFAULT;
+
+-- Create the monthly partitions from p_from's month through p_months_ahead months
+-- past the current one (UTC month boundaries). Rows that already landed in the
+-- default partition for a new month are moved into it. Returns partitions created.
+CREATE OR REPLACE FUNCTION ensure_verification_partitions(
+    p_from TIMESTAMPTZ DEFAULT NOW(),
+    p_months_ahead INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from AT TIME ZONE 'UTC')::DATE;
+    v_last DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead))::DATE;
+    v_name TEXT;
+    v_lower TIMESTAMPTZ;
+    v_upper TIMESTAMPTZ;
+    v_moved BIGINT;
+    v_created INTEGER := 0;
+BEGIN
+    -- Several app processes run this at startup; one at a time
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_verification_partitions'));
+
+    WHILE v_month <= v_last LOOP
+        v_name := 'transaction_verifications_p' || to_char(v_month, 'YYYY_MM');
+        v_lower := v_month::TIMESTAMP AT TIME ZONE 'UTC';
+        v_upper := (v_month + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+
+        IF to_regclass(v_name) IS NULL THEN
+            IF NOT EXISTS (
+                SELECT 1 FROM transaction_verifications_default
+                WHERE created_at >= v_lower AND created_at < v_upper
+            ) THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF transaction_verifications FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_lower, v_upper
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE transaction_verifications INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    v_name
+                );
+                EXECUTE format(
+                    'WITH moved AS (
+                        DELETE FROM transaction_verifications_default
+                        WHERE created_at >= $1 AND created_at < $2
+                        RETURNING *
+                    )
+                    INSERT INTO %I SELECT * FROM moved',
+                    v_name
+                ) USING v_lower, v_upper;
+                GET DIAGNOSTICS v_moved = ROW_COUNT;
+
+                -- The move fired the counter trigger's DELETE side; count the rows back in
+                EXECUTE format(
+                    'INSERT INTO transaction_verification_counts (verification_status, total)
+                    SELECT verification_status, COUNT(*) FROM %I GROUP BY verification_status
+                    ON CONFLICT (verification_status) DO UPDATE SET
+                        total = transaction_verification_counts.total + EXCLUDED.total',
+                    v_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE transaction_verifications ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_lower, v_upper
+                );
+                RAISE NOTICE 'Moved % rows from transaction_verifications_default into %', v_moved, v_name;
+            END IF;
+            v_created := v_created + 1;
+        END IF;
+
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ language 'plpgsql';
+
+-- Retention: drop (or, with p_detach, detach and keep as standalone tables) every
+-- monthly partition that ends before the start of the month p_retain_months ago.
+-- transaction_verification_counts keeps counting pruned rows, so all-time
+-- statistics stay lifetime totals.
+CREATE OR REPLACE FUNCTION prune_verification_partitions(
+    p_retain_months INTEGER,
+    p_detach BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (partition_name TEXT, pruned_action TEXT) AS $$
+DECLARE
+    v_cutoff TIMESTAMPTZ := (date_trunc('month', NOW() AT TIME ZONE 'UTC') - make_interval(months => p_retain_months))
+        AT TIME ZONE 'UTC';
+    v_partition RECORD;
+BEGIN
+    IF p_retain_months IS NULL OR p_retain_months < 1 THEN
+        RAISE EXCEPTION 'p_retain_months must be at least 1';
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_verification_partitions'));
+
+    FOR v_partition IN
+        SELECT c.relname::TEXT AS relname,
+               to_date(substring(c.relname FROM '(\d{4}_\d{2})$'), 'YYYY_MM') AS month
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'transaction_verifications'::regclass
+          AND c.relname ~ '^transaction_verifications_p\d{4}_\d{2}$'
+        ORDER BY 2
+    LOOP
+        EXIT WHEN (v_partition.month + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC' > v_cutoff;
+
+        IF p_detach THEN
+            EXECUTE format('ALTER TABLE transaction_verifications DETACH PARTITION %I', v_partition.relname);
+        ELSE
+            EXECUTE format('DROP TABLE %I', v_partition.relname);
+        END IF;
+
+        partition_name := v_partition.relname;
+        pruned_action := CASE WHEN p_detach THEN 'detached' ELSE 'dropped' END;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+-- Partitions for every month that has rows, plus the next three
+SELECT ensure_verification_partitions(
+    COALESCE((SELECT MIN(created_at) FROM transaction_verifications_unpartitioned), NOW()),
+    3
+);
+
+-- Counters already include these rows, and the trigger isn't attached yet
+INSERT INTO transaction_verifications (
+    id, transaction_hash, verification_status, trongrid_response, verification_attempts,
+    first_attempt_at, last_attempt_at, verified_at, error_message, created_at
+)
+SELECT id, transaction_hash, verification_status, trongrid_response, verification_attempts,
+       first_attempt_at, last_attempt_at, verified_at, error_message,
+       COALESCE(created_at, first_attempt_at, NOW())
+FROM transaction_verifications_unpartitioned
+ON CONFLICT (transaction_hash, created_at) DO NOTHING;
+
+DROP TABLE transaction_verifications_unpartitioned;
+
+-- Same names as migration 0004, now partitioned indexes
+CREATE INDEX IF NOT EXISTS idx_transaction_verifications_status ON transaction_verifications(verification_status);
+CREATE INDEX IF NOT EXISTS idx_transaction_verifications_created_status ON transaction_verifications(created_at, verification_status);
+
+CREATE TRIGGER track_transaction_verification_counts
+    AFTER INSERT OR UPDATE OR DELETE ON transaction_verifications
+    FOR EACH ROW
+    EXECUTE FUNCTION track_verification_status_counts();
@@ -0,0 +1,108 @@
+-- Migration 0011: hot/cold archival for user_nodes and withdrawals
+-- Finished nodes and withdrawals older than the archive age move out of the hot
+-- tables into append-only archive tables, so idx_user_nodes_user_id and
+-- idx_withdrawals_user_id only index rows that are still being worked on.
+-- Archive tables are packed (fillfactor 100, never updated) and carry a single
+-- (user_id, created_at) index instead of the hot tables' six; read endpoints
+-- reach them only when a client asks for archived rows. Archived rows keep their
+-- consumed_transaction_hashes claims, so a hash stays spent after archival.
+-- Columns come from the hot tables: a migration that adds a column to user_nodes
+-- or withdrawals must add it to the archive table too.
+
+CREATE TABLE IF NOT EXISTS user_nodes_archive (
+    LIKE user_nodes INCLUDING DEFAULTS,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) WITH (fillfactor = 100);
+
+CREATE TABLE IF NOT EXISTS withdrawals_archive (
+    LIKE withdrawals INCLUDING DEFAULTS,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) WITH (fillfactor = 100);
+
+CREATE INDEX IF NOT EXISTS idx_user_nodes_archive_user_created ON user_nodes_archive(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_withdrawals_archive_user_created ON withdrawals_archive(user_id, created_at DESC);
+
+-- Move one batch of finished nodes created before NOW() - p_older_than into the
+-- archive. Each call is its own transaction, so a run can stop at any point and
+-- the next one carries on where it left off. Returns the number of rows moved.
+CREATE OR REPLACE FUNCTION archive_user_nodes(p_older_than INTERVAL, p_batch_size INTEGER DEFAULT 1000)
+RETURNS INTEGER AS $$
+DECLARE
+    v_moved INTEGER;
+BEGIN
+    WITH batch AS (
+        SELECT id FROM user_nodes
+        WHERE status IN ('completed', 'cancelled')
+          AND created_at < NOW() - p_older_than
+        ORDER BY created_at
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    moved AS (
+        DELETE FROM user_nodes n
+        USING batch
+        WHERE n.id = batch.id
+        RETURNING n.*
+    )
+    INSERT INTO user_nodes_archive
+    SELECT moved.*, NOW() FROM moved
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS v_moved = ROW_COUNT;
+    RETURN v_moved;
+END;
+$$ language 'plpgsql';
+
+-- Same for withdrawals that reached a final status
+CREATE OR REPLACE FUNCTION archive_withdrawals(p_older_than INTERVAL, p_batch_size INTEGER DEFAULT 1000)
+RETURNS INTEGER AS $$
+DECLARE
+    v_moved INTEGER;
+BEGIN
+    WITH batch AS (
+        SELECT id FROM withdrawals
+        WHERE status IN ('completed', 'failed', 'cancelled')
+          AND created_at < NOW() - p_older_than
+        ORDER BY created_at
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    moved AS (
+        DELETE FROM withdrawals w
+        USING batch
+        WHERE w.id = batch.id
+        RETURNING w.*
+    )
+    INSERT INTO withdrawals_archive
+    SELECT moved.*, NOW() FROM moved
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS v_moved = ROW_COUNT;
+    RETURN v_moved;
+END;
+$$ language 'plpgsql';
+
+-- Mining statistics still count archived nodes
+CREATE OR REPLACE VIEW mining_statistics AS
+SELECT
+    u.id as user_id,
+    u.username,
+    COUNT(un.id) as total_nodes,
+    COUNT(CASE WHEN un.status = 'running' THEN 1 END) as active_nodes,
+    COUNT(CASE WHEN un.status = 'completed' THEN 1 END) as completed_nodes,
+    COALESCE(SUM(CASE WHEN un.status = 'completed' THEN un.mining_amount ELSE 0 END), 0) as total_mined,
+    COALESCE(SUM(CASE WHEN un.status = 'running' THEN un.total_mined ELSE 0 END), 0) as current_mining_total,
+    u.mine_balance,
+    u.referral_balance,
+    u.valid_referrals
+FROM users u
+LEFT JOIN (
+    SELECT id, user_id, status, mining_amount, total_mined FROM user_nodes
+    UNION ALL
+    SELECT id, user_id, status, mining_amount, total_mined FROM user_nodes_archive
+) un ON u.id = un.user_id
+GROUP BY u.id, u.username, u.mine_balance, u.referral_balance, u.valid_referrals;
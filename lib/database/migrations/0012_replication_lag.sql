@@ -0,0 +1,16 @@
+-- Migration 0012: replication lag probe
+-- Called on a read replica by lib/read-router.js to decide whether the replica
+-- is fresh enough to serve reads. A replica that has replayed everything it
+-- received reports zero lag (an idle primary writes nothing to replay), and
+-- the primary itself always reports zero.
+
+CREATE OR REPLACE FUNCTION get_replication_lag()
+RETURNS TABLE (in_recovery BOOLEAN, lag_ms DOUBLE PRECISION) AS $$
+    SELECT
+        pg_is_in_recovery(),
+        CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM (NOW() - pg_last_xact_replay_timestamp())) * 1000, 0)
+        END;
+$$ language 'sql' STABLE;
@@ -0,0 +1,78 @@
+-- Migration 0013: case-insensitive transaction hashes
+-- Transaction hashes are hex, so 'ABC…' and 'abc…' are the same transaction,
+-- but consumed_transaction_hashes was keyed on the hash as submitted and a
+-- second purchase could spend a hash again by changing its case. Registry keys
+-- are now always lowercase: existing keys are folded (where two casings of one
+-- hash were both recorded, the lowercase one, or else the first, is kept, and
+-- either way the hash stays consumed), the claim, release and uniqueness
+-- functions lowercase their input, and a CHECK constraint rejects anything else.
+
+DELETE FROM consumed_transaction_hashes c
+WHERE c.transaction_hash <> lower(c.transaction_hash)
+  AND EXISTS (
+      SELECT 1 FROM consumed_transaction_hashes k
+      WHERE k.transaction_hash <> c.transaction_hash
+        AND lower(k.transaction_hash) = lower(c.transaction_hash)
+        AND (k.transaction_hash = lower(k.transaction_hash) OR k.transaction_hash < c.transaction_hash)
+  );
+
+UPDATE consumed_transaction_hashes
+SET transaction_hash = lower(transaction_hash)
+WHERE transaction_hash <> lower(transaction_hash);
+
+ALTER TABLE consumed_transaction_hashes DROP CONSTRAINT IF EXISTS consumed_transaction_hashes_lowercase;
+ALTER TABLE consumed_transaction_hashes
+    ADD CONSTRAINT consumed_transaction_hashes_lowercase CHECK (transaction_hash = lower(transaction_hash));
+
+CREATE OR REPLACE FUNCTION claim_transaction_hash(p_transaction_hash VARCHAR, p_user_id UUID)
+RETURNS TABLE (claimed BOOLEAN, source VARCHAR, consumed_at TIMESTAMPTZ) AS $$
+#variable_conflict use_column
+BEGIN
+    INSERT INTO consumed_transaction_hashes (transaction_hash, source, user_id)
+    VALUES (lower(p_transaction_hash), 'pending', p_user_id)
+    ON CONFLICT (transaction_hash) DO NOTHING;
+
+    IF FOUND THEN
+        RETURN QUERY SELECT TRUE, 'pending'::VARCHAR, NOW();
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT (c.source = 'pending' AND c.user_id = p_user_id), c.source, c.consumed_at
+    FROM consumed_transaction_hashes c
+    WHERE c.transaction_hash = lower(p_transaction_hash);
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION release_transaction_hash(p_transaction_hash VARCHAR, p_user_id UUID)
+RETURNS VOID AS $$
+    DELETE FROM consumed_transaction_hashes
+    WHERE transaction_hash = lower(p_transaction_hash) AND source = 'pending' AND user_id = p_user_id;
+$$ language 'sql';
+
+-- user_nodes and withdrawals keep the hash as stored; only the registry key is folded
+CREATE OR REPLACE FUNCTION validate_transaction_uniqueness()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND lower(NEW.transaction_hash) IS NOT DISTINCT FROM lower(OLD.transaction_hash) THEN
+        RETURN NEW;
+    END IF;
+
+    IF NEW.transaction_hash IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO consumed_transaction_hashes AS c (transaction_hash, source, owner_id, user_id)
+    VALUES (lower(NEW.transaction_hash), TG_ARGV[0], NEW.id, NEW.user_id)
+    ON CONFLICT (transaction_hash) DO UPDATE
+        SET source = EXCLUDED.source, owner_id = EXCLUDED.owner_id, consumed_at = NOW()
+        WHERE (c.source = 'pending' AND c.user_id = EXCLUDED.user_id) OR c.owner_id = EXCLUDED.owner_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Transaction hash already used: %', NEW.transaction_hash
+            USING ERRCODE = 'unique_violation';
+    END IF;
+
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
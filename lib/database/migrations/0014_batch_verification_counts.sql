@@ -0,0 +1,132 @@
+-- Migration 0014: statement-level verification counters
+-- transaction_verification_counts was kept up by a row-level trigger, so every
+-- audit row updated its status's counter row: concurrent verifications queued
+-- on the same few rows, and one audit flush of N rows took the lock N times.
+-- The counters are now maintained once per statement from its transition
+-- tables: a batch adds one delta per status, taken in status order so two
+-- batches can't deadlock on the rows. Postgres allows transition tables on one
+-- event per trigger, hence three triggers sharing one function. Statement
+-- triggers on the partitioned parent don't fire for statements that name a
+-- partition directly, which is what ensure_verification_partitions relies on
+-- when it moves rows out of the default partition (see below).
+
+CREATE OR REPLACE FUNCTION track_verification_status_count_batches()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO transaction_verification_counts AS c (verification_status, total)
+        SELECT verification_status, COUNT(*) FROM new_rows
+        GROUP BY verification_status
+        ORDER BY verification_status
+        ON CONFLICT (verification_status) DO UPDATE SET total = c.total + EXCLUDED.total;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO transaction_verification_counts AS c (verification_status, total)
+        SELECT verification_status, -COUNT(*) FROM old_rows
+        GROUP BY verification_status
+        ORDER BY verification_status
+        ON CONFLICT (verification_status) DO UPDATE SET total = c.total + EXCLUDED.total;
+    ELSE
+        -- Only status changes move the totals; unchanged statuses net to zero and are skipped
+        INSERT INTO transaction_verification_counts AS c (verification_status, total)
+        SELECT verification_status, SUM(delta) FROM (
+            SELECT verification_status, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT verification_status, -1 AS delta FROM old_rows
+        ) changes
+        GROUP BY verification_status
+        HAVING SUM(delta) <> 0
+        ORDER BY verification_status
+        ON CONFLICT (verification_status) DO UPDATE SET total = c.total + EXCLUDED.total;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS track_transaction_verification_counts ON transaction_verifications;
+
+DROP TRIGGER IF EXISTS track_transaction_verification_inserts ON transaction_verifications;
+CREATE TRIGGER track_transaction_verification_inserts
+    AFTER INSERT ON transaction_verifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION track_verification_status_count_batches();
+
+DROP TRIGGER IF EXISTS track_transaction_verification_updates ON transaction_verifications;
+CREATE TRIGGER track_transaction_verification_updates
+    AFTER UPDATE ON transaction_verifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION track_verification_status_count_batches();
+
+DROP TRIGGER IF EXISTS track_transaction_verification_deletes ON transaction_verifications;
+CREATE TRIGGER track_transaction_verification_deletes
+    AFTER DELETE ON transaction_verifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION track_verification_status_count_batches();
+
+-- As in migration 0010, except that rows moved out of the default partition are
+-- no longer counted back in: the move names the partition, so the statement
+-- triggers above never subtracted them.
+CREATE OR REPLACE FUNCTION ensure_verification_partitions(
+    p_from TIMESTAMPTZ DEFAULT NOW(),
+    p_months_ahead INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from AT TIME ZONE 'UTC')::DATE;
+    v_last DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead))::DATE;
+    v_name TEXT;
+    v_lower TIMESTAMPTZ;
+    v_upper TIMESTAMPTZ;
+    v_moved BIGINT;
+    v_created INTEGER := 0;
+BEGIN
+    -- Several app processes run this at startup; one at a time
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_verification_partitions'));
+
+    WHILE v_month <= v_last LOOP
+        v_name := 'transaction_verifications_p' || to_char(v_month, 'YYYY_MM');
+        v_lower := v_month::TIMESTAMP AT TIME ZONE 'UTC';
+        v_upper := (v_month + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+
+        IF to_regclass(v_name) IS NULL THEN
+            IF NOT EXISTS (
+                SELECT 1 FROM transaction_verifications_default
+                WHERE created_at >= v_lower AND created_at < v_upper
+            ) THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF transaction_verifications FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_lower, v_upper
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE transaction_verifications INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    v_name
+                );
+                EXECUTE format(
+                    'WITH moved AS (
+                        DELETE FROM transaction_verifications_default
+                        WHERE created_at >= $1 AND created_at < $2
+                        RETURNING *
+                    )
+                    INSERT INTO %I SELECT * FROM moved',
+                    v_name
+                ) USING v_lower, v_upper;
+                GET DIAGNOSTICS v_moved = ROW_COUNT;
+                EXECUTE format(
+                    'ALTER TABLE transaction_verifications ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_lower, v_upper
+                );
+                RAISE NOTICE 'Moved % rows from transaction_verifications_default into %', v_moved, v_name;
+            END IF;
+            v_created := v_created + 1;
+        END IF;
+
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ language 'plpgsql';
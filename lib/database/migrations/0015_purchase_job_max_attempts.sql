@@ -0,0 +1,52 @@
+-- Migration 0015: give up on purchase jobs that keep losing their lease
+-- claim_purchase_jobs re-claimed any job whose lease had expired, and only the
+-- worker's retry path checked attempts against the maximum. A job that crashes
+-- its worker every time never reaches that path, so it was retried forever.
+-- Claiming now takes the maximum as well: an expired job that has already used
+-- p_max_attempts claims is marked failed instead of being handed out again.
+
+DROP FUNCTION IF EXISTS claim_purchase_jobs(TEXT, INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION claim_purchase_jobs(
+    p_worker TEXT,
+    p_limit INTEGER,
+    p_lease_seconds INTEGER,
+    p_max_attempts INTEGER DEFAULT 5
+)
+RETURNS SETOF purchase_jobs AS $$
+BEGIN
+    UPDATE purchase_jobs j
+    SET status = 'failed',
+        locked_by = NULL,
+        locked_at = NULL,
+        http_status = 500,
+        error_message = format('Purchase processing abandoned after %s attempts', j.attempts),
+        completed_at = NOW()
+    WHERE j.id IN (
+        SELECT c.id
+        FROM purchase_jobs c
+        WHERE c.status = 'processing'
+          AND c.locked_at < NOW() - make_interval(secs => p_lease_seconds)
+          AND c.attempts >= p_max_attempts
+        FOR UPDATE SKIP LOCKED
+    );
+
+    RETURN QUERY
+    UPDATE purchase_jobs j
+    SET status = 'processing',
+        locked_by = p_worker,
+        locked_at = NOW(),
+        attempts = j.attempts + 1
+    WHERE j.id IN (
+        SELECT c.id
+        FROM purchase_jobs c
+        WHERE (c.status = 'queued' AND c.run_after <= NOW())
+           OR (c.status = 'processing' AND c.locked_at < NOW() - make_interval(secs => p_lease_seconds)
+               AND c.attempts < p_max_attempts)
+        ORDER BY c.run_after
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+END;
+$$ language 'plpgsql';
@@ -0,0 +1,65 @@
+-- Migration 0016: pending transaction hash claims expire
+-- A 'pending' claim in consumed_transaction_hashes had no expiry: when a
+-- verification crashed or was abandoned before releasing its claim, the hash
+-- stayed blocked for every later purchase. Claims now record claimed_at. A
+-- pending claim older than the timeout can be taken over by the next purchase
+-- that claims the hash, and the retention job (lib/verification-retention.js)
+-- releases the ones nobody came back for. Only pending claims expire; a hash
+-- bound to a node or withdrawal is consumed for good. A verification that is
+-- still running when its claim is taken over can't spend the hash: the
+-- uniqueness trigger only lets the claim's current user bind it.
+
+ALTER TABLE consumed_transaction_hashes ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ DEFAULT NOW();
+
+UPDATE consumed_transaction_hashes SET claimed_at = consumed_at WHERE claimed_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_consumed_transaction_hashes_pending
+    ON consumed_transaction_hashes(claimed_at) WHERE source = 'pending';
+
+DROP FUNCTION IF EXISTS claim_transaction_hash(VARCHAR, UUID);
+
+-- Claim a hash for a user's purchase. A pending claim by the same user (a retried
+-- verification) is renewed, a pending claim older than p_claim_timeout_seconds is
+-- taken over; anything else reports who holds the hash.
+CREATE OR REPLACE FUNCTION claim_transaction_hash(
+    p_transaction_hash VARCHAR,
+    p_user_id UUID,
+    p_claim_timeout_seconds INTEGER DEFAULT 600
+)
+RETURNS TABLE (claimed BOOLEAN, source VARCHAR, consumed_at TIMESTAMPTZ) AS $$
+#variable_conflict use_column
+BEGIN
+    INSERT INTO consumed_transaction_hashes AS c (transaction_hash, source, user_id, claimed_at)
+    VALUES (lower(p_transaction_hash), 'pending', p_user_id, NOW())
+    ON CONFLICT (transaction_hash) DO UPDATE
+        SET user_id = EXCLUDED.user_id, claimed_at = NOW(), consumed_at = NOW()
+        WHERE c.source = 'pending'
+          AND (c.user_id = EXCLUDED.user_id
+               OR c.claimed_at < NOW() - make_interval(secs => p_claim_timeout_seconds));
+
+    IF FOUND THEN
+        RETURN QUERY SELECT TRUE, 'pending'::VARCHAR, NOW();
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT FALSE, c.source, c.consumed_at
+    FROM consumed_transaction_hashes c
+    WHERE c.transaction_hash = lower(p_transaction_hash);
+END;
+$$ language 'plpgsql';
+
+-- Release pending claims older than p_claim_timeout_seconds; returns how many
+CREATE OR REPLACE FUNCTION release_stale_transaction_claims(p_claim_timeout_seconds INTEGER DEFAULT 600)
+RETURNS INTEGER AS $$
+DECLARE
+    released INTEGER;
+BEGIN
+    DELETE FROM consumed_transaction_hashes
+    WHERE source = 'pending'
+      AND claimed_at < NOW() - make_interval(secs => p_claim_timeout_seconds);
+
+    GET DIAGNOSTICS released = ROW_COUNT;
+    RETURN released;
+END;
+$$ language 'plpgsql';
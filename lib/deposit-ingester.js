@@ -0,0 +1,246 @@
+import { supabase } from './supabase'
+import fs from 'fs'
+import path from 'path'
+import trongridClient from './trongrid-client'
+import { receiveAddressHex } from './trx-transaction-validator'
+import { depositsIngestedTotal, depositIngestBatchDuration } from './metrics'
+import logger from './logger'
+
+const DEFAULT_RECEIVE_ADDRESS = 'TFNHcYdhEq5sgjaWPdR1Gnxgzu3RUKncwu'
+
+/**
+ * Pages through Trongrid's account transaction listing
+ */
+export class TrongridPageSource {
+  constructor(client = trongridClient) {
+    this.client = client
+  }
+
+  fetchPage(address, options) {
+    return this.client.getAccountTransactions(address, options)
+  }
+}
+
+/**
+ * Replays recorded Trongrid transactions from a JSON file as if they were the
+ * account listing. Accepts a recorded listing ({ data: [...] }) or the verifier
+ * corpus ({ transactions: [{ response }] }). Timestamps are rebased so the newest
+ * transaction is a minute old, keeping replayed deposits inside the 24h window.
+ */
+export class FixturePageSource {
+  constructor(fixturePath) {
+    const fixture = JSON.parse(fs.readFileSync(path.resolve(process.cwd(), fixturePath), 'utf8'))
+    const transactions = fixture.data || fixture.transactions.map(entry => entry.response)
+
+    const newest = transactions.reduce((max, tx) => Math.max(max, tx.block_timestamp), 0)
+    const shift = Date.now() - 60 * 1000 - newest
+    this.transactions = transactions
+      .map(tx => ({ ...tx, block_timestamp: tx.block_timestamp + shift }))
+      .sort((a, b) => a.block_timestamp - b.block_timestamp)
+  }
+
+  async fetchPage(address, { minTimestamp = 0, fingerprint = null, limit = 200 } = {}) {
+    let start = fingerprint ? Number(fingerprint) : this.transactions.findIndex(tx => tx.block_timestamp >= minTimestamp)
+    if (start < 0) start = this.transactions.length
+
+    const data = this.transactions.slice(start, start + limit)
+    const next = start + data.length
+    return { data, fingerprint: next < this.transactions.length ? String(next) : null }
+  }
+}
+
+/**
+ * Background ingester for incoming TRX deposits
+ * Pages through every confirmed transaction to the receive address from the
+ * stored checkpoint, keeps successful TransferContracts and bulk-inserts them
+ * into trx_deposits, so the verifier can answer from the table instead of
+ * asking Trongrid per hash. Run it in a single process (DEPOSIT_INGESTER).
+ */
+export class DepositIngester {
+  constructor(options = {}) {
+    this.address = options.address || process.env.TRX_RECEIVE_ADDRESS || DEFAULT_RECEIVE_ADDRESS
+    this.addressHex = receiveAddressHex(this.address)
+    this.source = options.source || new TrongridPageSource()
+    this.pageSize = options.pageSize || 200
+    this.intervalMs = options.intervalMs || Number(process.env.DEPOSIT_INGEST_INTERVAL_MS) || 3000
+
+    this.checkpoint = null
+    this.running = null
+    this.timer = null
+    this.started = false
+    this.stopRequested = false
+  }
+
+  /**
+   * Ingest everything newer than the checkpoint; resolves to the number of new deposits
+   */
+  runOnce() {
+    // Overlapping ticks share the pass already in progress
+    if (!this.running) {
+      this.running = this.ingest().finally(() => {
+        this.running = null
+      })
+    }
+    return this.running
+  }
+
+  async ingest() {
+    if (!this.checkpoint) {
+      this.checkpoint = await this.loadCheckpoint()
+    }
+
+    // A fingerprint continues the query it was issued for, so every page of
+    // this pass asks from the same starting timestamp
+    const minTimestamp = this.checkpoint.last_block_timestamp
+    let inserted = 0
+    let fingerprint = null
+    do {
+      const page = await this.source.fetchPage(this.address, {
+        minTimestamp,
+        fingerprint,
+        limit: this.pageSize
+      })
+      fingerprint = page.fingerprint
+
+      const deposits = page.data.map(tx => this.toDeposit(tx)).filter(Boolean)
+      const pageInserted = await this.storeDeposits(deposits)
+      inserted += pageInserted
+
+      // Only advance once the page is stored, so a crash re-reads it instead of skipping it
+      const newest = page.data.reduce((max, tx) => Math.max(max, tx.block_timestamp || 0), 0)
+      if (newest > this.checkpoint.last_block_timestamp || pageInserted > 0) {
+        this.checkpoint = {
+          ...this.checkpoint,
+          last_block_timestamp: Math.max(this.checkpoint.last_block_timestamp, newest),
+          deposits_ingested: this.checkpoint.deposits_ingested + pageInserted
+        }
+        await this.saveCheckpoint()
+      }
+    } while (fingerprint && !this.stopRequested)
+
+    return inserted
+  }
+
+  /**
+   * Deposit row for a successful TransferContract to our address, otherwise null
+   */
+  toDeposit(tx) {
+    if (tx.ret?.[0]?.contractRet !== 'SUCCESS') return null
+
+    const contract = tx.raw_data?.contract?.[0]
+    if (contract?.type !== 'TransferContract') return null
+
+    const transfer = contract.parameter?.value
+    if (typeof transfer?.to_address !== 'string' || transfer.to_address.toLowerCase() !== this.addressHex) return null
+    // Malformed transfers are skipped rather than failing the whole pass
+    if (typeof transfer.owner_address !== 'string' || typeof tx.txID !== 'string') return null
+
+    return {
+      transaction_hash: tx.txID.toLowerCase(),
+      to_address: transfer.to_address.toLowerCase(),
+      from_address: transfer.owner_address.toLowerCase(),
+      amount_sun: transfer.amount,
+      block_number: tx.blockNumber || null,
+      block_timestamp: new Date(tx.block_timestamp).toISOString()
+    }
+  }
+
+  async storeDeposits(deposits) {
+    if (deposits.length === 0) return 0
+
+    const endTimer = depositIngestBatchDuration.startTimer()
+    const { data, error } = await supabase
+      .from('trx_deposits')
+      .upsert(deposits, { onConflict: 'transaction_hash', ignoreDuplicates: true })
+      .select('transaction_hash')
+    endTimer({ result: error ? 'error' : 'ok' })
+
+    if (error) throw new Error(`Failed to store deposits: ${error.message}`)
+    depositsIngestedTotal.inc({}, data.length)
+    return data.length
+  }
+
+  async loadCheckpoint() {
+    const { data, error } = await supabase
+      .from('trx_deposit_checkpoints')
+      .select('address, last_block_timestamp, deposits_ingested')
+      .eq('address', this.address)
+      .maybeSingle()
+
+    if (error) throw new Error(`Failed to load deposit checkpoint: ${error.message}`)
+    return {
+      address: this.address,
+      last_block_timestamp: Number(data?.last_block_timestamp || 0),
+      deposits_ingested: Number(data?.deposits_ingested || 0)
+    }
+  }
+
+  async saveCheckpoint() {
+    const { error } = await supabase
+      .from('trx_deposit_checkpoints')
+      .upsert({ ...this.checkpoint, updated_at: new Date().toISOString() }, { onConflict: 'address' })
+
+    if (error) throw new Error(`Failed to save deposit checkpoint: ${error.message}`)
+  }
+
+  /**
+   * Poll continuously until stop() is called
+   */
+  start() {
+    if (this.started) return
+    this.started = true
+    this.stopRequested = false
+    logger.info('Deposit ingester started', { address: this.address, intervalMs: this.intervalMs })
+
+    const tick = async () => {
+      try {
+        const inserted = await this.runOnce()
+        if (inserted > 0) {
+          logger.info('Ingested deposits', { address: this.address, inserted })
+        }
+      } catch (error) {
+        console.error('Deposit ingestion failed:', error.message)
+      }
+      if (!this.stopRequested) {
+        this.timer = setTimeout(tick, this.intervalMs)
+        this.timer.unref?.()
+      }
+    }
+    tick()
+  }
+
+  stop() {
+    this.started = false
+    this.stopRequested = true
+    clearTimeout(this.timer)
+  }
+}
+
+/**
+ * Deposit ingester for the configured mode: DEPOSIT_INGESTER=trongrid polls
+ * Trongrid, DEPOSIT_INGESTER=fixtures replays DEPOSIT_INGEST_FIXTURES
+ */
+export function createDepositIngester(mode = process.env.DEPOSIT_INGESTER) {
+  if (mode === 'trongrid') {
+    return new DepositIngester()
+  }
+  if (mode === 'fixtures') {
+    const fixturePath = process.env.DEPOSIT_INGEST_FIXTURES || 'fixtures/trongrid/transactions.json'
+    return new DepositIngester({ source: new FixturePageSource(fixturePath) })
+  }
+  return null
+}
+
+/**
+ * Stored deposit for a transaction hash, or null (primary key lookup)
+ */
+export async function findDeposit(transactionHash) {
+  const { data, error } = await supabase
+    .from('trx_deposits')
+    .select('transaction_hash, to_address, from_address, amount_sun, block_number, block_timestamp')
+    .eq('transaction_hash', transactionHash.toLowerCase())
+    .maybeSingle()
+
+  if (error) throw new Error(`Deposit lookup failed: ${error.message}`)
+  return data
+}
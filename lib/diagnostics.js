@@ -0,0 +1,108 @@
+import crypto from 'crypto'
+import fs from 'fs'
+import path from 'path'
+import inspector from 'inspector'
+import v8 from 'v8'
+
+export const MAX_PROFILE_MS = 60 * 1000
+const DEFAULT_PROFILE_MS = 10 * 1000
+
+/**
+ * Whether a request carries the admin token (Authorization: Bearer $ADMIN_API_TOKEN).
+ * Without ADMIN_API_TOKEN configured nobody is an admin.
+ */
+export function isAdminRequest(request) {
+  const token = process.env.ADMIN_API_TOKEN
+  const header = request.headers.get('authorization') || ''
+  if (!token || !header.startsWith('Bearer ')) return false
+
+  const expected = crypto.createHash('sha256').update(token).digest()
+  const given = crypto.createHash('sha256').update(header.slice('Bearer '.length)).digest()
+  return crypto.timingSafeEqual(expected, given)
+}
+
+/**
+ * On-demand CPU profiles and heap snapshots of this process
+ * Captures are written to DIAGNOSTICS_DIR (default .data/diagnostics) as
+ * .cpuprofile and .heapsnapshot files that Chrome DevTools opens directly.
+ * One capture runs at a time; a CPU profile samples for at most
+ * MAX_PROFILE_MS, and a heap snapshot pauses the process while it is written.
+ */
+export class Diagnostics {
+  constructor(options = {}) {
+    this.dir = options.dir || process.env.DIAGNOSTICS_DIR || path.join(process.cwd(), '.data', 'diagnostics')
+    this.busy = null
+  }
+
+  filePath(kind, extension) {
+    fs.mkdirSync(this.dir, { recursive: true })
+    const stamp = new Date().toISOString().replace(/[:.]/g, '-')
+    return path.join(this.dir, `${kind}-${process.pid}-${stamp}.${extension}`)
+  }
+
+  /**
+   * Run one capture, or resolve to null when another is in progress
+   */
+  async exclusive(kind, capture) {
+    if (this.busy) return null
+    this.busy = kind
+    try {
+      return await capture()
+    } finally {
+      this.busy = null
+    }
+  }
+
+  /**
+   * Sample the CPU for durationMs; resolves to { file, bytes, durationMs } or null if busy
+   */
+  captureCpuProfile(durationMs = DEFAULT_PROFILE_MS) {
+    const duration = Math.min(Math.max(Number(durationMs) || DEFAULT_PROFILE_MS, 100), MAX_PROFILE_MS)
+
+    return this.exclusive('cpu-profile', async () => {
+      const session = new inspector.Session()
+      session.connect()
+      const post = (method, params) => new Promise((resolve, reject) => {
+        session.post(method, params, (error, result) => (error ? reject(error) : resolve(result)))
+      })
+
+      try {
+        await post('Profiler.enable')
+        await post('Profiler.start')
+        await new Promise(resolve => setTimeout(resolve, duration))
+        const { profile } = await post('Profiler.stop')
+
+        const file = this.filePath('cpu', 'cpuprofile')
+        const body = JSON.stringify(profile)
+        await fs.promises.writeFile(file, body)
+        console.log(`🩺 CPU profile (${duration}ms) written to ${file}`)
+        return { file, bytes: Buffer.byteLength(body), durationMs: duration }
+      } finally {
+        await post('Profiler.disable').catch(() => {})
+        session.disconnect()
+      }
+    })
+  }
+
+  /**
+   * Write a heap snapshot; resolves to { file, bytes, durationMs } or null if busy
+   */
+  captureHeapSnapshot() {
+    return this.exclusive('heap-snapshot', async () => {
+      const startedAt = Date.now()
+      const file = v8.writeHeapSnapshot(this.filePath('heap', 'heapsnapshot'))
+      const durationMs = Date.now() - startedAt
+      console.log(`🩺 Heap snapshot written to ${file} in ${durationMs}ms`)
+      return { file, bytes: fs.statSync(file).size, durationMs }
+    })
+  }
+}
+
+// One capture at a time per process, shared across route bundles
+if (!globalThis.__trxDiagnostics) {
+  globalThis.__trxDiagnostics = new Diagnostics()
+}
+
+const diagnostics = globalThis.__trxDiagnostics
+
+export default diagnostics
@@ -1,4 +1,57 @@
 import { supabase } from './supabase'
+import auditLog from './audit-log'
+import logger from './logger'
+import trongridClient, { TrongridError } from './trongrid-client'
+import { findDeposit } from './deposit-ingester'
+import { PENDING_CLAIM_TIMEOUT_SECONDS } from './verification-retention'
+import { validateTransactionData, validateDeposit, receiveAddressHex } from './trx-transaction-validator'
+
+// Time windows accepted by getVerificationStats
+export const VERIFICATION_STATS_WINDOWS = {
+  '1h': 60 * 60 * 1000,
+  '24h': 24 * 60 * 60 * 1000,
+  '7d': 7 * 24 * 60 * 60 * 1000
+}
+
+/**
+ * Get verification statistics, aggregated in the database.
+ * Pass a time window ('1h', '24h', '7d') to restrict to recent verifications.
+ * Reads the audit tables directly, so it answers whichever verifier is configured.
+ */
+export async function getVerificationStats(timeWindow = null) {
+  try {
+    let since = null
+    if (timeWindow) {
+      const windowMs = VERIFICATION_STATS_WINDOWS[timeWindow]
+      if (!windowMs) {
+        throw new Error(`Unsupported stats window: ${timeWindow}`)
+      }
+      since = new Date(Date.now() - windowMs).toISOString()
+    }
+
+    const { data, error } = await supabase.rpc('get_verification_stats', { since })
+
+    if (error) throw error
+
+    const stats = data.reduce((acc, row) => {
+      acc[row.verification_status] = Number(row.total)
+      return acc
+    }, {})
+    const total = Object.values(stats).reduce((sum, count) => sum + count, 0)
+
+    return {
+      window: timeWindow || 'all',
+      total,
+      verified: stats.verified || 0,
+      failed: stats.failed || 0,
+      pending: stats.pending || 0,
+      success_rate: total > 0 ? ((stats.verified || 0) / total * 100).toFixed(2) : 0
+    }
+  } catch (error) {
+    console.error('Failed to get verification stats:', error)
+    return null
+  }
+}
 
 /**
  * Enhanced TRX Transaction Verification Service
@@ -6,16 +59,27 @@ import { supabase } from './supabase'
  */
 export class EnhancedTRXVerifier {
   constructor() {
-    this.trongridApiKey = process.env.TRONGRID_API_KEY
-    this.baseUrl = 'https://api.trongrid.io'
-    this.maxRetries = 3
-    this.retryDelay = 1000 // 1 second
+    // Pooled keep-alive client with deadlines, backoff and a circuit breaker
+    this.trongrid = trongridClient
+
+    // With the deposit ingester running, answer from trx_deposits first
+    this.useDeposits = process.env.TRX_VERIFICATION_SOURCE === 'deposits'
+
+    // Convert the configured receive address once; validation compares raw hex
+    if (process.env.TRX_RECEIVE_ADDRESS) {
+      receiveAddressHex(process.env.TRX_RECEIVE_ADDRESS)
+    }
   }
 
   /**
    * Verify TRX transaction with comprehensive validation
    */
   async verifyTransaction(transactionHash, expectedAmount, expectedToAddress, userId = null) {
+    // Hex hashes are case-insensitive; claims, audit rows and lookups all use lowercase
+    if (typeof transactionHash === 'string') {
+      transactionHash = transactionHash.toLowerCase()
+    }
+
     try {
       // Input validation
       const validation = this.validateInput(transactionHash, expectedAmount, expectedToAddress)
@@ -23,10 +87,10 @@ export class EnhancedTRXVerifier {
         return validation
       }
 
-      // Check if transaction hash is already used (security measure)
-      const duplicateCheck = await this.checkTransactionDuplicate(transactionHash)
-      if (!duplicateCheck.valid) {
-        return duplicateCheck
+      // Claim the hash up front so concurrent purchases can't both spend it (security measure)
+      const claim = await this.claimTransactionHash(transactionHash, userId)
+      if (!claim.valid) {
+        return claim
       }
 
       // Log verification attempt
@@ -42,9 +106,16 @@ export class EnhancedTRXVerifier {
       // Log final result
       await this.logVerificationResult(transactionHash, verificationResult)
 
+      // A transaction that failed verification stays spendable; a retryable
+      // failure keeps the claim for this user's retry
+      if (!verificationResult.valid && !verificationResult.retryable) {
+        await this.releaseTransactionHash(transactionHash, userId)
+      }
+
       return verificationResult
     } catch (error) {
       console.error('TRX Verification Error:', error)
+      await this.releaseTransactionHash(transactionHash, userId)
       await this.logVerificationResult(transactionHash, {
         valid: false,
         error: 'Verification service error',
@@ -89,305 +160,169 @@ export class EnhancedTRXVerifier {
   }
 
   /**
-   * Check if transaction hash is already used in the system
+   * Claim the hash in consumed_transaction_hashes for this purchase (one primary
+   * key probe); a hash already bound to a node or withdrawal is rejected, and a
+   * pending claim older than PENDING_CLAIM_TIMEOUT_SECONDS is taken over
    */
-  async checkTransactionDuplicate(transactionHash) {
-    try {
-      // Check in user_nodes table
-      const { data: existingNode } = await supabase
-        .from('user_nodes')
-        .select('id, user_id, created_at')
-        .eq('transaction_hash', transactionHash)
-        .single()
-
-      if (existingNode) {
-        return {
-          valid: false,
-          error: 'Transaction hash already used',
-          details: `Already used in node purchase on ${new Date(existingNode.created_at).toLocaleString()}`
-        }
-      }
-
-      // Check in withdrawals table
-      const { data: existingWithdrawal } = await supabase
-        .from('withdrawals')
-        .select('id, user_id, created_at')
-        .eq('transaction_hash', transactionHash)
-        .single()
-
-      if (existingWithdrawal) {
-        return {
-          valid: false,
-          error: 'Transaction hash already used in withdrawals',
-          details: `Already used in withdrawal on ${new Date(existingWithdrawal.created_at).toLocaleString()}`
-        }
-      }
+  async claimTransactionHash(transactionHash, userId) {
+    const { data, error } = await supabase
+      .rpc('claim_transaction_hash', {
+        p_transaction_hash: transactionHash,
+        p_user_id: userId,
+        p_claim_timeout_seconds: PENDING_CLAIM_TIMEOUT_SECONDS
+      })
+      .single()
 
+    if (error) throw error
+    if (data.claimed) {
       return { valid: true }
-    } catch (error) {
-      // If no records found, that's good (single() throws when no data)
-      if (error.code === 'PGRST116') {
-        return { valid: true }
-      }
-      throw error
     }
-  }
 
-  /**
-   * Perform actual blockchain verification with Trongrid API
-   */
-  async performBlockchainVerification(transactionHash, expectedAmount, expectedToAddress) {
-    let lastError = null
-    
-    for (let attempt = 1; attempt <= this.maxRetries; attempt++) {
-      try {
-        const result = await this.callTrongridAPI(transactionHash, expectedAmount, expectedToAddress)
-        
-        if (result.valid) {
-          await this.updateVerificationAttempts(transactionHash, attempt, 'verified')
-          return result
-        } else {
-          lastError = result
-          await this.updateVerificationAttempts(transactionHash, attempt, 'failed', result.error)
-          
-          // If it's a definitive failure (not a network issue), don't retry
-          if (this.isDefinitiveFailure(result.error)) {
-            break
-          }
-        }
-      } catch (error) {
-        lastError = { valid: false, error: 'Network error', details: error.message }
-        await this.updateVerificationAttempts(transactionHash, attempt, 'failed', error.message)
-        
-        if (attempt < this.maxRetries) {
-          await this.delay(this.retryDelay * attempt) // Exponential backoff
-        }
+    const usedAt = new Date(data.consumed_at).toLocaleString()
+    if (data.source === 'withdrawal') {
+      return {
+        valid: false,
+        error: 'Transaction hash already used in withdrawals',
+        details: `Already used in withdrawal on ${usedAt}`
       }
     }
-
-    return lastError || { valid: false, error: 'Verification failed after all retries' }
+    return {
+      valid: false,
+      error: 'Transaction hash already used',
+      details: data.source === 'pending'
+        ? 'Another purchase is verifying this transaction'
+        : `Already used in node purchase on ${usedAt}`
+    }
   }
 
   /**
-   * Call Trongrid API to verify transaction
+   * Give back a pending claim when the purchase it was made for won't happen
    */
-  async callTrongridAPI(transactionHash, expectedAmount, expectedToAddress) {
-    const url = `${this.baseUrl}/v1/transactions/${transactionHash}`
-    const headers = {
-      'TRON-PRO-API-KEY': this.trongridApiKey,
-      'Content-Type': 'application/json'
-    }
-
-    const response = await fetch(url, { headers })
-    
-    if (!response.ok) {
-      if (response.status === 404) {
-        return { valid: false, error: 'Transaction not found on blockchain' }
-      }
-      throw new Error(`Trongrid API error: ${response.status} ${response.statusText}`)
+  async releaseTransactionHash(transactionHash, userId) {
+    const { error } = await supabase.rpc('release_transaction_hash', {
+      p_transaction_hash: transactionHash.toLowerCase(),
+      p_user_id: userId
+    })
+
+    if (error) {
+      console.error(`Failed to release transaction hash ${transactionHash}:`, error.message)
     }
-
-    const data = await response.json()
-    return this.validateTransactionData(data, expectedAmount, expectedToAddress)
   }
 
   /**
-   * Validate transaction data from Trongrid API response
+   * Perform actual blockchain verification with Trongrid API
+   * Transport retries happen in the Trongrid client; every failed attempt is audited.
    */
-  validateTransactionData(data, expectedAmount, expectedToAddress) {
-    try {
-      // Check if transaction exists and is successful
-      if (!data.ret || data.ret.length === 0) {
-        return { valid: false, error: 'Transaction not found or invalid' }
-      }
-
-      const transactionResult = data.ret[0]
-      if (transactionResult.contractRet !== 'SUCCESS') {
-        return { 
-          valid: false, 
-          error: `Transaction failed with status: ${transactionResult.contractRet}`,
-          details: transactionResult.message || 'No additional details'
-        }
-      }
-
-      // Validate transaction type and contract details
-      const contract = data.raw_data?.contract?.[0]
-      if (!contract) {
-        return { valid: false, error: 'No contract data found in transaction' }
-      }
-
-      if (contract.type !== 'TransferContract') {
-        return { 
-          valid: false, 
-          error: `Invalid transaction type: ${contract.type}. Expected: TransferContract` 
-        }
-      }
-
-      const transferData = contract.parameter.value
-      if (!transferData) {
-        return { valid: false, error: 'No transfer data found in contract' }
-      }
-
-      // Validate amount (TRON uses SUN as the smallest unit, 1 TRX = 1,000,000 SUN)
-      const actualAmountSun = transferData.amount
-      const expectedAmountSun = expectedAmount * 1000000
-      
-      if (actualAmountSun !== expectedAmountSun) {
-        return {
-          valid: false,
-          error: `Amount mismatch. Expected: ${expectedAmount} TRX, Got: ${actualAmountSun / 1000000} TRX`
-        }
+  async performBlockchainVerification(transactionHash, expectedAmount, expectedToAddress) {
+    if (this.useDeposits) {
+      // Ingested deposits answer with one primary key lookup; a miss (not ingested
+      // yet) falls through to asking Trongrid for the hash
+      const deposit = await findDeposit(transactionHash)
+      if (deposit) {
+        const result = validateDeposit(deposit, expectedAmount, expectedToAddress)
+        await this.updateVerificationAttempts(
+          transactionHash,
+          1,
+          result.valid ? 'verified' : 'failed',
+          result.valid ? null : result.error
+        )
+        return result
       }
+    }
 
-      // Validate recipient address
-      const toAddressHex = transferData.to_address
-      if (!toAddressHex) {
-        return { valid: false, error: 'No recipient address found in transaction' }
-      }
+    let attempts = 1
 
-      // Convert hex address to base58
-      const TronWeb = require('tronweb')
-      const toAddressBase58 = TronWeb.address.fromHex(toAddressHex)
-      
-      if (toAddressBase58 !== expectedToAddress) {
-        return {
-          valid: false,
-          error: `Recipient address mismatch. Expected: ${expectedToAddress}, Got: ${toAddressBase58}`
+    try {
+      const data = await this.trongrid.getTransaction(transactionHash, {
+        onRetry: (attempt, error) => {
+          attempts = attempt + 1
+          return this.updateVerificationAttempts(transactionHash, attempt, 'failed', error.message)
         }
-      }
+      })
 
-      // Get transaction timestamp
-      const blockTimestamp = data.block_timestamp || Date.now()
-      const transactionTime = new Date(blockTimestamp)
-
-      // Additional security: Check if transaction is too old (e.g., older than 24 hours)
-      const maxAge = 24 * 60 * 60 * 1000 // 24 hours in milliseconds
-      if (Date.now() - transactionTime.getTime() > maxAge) {
-        return {
-          valid: false,
-          error: 'Transaction is too old (older than 24 hours)',
-          details: `Transaction timestamp: ${transactionTime.toISOString()}`
-        }
-      }
+      const result = data
+        ? this.validateTransactionData(data, expectedAmount, expectedToAddress)
+        : { valid: false, error: 'Transaction not found on blockchain' }
 
-      // All validations passed
-      return {
-        valid: true,
-        transactionHash: data.txID,
-        amount: actualAmountSun / 1000000,
-        fromAddress: TronWeb.address.fromHex(transferData.owner_address),
-        toAddress: toAddressBase58,
-        blockNumber: data.blockNumber,
-        blockTimestamp: transactionTime.toISOString(),
-        energyUsed: data.receipt?.energy_usage || 0,
-        bandwidth: data.receipt?.net_usage || 0,
-        fee: (data.receipt?.energy_fee || 0) / 1000000, // Convert from SUN to TRX
-        confirmations: data.confirmations || 0
-      }
+      await this.updateVerificationAttempts(
+        transactionHash,
+        attempts,
+        result.valid ? 'verified' : 'failed',
+        result.valid ? null : result.error
+      )
+      return result
     } catch (error) {
+      if (!(error instanceof TrongridError)) throw error
+
+      await this.updateVerificationAttempts(transactionHash, attempts, 'failed', error.message)
       return {
         valid: false,
-        error: 'Failed to parse transaction data',
-        details: error.message
+        error: 'Trongrid unavailable, please retry shortly',
+        details: error.message,
+        retryable: error.retryable,
+        retryAfterMs: error.retryAfterMs
       }
     }
   }
 
   /**
-   * Log verification attempt to database
+   * Validate transaction data from Trongrid API response
    */
-  async logVerificationAttempt(transactionHash, status) {
-    try {
-      await supabase
-        .from('transaction_verifications')
-        .insert({
-          transaction_hash: transactionHash,
-          verification_status: status,
-          verification_attempts: 1,
-          first_attempt_at: new Date().toISOString(),
-          last_attempt_at: new Date().toISOString()
-        })
-    } catch (error) {
-      console.error('Failed to log verification attempt:', error)
-    }
+  validateTransactionData(data, expectedAmount, expectedToAddress) {
+    return validateTransactionData(data, expectedAmount, expectedToAddress)
   }
 
   /**
-   * Update verification attempts count
+   * Log verification attempt to the audit log (buffered, see lib/audit-log.js)
    */
-  async updateVerificationAttempts(transactionHash, attempts, status, errorMessage = null) {
-    try {
-      const updateData = {
-        verification_attempts: attempts,
-        last_attempt_at: new Date().toISOString(),
-        verification_status: status
-      }
-
-      if (status === 'verified') {
-        updateData.verified_at = new Date().toISOString()
-      }
-
-      if (errorMessage) {
-        updateData.error_message = errorMessage
-      }
-
-      await supabase
-        .from('transaction_verifications')
-        .update(updateData)
-        .eq('transaction_hash', transactionHash)
-    } catch (error) {
-      console.error('Failed to update verification attempts:', error)
-    }
+  logVerificationAttempt(transactionHash, status) {
+    const now = new Date().toISOString()
+    return auditLog.begin(transactionHash, {
+      verification_status: status,
+      verification_attempts: 1,
+      first_attempt_at: now,
+      last_attempt_at: now
+    })
   }
 
   /**
-   * Log final verification result
+   * Update verification attempts count
    */
-  async logVerificationResult(transactionHash, result) {
-    try {
-      const updateData = {
-        verification_status: result.valid ? 'verified' : 'failed',
-        last_attempt_at: new Date().toISOString()
-      }
+  updateVerificationAttempts(transactionHash, attempts, status, errorMessage = null) {
+    const updateData = {
+      verification_attempts: attempts,
+      last_attempt_at: new Date().toISOString(),
+      verification_status: status
+    }
 
-      if (result.valid) {
-        updateData.verified_at = new Date().toISOString()
-        updateData.trongrid_response = result
-      } else {
-        updateData.error_message = result.error
-      }
+    if (status === 'verified') {
+      updateData.verified_at = new Date().toISOString()
+    }
 
-      await supabase
-        .from('transaction_verifications')
-        .update(updateData)
-        .eq('transaction_hash', transactionHash)
-    } catch (error) {
-      console.error('Failed to log verification result:', error)
+    if (errorMessage) {
+      updateData.error_message = errorMessage
     }
-  }
 
-  /**
-   * Check if error is definitive (no point in retrying)
-   */
-  isDefinitiveFailure(error) {
-    const definitiveErrors = [
-      'Transaction not found',
-      'Transaction failed',
-      'Amount mismatch',
-      'Recipient address mismatch',
-      'Invalid transaction type',
-      'Transaction hash already used',
-      'Transaction is too old'
-    ]
-    
-    return definitiveErrors.some(defError => error.includes(defError))
+    return auditLog.update(transactionHash, updateData)
   }
 
   /**
-   * Delay utility for retries
+   * Log final verification result
    */
-  delay(ms) {
-    return new Promise(resolve => setTimeout(resolve, ms))
+  logVerificationResult(transactionHash, result) {
+    const updateData = {
+      verification_status: result.valid ? 'verified' : 'failed',
+      last_attempt_at: new Date().toISOString()
+    }
+
+    if (result.valid) {
+      updateData.verified_at = new Date().toISOString()
+      updateData.trongrid_response = result
+    } else {
+      updateData.error_message = result.error
+    }
+
+    return auditLog.finish(transactionHash, updateData)
   }
 
   /**
@@ -402,7 +337,11 @@ export class EnhancedTRXVerifier {
         .order('created_at', { ascending: false })
 
       if (error) throw error
-      return data
+
+      // Audit rows that haven't been flushed yet are newer than what's stored
+      const pending = auditLog.pendingFor(transactionHash)
+      const pendingIds = new Set(pending.map(row => row.id))
+      return [...pending, ...data.filter(row => !pendingIds.has(row.id))]
     } catch (error) {
       console.error('Failed to get verification history:', error)
       return []
@@ -410,33 +349,35 @@ export class EnhancedTRXVerifier {
   }
 
   /**
-   * Get verification statistics
+   * Get verification statistics (see the module-level getVerificationStats)
    */
-  async getVerificationStats() {
-    try {
-      const { data, error } = await supabase
-        .from('transaction_verifications')
-        .select('verification_status')
-
-      if (error) throw error
-
-      const stats = data.reduce((acc, record) => {
-        acc[record.verification_status] = (acc[record.verification_status] || 0) + 1
-        return acc
-      }, {})
+  getVerificationStats(timeWindow = null) {
+    return getVerificationStats(timeWindow)
+  }
+}
 
-      return {
-        total: data.length,
-        verified: stats.verified || 0,
-        failed: stats.failed || 0,
-        pending: stats.pending || 0,
-        success_rate: data.length > 0 ? ((stats.verified || 0) / data.length * 100).toFixed(2) : 0
-      }
-    } catch (error) {
-      console.error('Failed to get verification stats:', error)
-      return null
+// Default verifier: rejects every transaction, so nothing is credited without Trongrid
+const mockVerifier = {
+  verifyTransaction: async (hash, amount, address, userId) => {
+    logger.debug('Mock TRX verification', { route: '/nodes/purchase', transactionHash: hash })
+    return {
+      valid: false,
+      error: 'Transaction not found on blockchain (mock verification)',
+      details: 'This is a mock verification for testing purposes'
     }
   }
 }
 
-export default EnhancedTRXVerifier
\ No newline at end of file
+/**
+ * The verifier selected by TRX_VERIFIER, built on first use and shared across
+ * route bundles: 'enhanced' verifies against Trongrid (TRONGRID_API_URL can
+ * point at a local stand-in), anything else gets the mock
+ */
+export function getTrxVerifier() {
+  if (!globalThis.__trxVerifier) {
+    globalThis.__trxVerifier = process.env.TRX_VERIFIER === 'enhanced' ? new EnhancedTRXVerifier() : mockVerifier
+  }
+  return globalThis.__trxVerifier
+}
+
+export default EnhancedTRXVerifier
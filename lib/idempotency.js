@@ -0,0 +1,145 @@
+import crypto from 'crypto'
+import { NextResponse } from 'next/server'
+import { idempotencyRequestsTotal } from './metrics'
+
+/**
+ * Idempotency-Key support for mutating POST endpoints
+ * The first response for a key is kept for a TTL and replayed to retries
+ * without running the handler again; a retry that arrives while the original
+ * is still running waits for it and gets the same response. Keys are scoped
+ * to the endpoint, and reusing a key with a different body is rejected.
+ * Responses that invite a retry (5xx, 429) are not kept, so retrying with the
+ * same key runs the handler again once the original has finished.
+ */
+
+const KEY_PATTERN = /^[\x21-\x7e]{1,255}$/
+
+export class IdempotencyStore {
+  constructor(options = {}) {
+    this.ttlMs = options.ttlMs || Number(process.env.IDEMPOTENCY_TTL_MS) || 24 * 60 * 60 * 1000
+    this.maxEntries = options.maxEntries || Number(process.env.IDEMPOTENCY_MAX_ENTRIES) || 10000
+
+    // scope:key -> { fingerprint, snapshot, expiresAt }, oldest first
+    this.completed = new Map()
+    // scope:key -> { fingerprint, promise }
+    this.inFlight = new Map()
+  }
+
+  /**
+   * Run `handler` once per (scope, key); resolves to a Response for every caller
+   */
+  async execute({ key, scope, body }, handler) {
+    if (!KEY_PATTERN.test(key)) {
+      idempotencyRequestsTotal.inc({ scope, outcome: 'invalid' })
+      return NextResponse.json({ error: 'Invalid Idempotency-Key header' }, { status: 400 })
+    }
+
+    const storeKey = `${scope}:${key}`
+    const fingerprint = crypto.createHash('sha256').update(JSON.stringify(body ?? null)).digest('hex')
+
+    const stored = this.lookup(storeKey)
+    if (stored) {
+      return this.replay(stored, fingerprint, scope, 'replayed')
+    }
+
+    const pending = this.inFlight.get(storeKey)
+    if (pending) {
+      await pending.promise.catch(() => {})
+      return this.replay(pending, fingerprint, scope, 'joined')
+    }
+
+    const entry = { fingerprint, snapshot: null, promise: null }
+    entry.promise = (async () => {
+      try {
+        entry.snapshot = await snapshotResponse(await handler())
+        if (entry.snapshot.status < 500 && entry.snapshot.status !== 429) {
+          this.remember(storeKey, entry)
+        }
+      } finally {
+        this.inFlight.delete(storeKey)
+      }
+    })()
+    this.inFlight.set(storeKey, entry)
+
+    await entry.promise
+    idempotencyRequestsTotal.inc({ scope, outcome: 'executed' })
+    return buildResponse(entry.snapshot)
+  }
+
+  lookup(storeKey) {
+    const stored = this.completed.get(storeKey)
+    if (stored && stored.expiresAt <= Date.now()) {
+      this.completed.delete(storeKey)
+      return null
+    }
+    return stored
+  }
+
+  remember(storeKey, entry) {
+    this.completed.set(storeKey, {
+      fingerprint: entry.fingerprint,
+      snapshot: entry.snapshot,
+      expiresAt: Date.now() + this.ttlMs
+    })
+    this.evict()
+  }
+
+  /**
+   * Drop expired entries from the front, then the oldest ones over the cap
+   */
+  evict() {
+    const now = Date.now()
+    for (const [storeKey, stored] of this.completed) {
+      if (stored.expiresAt > now && this.completed.size <= this.maxEntries) break
+      this.completed.delete(storeKey)
+    }
+  }
+
+  replay(entry, fingerprint, scope, outcome) {
+    if (entry.fingerprint !== fingerprint) {
+      idempotencyRequestsTotal.inc({ scope, outcome: 'mismatch' })
+      return NextResponse.json({
+        error: 'Idempotency-Key was already used with a different request body'
+      }, { status: 422 })
+    }
+
+    if (!entry.snapshot) {
+      // The original request crashed before producing a response
+      idempotencyRequestsTotal.inc({ scope, outcome: 'failed' })
+      return NextResponse.json({ error: 'Internal server error' }, { status: 500 })
+    }
+
+    idempotencyRequestsTotal.inc({ scope, outcome })
+    const response = buildResponse(entry.snapshot)
+    response.headers.set('Idempotent-Replayed', 'true')
+    return response
+  }
+
+  clear() {
+    this.completed.clear()
+  }
+}
+
+async function snapshotResponse(response) {
+  return {
+    status: response.status,
+    headers: [...response.headers.entries()],
+    body: await response.text()
+  }
+}
+
+function buildResponse(snapshot) {
+  return new NextResponse(snapshot.body, {
+    status: snapshot.status,
+    headers: snapshot.headers
+  })
+}
+
+// One store per process, shared across route bundles
+if (!globalThis.__trxIdempotencyStore) {
+  globalThis.__trxIdempotencyStore = new IdempotencyStore()
+}
+
+const idempotencyStore = globalThis.__trxIdempotencyStore
+
+export default idempotencyStore
@@ -0,0 +1,168 @@
+import fs from 'fs'
+import path from 'path'
+import { logEntriesTotal, logEntriesDroppedTotal } from './metrics'
+
+export const LOG_LEVELS = { debug: 10, info: 20, warn: 30, error: 40 }
+
+/**
+ * Per-route sampling rates from LOG_SAMPLE_RATES, e.g. "/nodes=0,/user/nodes=0.1,*=1"
+ */
+export function parseSampleRates(spec) {
+  const rates = new Map()
+  for (const part of (spec || '').split(',')) {
+    const [route, rate] = part.split('=').map(value => value && value.trim())
+    if (route && rate !== undefined && !Number.isNaN(Number(rate))) {
+      rates.set(route, Math.min(1, Math.max(0, Number(rate))))
+    }
+  }
+  return rates
+}
+
+/**
+ * Structured logger for the request hot paths
+ * Entries below LOG_LEVEL cost one comparison. Debug and info entries tagged
+ * with a route are sampled at that route's rate; warnings and errors are always
+ * kept. Entries become JSON lines in a queue that is written in batches, on a
+ * size or time trigger, to LOG_FILE (or stdout) without waiting on the write.
+ * The last ringSize entries stay in memory for inspection, and a queue that
+ * outgrows maxQueuedLines drops its oldest lines rather than the process memory.
+ */
+export class Logger {
+  constructor(options = {}) {
+    this.level = LOG_LEVELS[options.level || process.env.LOG_LEVEL] || LOG_LEVELS.info
+    this.sampleRates = options.sampleRates || parseSampleRates(process.env.LOG_SAMPLE_RATES)
+    this.defaultRate = this.sampleRates.has('*') ? this.sampleRates.get('*') : 1
+    this.filePath = options.filePath === undefined ? process.env.LOG_FILE : options.filePath
+    this.batchSize = options.batchSize || Number(process.env.LOG_BATCH_SIZE) || 500
+    this.flushIntervalMs = options.flushIntervalMs || Number(process.env.LOG_FLUSH_MS) || 200
+    this.maxQueuedLines = options.maxQueuedLines || 20000
+    this.ringSize = options.ringSize || Number(process.env.LOG_RING_SIZE) || 1000
+
+    this.ring = new Array(this.ringSize)
+    this.ringNext = 0
+    this.queue = []
+    this.stream = null
+    this.writing = false
+    this.flushTimer = null
+
+    // Whatever is still queued when the process goes away is written synchronously
+    process.once('exit', () => this.flushSync())
+  }
+
+  enabled(level) {
+    return LOG_LEVELS[level] >= this.level
+  }
+
+  /**
+   * Whether an entry for this route survives sampling
+   */
+  sampled(route) {
+    const rate = route !== undefined && this.sampleRates.has(route) ? this.sampleRates.get(route) : this.defaultRate
+    return rate >= 1 || (rate > 0 && Math.random() < rate)
+  }
+
+  debug(msg, fields) {
+    this.log('debug', msg, fields)
+  }
+
+  info(msg, fields) {
+    this.log('info', msg, fields)
+  }
+
+  warn(msg, fields) {
+    this.log('warn', msg, fields)
+  }
+
+  error(msg, fields) {
+    this.log('error', msg, fields)
+  }
+
+  log(level, msg, fields) {
+    if (LOG_LEVELS[level] < this.level) return
+    if (LOG_LEVELS[level] < LOG_LEVELS.warn && !this.sampled(fields?.route)) return
+
+    const entry = { time: new Date().toISOString(), level, msg, ...fields }
+    this.ring[this.ringNext] = entry
+    this.ringNext = (this.ringNext + 1) % this.ringSize
+    logEntriesTotal.inc({ level })
+
+    this.queue.push(JSON.stringify(entry))
+    if (this.queue.length > this.maxQueuedLines) {
+      const dropped = this.queue.length - this.maxQueuedLines
+      this.queue.splice(0, dropped)
+      logEntriesDroppedTotal.inc({}, dropped)
+    }
+
+    if (this.queue.length >= this.batchSize) {
+      this.flush()
+    } else if (!this.flushTimer) {
+      this.flushTimer = setTimeout(() => this.flush(), this.flushIntervalMs)
+      this.flushTimer.unref?.()
+    }
+  }
+
+  /**
+   * The most recent entries, oldest first
+   */
+  recent(limit = this.ringSize) {
+    const ordered = [...this.ring.slice(this.ringNext), ...this.ring.slice(0, this.ringNext)].filter(Boolean)
+    return ordered.slice(-limit)
+  }
+
+  sink() {
+    if (!this.stream) {
+      if (this.filePath) {
+        fs.mkdirSync(path.dirname(this.filePath), { recursive: true })
+        this.stream = fs.createWriteStream(this.filePath, { flags: 'a' })
+        this.stream.on('error', error => console.error('Log sink error:', error.message))
+      } else {
+        this.stream = process.stdout
+      }
+    }
+    return this.stream
+  }
+
+  /**
+   * Hand the queued lines to the sink as one write; the next batch waits for a drain
+   */
+  flush() {
+    clearTimeout(this.flushTimer)
+    this.flushTimer = null
+    if (this.writing || this.queue.length === 0) return
+
+    const batch = this.queue
+    this.queue = []
+    const stream = this.sink()
+    if (!stream.write(`${batch.join('\n')}\n`)) {
+      this.writing = true
+      stream.once('drain', () => {
+        this.writing = false
+        if (this.queue.length > 0) this.flush()
+      })
+    }
+  }
+
+  flushSync() {
+    if (this.queue.length === 0) return
+    const lines = `${this.queue.join('\n')}\n`
+    this.queue = []
+    try {
+      if (this.filePath) {
+        fs.appendFileSync(this.filePath, lines)
+      } else {
+        fs.writeSync(1, lines)
+      }
+    } catch {
+      // Nothing left to report to at exit
+    }
+  }
+}
+
+// One logger (and sink) per process, shared across route bundles
+if (!globalThis.__trxLogger) {
+  globalThis.__trxLogger = new Logger()
+}
+
+const logger = globalThis.__trxLogger
+
+export default logger
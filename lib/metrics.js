@@ -0,0 +1,313 @@
+/**
+ * In-process metrics registry for the TRX mining platform
+ * Collects counters and latency histograms and renders them in Prometheus text format
+ */
+
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+function labelKey(labels) {
+  return Object.keys(labels).sort().map(name => `${name}=${labels[name]}`).join(',')
+}
+
+function formatLabels(labels, extra = {}) {
+  const all = { ...labels, ...extra }
+  const names = Object.keys(all)
+  if (names.length === 0) return ''
+
+  const pairs = names.map(name => {
+    const value = String(all[name]).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"')
+    return `${name}="${value}"`
+  })
+  return `{${pairs.join(',')}}`
+}
+
+class Counter {
+  constructor(name, help) {
+    this.name = name
+    this.help = help
+    this.type = 'counter'
+    this.values = new Map()
+  }
+
+  inc(labels = {}, value = 1) {
+    const key = labelKey(labels)
+    const entry = this.values.get(key)
+    if (entry) {
+      entry.value += value
+    } else {
+      this.values.set(key, { labels, value })
+    }
+  }
+
+  render() {
+    const lines = []
+    for (const { labels, value } of this.values.values()) {
+      lines.push(`${this.name}${formatLabels(labels)} ${value}`)
+    }
+    return lines
+  }
+}
+
+class Gauge {
+  constructor(name, help) {
+    this.name = name
+    this.help = help
+    this.type = 'gauge'
+    this.values = new Map()
+  }
+
+  set(labels = {}, value) {
+    this.values.set(labelKey(labels), { labels, value })
+  }
+
+  render() {
+    const lines = []
+    for (const { labels, value } of this.values.values()) {
+      lines.push(`${this.name}${formatLabels(labels)} ${value}`)
+    }
+    return lines
+  }
+}
+
+class Histogram {
+  constructor(name, help, buckets = DEFAULT_BUCKETS) {
+    this.name = name
+    this.help = help
+    this.type = 'histogram'
+    this.buckets = buckets
+    this.values = new Map()
+  }
+
+  observe(labels = {}, value) {
+    const key = labelKey(labels)
+    let entry = this.values.get(key)
+    if (!entry) {
+      entry = { labels, counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 }
+      this.values.set(key, entry)
+    }
+
+    for (let i = 0; i < this.buckets.length; i++) {
+      if (value <= this.buckets[i]) {
+        entry.counts[i]++
+      }
+    }
+    entry.sum += value
+    entry.count++
+  }
+
+  /**
+   * Start a timer; calling the returned function records the elapsed seconds
+   */
+  startTimer(labels = {}) {
+    const start = process.hrtime.bigint()
+    return (extraLabels = {}) => {
+      const seconds = Number(process.hrtime.bigint() - start) / 1e9
+      this.observe({ ...labels, ...extraLabels }, seconds)
+      return seconds
+    }
+  }
+
+  render() {
+    const lines = []
+    for (const { labels, counts, sum, count } of this.values.values()) {
+      for (let i = 0; i < this.buckets.length; i++) {
+        lines.push(`${this.name}_bucket${formatLabels(labels, { le: this.buckets[i] })} ${counts[i]}`)
+      }
+      lines.push(`${this.name}_bucket${formatLabels(labels, { le: '+Inf' })} ${count}`)
+      lines.push(`${this.name}_sum${formatLabels(labels)} ${sum}`)
+      lines.push(`${this.name}_count${formatLabels(labels)} ${count}`)
+    }
+    return lines
+  }
+}
+
+export class MetricsRegistry {
+  constructor() {
+    this.metrics = new Map()
+  }
+
+  /**
+   * Get or create a counter
+   */
+  counter(name, help) {
+    if (!this.metrics.has(name)) {
+      this.metrics.set(name, new Counter(name, help))
+    }
+    return this.metrics.get(name)
+  }
+
+  /**
+   * Get or create a gauge
+   */
+  gauge(name, help) {
+    if (!this.metrics.has(name)) {
+      this.metrics.set(name, new Gauge(name, help))
+    }
+    return this.metrics.get(name)
+  }
+
+  /**
+   * Get or create a histogram
+   */
+  histogram(name, help, buckets) {
+    if (!this.metrics.has(name)) {
+      this.metrics.set(name, new Histogram(name, help, buckets))
+    }
+    return this.metrics.get(name)
+  }
+
+  /**
+   * Render all metrics in Prometheus text exposition format
+   */
+  render() {
+    const lines = []
+    for (const metric of this.metrics.values()) {
+      lines.push(`# HELP ${metric.name} ${metric.help}`)
+      lines.push(`# TYPE ${metric.name} ${metric.type}`)
+      lines.push(...metric.render())
+    }
+    return lines.join('\n') + '\n'
+  }
+}
+
+// Route handlers are bundled separately by Next.js, so the registry lives on
+// globalThis to keep a single set of counters per process
+if (!globalThis.__trxMetricsRegistry) {
+  globalThis.__trxMetricsRegistry = new MetricsRegistry()
+}
+
+export const metrics = globalThis.__trxMetricsRegistry
+
+export const httpRequestsTotal = metrics.counter(
+  'http_requests_total',
+  'Total API requests by method, route and status'
+)
+
+export const httpRequestDuration = metrics.histogram(
+  'http_request_duration_seconds',
+  'API request latency by method and route'
+)
+
+export const rateLimitRejectionsTotal = metrics.counter(
+  'rate_limit_rejections_total',
+  'Requests rejected by the rate limiter'
+)
+
+export const rateLimiterTrackedIps = metrics.gauge(
+  'rate_limiter_tracked_ips',
+  'IPs held by the rate limiter, by map (counts for the current window, blocked)'
+)
+
+export const trxVerificationsTotal = metrics.counter(
+  'trx_verifications_total',
+  'TRX verifications by result'
+)
+
+export const trxVerificationRetriesTotal = metrics.counter(
+  'trx_verification_retries_total',
+  'Trongrid verification retries after a failed attempt'
+)
+
+export const supabaseRequestDuration = metrics.histogram(
+  'supabase_request_duration_seconds',
+  'Supabase REST call latency by table and method'
+)
+
+export const postgresQueryDuration = metrics.histogram(
+  'postgres_query_duration_seconds',
+  'Direct Postgres statement latency by statement name'
+)
+
+export const auditRowsFlushedTotal = metrics.counter(
+  'audit_log_rows_flushed_total',
+  'Verification audit rows written to the database'
+)
+
+export const auditRowsSpilledTotal = metrics.counter(
+  'audit_log_rows_spilled_total',
+  'Verification audit rows spilled to the local file'
+)
+
+export const auditRowsDroppedTotal = metrics.counter(
+  'audit_log_rows_dropped_total',
+  'Verification audit rows dropped because the spill file was full'
+)
+
+export const auditFlushDuration = metrics.histogram(
+  'audit_log_flush_duration_seconds',
+  'Audit log bulk flush latency by result'
+)
+
+export const trongridRequestDuration = metrics.histogram(
+  'trongrid_request_duration_seconds',
+  'Trongrid API attempt latency by outcome'
+)
+
+export const trongridCircuitTransitionsTotal = metrics.counter(
+  'trongrid_circuit_transitions_total',
+  'Trongrid circuit breaker state changes by new state'
+)
+
+export const depositsIngestedTotal = metrics.counter(
+  'trx_deposits_ingested_total',
+  'New TRX deposits stored by the deposit ingester'
+)
+
+export const depositIngestBatchDuration = metrics.histogram(
+  'trx_deposit_ingest_batch_duration_seconds',
+  'Deposit ingester bulk insert latency by result'
+)
+
+export const purchaseJobsTotal = metrics.counter(
+  'purchase_jobs_total',
+  'Purchase queue job transitions by status'
+)
+
+export const purchaseJobDuration = metrics.histogram(
+  'purchase_job_duration_seconds',
+  'Purchase job processing time by outcome'
+)
+
+export const purchaseJobsInFlight = metrics.gauge(
+  'purchase_jobs_in_flight',
+  'Purchase jobs currently being processed by this process'
+)
+
+export const idempotencyRequestsTotal = metrics.counter(
+  'idempotency_requests_total',
+  'Requests carrying an Idempotency-Key by endpoint and outcome'
+)
+
+export const archivedRowsTotal = metrics.counter(
+  'archived_rows_total',
+  'Rows moved from the hot tables into their archive tables by table'
+)
+
+export const replicaReadsTotal = metrics.counter(
+  'replica_reads_total',
+  'Routed reads by target (replica or primary) and the reason for the choice'
+)
+
+export const replicaLagSeconds = metrics.gauge(
+  'replica_lag_seconds',
+  'Read replica lag as last measured'
+)
+
+export const compressedResponsesTotal = metrics.counter(
+  'compressed_responses_total',
+  'Responses over the compression threshold by encoding sent (br, gzip or identity)'
+)
+
+export const logEntriesTotal = metrics.counter(
+  'log_entries_total',
+  'Log entries kept after level filtering and sampling, by level'
+)
+
+export const logEntriesDroppedTotal = metrics.counter(
+  'log_entries_dropped_total',
+  'Log lines dropped because the write queue was full'
+)
+
+export const PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+export default metrics
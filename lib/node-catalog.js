@@ -0,0 +1,135 @@
+import crypto from 'crypto'
+import { supabase } from './supabase'
+import { MINING_NODES as SEED_NODES } from './database-initializer'
+import { precompress } from './compression'
+
+// How long a loaded catalog is served before the table is read again
+const REFRESH_INTERVAL_MS = Number(process.env.NODE_CATALOG_REFRESH_MS) || 60 * 1000
+
+// Browsers keep the catalog for CATALOG_MAX_AGE and may serve it stale while revalidating
+const CATALOG_MAX_AGE = Number(process.env.NODE_CATALOG_MAX_AGE) || 3600
+export const CATALOG_CACHE_CONTROL = `public, max-age=${CATALOG_MAX_AGE}, stale-while-revalidate=86400`
+
+/**
+ * Mining node catalog backed by the mining_nodes table
+ * The active nodes are read once, serialized once, and served as the same
+ * bytes with a strong ETag (a hash of those bytes) until the next refresh, so
+ * every process serving the same rows hands out the same ETag. The brotli and
+ * gzip encodings of those bytes are made once per load as well.
+ */
+export class NodeCatalog {
+  constructor() {
+    this.current = null
+    this.loadedAt = 0
+    this.loading = null
+  }
+
+  /**
+   * Resolve to { nodes, body, encoded, etag, lastModified }; an expired catalog is still
+   * returned while a refresh runs in the background
+   */
+  async get() {
+    if (!this.current) {
+      return this.refresh()
+    }
+    if (Date.now() - this.loadedAt > REFRESH_INTERVAL_MS) {
+      this.refresh().catch(() => {})
+    }
+    return this.current
+  }
+
+  async find(nodeId) {
+    const { nodes } = await this.get()
+    return nodes.find(node => node.id === nodeId) || null
+  }
+
+  /**
+   * Reload the table; concurrent callers share one query
+   */
+  refresh() {
+    if (!this.loading) {
+      this.loading = this.load().finally(() => {
+        this.loading = null
+      })
+    }
+    return this.loading
+  }
+
+  async load() {
+    const { data, error } = await supabase
+      .from('mining_nodes')
+      .select('id, name, price, storage, mining_amount, duration_days, description, updated_at')
+      .eq('is_active', true)
+      .order('price', { ascending: true })
+
+    let rows = data
+    if (error || !data || data.length === 0) {
+      // Keep serving what we have; before the first load, fall back to the seed rows
+      console.error('Failed to load mining node catalog:', error?.message || 'no active nodes')
+      if (this.current) return this.current
+      rows = SEED_NODES
+    }
+
+    const catalog = serializeCatalog(rows)
+    catalog.encoded = await precompress(catalog.body)
+    this.current = catalog
+    this.loadedAt = Date.now()
+    return this.current
+  }
+}
+
+/**
+ * API shape of the catalog, serialized once with its ETag
+ */
+export function serializeCatalog(rows) {
+  const nodes = rows.map(row => ({
+    id: row.id,
+    name: row.name,
+    price: Number(row.price),
+    storage: row.storage,
+    mining: Number(row.mining_amount),
+    duration: row.duration_days,
+    description: row.description
+  }))
+
+  const body = JSON.stringify({ nodes })
+  const updatedAt = rows.reduce((latest, row) => {
+    const time = row.updated_at ? Date.parse(row.updated_at) : 0
+    return time > latest ? time : latest
+  }, 0)
+
+  return {
+    nodes,
+    body,
+    etag: `"${crypto.createHash('sha256').update(body).digest('base64url').slice(0, 27)}"`,
+    lastModified: updatedAt ? new Date(updatedAt).toUTCString() : null
+  }
+}
+
+/**
+ * Strong ETag of one encoding of the catalog: each encoding is its own representation
+ */
+export function encodedETag(etag, encoding) {
+  return encoding ? `${etag.slice(0, -1)}-${encoding}"` : etag
+}
+
+/**
+ * Whether an If-None-Match header matches the catalog's strong ETag, in any encoding
+ */
+export function matchesETag(ifNoneMatch, etag) {
+  if (!ifNoneMatch) return false
+  if (ifNoneMatch.trim() === '*') return true
+  return ifNoneMatch.split(',').some(candidate => {
+    const tag = candidate.trim().replace(/^W\//, '')
+    return tag === etag || tag === encodedETag(etag, 'br') || tag === encodedETag(etag, 'gzip')
+  })
+}
+
+// One catalog per process, shared across route bundles
+if (!globalThis.__trxNodeCatalog) {
+  globalThis.__trxNodeCatalog = new NodeCatalog()
+}
+
+const nodeCatalog = globalThis.__trxNodeCatalog
+
+export default nodeCatalog
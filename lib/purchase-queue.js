@@ -0,0 +1,204 @@
+import { supabase } from './supabase'
+import os from 'os'
+import {
+  purchaseJobsTotal,
+  purchaseJobDuration,
+  purchaseJobsInFlight
+} from './metrics'
+
+/**
+ * Postgres-backed queue for node purchases
+ * The purchase endpoint enqueues a job and returns at once; a bounded pool of
+ * workers claims jobs with claim_purchase_jobs (FOR UPDATE SKIP LOCKED), runs
+ * the verification and writes, and stores the outcome for the status endpoint.
+ * Jobs that fail with a retryable error (Trongrid unavailable) are put back
+ * with a backoff until maxAttempts is reached; a job whose lease keeps expiring
+ * is marked failed by the claim once it has used maxAttempts. When claiming itself fails the
+ * dispatcher backs off exponentially, up to maxClaimBackoffMs, until a claim
+ * succeeds again.
+ */
+export class PurchaseQueue {
+  constructor(options = {}) {
+    this.concurrency = options.concurrency || Number(process.env.PURCHASE_QUEUE_CONCURRENCY) || 4
+    this.pollIntervalMs = options.pollIntervalMs || 250
+    this.leaseSeconds = options.leaseSeconds || 120
+    this.maxAttempts = options.maxAttempts || 5
+    this.retryDelayMs = options.retryDelayMs || 2000
+    this.maxClaimBackoffMs = options.maxClaimBackoffMs || 5000
+    this.workerId = `${os.hostname()}:${process.pid}`
+
+    this.processJob = null
+    this.inFlight = new Set()
+    this.wakeUp = null
+    this.claimFailures = 0
+    this.stopped = true
+  }
+
+  /**
+   * Enqueue a purchase; resolves to { id, userId, status, created }.
+   * A live job for the same hash is returned instead of a duplicate (created: false).
+   */
+  async enqueue({ userId, nodeId, transactionHash }) {
+    const { data, error } = await supabase.rpc('enqueue_purchase_job', {
+      p_user_id: userId,
+      p_node_id: nodeId,
+      p_transaction_hash: transactionHash
+    })
+
+    if (error) throw error
+    const job = data[0]
+    if (job.created) {
+      purchaseJobsTotal.inc({ status: 'queued' })
+      this.wake()
+    }
+    return { id: job.id, userId: job.user_id, status: job.status, created: job.created }
+  }
+
+  async getJob(jobId) {
+    const { data, error } = await supabase
+      .from('purchase_jobs')
+      .select('id, user_id, node_id, transaction_hash, status, attempts, http_status, result, error_message, created_at, completed_at')
+      .eq('id', jobId)
+      .maybeSingle()
+
+    if (error) throw error
+    return data
+  }
+
+  /**
+   * Start the worker pool; `processJob(job)` resolves to { status, body, retryAfterMs }
+   * with the HTTP status and body the synchronous endpoint would have returned
+   */
+  start(processJob) {
+    this.processJob = processJob
+    if (!this.stopped) return
+    this.stopped = false
+    console.log(`🧵 Purchase queue started with ${this.concurrency} workers (${this.workerId})`)
+    this.dispatch()
+  }
+
+  stop() {
+    this.stopped = true
+    if (this.wakeUp) this.wakeUp()
+  }
+
+  /**
+   * Cut the idle sleep short for a new job; a claim backoff runs its course
+   */
+  wake() {
+    if (this.wakeUp && this.claimFailures === 0) this.wakeUp()
+  }
+
+  /**
+   * Claim as many jobs as there are free worker slots; sleep when the queue is
+   * empty, and for longer after each consecutive failed claim
+   */
+  async dispatch() {
+    while (!this.stopped) {
+      const free = this.concurrency - this.inFlight.size
+      if (free === 0) {
+        await Promise.race(this.inFlight)
+        continue
+      }
+
+      let jobs = []
+      let sleepMs = this.pollIntervalMs
+      try {
+        jobs = await this.claim(free)
+        this.claimFailures = 0
+      } catch (error) {
+        this.claimFailures += 1
+        sleepMs = Math.min(this.pollIntervalMs * 2 ** this.claimFailures, this.maxClaimBackoffMs)
+        console.error(`Failed to claim purchase jobs (${this.claimFailures} in a row, retrying in ${sleepMs}ms):`, error.message)
+      }
+
+      for (const job of jobs) {
+        const run = this.run(job).finally(() => {
+          this.inFlight.delete(run)
+          purchaseJobsInFlight.set({}, this.inFlight.size)
+        })
+        this.inFlight.add(run)
+      }
+      purchaseJobsInFlight.set({}, this.inFlight.size)
+
+      if (jobs.length === 0) {
+        await new Promise(resolve => {
+          this.wakeUp = resolve
+          setTimeout(resolve, sleepMs).unref?.()
+        })
+        this.wakeUp = null
+      }
+    }
+  }
+
+  async claim(limit) {
+    const { data, error } = await supabase.rpc('claim_purchase_jobs', {
+      p_worker: this.workerId,
+      p_limit: limit,
+      p_lease_seconds: this.leaseSeconds,
+      p_max_attempts: this.maxAttempts
+    })
+
+    if (error) throw new Error(error.message)
+    return data || []
+  }
+
+  async run(job) {
+    const endTimer = purchaseJobDuration.startTimer()
+    let outcome
+    try {
+      outcome = await this.processJob(job)
+    } catch (error) {
+      console.error(`Purchase job ${job.id} crashed:`, error)
+      outcome = { status: 500, body: { error: 'Purchase processing failed', details: error.message } }
+    }
+
+    try {
+      if (outcome.status === 503 && job.attempts < this.maxAttempts) {
+        const delay = outcome.retryAfterMs || this.retryDelayMs * 2 ** (job.attempts - 1)
+        await this.release(job, {
+          status: 'queued',
+          run_after: new Date(Date.now() + delay).toISOString(),
+          error_message: outcome.body?.error || null
+        })
+        endTimer({ status: 'retried' })
+        purchaseJobsTotal.inc({ status: 'retried' })
+        return
+      }
+
+      const status = outcome.status === 200 ? 'completed' : 'failed'
+      await this.release(job, {
+        status,
+        http_status: outcome.status,
+        result: outcome.body,
+        error_message: status === 'failed' ? outcome.body?.error || null : null,
+        completed_at: new Date().toISOString()
+      })
+      endTimer({ status })
+      purchaseJobsTotal.inc({ status })
+    } catch (error) {
+      // The lease runs out and another worker picks the job up again
+      console.error(`Failed to record purchase job ${job.id}:`, error.message)
+      endTimer({ status: 'error' })
+    }
+  }
+
+  async release(job, fields) {
+    const { error } = await supabase
+      .from('purchase_jobs')
+      .update({ ...fields, locked_by: null, locked_at: null })
+      .eq('id', job.id)
+      .eq('locked_by', this.workerId)
+
+    if (error) throw new Error(error.message)
+  }
+}
+
+// One worker pool per process, shared across route bundles
+if (!globalThis.__trxPurchaseQueue) {
+  globalThis.__trxPurchaseQueue = new PurchaseQueue()
+}
+
+const purchaseQueue = globalThis.__trxPurchaseQueue
+
+export default purchaseQueue
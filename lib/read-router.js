@@ -0,0 +1,162 @@
+import { supabase, getSupabaseReplica } from './supabase'
+import { replicaReadsTotal, replicaLagSeconds } from './metrics'
+import logger from './logger'
+
+// Cookie that carries a client's read-your-writes window across app processes
+export const PIN_COOKIE = 'trx_read_primary_until'
+
+/**
+ * Routes safe reads to the read replica
+ * A read goes to the primary instead when no replica is configured, when the
+ * user wrote within the last pinMs (read-your-writes, tracked in memory and in
+ * a cookie so any process honours it), when the last lag probe found the
+ * replica more than maxLagMs behind or unreachable, or when the replica read
+ * itself fails.
+ */
+export class ReadRouter {
+  constructor(options = {}) {
+    this.primary = options.primary || supabase
+    // Resolved on first use so importing the router doesn't build the replica client
+    this.replicaOption = options.replica
+    this.pinMs = options.pinMs || Number(process.env.READ_YOUR_WRITES_MS) || 5000
+    this.maxLagMs = options.maxLagMs || Number(process.env.REPLICA_MAX_LAG_MS) || 2000
+    this.lagCheckIntervalMs = options.lagCheckIntervalMs || Number(process.env.REPLICA_LAG_CHECK_MS) || 5000
+    this.maxPinnedUsers = options.maxPinnedUsers || 10000
+
+    this.pinned = new Map() // user id -> pinned until (ms epoch)
+    this.lagMs = null
+    this.healthy = false
+    this.lagTimer = null
+  }
+
+  get replica() {
+    return this.replicaOption === undefined ? getSupabaseReplica() : this.replicaOption
+  }
+
+  /**
+   * Pin a user to the primary for pinMs after a write; returns the expiry
+   */
+  recordWrite(userId) {
+    const until = Date.now() + this.pinMs
+    if (!userId) return until
+
+    // Re-insert so the map stays ordered by expiry and the oldest pins go first
+    this.pinned.delete(userId)
+    this.pinned.set(userId, until)
+    if (this.pinned.size > this.maxPinnedUsers) {
+      this.pinned.delete(this.pinned.keys().next().value)
+    }
+    return until
+  }
+
+  /**
+   * Set-Cookie value that pins the client until `until`
+   */
+  pinCookie(until) {
+    return `${PIN_COOKIE}=${until}; Max-Age=${Math.ceil(this.pinMs / 1000)}; Path=/; HttpOnly; SameSite=Lax`
+  }
+
+  isPinned(request, userId) {
+    const now = Date.now()
+    const until = userId ? this.pinned.get(userId) : undefined
+    if (until !== undefined) {
+      if (until > now) return true
+      this.pinned.delete(userId)
+    }
+
+    return this.cookiePin(request) > now
+  }
+
+  /**
+   * The pin expiry from the request's Cookie header (0 if absent). Read from the
+   * header rather than NextRequest.cookies: /trx-api forwards plain Requests.
+   */
+  cookiePin(request) {
+    const header = request?.headers?.get?.('cookie') || ''
+    for (const part of header.split(';')) {
+      const separator = part.indexOf('=')
+      if (separator !== -1 && part.slice(0, separator).trim() === PIN_COOKIE) {
+        return Number(part.slice(separator + 1).trim()) || 0
+      }
+    }
+    return 0
+  }
+
+  /**
+   * The client a read should use and why: { client, target, reason }
+   */
+  route(request, userId) {
+    if (!this.replica) return { client: this.primary, target: 'primary', reason: 'no_replica' }
+
+    this.startLagChecks()
+    if (this.isPinned(request, userId)) return { client: this.primary, target: 'primary', reason: 'pinned' }
+    if (!this.healthy) {
+      return { client: this.primary, target: 'primary', reason: this.lagMs === null ? 'unavailable' : 'lagging' }
+    }
+    return { client: this.replica, target: 'replica', reason: 'fresh' }
+  }
+
+  /**
+   * Run a read query built by `query(client)`; a replica failure is retried on the primary
+   */
+  async read(request, userId, query) {
+    const { client, target, reason } = this.route(request, userId)
+    const result = await query(client)
+
+    if (target === 'replica' && result.error && (!result.status || result.status >= 500)) {
+      logger.warn('Replica read failed, retrying on primary', { error: result.error.message, status: result.status })
+      this.healthy = false
+      this.lagMs = null
+      replicaReadsTotal.inc({ target: 'primary', reason: 'replica_error' })
+      return query(this.primary)
+    }
+
+    replicaReadsTotal.inc({ target, reason })
+    return result
+  }
+
+  /**
+   * Probe the replica's lag; it serves reads only while within maxLagMs
+   */
+  async checkLag() {
+    const { data, error } = await this.replica.rpc('get_replication_lag').maybeSingle()
+    if (error || !data) {
+      this.lagMs = null
+      this.healthy = false
+      return null
+    }
+
+    this.lagMs = Number(data.lag_ms)
+    this.healthy = this.lagMs <= this.maxLagMs
+    replicaLagSeconds.set({}, this.lagMs / 1000)
+    return this.lagMs
+  }
+
+  startLagChecks() {
+    if (this.lagTimer || !this.replica) return
+
+    const tick = () => this.checkLag().catch(error => {
+      this.lagMs = null
+      this.healthy = false
+      console.error('Replica lag check failed:', error.message)
+    })
+
+    tick()
+    this.lagTimer = setInterval(tick, this.lagCheckIntervalMs)
+    this.lagTimer.unref?.()
+  }
+
+  stop() {
+    clearInterval(this.lagTimer)
+    this.lagTimer = null
+  }
+}
+
+// One router (and lag probe) per process, shared across route bundles
+if (!globalThis.__trxReadRouter) {
+  globalThis.__trxReadRouter = new ReadRouter()
+}
+
+const readRouter = globalThis.__trxReadRouter
+
+export default readRouter
@@ -0,0 +1,113 @@
+/**
+ * Response shapes compiled once per route
+ * A shape lists the response keys in order, each with the column it is read
+ * from and how it is encoded. From that it derives the PostgREST select (each
+ * column aliased to its response key), the same list for raw SQL, and a
+ * serializer generated ahead of time that writes a row straight to JSON, so
+ * rows are neither remapped nor walked generically by JSON.stringify.
+ */
+
+// Numeric columns arrive as JSON numbers from PostgREST and as strings from pg
+function encodeNumber(value) {
+  if (value === null || value === undefined) return 'null'
+  const number = Number(value)
+  return Number.isFinite(number) ? String(number) : 'null'
+}
+
+const ENCODERS = {
+  string: value => `(JSON.stringify(${value}) ?? 'null')`,
+  number: value => `encodeNumber(${value})`,
+  boolean: value => `(${value} == null ? 'null' : ${value} ? 'true' : 'false')`,
+  // Present and truthy, e.g. a column only the archive table has
+  flag: value => `(${value} ? 'true' : 'false')`
+}
+
+/**
+ * Compile `{ responseKey: [column | null, type] }` into { select, sql, serialize }.
+ * Keys with a null column are serialized but left out of the selects.
+ */
+export function compileShape(fields) {
+  const entries = Object.entries(fields)
+  const selected = entries.filter(([, [column]]) => column)
+
+  const parts = entries.map(([key, [, type]], index) => {
+    const encode = ENCODERS[type]
+    if (!encode) throw new Error(`Unknown field type ${type} for ${key}`)
+    const prefix = JSON.stringify(`${index === 0 ? '{' : ','}${JSON.stringify(key)}:`)
+    return `${prefix} + ${encode(`row[${JSON.stringify(key)}]`)}`
+  })
+
+  // eslint-disable-next-line no-new-func
+  const serialize = new Function('encodeNumber', `return function serialize(row) {
+    return ${parts.join(' + ')} + '}'
+  }`)(encodeNumber)
+
+  return {
+    select: selected.map(([key, [column]]) => (key === column ? column : `${key}:${column}`)).join(', '),
+    sql: selected.map(([key, [column]]) => (key === column ? column : `${column} AS "${key}"`)).join(', '),
+    serialize
+  }
+}
+
+/**
+ * JSON array of rows written by a compiled serializer
+ */
+export function serializeList(serialize, rows) {
+  return `[${rows.map(serialize).join(',')}]`
+}
+
+export const PROFILE_SHAPE = compileShape({
+  id: ['id', 'string'],
+  username: ['username', 'string'],
+  email: ['email', 'string'],
+  mineBalance: ['mine_balance', 'number'],
+  referralBalance: ['referral_balance', 'number'],
+  totalReferrals: ['total_referrals', 'number'],
+  validReferrals: ['valid_referrals', 'number'],
+  referralCode: ['referral_code', 'string'],
+  hasActiveMining: ['has_active_mining', 'boolean'],
+  hasBoughtNode4: ['has_bought_node4', 'boolean'],
+  createdAt: ['created_at', 'string'],
+  updatedAt: ['updated_at', 'string']
+})
+
+export const USER_NODE_SHAPE = compileShape({
+  id: ['id', 'string'],
+  userId: ['user_id', 'string'],
+  nodeId: ['node_id', 'string'],
+  transactionHash: ['transaction_hash', 'string'],
+  status: ['status', 'string'],
+  progress: ['progress', 'number'],
+  startDate: ['start_date', 'string'],
+  endDate: ['end_date', 'string'],
+  miningAmount: ['mining_amount', 'number'],
+  dailyMining: ['daily_mining', 'number'],
+  duration: ['duration', 'number'],
+  createdAt: ['created_at', 'string'],
+  archived: [null, 'flag']
+})
+
+export const WITHDRAWAL_SHAPE = compileShape({
+  id: ['id', 'string'],
+  type: ['type', 'string'],
+  amount: ['amount', 'number'],
+  status: ['status', 'string'],
+  transactionHash: ['transaction_hash', 'string'],
+  netAmount: ['net_amount', 'number'],
+  processedAt: ['processed_at', 'string'],
+  createdAt: ['created_at', 'string'],
+  archived: [null, 'flag']
+})
+
+export const REFERRAL_SHAPE = compileShape({
+  id: ['id', 'string'],
+  referrerId: ['referrer_id', 'string'],
+  referredId: ['referred_id', 'string'],
+  referralCode: ['referral_code', 'string'],
+  isValid: ['is_valid', 'boolean'],
+  rewardPaid: ['reward_paid', 'boolean'],
+  createdAt: ['created_at', 'string']
+})
+
+// Only archive rows carry archived_at, so only the archive select asks for it
+export const ARCHIVED_FLAG = 'archived:archived_at'
@@ -1,22 +1,107 @@
 import { createClient } from '@supabase/supabase-js'
+import { supabaseRequestDuration } from './metrics'
 
-const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL
-const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY
+// Time every PostgREST call, labelled by table (or rpc function) and method
+async function instrumentedFetch(input, init = {}) {
+  const url = new URL(typeof input === 'string' ? input : input.url)
+  const match = url.pathname.match(/\/rest\/v1\/(.+)$/)
+  const endTimer = supabaseRequestDuration.startTimer({
+    table: match ? match[1] : 'other',
+    method: (init.method || 'GET').toUpperCase()
+  })
 
-if (!supabaseUrl || !supabaseServiceKey) {
-  throw new Error('Missing Supabase environment variables')
+  try {
+    const response = await fetch(input, init)
+    endTimer({ status: response.status })
+    return response
+  } catch (error) {
+    endTimer({ status: 'error' })
+    throw error
+  }
 }
 
-// Create a Supabase client with service role key for server-side operations
-export const supabase = createClient(supabaseUrl, supabaseServiceKey, {
+const SERVER_OPTIONS = {
   auth: {
     autoRefreshToken: false,
     persistSession: false
+  },
+  global: {
+    fetch: instrumentedFetch
+  }
+}
+
+// Clients are built on first use and shared across route bundles
+const clients = globalThis.__trxSupabaseClients || (globalThis.__trxSupabaseClients = {})
+
+function memoized(name, build) {
+  if (!(name in clients)) {
+    clients[name] = build()
   }
-})
+  return clients[name]
+}
 
-// Create a Supabase client with anon key for client-side operations
-export const supabaseClient = createClient(
-  supabaseUrl, 
-  process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
-)
\ No newline at end of file
+function requireEnv() {
+  const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL
+  const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY
+
+  if (!supabaseUrl || !supabaseServiceKey) {
+    throw new Error('Missing Supabase environment variables')
+  }
+  return { supabaseUrl, supabaseServiceKey }
+}
+
+/**
+ * Supabase client with service role key for server-side operations
+ */
+export function getSupabase() {
+  return memoized('service', () => {
+    const { supabaseUrl, supabaseServiceKey } = requireEnv()
+    return createClient(supabaseUrl, supabaseServiceKey, SERVER_OPTIONS)
+  })
+}
+
+/**
+ * Read replica client (its own REST endpoint, same service key) for reads
+ * routed by lib/read-router.js; null when SUPABASE_READ_REPLICA_URL is unset
+ */
+export function getSupabaseReplica() {
+  return memoized('replica', () => {
+    const replicaUrl = process.env.SUPABASE_READ_REPLICA_URL
+    if (!replicaUrl) return null
+    return createClient(replicaUrl, requireEnv().supabaseServiceKey, SERVER_OPTIONS)
+  })
+}
+
+/**
+ * Supabase client with anon key for client-side operations
+ */
+export function getSupabaseClient() {
+  return memoized('anon', () => createClient(
+    requireEnv().supabaseUrl,
+    process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
+  ))
+}
+
+// Stand-in that builds the client on first property access, so importing this
+// module costs nothing and missing env vars only fail the calls that need them
+function lazyClient(getClient) {
+  return new Proxy({}, {
+    get(_, property) {
+      const client = getClient()
+      const value = client[property]
+      return typeof value === 'function' ? value.bind(client) : value
+    }
+  })
+}
+
+export const supabase = lazyClient(getSupabase)
+
+export const supabaseClient = lazyClient(getSupabaseClient)
+
+/**
+ * Build the clients now instead of on the first request
+ */
+export function warmUpSupabase() {
+  getSupabase()
+  getSupabaseReplica()
+}
@@ -0,0 +1,64 @@
+import crypto from 'crypto'
+
+/**
+ * Base58check codec for TRON addresses
+ * Built once at load; converts between the base58 form users see ("T...") and
+ * the 21-byte hex form Trongrid returns (0x41 prefix + 20-byte account id).
+ */
+
+const ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+const ALPHABET_INDEX = new Map([...ALPHABET].map((char, index) => [char, BigInt(index)]))
+const ADDRESS_BYTES = 21
+const CHECKSUM_BYTES = 4
+
+function checksum(payload) {
+  const first = crypto.createHash('sha256').update(payload).digest()
+  return crypto.createHash('sha256').update(first).digest().subarray(0, CHECKSUM_BYTES)
+}
+
+/**
+ * Base58 address -> lowercase hex ("41..."); throws on bad characters or checksum
+ */
+export function addressToHex(address) {
+  let value = 0n
+  for (const char of address) {
+    const digit = ALPHABET_INDEX.get(char)
+    if (digit === undefined) {
+      throw new Error(`Invalid base58 character in TRON address: ${address}`)
+    }
+    value = value * 58n + digit
+  }
+
+  const hex = value.toString(16).padStart((ADDRESS_BYTES + CHECKSUM_BYTES) * 2, '0')
+  const bytes = Buffer.from(hex, 'hex')
+  if (bytes.length !== ADDRESS_BYTES + CHECKSUM_BYTES) {
+    throw new Error(`Invalid TRON address length: ${address}`)
+  }
+
+  const payload = bytes.subarray(0, ADDRESS_BYTES)
+  if (!checksum(payload).equals(bytes.subarray(ADDRESS_BYTES))) {
+    throw new Error(`Invalid TRON address checksum: ${address}`)
+  }
+  return payload.toString('hex')
+}
+
+/**
+ * Hex address ("41...") -> base58 address
+ */
+export function addressFromHex(hex) {
+  const payload = Buffer.from(hex, 'hex')
+  const bytes = Buffer.concat([payload, checksum(payload)])
+
+  let value = BigInt('0x' + bytes.toString('hex'))
+  let address = ''
+  while (value > 0n) {
+    address = ALPHABET[Number(value % 58n)] + address
+    value /= 58n
+  }
+
+  // Leading zero bytes are encoded as '1'
+  for (let i = 0; i < bytes.length && bytes[i] === 0; i++) {
+    address = '1' + address
+  }
+  return address
+}
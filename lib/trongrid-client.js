@@ -0,0 +1,293 @@
+import http from 'http'
+import https from 'https'
+import {
+  trongridRequestDuration,
+  trongridCircuitTransitionsTotal,
+  trxVerificationRetriesTotal
+} from './metrics'
+import logger from './logger'
+
+/**
+ * Error raised by the Trongrid client; `retryable` marks transient upstream trouble
+ */
+export class TrongridError extends Error {
+  constructor(message, { status = null, retryable = true, retryAfterMs = null } = {}) {
+    super(message)
+    this.name = 'TrongridError'
+    this.status = status
+    this.retryable = retryable
+    this.retryAfterMs = retryAfterMs
+  }
+}
+
+/**
+ * Circuit breaker for the Trongrid upstream
+ * Opens after `failureThreshold` consecutive failures and rejects calls until
+ * `cooldownMs` has passed, then lets a single half-open probe through: success
+ * closes the circuit, failure opens it again.
+ */
+export class CircuitBreaker {
+  constructor({ failureThreshold = 5, cooldownMs = 30000 } = {}) {
+    this.failureThreshold = failureThreshold
+    this.cooldownMs = cooldownMs
+    this.state = 'closed'
+    this.failures = 0
+    this.openUntil = 0
+    this.probeInFlight = false
+  }
+
+  /**
+   * Whether a call may go upstream now; claims the probe slot when half-open
+   */
+  tryAcquire() {
+    if (this.state === 'closed') return true
+
+    if (this.state === 'open') {
+      if (Date.now() < this.openUntil) return false
+      this.transition('half_open')
+    }
+
+    if (this.probeInFlight) return false
+    this.probeInFlight = true
+    return true
+  }
+
+  recordSuccess() {
+    this.failures = 0
+    this.probeInFlight = false
+    if (this.state !== 'closed') this.transition('closed')
+  }
+
+  recordFailure() {
+    this.failures++
+    if (this.state === 'half_open' || this.failures >= this.failureThreshold) {
+      this.openFor(this.cooldownMs)
+    }
+  }
+
+  /**
+   * Open the circuit for at least `ms` (also used to honour a long Retry-After)
+   */
+  openFor(ms) {
+    this.probeInFlight = false
+    this.openUntil = Math.max(this.openUntil, Date.now() + ms)
+    if (this.state !== 'open') this.transition('open')
+  }
+
+  retryInMs() {
+    return Math.max(0, this.openUntil - Date.now())
+  }
+
+  transition(state) {
+    // An opening circuit means Trongrid is failing; the way back is routine
+    logger[state === 'open' ? 'warn' : 'info']('Trongrid circuit transition', { from: this.state, to: state })
+    this.state = state
+    trongridCircuitTransitionsTotal.inc({ state })
+  }
+}
+
+/**
+ * Parse a Retry-After header (delta seconds or HTTP date) into milliseconds
+ */
+export function parseRetryAfter(value) {
+  if (!value) return null
+
+  const seconds = Number(value)
+  if (Number.isFinite(seconds)) return Math.max(0, seconds * 1000)
+
+  const date = Date.parse(value)
+  return Number.isNaN(date) ? null : Math.max(0, date - Date.now())
+}
+
+/**
+ * Pooled keep-alive HTTP client for the Trongrid API
+ * Every attempt has its own deadline, transient failures are retried with
+ * jittered exponential backoff, 429 responses wait for Retry-After, and a
+ * circuit breaker fails calls fast while the upstream is down.
+ */
+export class TrongridClient {
+  constructor(options = {}) {
+    this.baseUrl = new URL(options.baseUrl || process.env.TRONGRID_API_URL || 'https://api.trongrid.io')
+    this.apiKey = options.apiKey || process.env.TRONGRID_API_KEY
+    this.timeoutMs = options.timeoutMs || Number(process.env.TRONGRID_TIMEOUT_MS) || 5000
+    this.maxAttempts = options.maxAttempts || 3
+    this.baseDelayMs = options.baseDelayMs || 250
+    this.maxDelayMs = options.maxDelayMs || 4000
+    this.maxRetryAfterMs = options.maxRetryAfterMs || 10000
+
+    this.breaker = options.breaker || new CircuitBreaker({
+      failureThreshold: Number(process.env.TRONGRID_BREAKER_THRESHOLD) || 5,
+      cooldownMs: Number(process.env.TRONGRID_BREAKER_COOLDOWN_MS) || 30000
+    })
+
+    const Agent = this.baseUrl.protocol === 'https:' ? https.Agent : http.Agent
+    this.transport = this.baseUrl.protocol === 'https:' ? https : http
+    this.agent = new Agent({
+      keepAlive: true,
+      maxSockets: options.maxSockets || 50,
+      maxFreeSockets: 10
+    })
+  }
+
+  /**
+   * Fetch a transaction by hash; resolves to null when Trongrid doesn't know it.
+   * `onRetry(attempt, error)` is called after each failed attempt that will be retried.
+   */
+  async getTransaction(transactionHash, { onRetry } = {}) {
+    const { status, body } = await this.requestWithRetries(`/v1/transactions/${transactionHash}`, onRetry)
+    return status === 404 ? null : body
+  }
+
+  /**
+   * One page of confirmed incoming transactions for an account, oldest first.
+   * Resolves to { data, fingerprint }; fingerprint is null on the last page.
+   */
+  async getAccountTransactions(address, { minTimestamp = 0, fingerprint = null, limit = 200 } = {}) {
+    const query = new URLSearchParams({
+      only_to: 'true',
+      only_confirmed: 'true',
+      order_by: 'block_timestamp,asc',
+      min_timestamp: String(minTimestamp),
+      limit: String(limit)
+    })
+    if (fingerprint) query.set('fingerprint', fingerprint)
+
+    const { body } = await this.requestWithRetries(`/v1/accounts/${address}/transactions?${query}`)
+    return { data: body?.data || [], fingerprint: body?.meta?.fingerprint || null }
+  }
+
+  async requestWithRetries(path, onRetry) {
+    for (let attempt = 1; ; attempt++) {
+      if (!this.breaker.tryAcquire()) {
+        throw new TrongridError('Trongrid circuit open', {
+          retryable: true,
+          retryAfterMs: this.breaker.retryInMs()
+        })
+      }
+
+      try {
+        const response = await this.request(path)
+        this.breaker.recordSuccess()
+        return response
+      } catch (error) {
+        if (!(error instanceof TrongridError)) {
+          this.breaker.probeInFlight = false
+          throw error
+        }
+
+        if (error.status === 429) {
+          // Upstream is alive but asking us to back off; a long wait holds off every caller
+          this.breaker.probeInFlight = false
+          if (error.retryAfterMs > this.maxRetryAfterMs) {
+            this.breaker.openFor(error.retryAfterMs)
+            throw error
+          }
+        } else if (error.retryable) {
+          this.breaker.recordFailure()
+        } else {
+          this.breaker.recordSuccess()
+          throw error
+        }
+
+        if (attempt >= this.maxAttempts || !error.retryable || this.breaker.state === 'open') {
+          throw error
+        }
+
+        trxVerificationRetriesTotal.inc({ reason: error.status === 429 ? 'rate_limited' : 'network' })
+        if (onRetry) await onRetry(attempt, error)
+        await this.delay(error.retryAfterMs ?? this.backoffMs(attempt))
+      }
+    }
+  }
+
+  /**
+   * Full-jitter exponential backoff: uniform in [0, min(max, base * 2^(attempt - 1))]
+   */
+  backoffMs(attempt) {
+    const ceiling = Math.min(this.maxDelayMs, this.baseDelayMs * 2 ** (attempt - 1))
+    return Math.random() * ceiling
+  }
+
+  /**
+   * One HTTP attempt bounded by the per-attempt deadline
+   */
+  request(path) {
+    const endTimer = trongridRequestDuration.startTimer()
+
+    return new Promise((resolve, reject) => {
+      let settled = false
+      const fail = (error, outcome) => {
+        clearTimeout(deadline)
+        if (settled) return
+        settled = true
+        endTimer({ outcome })
+        reject(error)
+      }
+
+      const req = this.transport.request(new URL(path, this.baseUrl), {
+        method: 'GET',
+        agent: this.agent,
+        headers: {
+          'Accept': 'application/json',
+          ...(this.apiKey ? { 'TRON-PRO-API-KEY': this.apiKey } : {})
+        }
+      }, (res) => {
+        const chunks = []
+        res.on('data', chunk => chunks.push(chunk))
+        res.on('error', error => fail(new TrongridError(`Trongrid response error: ${error.message}`), 'network'))
+        res.on('end', () => {
+          if (settled) return
+          const status = res.statusCode
+
+          if (status === 429) {
+            return fail(new TrongridError('Trongrid rate limit exceeded', {
+              status,
+              retryAfterMs: parseRetryAfter(res.headers['retry-after'])
+            }), 'rate_limited')
+          }
+          if (status >= 500) {
+            return fail(new TrongridError(`Trongrid API error: ${status}`, { status }), 'server_error')
+          }
+          if (status !== 404 && status >= 400) {
+            return fail(new TrongridError(`Trongrid API error: ${status}`, { status, retryable: false }), 'client_error')
+          }
+
+          try {
+            const body = status === 404 ? null : JSON.parse(Buffer.concat(chunks).toString('utf8'))
+            clearTimeout(deadline)
+            settled = true
+            endTimer({ outcome: status === 404 ? 'not_found' : 'ok' })
+            resolve({ status, body })
+          } catch (error) {
+            fail(new TrongridError(`Invalid Trongrid response: ${error.message}`, { status }), 'invalid')
+          }
+        })
+      })
+
+      const deadline = setTimeout(() => {
+        req.destroy(new TrongridError(`Trongrid request timed out after ${this.timeoutMs}ms`))
+      }, this.timeoutMs)
+
+      req.on('error', (error) => {
+        fail(
+          error instanceof TrongridError ? error : new TrongridError(`Trongrid network error: ${error.message}`),
+          error instanceof TrongridError ? 'timeout' : 'network'
+        )
+      })
+      req.end()
+    })
+  }
+
+  delay(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms))
+  }
+}
+
+// One pool and one breaker per process, shared across route bundles
+if (!globalThis.__trxTrongridClient) {
+  globalThis.__trxTrongridClient = new TrongridClient()
+}
+
+const trongridClient = globalThis.__trxTrongridClient
+
+export default trongridClient
@@ -0,0 +1,175 @@
+import { addressToHex, addressFromHex } from './tron-address'
+
+/**
+ * Validation of Trongrid transaction payloads against an expected TRX transfer
+ * Kept free of I/O so the hot path can be benchmarked on its own.
+ */
+
+const SUN_PER_TRX = 1000000
+const MAX_TRANSACTION_AGE_MS = 24 * 60 * 60 * 1000 // 24 hours
+
+// Receive addresses are converted to hex once and compared as raw hex afterwards
+const receiveAddressHexCache = new Map()
+
+/**
+ * Hex form of a base58 receive address, memoized
+ */
+export function receiveAddressHex(address) {
+  let hex = receiveAddressHexCache.get(address)
+  if (!hex) {
+    hex = addressToHex(address)
+    receiveAddressHexCache.set(address, hex)
+  }
+  return hex
+}
+
+/**
+ * Validate a deposit row stored by the deposit ingester (already a successful
+ * TransferContract to the receive address it watches)
+ */
+export function validateDeposit(deposit, expectedAmount, expectedToAddress) {
+  const actualAmountSun = Number(deposit.amount_sun)
+  if (actualAmountSun !== expectedAmount * SUN_PER_TRX) {
+    return {
+      valid: false,
+      error: `Amount mismatch. Expected: ${expectedAmount} TRX, Got: ${actualAmountSun / SUN_PER_TRX} TRX`
+    }
+  }
+
+  if (deposit.to_address !== receiveAddressHex(expectedToAddress)) {
+    return {
+      valid: false,
+      error: `Recipient address mismatch. Expected: ${expectedToAddress}, Got: ${addressFromHex(deposit.to_address)}`
+    }
+  }
+
+  const blockTimestamp = Date.parse(deposit.block_timestamp)
+  if (Date.now() - blockTimestamp > MAX_TRANSACTION_AGE_MS) {
+    return {
+      valid: false,
+      error: 'Transaction is too old (older than 24 hours)',
+      details: `Transaction timestamp: ${deposit.block_timestamp}`
+    }
+  }
+
+  const result = {
+    valid: true,
+    transactionHash: deposit.transaction_hash,
+    amount: actualAmountSun / SUN_PER_TRX,
+    fromAddressHex: deposit.from_address,
+    toAddress: expectedToAddress,
+    blockNumber: deposit.block_number,
+    blockTimestamp: new Date(blockTimestamp).toISOString(),
+    source: 'deposits'
+  }
+
+  let fromAddress
+  Object.defineProperty(result, 'fromAddress', {
+    get: () => (fromAddress ??= addressFromHex(deposit.from_address))
+  })
+  return result
+}
+
+/**
+ * Validate transaction data from Trongrid API response
+ */
+export function validateTransactionData(data, expectedAmount, expectedToAddress) {
+  try {
+    // Check if transaction exists and is successful
+    if (!data.ret || data.ret.length === 0) {
+      return { valid: false, error: 'Transaction not found or invalid' }
+    }
+
+    const transactionResult = data.ret[0]
+    if (transactionResult.contractRet !== 'SUCCESS') {
+      return {
+        valid: false,
+        error: `Transaction failed with status: ${transactionResult.contractRet}`,
+        details: transactionResult.message || 'No additional details'
+      }
+    }
+
+    // Validate transaction type and contract details
+    const contract = data.raw_data?.contract?.[0]
+    if (!contract) {
+      return { valid: false, error: 'No contract data found in transaction' }
+    }
+
+    if (contract.type !== 'TransferContract') {
+      return {
+        valid: false,
+        error: `Invalid transaction type: ${contract.type}. Expected: TransferContract`
+      }
+    }
+
+    const transferData = contract.parameter.value
+    if (!transferData) {
+      return { valid: false, error: 'No transfer data found in contract' }
+    }
+
+    // Validate amount (TRON uses SUN as the smallest unit, 1 TRX = 1,000,000 SUN)
+    const actualAmountSun = transferData.amount
+    const expectedAmountSun = expectedAmount * SUN_PER_TRX
+
+    if (actualAmountSun !== expectedAmountSun) {
+      return {
+        valid: false,
+        error: `Amount mismatch. Expected: ${expectedAmount} TRX, Got: ${actualAmountSun / SUN_PER_TRX} TRX`
+      }
+    }
+
+    // Validate recipient address on the raw hex; base58 is only built for the error message
+    const toAddressHex = transferData.to_address
+    if (!toAddressHex) {
+      return { valid: false, error: 'No recipient address found in transaction' }
+    }
+
+    const expectedHex = receiveAddressHex(expectedToAddress)
+    if (toAddressHex !== expectedHex && toAddressHex.toLowerCase() !== expectedHex) {
+      return {
+        valid: false,
+        error: `Recipient address mismatch. Expected: ${expectedToAddress}, Got: ${addressFromHex(toAddressHex)}`
+      }
+    }
+
+    // Get transaction timestamp
+    const blockTimestamp = data.block_timestamp || Date.now()
+
+    // Additional security: Check if transaction is too old (e.g., older than 24 hours)
+    if (Date.now() - blockTimestamp > MAX_TRANSACTION_AGE_MS) {
+      return {
+        valid: false,
+        error: 'Transaction is too old (older than 24 hours)',
+        details: `Transaction timestamp: ${new Date(blockTimestamp).toISOString()}`
+      }
+    }
+
+    // All validations passed
+    const result = {
+      valid: true,
+      transactionHash: data.txID,
+      amount: actualAmountSun / SUN_PER_TRX,
+      fromAddressHex: transferData.owner_address,
+      toAddress: expectedToAddress,
+      blockNumber: data.blockNumber,
+      blockTimestamp: new Date(blockTimestamp).toISOString(),
+      energyUsed: data.receipt?.energy_usage || 0,
+      bandwidth: data.receipt?.net_usage || 0,
+      fee: (data.receipt?.energy_fee || 0) / SUN_PER_TRX, // Convert from SUN to TRX
+      confirmations: data.confirmations || 0
+    }
+
+    // Sender is decoded to base58 on first read only (non-enumerable, so it isn't serialized)
+    let fromAddress
+    Object.defineProperty(result, 'fromAddress', {
+      get: () => (fromAddress ??= addressFromHex(transferData.owner_address))
+    })
+    return result
+  } catch (error) {
+    return {
+      valid: false,
+      error: 'Failed to parse transaction data',
+      details: error.message
+    }
+  }
+}
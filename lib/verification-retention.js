@@ -0,0 +1,97 @@
+import { supabase } from './supabase'
+import logger from './logger'
+
+// Monthly partitions created ahead of the current month
+const MONTHS_AHEAD = 3
+
+// Age after which a pending transaction hash claim counts as abandoned; well
+// above the time a verification with all its retries can take
+export const PENDING_CLAIM_TIMEOUT_SECONDS = Number(process.env.TRX_HASH_CLAIM_TIMEOUT_SECONDS) || 600
+
+/**
+ * Partition maintenance for the transaction_verifications audit log
+ * Creates upcoming monthly partitions and, when VERIFICATION_RETENTION_MONTHS
+ * is set, drops the months that fell out of the retention window (or detaches
+ * them with VERIFICATION_RETENTION_MODE=detach so they can be archived).
+ * It also releases pending transaction hash claims older than
+ * PENDING_CLAIM_TIMEOUT_SECONDS, left behind by verifications that crashed.
+ * Each step is a single RPC; the database serializes concurrent processes.
+ */
+export class VerificationRetention {
+  constructor(options = {}) {
+    this.retainMonths = options.retainMonths ?? (Number(process.env.VERIFICATION_RETENTION_MONTHS) || 0)
+    this.detach = options.detach ?? process.env.VERIFICATION_RETENTION_MODE === 'detach'
+    this.intervalMs = options.intervalMs || Number(process.env.VERIFICATION_RETENTION_INTERVAL_MS) || 6 * 60 * 60 * 1000
+    this.timer = null
+  }
+
+  /**
+   * Create missing partitions, prune expired ones and release stale hash
+   * claims; resolves to { created, pruned: [{ partition, action }], releasedClaims }
+   */
+  async runOnce() {
+    const { data: created, error } = await supabase.rpc('ensure_verification_partitions', {
+      p_months_ahead: MONTHS_AHEAD
+    })
+    if (error) throw new Error(`Failed to create verification partitions: ${error.message}`)
+
+    let pruned = []
+    if (this.retainMonths > 0) {
+      const { data, error: pruneError } = await supabase.rpc('prune_verification_partitions', {
+        p_retain_months: this.retainMonths,
+        p_detach: this.detach
+      })
+      if (pruneError) throw new Error(`Failed to prune verification partitions: ${pruneError.message}`)
+      pruned = data.map(row => ({ partition: row.partition_name, action: row.pruned_action }))
+    }
+
+    const { data: releasedClaims, error: releaseError } = await supabase.rpc('release_stale_transaction_claims', {
+      p_claim_timeout_seconds: PENDING_CLAIM_TIMEOUT_SECONDS
+    })
+    if (releaseError) throw new Error(`Failed to release stale transaction hash claims: ${releaseError.message}`)
+
+    return { created, pruned, releasedClaims }
+  }
+
+  /**
+   * Run now and then every intervalMs until stop() is called
+   */
+  start() {
+    if (this.timer) return
+
+    const tick = async () => {
+      try {
+        const { created, pruned, releasedClaims } = await this.runOnce()
+        if (created > 0) {
+          logger.info('Created transaction_verifications partitions', { created })
+        }
+        for (const { partition, action } of pruned) {
+          logger.info('Retention pruned partition', { partition, action })
+        }
+        if (releasedClaims > 0) {
+          logger.info('Released stale transaction hash claims', { releasedClaims })
+        }
+      } catch (error) {
+        console.error('Verification partition maintenance failed:', error.message)
+      }
+    }
+
+    tick()
+    this.timer = setInterval(tick, this.intervalMs)
+    this.timer.unref?.()
+  }
+
+  stop() {
+    clearInterval(this.timer)
+    this.timer = null
+  }
+}
+
+// One maintenance loop per process, shared across route bundles
+if (!globalThis.__trxVerificationRetention) {
+  globalThis.__trxVerificationRetention = new VerificationRetention()
+}
+
+const verificationRetention = globalThis.__trxVerificationRetention
+
+export default verificationRetention
@@ -0,0 +1,42 @@
+import { warmUpSupabase } from './supabase'
+import { getTrxVerifier } from './enhanced-trx-verifier'
+import dbInitializer from './database-initializer'
+import nodeCatalog from './node-catalog'
+import dataAccess from './data-access'
+
+/**
+ * Build the lazily constructed clients and services before traffic needs them
+ * Runs once per process: the Supabase clients, the verifier, the schema check,
+ * the node catalog and the data access pool. Every step is memoized by its
+ * owner, so requests that arrive mid-warm-up share the work already in flight.
+ */
+export function warmUp() {
+  if (!globalThis.__trxWarmUp) {
+    globalThis.__trxWarmUp = runWarmUp().catch(error => {
+      // Let a later call try again
+      globalThis.__trxWarmUp = null
+      console.error('Warm-up failed:', error.message)
+      return { warm: false, error: error.message }
+    })
+  }
+  return globalThis.__trxWarmUp
+}
+
+async function runWarmUp() {
+  const startedAt = Date.now()
+
+  warmUpSupabase()
+  getTrxVerifier()
+  const database = await dbInitializer.ensureInitialized()
+  if (!database.success) {
+    // Not warm: the .catch in warmUp() reports it and lets the next call retry
+    throw new Error(`Database initialization failed: ${database.error}`)
+  }
+  await Promise.all([nodeCatalog.get(), dataAccess.warmUp()])
+
+  const durationMs = Date.now() - startedAt
+  console.log(`🔥 Warm-up completed in ${durationMs}ms`)
+  return { warm: true, durationMs }
+}
+
+export default warmUp
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Logging Load Test for TRX Mining Platform
+Drives the same concurrent request mix against the server with LOG_LEVEL=warn
+and LOG_LEVEL=info (batched to a LOG_FILE, and to stdout) and reports throughput,
+latency percentiles and how many log lines each run wrote. Needs the app's
+local Supabase stack.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import start_server, stop_server, wait_for_server
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Logging-Load-Test/1.0'
+}
+REQUESTS = int(os.getenv('BENCH_REQUESTS', '5000'))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', '32'))
+
+# Every request logs at info through the GET/POST handlers; the profile lookup also hits the database
+MIX = [
+    ('GET', '/auth/user', None),
+    ('POST', '/user/profile', lambda: {'userId': str(uuid.uuid4())}),
+    ('POST', '/auth/signin', lambda: {'username': 'log_load_nobody', 'password': 'loadtest123'}),
+]
+
+
+def configurations(log_dir):
+    return {
+        'warn': {'LOG_LEVEL': 'warn', 'LOG_FILE': os.path.join(log_dir, 'warn.ndjson')},
+        'info → file': {'LOG_LEVEL': 'info', 'LOG_FILE': os.path.join(log_dir, 'info.ndjson')},
+        'info → stdout': {'LOG_LEVEL': 'info'},
+    }
+
+
+def call(n, session):
+    method, path, body = MIX[n % len(MIX)]
+    # Distinct client IPs so the rate limiter stays out of the way
+    headers = {**HEADERS, 'X-Forwarded-For': f"10.49.{n // 250 % 250}.{n % 250}"}
+    start = time.perf_counter()
+    response = session.request(method, f"{BASE_URL}{path}", json=body() if body else None, headers=headers,
+                               timeout=60)
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def run_load():
+    """REQUESTS calls from CLIENTS threads, each with its own keep-alive session"""
+    sessions = [requests.Session() for _ in range(CLIENTS)]
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        results = list(pool.map(lambda n: call(n, sessions[n % CLIENTS]), range(REQUESTS)))
+    wall = time.perf_counter() - started_at
+    for session in sessions:
+        session.close()
+
+    latencies = sorted(elapsed for elapsed, _ in results)
+    errors = sum(1 for _, status in results if status >= 500 or status == 429)
+    return {
+        'rate': REQUESTS / wall,
+        'p50': statistics.median(latencies),
+        'p99': latencies[int(len(latencies) * 0.99) - 1],
+        'errors': errors,
+    }
+
+
+def count_lines(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as log:
+        return sum(1 for _ in log)
+
+
+def main():
+    print("=" * 80)
+    print(f"LOGGING LOAD TEST ({REQUESTS:,} requests, {CLIENTS} clients)")
+    print("=" * 80)
+
+    outcomes = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for label, env in configurations(log_dir).items():
+            process = start_server(PORT, env)
+            try:
+                wait_for_server(BASE_URL)
+                run_load()  # warm-up pass, not reported
+                result = run_load()
+            finally:
+                # Stopping the server flushes whatever the logger still has queued
+                stop_server(process)
+            result['lines'] = count_lines(env.get('LOG_FILE'))
+            outcomes[label] = result
+            print(f"   {label:<14} {result['rate']:8.1f} req/s   p50 {result['p50']:6.2f} ms   "
+                  f"p99 {result['p99']:7.2f} ms   {result['errors']} errors")
+
+    print()
+    baseline = outcomes['warn']['rate']
+    for label, result in outcomes.items():
+        lines = '-' if result['lines'] is None else f"{result['lines']:,}"
+        print(f"   {label:<14} {result['rate'] / baseline:6.1%} of warn throughput, {lines} log lines written")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,36 @@
 import { NextResponse } from 'next/server'
 
+const CACHEABLE_API_PATHS = new Set(['/api/nodes'])
+
+// Middleware runs on the edge runtime without the file-backed logger, so its tracing is debug-only
+const DEBUG = process.env.LOG_LEVEL === 'debug'
+
 export function middleware(request) {
-  // Log all requests for debugging
-  console.log(`[MIDDLEWARE] ${request.method} ${request.url} - ${request.nextUrl.pathname}`)
+  if (DEBUG) {
+    console.log(`[MIDDLEWARE] ${request.method} ${request.url} - ${request.nextUrl.pathname}`)
+  }
   
   // Handle CORS preflight requests
   if (request.method === 'OPTIONS') {
     const response = new NextResponse(null, { status: 200 })
     response.headers.set('Access-Control-Allow-Origin', '*')
     response.headers.set('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With')
+    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Idempotency-Key')
     response.headers.set('Access-Control-Max-Age', '86400')
-    console.log('[MIDDLEWARE] Handled OPTIONS request')
     return response
   }
 
   // Add CORS headers for API routes
   if (request.nextUrl.pathname.startsWith('/api')) {
-    console.log('[MIDDLEWARE] Processing API request:', request.nextUrl.pathname)
     const response = NextResponse.next()
     
     response.headers.set('Access-Control-Allow-Origin', '*')
     response.headers.set('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With')
-    response.headers.set('Cache-Control', 'no-cache, no-store, must-revalidate')
+    response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Idempotency-Key')
+    // The node catalog is cacheable; its route sets ETag and Cache-Control itself
+    if (!CACHEABLE_API_PATHS.has(request.nextUrl.pathname)) {
+      response.headers.set('Cache-Control', 'no-cache, no-store, must-revalidate')
+    }
     
     // Add security headers
     response.headers.set('X-Content-Type-Options', 'nosniff')
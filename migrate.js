@@ -0,0 +1,298 @@
+#!/usr/bin/env node
+/**
+ * Database migration runner for the TRX Mining Platform
+ * Applies the ordered, checksummed migrations in lib/database/migrations
+ *
+ * Usage:
+ *   node migrate.js            apply pending migrations
+ *   node migrate.js --dry-run  print the plan and lock warnings without applying anything
+ */
+
+const { Client } = require('pg')
+const crypto = require('crypto')
+const fs = require('fs')
+const path = require('path')
+require('dotenv').config()
+
+const MIGRATIONS_DIR = path.join(__dirname, 'lib', 'database', 'migrations')
+const MIGRATION_FILE = /^(\d{4})_([a-z0-9_]+)\.sql$/
+const NO_TRANSACTION = /^--\s*migrate:no-transaction\s*$/m
+
+// Arbitrary key so only one runner applies migrations at a time
+const ADVISORY_LOCK_KEY = 7_202_030
+
+/**
+ * Load migrations from disk in version order
+ */
+function loadMigrations(dir = MIGRATIONS_DIR) {
+  return fs.readdirSync(dir)
+    .filter(file => MIGRATION_FILE.test(file))
+    .sort()
+    .map(file => {
+      const [, version, name] = file.match(MIGRATION_FILE)
+      const sql = fs.readFileSync(path.join(dir, file), 'utf8')
+      return {
+        version,
+        name,
+        file,
+        sql,
+        checksum: crypto.createHash('sha256').update(sql).digest('hex'),
+        transactional: !NO_TRANSACTION.test(sql)
+      }
+    })
+}
+
+/**
+ * Split a SQL file into statements, respecting quotes, dollar quotes and comments
+ */
+function splitStatements(sql) {
+  const statements = []
+  let current = ''
+  let i = 0
+
+  while (i < sql.length) {
+    const rest = sql.slice(i)
+
+    if (rest.startsWith('--')) {
+      const end = sql.indexOf('\n', i)
+      i = end === -1 ? sql.length : end + 1
+      continue
+    }
+
+    const dollarTag = rest.match(/^\$[a-zA-Z_]*\$/)
+    if (dollarTag) {
+      const end = sql.indexOf(dollarTag[0], i + dollarTag[0].length)
+      const stop = end === -1 ? sql.length : end + dollarTag[0].length
+      current += sql.slice(i, stop)
+      i = stop
+      continue
+    }
+
+    if (sql[i] === "'") {
+      let end = i + 1
+      while (end < sql.length && !(sql[end] === "'" && sql[end + 1] !== "'")) {
+        end += sql[end] === "'" ? 2 : 1
+      }
+      current += sql.slice(i, end + 1)
+      i = end + 1
+      continue
+    }
+
+    if (sql[i] === ';') {
+      if (current.trim()) statements.push(current.trim())
+      current = ''
+      i++
+      continue
+    }
+
+    current += sql[i]
+    i++
+  }
+
+  if (current.trim()) statements.push(current.trim())
+  return statements
+}
+
+/**
+ * Describe the locking impact of a statement for the dry-run planner
+ */
+function describeLocks(statement, estimates) {
+  const rows = table => {
+    const count = estimates.get(table)
+    return count === undefined ? 'new table' : `~${Math.max(count, 0).toLocaleString()} rows`
+  }
+
+  const index = statement.match(/^CREATE\s+(UNIQUE\s+)?INDEX\s+(CONCURRENTLY\s+)?(?:IF NOT EXISTS\s+)?\w+\s+ON\s+(\w+)/i)
+  if (index) {
+    return index[2]
+      ? `online index build on ${index[3]} (${rows(index[3])})`
+      : `⚠️  blocks writes on ${index[3]} while the index builds (${rows(index[3])})`
+  }
+
+  const alter = statement.match(/^ALTER\s+TABLE\s+(?:IF EXISTS\s+)?(\w+)/i)
+  if (alter) {
+    return `ACCESS EXCLUSIVE lock on ${alter[1]} (${rows(alter[1])})`
+  }
+
+  return null
+}
+
+async function ensureMigrationsTable(client) {
+  await client.query(`
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+      version VARCHAR(16) PRIMARY KEY,
+      name VARCHAR(255) NOT NULL,
+      checksum CHAR(64) NOT NULL,
+      execution_ms INTEGER,
+      applied_at TIMESTAMPTZ DEFAULT NOW()
+    )
+  `)
+}
+
+async function getAppliedMigrations(client) {
+  const { rows } = await client.query('SELECT version, name, checksum FROM schema_migrations ORDER BY version')
+  return new Map(rows.map(row => [row.version, row]))
+}
+
+/**
+ * Refuse to continue if an applied migration was edited after the fact
+ */
+function verifyChecksums(migrations, applied) {
+  for (const migration of migrations) {
+    const record = applied.get(migration.version)
+    if (record && record.checksum.trim() !== migration.checksum) {
+      throw new Error(
+        `Migration ${migration.file} was modified after it was applied ` +
+        `(recorded ${record.checksum.substring(0, 12)}, now ${migration.checksum.substring(0, 12)})`
+      )
+    }
+  }
+}
+
+async function getRowEstimates(client) {
+  const { rows } = await client.query(`
+    SELECT c.relname, c.reltuples::BIGINT AS estimate
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+  `)
+  return new Map(rows.map(row => [row.relname, Number(row.estimate)]))
+}
+
+/**
+ * Drop indexes left INVALID by an interrupted CREATE INDEX CONCURRENTLY,
+ * otherwise IF NOT EXISTS would silently skip them
+ */
+async function dropInvalidIndexes(client, statements) {
+  for (const statement of statements) {
+    const match = statement.match(/^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF NOT EXISTS\s+)?(\w+)/i)
+    if (!match) continue
+
+    const { rows } = await client.query(`
+      SELECT 1
+      FROM pg_index i
+      JOIN pg_class c ON c.oid = i.indexrelid
+      WHERE c.relname = $1 AND NOT i.indisvalid
+    `, [match[1]])
+
+    if (rows.length > 0) {
+      console.log(`   🧹 Dropping invalid index ${match[1]} from an interrupted build`)
+      await client.query(`DROP INDEX CONCURRENTLY IF EXISTS ${match[1]}`)
+    }
+  }
+}
+
+async function applyMigration(client, migration) {
+  const startedAt = Date.now()
+
+  if (migration.transactional) {
+    await client.query('BEGIN')
+    try {
+      await client.query(migration.sql)
+      await client.query(
+        'INSERT INTO schema_migrations (version, name, checksum, execution_ms) VALUES ($1, $2, $3, $4)',
+        [migration.version, migration.name, migration.checksum, Date.now() - startedAt]
+      )
+      await client.query('COMMIT')
+    } catch (error) {
+      await client.query('ROLLBACK')
+      throw error
+    }
+  } else {
+    // Statements such as CREATE INDEX CONCURRENTLY cannot run inside a transaction;
+    // each one is idempotent so a partial run can simply be retried
+    const statements = splitStatements(migration.sql)
+    await dropInvalidIndexes(client, statements)
+    for (const statement of statements) {
+      await client.query(statement)
+    }
+    await client.query(
+      'INSERT INTO schema_migrations (version, name, checksum, execution_ms) VALUES ($1, $2, $3, $4)',
+      [migration.version, migration.name, migration.checksum, Date.now() - startedAt]
+    )
+  }
+
+  return Date.now() - startedAt
+}
+
+function printPlan(pending, estimates) {
+  if (pending.length === 0) {
+    console.log('✅ Database is up to date, nothing to apply')
+    return
+  }
+
+  console.log(`📋 ${pending.length} pending migration(s):`)
+  for (const migration of pending) {
+    const statements = splitStatements(migration.sql)
+    const mode = migration.transactional ? 'single transaction' : 'no transaction'
+    console.log(`\n   ${migration.file}  [${mode}, ${statements.length} statements, sha256 ${migration.checksum.substring(0, 12)}]`)
+
+    for (const statement of statements) {
+      const locks = describeLocks(statement, estimates)
+      if (locks) {
+        console.log(`      - ${locks}`)
+      }
+    }
+  }
+}
+
+/**
+ * Apply (or with dryRun, plan) all pending migrations
+ */
+async function migrate({ connectionString, dryRun = false, dir = MIGRATIONS_DIR } = {}) {
+  const useSSL = !/@(localhost|127\.0\.0\.1)[:/]/.test(connectionString)
+  const client = new Client({
+    connectionString,
+    ssl: useSSL ? { rejectUnauthorized: false } : false
+  })
+
+  await client.connect()
+  try {
+    await client.query('SELECT pg_advisory_lock($1)', [ADVISORY_LOCK_KEY])
+
+    await ensureMigrationsTable(client)
+    const migrations = loadMigrations(dir)
+    const applied = await getAppliedMigrations(client)
+    verifyChecksums(migrations, applied)
+
+    const pending = migrations.filter(migration => !applied.has(migration.version))
+
+    if (dryRun) {
+      printPlan(pending, await getRowEstimates(client))
+      return { applied: [], pending: pending.map(migration => migration.version) }
+    }
+
+    const results = []
+    for (const migration of pending) {
+      console.log(`⚡ Applying ${migration.file}...`)
+      const ms = await applyMigration(client, migration)
+      console.log(`   ✅ ${migration.file} applied in ${ms}ms`)
+      results.push({ version: migration.version, ms })
+    }
+
+    if (results.length === 0) {
+      console.log('✅ Database is up to date, nothing to apply')
+    }
+    return { applied: results, pending: [] }
+  } finally {
+    await client.query('SELECT pg_advisory_unlock($1)', [ADVISORY_LOCK_KEY]).catch(() => {})
+    await client.end()
+  }
+}
+
+module.exports = { loadMigrations, splitStatements, migrate }
+
+if (require.main === module) {
+  const connectionString = process.env.DATABASE_URL || process.env.POSTGRES_URL_NON_POOLING || process.env.POSTGRES_URL
+
+  if (!connectionString) {
+    console.error('❌ Missing DATABASE_URL / POSTGRES_URL environment variable')
+    process.exit(1)
+  }
+
+  migrate({ connectionString, dryRun: process.argv.includes('--dry-run') })
+    .catch(error => {
+      console.error('❌ Migration failed:', error.message)
+      process.exit(1)
+    })
+}
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Migration Benchmark for TRX Mining Platform
+Applies lib/database/migrations to a fresh local Postgres with migrate.js, checks
+re-runs are no-ops, then rebuilds the performance indexes on large tables while a
+writer keeps inserting, comparing CREATE INDEX CONCURRENTLY with a blocking build
+"""
+
+import os
+import threading
+import time
+
+from benchmark_utils import connect, apply_schema, seed_users, summarize
+
+USERS = int(os.getenv('BENCH_USERS', '1000000'))
+INDEX_MIGRATION = '0004'
+
+
+class Writer(threading.Thread):
+    """Inserts users continuously and records per-insert latency"""
+
+    def __init__(self, prefix):
+        super().__init__(daemon=True)
+        self.prefix = prefix
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        conn = connect()
+        with conn.cursor() as cur:
+            i = 0
+            while not self.stopped.is_set():
+                i += 1
+                start = time.perf_counter()
+                cur.execute(
+                    "INSERT INTO users (username, email, password, referral_code) VALUES (%s, %s, %s, %s)",
+                    (f"{self.prefix}_{i}", f"{self.prefix}_{i}@trxmining.com", 'benchpass123', f"{self.prefix[:6]}{i}".upper())
+                )
+                self.samples.append((time.perf_counter() - start) * 1000)
+        conn.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return summarize(self.samples)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<45} {elapsed * 1000:10.1f} ms")
+    return result, elapsed
+
+
+def index_names(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND indexname LIKE 'idx_%%'")
+        return [row[0] for row in cur.fetchall()]
+
+
+def main():
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("DROP SCHEMA public CASCADE")
+        cur.execute("CREATE SCHEMA public")
+
+    print("=" * 80)
+    print("MIGRATIONS ON AN EMPTY DATABASE")
+    print("=" * 80)
+    plan, _ = timed("dry-run plan", lambda: apply_schema(dry_run=True))
+    print(plan)
+    timed("apply all migrations", apply_schema)
+    output, _ = timed("re-run (should be a no-op)", apply_schema)
+    print(f"   {'✅' if 'up to date' in output else '❌'} {output.strip()}\n")
+
+    print("=" * 80)
+    print(f"INDEX MIGRATION ON LARGE TABLES ({USERS:,} users)")
+    print("=" * 80)
+    seed_users(conn, USERS)
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE users")
+
+    # Roll the index migration back so it can be replayed against the seeded data
+    indexes = index_names(conn)
+    with conn.cursor() as cur:
+        for name in indexes:
+            cur.execute(f"DROP INDEX IF EXISTS {name}")
+        cur.execute("DELETE FROM schema_migrations WHERE version = %s", (INDEX_MIGRATION,))
+
+    plan = apply_schema(dry_run=True)
+    print(plan)
+
+    writer = Writer('online_writer')
+    writer.start()
+    timed(f"apply {INDEX_MIGRATION} (CONCURRENTLY) under writes", apply_schema)
+    online = writer.stop()
+
+    # Same build on the largest table without CONCURRENTLY for comparison
+    with conn.cursor() as cur:
+        cur.execute("DROP INDEX IF EXISTS idx_users_created_at")
+    writer = Writer('blocking_writer')
+    writer.start()
+    with conn.cursor() as cur:
+        timed("plain CREATE INDEX idx_users_created_at", lambda: cur.execute(
+            "CREATE INDEX idx_users_created_at ON users(created_at)"))
+    blocking = writer.stop()
+
+    print()
+    print(f"   writer during CONCURRENTLY build: {online['runs']:6d} inserts, p95 {online['p95']:7.2f} ms, max {online['max']:8.2f} ms")
+    print(f"   writer during blocking build:     {blocking['runs']:6d} inserts, p95 {blocking['p95']:7.2f} ms, max {blocking['max']:8.2f} ms")
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid"
+        )
+        invalid = [row[0] for row in cur.fetchall()]
+    print(f"\n   {'✅' if not invalid else '❌'} invalid indexes after migration: {invalid or 'none'}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
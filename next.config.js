@@ -4,7 +4,12 @@ const nextConfig = {
     unoptimized: true,
   },
   experimental: {
-    serverComponentsExternalPackages: ['mongodb'],
+    serverComponentsExternalPackages: ['mongodb', 'pg'],
+    instrumentationHook: true,
+    // The startup schema check reads the migrations, so ship them with the standalone build
+    outputFileTracingIncludes: {
+      '/api/[[...path]]': ['./lib/database/migrations/*.sql'],
+    },
   },
   webpack(config, { dev }) {
     if (dev) {
@@ -27,7 +32,13 @@ const nextConfig = {
         headers: [
           { key: "Access-Control-Allow-Origin", value: "*" },
           { key: "Access-Control-Allow-Methods", value: "GET, POST, PUT, DELETE, OPTIONS" },
-          { key: "Access-Control-Allow-Headers", value: "Content-Type, Authorization, X-Requested-With" },
+          { key: "Access-Control-Allow-Headers", value: "Content-Type, Authorization, X-Requested-With, Idempotency-Key" },
+        ],
+      },
+      {
+        // Everything under /api except the node catalog, which sets its own ETag and max-age
+        source: "/api/:path((?!nodes$).*)",
+        headers: [
           { key: "Cache-Control", value: "no-cache, no-store, must-revalidate" },
         ],
       },
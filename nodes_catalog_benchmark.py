@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Node Catalog Benchmark for TRX Mining Platform
+Compares full GET /api/nodes responses against conditional GETs that revalidate with
+If-None-Match and get a bodiless 304, on /api and the /trx-api fallback, and checks
+that the catalog carries a strong ETag and cacheable headers instead of no-store.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import start_server, stop_server, wait_for_server, summarize, print_result
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+SERVER_URL = f"http://localhost:{PORT}"
+BASE_URL = f"{SERVER_URL}/api"
+HEADERS = {
+    'User-Agent': 'TRX-Mining-Node-Catalog-Benchmark/1.0'
+}
+REQUESTS = int(os.getenv('BENCH_REQUESTS', '2000'))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', '20'))
+
+
+def fetch(session, url, etag=None):
+    headers = {**HEADERS, 'If-None-Match': etag} if etag else HEADERS
+    start = time.perf_counter()
+    response = session.get(url, headers=headers, timeout=10)
+    return (time.perf_counter() - start) * 1000, response.status_code, len(response.content)
+
+
+def run(url, etag=None):
+    """Fire REQUESTS GETs from CLIENTS keep-alive sessions; returns (summary, req/s, statuses, bytes)"""
+    sessions = [requests.Session() for _ in range(CLIENTS)]
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        results = list(pool.map(lambda i: fetch(sessions[i % CLIENTS], url, etag), range(REQUESTS)))
+    wall = time.perf_counter() - started_at
+    for session in sessions:
+        session.close()
+
+    statuses = {}
+    for _, status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return summarize([elapsed for elapsed, _, _ in results]), REQUESTS / wall, statuses, sum(size for _, _, size in results)
+
+
+def check_headers(url):
+    """The catalog must be cacheable and revalidate to a 304 with the same ETag"""
+    first = requests.get(url, headers=HEADERS, timeout=10)
+    second = requests.get(url, headers=HEADERS, timeout=10)
+    etag = first.headers.get('ETag')
+    cache_control = first.headers.get('Cache-Control', '')
+    revalidated = requests.get(url, headers={**HEADERS, 'If-None-Match': etag}, timeout=10)
+
+    problems = []
+    if not etag or etag.startswith('W/'):
+        problems.append(f"expected a strong ETag, got {etag!r}")
+    if second.headers.get('ETag') != etag:
+        problems.append("ETag changed between identical requests")
+    if 'no-store' in cache_control or 'max-age' not in cache_control:
+        problems.append(f"Cache-Control is not cacheable: {cache_control!r}")
+    if revalidated.status_code != 304 or revalidated.content:
+        problems.append(f"conditional GET returned {revalidated.status_code} with {len(revalidated.content)} bytes")
+    return etag, cache_control, problems
+
+
+def main():
+    print("=" * 80)
+    print(f"NODE CATALOG BENCHMARK ({REQUESTS} requests, {CLIENTS} clients)")
+    print("=" * 80)
+
+    process = start_server(PORT)
+    try:
+        wait_for_server(BASE_URL)
+        endpoints = {'/api/nodes': f"{BASE_URL}/nodes", '/trx-api?path=nodes': f"{SERVER_URL}/trx-api?path=nodes"}
+
+        results = []
+        for label, url in endpoints.items():
+            etag, cache_control, problems = check_headers(url)
+            print(f"   {label}: ETag {etag}, Cache-Control {cache_control!r}")
+            for problem in problems:
+                print(f"   ⚠️  {problem}")
+
+            run(url)  # warm-up
+            results.append((f"{label} full GET", *run(url)))
+            results.append((f"{label} If-None-Match", *run(url, etag)))
+    finally:
+        stop_server(process)
+
+    print()
+    for label, latency, throughput, statuses, size in results:
+        print_result(label, latency)
+        print(f"   {'':<40} {throughput:8.0f} req/s   statuses {statuses}   {size / REQUESTS:6.0f} bytes/response")
+
+
+if __name__ == "__main__":
+    main()
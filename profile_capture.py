@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Profile Capture Helper for TRX Mining Platform
+Drives a load run against a running server (purchases plus a spread of client IPs
+for the rate limiter) and, in the middle of it, asks the admin diagnostics
+endpoint for a CPU profile or a heap snapshot. CPU profiles are then summarized
+by self time per function. ADMIN_API_TOKEN must match the server's.
+
+    python profile_capture.py capture --duration-ms 5000 --load-seconds 20
+    python profile_capture.py capture --kind heap
+    python profile_capture.py summarize .data/diagnostics/cpu-1234-....cpuprofile
+"""
+
+import argparse
+import json
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Configuration
+BASE_URL = os.getenv('BASE_URL', 'http://localhost:3000/api')
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Profile-Capture/1.0'
+}
+ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN', '')
+TOP_FUNCTIONS = 25
+# V8 pseudo-frames rather than JavaScript functions
+META_FRAMES = {'(idle)', '(program)', '(garbage collector)', '(root)'}
+
+
+def load_worker(worker, stop):
+    """Purchases with unknown hashes from fresh IPs, plus GETs from a few IPs that overrun the limit"""
+    session = requests.Session()
+    n = 0
+    while not stop.is_set():
+        n += 1
+        ip = f"10.50.{worker}.{n % 250}" if n % 4 else f"10.51.{worker}.{n // 4 % 250}"
+        headers = {**HEADERS, 'X-Forwarded-For': ip}
+        try:
+            if n % 2:
+                session.post(f"{BASE_URL}/nodes/purchase", headers=headers, timeout=30, json={
+                    'nodeId': 'node1', 'transactionHash': secrets.token_hex(32),
+                    'userId': '00000000-0000-4000-8000-000000000000'
+                })
+            else:
+                session.get(f"{BASE_URL}/auth/user", headers=headers, timeout=30)
+        except requests.exceptions.RequestException:
+            pass
+
+
+def capture(kind, duration_ms):
+    path = '/admin/diagnostics/cpu-profile' if kind == 'cpu' else '/admin/diagnostics/heap-snapshot'
+    headers = {**HEADERS, 'Authorization': f"Bearer {ADMIN_API_TOKEN}", 'X-Forwarded-For': '10.50.255.1'}
+    response = requests.post(f"{BASE_URL}{path}", json={'durationMs': duration_ms}, headers=headers,
+                             timeout=duration_ms / 1000 + 120)
+    if response.status_code != 200:
+        raise SystemExit(f"❌ Capture failed: HTTP {response.status_code} {response.text}")
+    return response.json()['capture']
+
+
+def summarize(profile_path, top=TOP_FUNCTIONS):
+    """Self time per function from a .cpuprofile (samples × time deltas attributed to the leaf frame)"""
+    with open(profile_path) as handle:
+        profile = json.load(handle)
+
+    frames = {node['id']: node['callFrame'] for node in profile['nodes']}
+    self_us = defaultdict(int)
+    for node_id, delta in zip(profile.get('samples', []), profile.get('timeDeltas', [])):
+        frame = frames[node_id]
+        location = f"{frame['url']}:{frame['lineNumber'] + 1}" if frame['url'] else '(native)'
+        self_us[(frame['functionName'] or '(anonymous)', location)] += max(delta, 0)
+
+    total = sum(self_us.values()) or 1
+    busy = sum(us for (name, _), us in self_us.items() if name not in META_FRAMES) or 1
+    print(f"   {profile_path}: {total / 1000:.0f} ms sampled, {busy / total:.1%} busy")
+    for name in sorted(META_FRAMES - {'(root)'}):
+        us = sum(value for (frame, _), value in self_us.items() if frame == name)
+        print(f"   {name:<20} {us / 1000:9.1f} ms")
+    print()
+    print(f"   {'self ms':>9} {'% busy':>7}  function")
+    ranked = sorted(((us, key) for key, us in self_us.items() if key[0] not in META_FRAMES), reverse=True)
+    for us, (name, location) in ranked[:top]:
+        print(f"   {us / 1000:9.1f} {us / busy:7.1%}  {name}  {location}")
+
+
+def run_capture(args):
+    if not ADMIN_API_TOKEN:
+        raise SystemExit("❌ Set ADMIN_API_TOKEN to the server's admin token")
+
+    print("=" * 80)
+    print(f"PROFILE CAPTURE ({args.kind}, {args.load_seconds}s load from {args.clients} clients against {BASE_URL})")
+    print("=" * 80)
+
+    # Centre the capture in the load run
+    lead = max(0, args.load_seconds / 2 - (args.duration_ms / 2000 if args.kind == 'cpu' else 0))
+    stop = threading.Event()
+    with ThreadPoolExecutor(args.clients) as pool:
+        for worker in range(args.clients):
+            pool.submit(load_worker, worker, stop)
+
+        time.sleep(lead)
+        try:
+            result = capture(args.kind, args.duration_ms)
+            time.sleep(lead)
+        finally:
+            stop.set()
+
+    print(f"   🩺 {result['file']} ({result['bytes']:,} bytes, {result['durationMs']} ms)")
+    if args.kind == 'cpu':
+        if os.path.exists(result['file']):
+            print()
+            summarize(result['file'], args.top)
+        else:
+            print("   The profile is on the server's disk; copy it here and run: "
+                  f"python profile_capture.py summarize {os.path.basename(result['file'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Capture and summarize CPU profiles and heap snapshots')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    capture_parser = commands.add_parser('capture', help='load the server and capture in the middle of the run')
+    capture_parser.add_argument('--kind', choices=('cpu', 'heap'), default='cpu')
+    capture_parser.add_argument('--duration-ms', type=int, default=5000)
+    capture_parser.add_argument('--load-seconds', type=float, default=20)
+    capture_parser.add_argument('--clients', type=int, default=8)
+    capture_parser.add_argument('--top', type=int, default=TOP_FUNCTIONS)
+
+    summarize_parser = commands.add_parser('summarize', help='top self-time functions of a .cpuprofile')
+    summarize_parser.add_argument('profile')
+    summarize_parser.add_argument('--top', type=int, default=TOP_FUNCTIONS)
+
+    args = parser.parse_args()
+    if args.command == 'capture':
+        run_capture(args)
+    else:
+        summarize(args.profile, args.top)
+
+
+if __name__ == "__main__":
+    main()
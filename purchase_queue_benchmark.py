@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Purchase Queue Benchmark for TRX Mining Platform
+With the local Trongrid stand-in made slow, compares synchronous /api/nodes/purchase
+against submit-and-poll (Prefer: respond-async): accepted requests per second at the
+endpoint, then how fast the worker pool drains the purchase_jobs queue.
+BENCH_DATABASE_URL must be the database behind the app's local Supabase stack.
+"""
+
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import (
+    connect, apply_schema, start_server, stop_server, wait_for_server, summarize, print_result
+)
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Purchase-Queue-Benchmark/1.0'
+}
+PURCHASES = int(os.getenv('BENCH_PURCHASES', '300'))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', '50'))
+WORKERS = int(os.getenv('BENCH_QUEUE_WORKERS', '8'))
+UPSTREAM_LATENCY_MS = int(os.getenv('BENCH_UPSTREAM_LATENCY_MS', '1000'))
+
+request_count = 0
+
+
+def client_headers(extra=None):
+    # Distinct client IPs so the rate limiter doesn't throttle the benchmark itself
+    global request_count
+    request_count += 1
+    return {**HEADERS, **(extra or {}), 'X-Forwarded-For': f"10.35.{request_count // 250 % 250}.{request_count % 250}"}
+
+
+def create_users(pool, count, run_id):
+    return list(pool.map(lambda i: requests.post(
+        f"{BASE_URL}/auth/signup",
+        json={'username': f"queue_{run_id}_{i}", 'password': 'benchpass123'},
+        headers=client_headers(),
+        timeout=30
+    ).json()['user']['id'], range(count)))
+
+
+def submit(user_id, node_id, prefer_async):
+    start = time.perf_counter()
+    response = requests.post(
+        f"{BASE_URL}/nodes/purchase",
+        json={'nodeId': node_id, 'transactionHash': secrets.token_hex(32), 'userId': user_id},
+        headers=client_headers({'Prefer': 'respond-async'} if prefer_async else None),
+        timeout=120
+    )
+    return (time.perf_counter() - start) * 1000, response
+
+
+def fire(pool, user_ids, node_id, prefer_async):
+    """Submit one purchase per user; returns (wall seconds, latency summary, responses)"""
+    started_at = time.perf_counter()
+    results = list(pool.map(lambda user_id: submit(user_id, node_id, prefer_async), user_ids))
+    wall = time.perf_counter() - started_at
+    return wall, summarize([elapsed for elapsed, _ in results]), [response for _, response in results]
+
+
+def queue_depth(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM purchase_jobs WHERE status IN ('queued', 'processing')")
+        return cur.fetchone()[0]
+
+
+def main():
+    conn = connect()
+    apply_schema()
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE purchase_jobs")
+
+    print("=" * 80)
+    print(f"PURCHASE QUEUE BENCHMARK ({PURCHASES} purchases, {CLIENTS} clients, "
+          f"{WORKERS} workers, upstream {UPSTREAM_LATENCY_MS} ms)")
+    print("=" * 80)
+
+    standin = TrongridStandIn(STANDIN_PORT, latency_ms=UPSTREAM_LATENCY_MS).start()
+    process = start_server(PORT, {
+        'TRX_VERIFIER': 'enhanced',
+        'TRONGRID_API_URL': standin.url,
+        'PURCHASE_QUEUE_CONCURRENCY': str(WORKERS)
+    })
+    try:
+        wait_for_server(BASE_URL)
+        with ThreadPoolExecutor(CLIENTS) as pool:
+            user_ids = create_users(pool, PURCHASES, secrets.token_hex(3))
+
+            # Synchronous: every request holds a connection through verification
+            standin.behaviour['amount_sun'] = 75 * 1_000_000
+            sync_wall, sync_latency, sync_responses = fire(pool, user_ids, 'node2', prefer_async=False)
+
+            # Submit-and-poll: accept now, verify in the worker pool
+            standin.behaviour['amount_sun'] = 50 * 1_000_000
+            async_wall, async_latency, async_responses = fire(pool, user_ids, 'node1', prefer_async=True)
+            accepted_at = time.perf_counter()
+
+        peak = depth = queue_depth(conn)
+        while depth > 0 and time.perf_counter() - accepted_at < 600:
+            time.sleep(0.1)
+            depth = queue_depth(conn)
+            peak = max(peak, depth)
+        drain = time.perf_counter() - accepted_at
+
+        job_ids = [response.json()['jobId'] for response in async_responses if response.status_code == 202]
+        statuses = {}
+        for job_id in job_ids[:20]:
+            job = requests.get(f"{BASE_URL}/nodes/purchase/status", params={'jobId': job_id},
+                               headers=client_headers(), timeout=10).json()
+            statuses[job['status']] = statuses.get(job['status'], 0) + 1
+    finally:
+        stop_server(process)
+        standin.stop()
+        conn.close()
+
+    sync_ok = sum(1 for response in sync_responses if response.status_code == 200)
+    print_result("sync purchase", sync_latency)
+    print_result("async submit (202)", async_latency)
+    print()
+    print(f"   sync:   {sync_ok}/{PURCHASES} completed, {PURCHASES / sync_wall:8.1f} req/s accepted")
+    print(f"   async:  {len(job_ids)}/{PURCHASES} accepted, {PURCHASES / async_wall:8.1f} req/s accepted")
+    print(f"   queue:  peak depth {peak}, drained in {drain:.1f}s after the last submit "
+          f"({len(job_ids) / (async_wall + drain):.1f} jobs/s end to end)")
+    print(f"   status of first {min(20, len(job_ids))} jobs: {statuses}")
+
+
+if __name__ == "__main__":
+    main()
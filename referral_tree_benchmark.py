@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Referral Tree Benchmark for TRX Mining Platform
+Seeds a power-law referral graph with seed_data.py (1M users by default), then compares
+downline-per-level and top-referrer queries answered from referral_closure against the
+same answers computed with a recursive CTE over referrals, checks both agree, and
+measures what the closure trigger adds to inserting a referral.
+"""
+
+import os
+import random
+import time
+import uuid
+
+from benchmark_utils import connect, apply_schema, time_query, summarize, print_result
+from seed_data import generate_dataset, teardown_dataset
+
+USERS = int(os.getenv('BENCH_USERS', '1000000'))
+SEED = int(os.getenv('BENCH_SEED', '39'))
+PREFIX = 'reftree'
+SAMPLE_USERS = int(os.getenv('BENCH_SAMPLE_USERS', '50'))
+NEW_REFERRALS = int(os.getenv('BENCH_NEW_REFERRALS', '500'))
+
+CLOSURE_DOWNLINE = "SELECT depth, members FROM get_referral_downline(%s)"
+CTE_DOWNLINE = """
+    WITH RECURSIVE downline (id, depth) AS (
+        SELECT referred_id, 1 FROM referrals WHERE referrer_id = %s
+        UNION ALL
+        SELECT r.referred_id, d.depth + 1 FROM downline d JOIN referrals r ON r.referrer_id = d.id
+    )
+    SELECT depth, COUNT(*) FROM downline GROUP BY depth ORDER BY depth
+"""
+CLOSURE_TOP = "SELECT user_id, downline FROM get_top_referrers(20)"
+CTE_TOP = """
+    WITH RECURSIVE paths (ancestor_id, descendant_id) AS (
+        SELECT referrer_id, referred_id FROM referrals
+        UNION ALL
+        SELECT p.ancestor_id, r.referred_id FROM paths p JOIN referrals r ON r.referrer_id = p.descendant_id
+    )
+    SELECT ancestor_id, COUNT(*) AS downline FROM paths GROUP BY ancestor_id ORDER BY downline DESC LIMIT 20
+"""
+
+
+def timed_per_user(conn, sql, user_ids):
+    """Run `sql` once per user; returns (latency summary, {user_id: rows})"""
+    samples, answers = [], {}
+    with conn.cursor() as cur:
+        for user_id in user_ids:
+            start = time.perf_counter()
+            cur.execute(sql, (user_id,))
+            answers[user_id] = [(depth, int(members)) for depth, members in cur.fetchall()]
+            samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples), answers
+
+
+def sample_referrers(conn):
+    """The five biggest referrers plus a random sample of users with at least one referral"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT user_id FROM get_top_referrers(5)")
+        top = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT DISTINCT referrer_id FROM referrals TABLESAMPLE SYSTEM (1) LIMIT %s", (SAMPLE_USERS,))
+        return top, top + [row[0] for row in cur.fetchall()]
+
+
+def insert_referrals(conn, parents):
+    """Sign up NEW_REFERRALS users under existing users and time the referral insert alone"""
+    samples = []
+    closure_rows = 0
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM referral_closure")
+        before = cur.fetchone()[0]
+        for i in range(NEW_REFERRALS):
+            user_id = str(uuid.uuid4())
+            cur.execute(
+                "INSERT INTO users (id, username, email, password, referral_code) VALUES (%s, %s, %s, %s, %s)",
+                (user_id, f"reftree_new_{user_id[:12]}", f"{user_id}@reftree.trxmining.com", 'benchpass123',
+                 f"RT{user_id[:12]}".upper())
+            )
+            start = time.perf_counter()
+            cur.execute(
+                "INSERT INTO referrals (referrer_id, referred_id, referral_code) VALUES (%s, %s, 'BENCH')",
+                (parents[i % len(parents)], user_id)
+            )
+            samples.append((time.perf_counter() - start) * 1000)
+        cur.execute("SELECT COUNT(*) FROM referral_closure")
+        closure_rows = cur.fetchone()[0] - before
+        cur.execute("DELETE FROM users WHERE username LIKE 'reftree\\_new\\_%'")
+    return summarize(samples), closure_rows
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"REFERRAL TREE BENCHMARK ({USERS:,} users, seed {SEED})")
+    print("=" * 80)
+    teardown_dataset(SEED, PREFIX, verbose=False)
+    counts = generate_dataset(USERS, SEED, PREFIX)
+
+    try:
+        top, user_ids = sample_referrers(conn)
+        print(f"\n   sampled {len(user_ids)} referrers ({len(top)} largest downlines included)\n")
+
+        closure, closure_answers = timed_per_user(conn, CLOSURE_DOWNLINE, user_ids)
+        cte, cte_answers = timed_per_user(conn, CTE_DOWNLINE, user_ids)
+        print_result("downline per level, closure table", closure)
+        print_result("downline per level, recursive CTE", cte)
+        mismatched = [user_id for user_id in user_ids if closure_answers[user_id] != cte_answers[user_id]]
+        print(f"   {'✅' if not mismatched else '❌'} {len(user_ids) - len(mismatched)}/{len(user_ids)} "
+              f"downlines agree")
+
+        largest = max(top, key=lambda user_id: sum(members for _, members in closure_answers[user_id]))
+        levels = closure_answers[largest]
+        print(f"   largest downline: {sum(m for _, m in levels):,} members over {len(levels)} levels\n")
+
+        print_result("top 20 referrers, closure table", time_query(conn, CLOSURE_TOP, runs=3))
+        print_result("top 20 referrers, recursive CTE", time_query(conn, CTE_TOP, runs=3))
+        with conn.cursor() as cur:
+            cur.execute(CLOSURE_TOP)
+            closure_top = [int(downline) for _, downline in cur.fetchall()]
+            cur.execute(CTE_TOP)
+            cte_top = [int(downline) for _, downline in cur.fetchall()]
+        # Compare downline sizes; users tied on size may come back in either order
+        print(f"   {'✅' if closure_top == cte_top else '❌'} top referrer downline sizes agree\n")
+
+        # Attach new users under random members, biased deep, so the trigger copies long ancestor chains
+        with conn.cursor() as cur:
+            cur.execute("SELECT descendant_id FROM referral_closure WHERE depth >= 3 LIMIT 5000")
+            parents = [row[0] for row in cur.fetchall()] or user_ids
+        random.Random(SEED).shuffle(parents)
+        inserts, closure_rows = insert_referrals(conn, parents)
+        print_result("referral insert incl. closure trigger", inserts)
+        print(f"   {closure_rows / NEW_REFERRALS:.1f} closure rows written per referral "
+              f"({counts['referrals']:,} seeded referrals)")
+    finally:
+        teardown_dataset(SEED, PREFIX)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
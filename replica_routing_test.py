@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Read-Replica Routing Testing for TRX Mining Platform
+Runs the app against a primary/replica pair of local Supabase REST stand-ins
+(supabase_standin.py) and checks that listings are read from the replica, that a
+user who just wrote reads from the primary until the read-your-writes window
+closes (in this process and, through the pin cookie, in any other), that a
+lagging replica is dropped until it catches up, and that an unreachable replica
+costs no failed requests. SUPABASE_LOCAL_URL must be the local Supabase stack.
+"""
+
+import os
+import secrets
+import time
+from datetime import datetime
+
+import requests
+
+from benchmark_utils import apply_schema, start_server, stop_server, wait_for_server
+from metrics_test import parse_metrics, metric_total
+from supabase_standin import RestStandIn
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+PRIMARY_PORT = int(os.getenv('PRIMARY_STANDIN_PORT', '54331'))
+REPLICA_PORT = int(os.getenv('REPLICA_STANDIN_PORT', '54332'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+SERVER_URL = f"http://localhost:{PORT}"
+BASE_URL = f"{SERVER_URL}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Replica-Routing-Test/1.0'
+}
+PIN_MS = 3000
+MAX_LAG_MS = 1000
+LAG_CHECK_MS = 500
+
+
+class ReplicaRoutingTester:
+    def __init__(self, primary, replica):
+        self.primary = primary
+        self.replica = replica
+        self.test_results = []
+        self.request_count = 0
+
+    def log_test(self, test_name, success, details="", error_msg=""):
+        """Log test results"""
+        result = {
+            'test': test_name,
+            'success': success,
+            'details': details,
+            'error': error_msg,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.test_results.append(result)
+
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"   Details: {details}")
+        if error_msg:
+            print(f"   Error: {error_msg}")
+        print()
+
+    def post(self, path, body, session=None, via_fallback=False):
+        """POST through /api, or through /trx-api?path= like the frontend's first attempt"""
+        # Distinct client IPs so the rate limiter stays out of the way
+        self.request_count += 1
+        headers = {**HEADERS, 'X-Forwarded-For': f"10.45.{self.request_count // 250 % 250}.{self.request_count % 250}"}
+        url = f"{SERVER_URL}/trx-api?path={path.lstrip('/')}" if via_fallback else f"{BASE_URL}{path}"
+        return (session or requests).post(url, json=body, headers=headers, timeout=60)
+
+    def signup(self, session=None):
+        response = self.post('/auth/signup', {'username': f"replica_{secrets.token_hex(4)}", 'password': 'replicapass123'},
+                             session)
+        response.raise_for_status()
+        return response.json()['user']['id']
+
+    def read_nodes(self, user_id, session=None, via_fallback=False):
+        """POST /user/nodes; returns (node count, served by 'replica' | 'primary')"""
+        replica_before = self.replica.served('user_nodes')
+        primary_before = self.primary.served('user_nodes')
+        response = self.post('/user/nodes', {'userId': user_id}, session, via_fallback)
+        response.raise_for_status()
+        if self.replica.served('user_nodes') > replica_before:
+            served_by = 'replica'
+        elif self.primary.served('user_nodes') > primary_before:
+            served_by = 'primary'
+        else:
+            served_by = 'unknown'
+        return len(response.json()['nodes']), served_by
+
+    def replica_reads(self, reason):
+        samples = parse_metrics(requests.get(f"{BASE_URL}/metrics", timeout=10).text)
+        return metric_total(samples, 'replica_reads_total', reason=reason)
+
+    def wait_for_probe(self):
+        time.sleep(LAG_CHECK_MS * 3 / 1000)
+
+    def test_listings_use_replica(self):
+        """Reads by a user with no recent write are served by the replica"""
+        try:
+            user_id = self.signup()
+            time.sleep(PIN_MS / 1000 + 0.5)
+            served = [self.read_nodes(user_id)[1] for _ in range(5)]
+
+            referrals_before = self.replica.served('referrals')
+            self.post('/user/referrals', {'userId': user_id}).raise_for_status()
+            referrals_on_replica = self.replica.served('referrals') > referrals_before
+
+            success = all(by == 'replica' for by in served) and referrals_on_replica
+            self.log_test("Listings Read From Replica", success,
+                          f"/user/nodes served by {served}, /user/referrals on replica: {referrals_on_replica}")
+        except Exception as e:
+            self.log_test("Listings Read From Replica", False, "", str(e))
+
+    def test_read_your_writes(self):
+        """A purchase is visible immediately although the replica is stale; reads return to it afterwards"""
+        try:
+            session = requests.Session()
+            user_id = self.signup(session)
+            time.sleep(PIN_MS / 1000 + 0.5)
+
+            # The replica now answers this read from a cache older than the purchase
+            self.replica.behaviour['stale_ms'] = 60000
+            before, before_by = self.read_nodes(user_id)
+
+            purchase = self.post('/nodes/purchase', {
+                'nodeId': 'node1', 'transactionHash': secrets.token_hex(32), 'userId': user_id
+            }, session)
+            pin_cookie = 'trx_read_primary_until' in session.cookies
+
+            own_count, own_by = self.read_nodes(user_id, session)
+            # No cookie: the in-memory pin for this user still applies in this process
+            other_count, other_by = self.read_nodes(user_id)
+
+            time.sleep(PIN_MS / 1000 + 0.5)
+            later_count, later_by = self.read_nodes(user_id, session)
+            self.replica.behaviour['stale_ms'] = 0
+            self.replica.clear_cache()
+
+            success = (purchase.status_code == 200 and pin_cookie and before_by == 'replica'
+                       and (own_count, own_by) == (before + 1, 'primary')
+                       and (other_count, other_by) == (before + 1, 'primary')
+                       and later_by == 'replica')
+            self.log_test("Read Your Writes", success,
+                          f"purchase {purchase.status_code}, pin cookie set: {pin_cookie}; nodes before {before} "
+                          f"({before_by}), right after {own_count} ({own_by}), without cookie {other_count} "
+                          f"({other_by}), after the window {later_count} ({later_by}, stale replica)")
+        except Exception as e:
+            self.log_test("Read Your Writes", False, "", str(e))
+
+    def test_pin_cookie_across_processes(self):
+        """The pin cookie alone routes reads to the primary, as another app process would see it"""
+        try:
+            reader_id = self.signup_and_wait()
+
+            # A rejected write (no node to withdraw against) wrote nothing and pins nothing
+            rejected = requests.Session()
+            rejected_id = self.signup_and_wait()
+            refused = self.post('/withdraw', {'userId': rejected_id, 'type': 'mine', 'amount': 25}, rejected)
+            rejected_pin = 'trx_read_primary_until' in rejected.cookies
+
+            # A signup is a write: its response pins the new account's client
+            writer = requests.Session()
+            self.signup(writer)
+            # reader_id isn't pinned in memory, only the writer's cookie says "read from the primary",
+            # through /api and through the /trx-api forwarder the frontend uses first
+            cookie_only = requests.Session()
+            cookie_only.cookies.update(writer.cookies)
+            _, with_cookie = self.read_nodes(reader_id, cookie_only)
+            _, with_cookie_fallback = self.read_nodes(reader_id, cookie_only, via_fallback=True)
+            _, without_cookie = self.read_nodes(reader_id)
+
+            success = (with_cookie == 'primary' and with_cookie_fallback == 'primary'
+                       and without_cookie == 'replica' and 400 <= refused.status_code < 500 and not rejected_pin)
+            self.log_test("Pin Cookie Across Processes", success,
+                          f"with the writer's cookie: {with_cookie} (/api), {with_cookie_fallback} (/trx-api); "
+                          f"without: {without_cookie}; rejected withdrawal ({refused.status_code}) "
+                          f"set a pin: {rejected_pin}")
+        except Exception as e:
+            self.log_test("Pin Cookie Across Processes", False, "", str(e))
+
+    def signup_and_wait(self):
+        user_id = self.signup()
+        time.sleep(PIN_MS / 1000 + 0.5)
+        return user_id
+
+    def test_lagging_replica_dropped(self):
+        """Reported lag above REPLICA_MAX_LAG_MS sends reads to the primary until it recovers"""
+        try:
+            user_id = self.signup_and_wait()
+            lagging_before = self.replica_reads('lagging')
+
+            self.replica.behaviour['reported_lag_ms'] = MAX_LAG_MS * 5
+            self.wait_for_probe()
+            _, while_lagging = self.read_nodes(user_id)
+            lagging_after = self.replica_reads('lagging')
+
+            self.replica.behaviour['reported_lag_ms'] = 0
+            self.wait_for_probe()
+            _, recovered = self.read_nodes(user_id)
+
+            success = while_lagging == 'primary' and recovered == 'replica' and lagging_after > lagging_before
+            self.log_test("Lagging Replica Dropped", success,
+                          f"while {MAX_LAG_MS * 5}ms behind: {while_lagging}, after catching up: {recovered}, "
+                          f"{lagging_after - lagging_before:.0f} reads counted as lagging "
+                          f"({self.replica.lag_probes} lag probes so far)")
+        except Exception as e:
+            self.log_test("Lagging Replica Dropped", False, "", str(e))
+
+    def test_replica_down(self):
+        """An unreachable replica fails over to the primary without failing a request"""
+        try:
+            user_id = self.signup_and_wait()
+            error_before = self.replica_reads('replica_error')
+
+            # Straight away (before the next probe), then after the probe has noticed
+            self.replica.behaviour['down'] = True
+            statuses = [self.post('/user/nodes', {'userId': user_id}).status_code]
+            self.wait_for_probe()
+            statuses += [self.post('/user/nodes', {'userId': user_id}).status_code for _ in range(5)]
+            self.replica.behaviour['down'] = False
+            self.wait_for_probe()
+            _, recovered = self.read_nodes(user_id)
+
+            failovers = self.replica_reads('replica_error') - error_before
+            success = all(status == 200 for status in statuses) and recovered == 'replica'
+            self.log_test("Replica Down", success,
+                          f"statuses {statuses}, {failovers:.0f} immediate failovers, back on replica: "
+                          f"{recovered == 'replica'}")
+        except Exception as e:
+            self.log_test("Replica Down", False, "", str(e))
+
+    def run_all_tests(self):
+        """Run all replica routing tests"""
+        print("=" * 80)
+        print("READ-REPLICA ROUTING TESTS")
+        print("=" * 80)
+        self.test_listings_use_replica()
+        self.test_read_your_writes()
+        self.test_pin_cookie_across_processes()
+        self.test_lagging_replica_dropped()
+        self.test_replica_down()
+
+        passed = sum(1 for result in self.test_results if result['success'])
+        print(f"Passed: {passed}/{len(self.test_results)}")
+
+
+if __name__ == "__main__":
+    apply_schema()
+    primary = RestStandIn(PRIMARY_PORT, 'primary').start()
+    replica = RestStandIn(REPLICA_PORT, 'replica').start()
+    trongrid = TrongridStandIn(STANDIN_PORT).start()
+    process = start_server(PORT, {
+        'NEXT_PUBLIC_SUPABASE_URL': primary.url,
+        'SUPABASE_READ_REPLICA_URL': replica.url,
+        'READ_YOUR_WRITES_MS': str(PIN_MS),
+        'REPLICA_MAX_LAG_MS': str(MAX_LAG_MS),
+        'REPLICA_LAG_CHECK_MS': str(LAG_CHECK_MS),
+        'TRX_VERIFIER': 'enhanced',
+        'TRONGRID_API_URL': trongrid.url
+    })
+    try:
+        wait_for_server(BASE_URL)
+        ReplicaRoutingTester(primary, replica).run_all_tests()
+    finally:
+        stop_server(process)
+        trongrid.stop()
+        replica.stop()
+        primary.stop()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Response Shape Benchmark for TRX Mining Platform
+Measures /user/nodes, /user/withdrawals, /user/referrals and /user/profile for
+users with thousands of rows: server CPU per request (read from /proc for the
+server's process group), latency and response payload bytes. Set
+BASELINE_SERVER_CMD to a build of an earlier commit (e.g. one still selecting
+'*' and remapping rows) to get both side by side.
+BENCH_DATABASE_URL must be the database behind the app's local Supabase stack.
+"""
+
+import os
+import statistics
+import time
+
+import requests
+
+from benchmark_utils import SERVER_CMD, connect, apply_schema, start_server, stop_server, wait_for_server
+from seed_data import generate_dataset, teardown_dataset, namespace_for, row_id
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Response-Shape-Benchmark/1.0'
+}
+USERS = int(os.getenv('BENCH_USERS', '50000'))
+SEED = int(os.getenv('BENCH_SEED', '47'))
+PREFIX = 'rsh'
+HISTORY_ROWS = int(os.getenv('BENCH_HISTORY_ROWS', '5000'))
+REQUESTS = int(os.getenv('BENCH_REQUESTS', '200'))
+BASELINE_SERVER_CMD = os.getenv('BASELINE_SERVER_CMD')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+request_count = 0
+
+
+def post(path, body):
+    # Distinct client IPs so the rate limiter stays out of the way
+    global request_count
+    request_count += 1
+    headers = {**HEADERS, 'X-Forwarded-For': f"10.47.{request_count // 250 % 250}.{request_count % 250}"}
+    start = time.perf_counter()
+    response = requests.post(f"{BASE_URL}{path}", json=body, headers=headers, timeout=60)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000, len(response.content)
+
+
+def group_cpu_seconds(pgid):
+    """User + system CPU of every process in the server's process group"""
+    total = 0
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                # Fields after the parenthesized command: state, ppid, pgrp, ... utime (14), stime (15)
+                fields = stat.read().rsplit(')', 1)[1].split()
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+        if int(fields[2]) == pgid:
+            total += int(fields[11]) + int(fields[12])
+    return total / CLOCK_TICKS
+
+
+def history_id_prefix(namespace, table):
+    # Row numbers from 0x900000000000 up, far past any the generator hands out
+    return row_id(namespace, table, 0)[:-12] + '9'
+
+
+def add_history(conn, namespace, user_id):
+    """HISTORY_ROWS finished nodes and paid withdrawals for one user, in the dataset's namespace"""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO user_nodes (id, user_id, node_id, transaction_hash, transaction_verified, transaction_amount,
+                                    status, progress, start_date, end_date, mining_amount, daily_mining, duration,
+                                    created_at)
+            SELECT (%s || lpad(to_hex(n), 11, '0'))::uuid, %s, 'node1', %s || 'shape' || n, TRUE, 50, 'completed',
+                   100, NOW() - (n || ' hours')::interval - INTERVAL '30 days', NOW() - (n || ' hours')::interval,
+                   500, 16.67, 30, NOW() - (n || ' hours')::interval - INTERVAL '30 days'
+            FROM generate_series(1, %s) AS n
+            """,
+            (history_id_prefix(namespace, 'user_nodes'), user_id, f"{namespace:08x}", HISTORY_ROWS)
+        )
+        cur.execute(
+            """
+            INSERT INTO withdrawals (id, user_id, type, amount, status, net_amount, processed_at, created_at)
+            SELECT (%s || lpad(to_hex(n), 11, '0'))::uuid, %s, 'mine', 25, 'completed', 24,
+                   NOW() - (n || ' hours')::interval, NOW() - (n || ' hours')::interval
+            FROM generate_series(1, %s) AS n
+            """,
+            (history_id_prefix(namespace, 'withdrawals'), user_id, HISTORY_ROWS)
+        )
+
+
+def pick_heavy_user(conn, namespace):
+    """The user with the most referrals, and how many they have"""
+    low, high = row_id(namespace, 'users', 0), row_id(namespace, 'users', USERS)
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, total_referrals FROM users WHERE id BETWEEN %s AND %s "
+                    "ORDER BY total_referrals DESC LIMIT 1", (low, high))
+        user_id, referrals = cur.fetchone()
+    return str(user_id), referrals
+
+
+def measure(process, path, body):
+    """REQUESTS sequential calls: (CPU ms per request, median latency ms, payload bytes)"""
+    post(path, body)
+    cpu_before = group_cpu_seconds(process.pid)
+    results = [post(path, body) for _ in range(REQUESTS)]
+    cpu = group_cpu_seconds(process.pid) - cpu_before
+    return cpu * 1000 / REQUESTS, statistics.median(elapsed for elapsed, _ in results), results[-1][1]
+
+
+def run_server(cmd, user_id):
+    process = start_server(PORT, cmd=cmd)
+    try:
+        wait_for_server(BASE_URL)
+        return {
+            '/user/nodes': measure(process, '/user/nodes', {'userId': user_id}),
+            '/user/withdrawals': measure(process, '/user/withdrawals', {'userId': user_id}),
+            '/user/referrals': measure(process, '/user/referrals', {'userId': user_id}),
+            '/user/profile': measure(process, '/user/profile', {'userId': user_id}),
+        }
+    finally:
+        stop_server(process)
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"RESPONSE SHAPE BENCHMARK ({USERS:,} users, {HISTORY_ROWS:,} nodes and withdrawals on the heaviest, "
+          f"{REQUESTS} requests per endpoint)")
+    print("=" * 80)
+    teardown_dataset(SEED, PREFIX, verbose=False)
+    generate_dataset(USERS, SEED, PREFIX)
+    namespace = namespace_for(SEED, PREFIX)
+    user_id, referrals = pick_heavy_user(conn, namespace)
+    add_history(conn, namespace, user_id)
+    print(f"   heaviest user {user_id}: {referrals:,} referrals")
+
+    servers = {'current': SERVER_CMD}
+    if BASELINE_SERVER_CMD:
+        servers = {'baseline': BASELINE_SERVER_CMD, **servers}
+
+    outcomes = {}
+    try:
+        for label, cmd in servers.items():
+            outcomes[label] = run_server(cmd, user_id)
+    finally:
+        teardown_dataset(SEED, PREFIX)
+        conn.close()
+
+    print()
+    print(f"   {'endpoint':<20} {'server':<10} {'CPU/request':>12} {'median':>10} {'payload':>12}")
+    for endpoint in outcomes['current']:
+        for label, results in outcomes.items():
+            cpu_ms, median_ms, payload = results[endpoint]
+            print(f"   {endpoint:<20} {label:<10} {cpu_ms:9.2f} ms {median_ms:7.2f} ms {payload:>9,} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Bulk Dataset Generator for TRX Mining Platform
+Builds capacity-test datasets straight into a local Postgres with COPY: users, a
+referral graph with power-law fan-out (preferential attachment, so a few users
+refer thousands and chains run many levels deep), user_nodes across all four node
+types and withdrawal history. The same --seed and --anchor date always produce the
+same rows.
+
+Every row id carries a namespace derived from the prefix and seed, so teardown
+deletes a dataset by primary-key range instead of scanning usernames.
+
+    python seed_data.py generate --users 1000000 --seed 42
+    python seed_data.py teardown --seed 42
+"""
+
+import argparse
+import random
+import time
+import zlib
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+
+import psycopg2
+
+from benchmark_utils import connect, apply_schema
+
+# Mirrors the mining_nodes seed rows: id, price, mining amount, duration in days
+NODE_TYPES = [
+    ('node1', 50, 500, 30),
+    ('node2', 75, 500, 15),
+    ('node3', 100, 1000, 7),
+    ('node4', 250, 1000, 3),
+]
+# Chance that a user buys each node type at least once
+NODE_PURCHASE_RATES = [0.35, 0.20, 0.10, 0.04]
+REFERRED_RATE = 0.7
+HISTORY_DAYS = 365
+COPY_BUFFER_ROWS = 5000
+COPY_READ_SIZE = 1 << 20
+NULL = '\\N'
+
+# Second group of every generated UUID, one per table
+ID_TABLES = {'users': 1, 'referrals': 2, 'user_nodes': 3, 'withdrawals': 4}
+
+
+def namespace_for(seed, prefix='seed'):
+    """32-bit namespace stamped into every id of a dataset"""
+    return zlib.crc32(f"{prefix}:{seed}".encode())
+
+
+def row_id(namespace, table, n):
+    return f"{namespace:08x}-{ID_TABLES[table]:04x}-4000-8000-{n:012x}"
+
+
+def namespace_range(namespace):
+    return f"{namespace:08x}-0000-0000-0000-000000000000", f"{namespace:08x}-ffff-ffff-ffff-ffffffffffff"
+
+
+class CopyStream:
+    """File-like reader over a generator of COPY text lines, for cursor.copy_expert"""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.buffer = b''
+        self.position = 0
+        self.rows = 0
+
+    def read(self, size=-1):
+        if self.position >= len(self.buffer):
+            chunk = list(islice(self.lines, COPY_BUFFER_ROWS))
+            if not chunk:
+                return b''
+            self.rows += len(chunk)
+            self.buffer = ''.join(chunk).encode()
+            self.position = 0
+        end = len(self.buffer) if size < 0 else self.position + size
+        data = self.buffer[self.position:end]
+        self.position = end
+        return data
+
+
+def timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f+00')
+
+
+class DatasetGenerator:
+    """Builds one dataset; the graph is decided up front so every table agrees with it"""
+
+    def __init__(self, users, seed, prefix='seed', anchor=None):
+        self.users = users
+        self.seed = seed
+        self.prefix = prefix
+        self.namespace = namespace_for(seed, prefix)
+        # History ends at midnight UTC of the anchor day (today by default)
+        self.now = datetime.combine(anchor or datetime.now(timezone.utc).date(), datetime.min.time(), timezone.utc)
+        self.start = self.now - timedelta(days=HISTORY_DAYS)
+
+        self.referrer = array('l', [-1]) * users
+        self.referral_count = array('l', [0]) * users
+        self.valid_referral_count = array('l', [0]) * users
+        self.node_mask = array('B', [0]) * users
+        self.build_graph()
+
+    def rng(self, stream):
+        return random.Random(f"{self.seed}:{self.prefix}:{stream}")
+
+    def created_at(self, i):
+        # Signups spread evenly over the history window, in id order
+        return self.start + timedelta(seconds=HISTORY_DAYS * 86400 * i / max(1, self.users))
+
+    def build_graph(self):
+        """Preferential attachment: a user's chance of referring grows with their referral count"""
+        rng = self.rng('graph')
+        attachment = array('l')
+        for i in range(self.users):
+            if attachment and rng.random() < REFERRED_RATE:
+                referrer = attachment[rng.randrange(len(attachment))]
+                self.referrer[i] = referrer
+                self.referral_count[referrer] += 1
+                attachment.append(referrer)
+            attachment.append(i)
+
+            mask = 0
+            for bit, rate in enumerate(NODE_PURCHASE_RATES):
+                if rng.random() < rate:
+                    mask |= 1 << bit
+            self.node_mask[i] = mask
+
+        for i in range(self.users):
+            if self.referrer[i] >= 0 and self.node_mask[i]:
+                self.valid_referral_count[self.referrer[i]] += 1
+
+    def user_rows(self):
+        rng = self.rng('users')
+        for i in range(self.users):
+            username = f"{self.prefix}_{self.seed}_{i}"
+            mask = self.node_mask[i]
+            mine_balance = 25 + (rng.random() * 500 if mask else 0)
+            referral_balance = self.valid_referral_count[i] * 50.0
+            created = timestamp(self.created_at(i))
+            yield (
+                f"{row_id(self.namespace, 'users', i)}\t{username}\t{username}@{self.prefix}.trxmining.com\t"
+                f"seedpass123\t{mine_balance:.6f}\t{referral_balance:.6f}\t{self.referral_count[i]}\t"
+                f"{self.valid_referral_count[i]}\tS{self.namespace:08X}{i:07X}\t{'t' if mask else 'f'}\t"
+                f"{'t' if mask & 8 else 'f'}\t{created}\t{created}\n"
+            )
+
+    def referral_rows(self):
+        for i in range(self.users):
+            referrer = self.referrer[i]
+            if referrer < 0:
+                continue
+            valid = bool(self.node_mask[i])
+            created = timestamp(self.created_at(i))
+            yield (
+                f"{row_id(self.namespace, 'referrals', i)}\t{row_id(self.namespace, 'users', referrer)}\t"
+                f"{row_id(self.namespace, 'users', i)}\tS{self.namespace:08X}{referrer:07X}\t"
+                f"{'t' if valid else 'f'}\t{'t' if valid else 'f'}\t50.00\t{created if valid else NULL}\t"
+                f"{created}\t{created}\n"
+            )
+
+    def user_node_rows(self):
+        rng = self.rng('user_nodes')
+        n = 0
+        for i in range(self.users):
+            mask = self.node_mask[i]
+            if not mask:
+                continue
+            signed_up = self.created_at(i)
+            for bit, (node_id, price, mining, duration) in enumerate(NODE_TYPES):
+                if not mask & (1 << bit):
+                    continue
+                started = signed_up + (self.now - signed_up) * rng.random()
+                ended = started + timedelta(days=duration)
+                if ended <= self.now:
+                    status, progress = 'completed', 100.0
+                else:
+                    status = 'running'
+                    progress = min(100.0, (self.now - started) / (ended - started) * 100)
+                yield (
+                    f"{row_id(self.namespace, 'user_nodes', n)}\t{row_id(self.namespace, 'users', i)}\t{node_id}\t"
+                    f"{self.namespace:08x}{n:056x}\tt\t{price:.2f}\t{timestamp(started)}\t{status}\t"
+                    f"{progress:.2f}\t{timestamp(started)}\t{timestamp(ended)}\t{mining:.2f}\t"
+                    f"{mining / duration:.2f}\t{duration}\t{mining * progress / 100:.2f}\t"
+                    f"{timestamp(started)}\t{timestamp(started)}\n"
+                )
+                n += 1
+
+    def withdrawal_rows(self):
+        rng = self.rng('withdrawals')
+        n = 0
+        for i in range(self.users):
+            mask = self.node_mask[i]
+            if not mask:
+                continue
+            signed_up = self.created_at(i)
+            # Geometric history length: most miners withdraw a few times, a few withdraw often
+            while rng.random() < 0.6:
+                kind = 'referral' if mask & 8 and self.valid_referral_count[i] and rng.random() < 0.3 else 'mine'
+                amount = rng.randint(50 if kind == 'referral' else 25, 500)
+                created = signed_up + (self.now - signed_up) * rng.random()
+                status = rng.choices(['completed', 'pending', 'failed'], [90, 7, 3])[0]
+                yield (
+                    f"{row_id(self.namespace, 'withdrawals', n)}\t{row_id(self.namespace, 'users', i)}\t{kind}\t"
+                    f"{amount:.6f}\t{status}\t{amount:.6f}\t"
+                    f"{timestamp(created) if status == 'completed' else NULL}\t"
+                    f"{timestamp(created)}\t{timestamp(created)}\n"
+                )
+                n += 1
+
+
+COPY_STATEMENTS = [
+    ('users', """COPY users (id, username, email, password, mine_balance, referral_balance, total_referrals,
+                 valid_referrals, referral_code, has_active_mining, has_bought_node4, created_at, updated_at)
+                 FROM STDIN""", 'user_rows'),
+    ('referrals', """COPY referrals (id, referrer_id, referred_id, referral_code, is_valid, reward_paid,
+                     reward_amount, activated_at, created_at, updated_at) FROM STDIN""", 'referral_rows'),
+    ('user_nodes', """COPY user_nodes (id, user_id, node_id, transaction_hash, transaction_verified,
+                      transaction_amount, transaction_verified_at, status, progress, start_date, end_date,
+                      mining_amount, daily_mining, duration, total_mined, last_mining_update, created_at)
+                      FROM STDIN""", 'user_node_rows'),
+    ('withdrawals', """COPY withdrawals (id, user_id, type, amount, status, net_amount, processed_at,
+                       created_at, updated_at) FROM STDIN""", 'withdrawal_rows'),
+]
+
+
+def skip_row_triggers(cur):
+    """Skip per-row triggers and FK checks during the load; the generator keeps the rows consistent.
+    Needs a superuser, which a local benchmark database normally has."""
+    cur.execute("SAVEPOINT replication_role")
+    try:
+        cur.execute("SET LOCAL session_replication_role = replica")
+        return True
+    except psycopg2.errors.InsufficientPrivilege:
+        cur.execute("ROLLBACK TO SAVEPOINT replication_role")
+        return False
+
+
+def generate_dataset(users, seed, prefix='seed', anchor=None, verbose=True):
+    """Load one dataset in a single transaction; returns {table: rows}"""
+    started_at = time.perf_counter()
+    generator = DatasetGenerator(users, seed, prefix, anchor)
+    if verbose:
+        print(f"   graph built for {users:,} users in {time.perf_counter() - started_at:.1f}s "
+              f"(namespace {generator.namespace:08x}, max fan-out {max(generator.referral_count, default=0):,})")
+
+    conn = connect(autocommit=False)
+    counts = {}
+    try:
+        with conn.cursor() as cur:
+            fast = skip_row_triggers(cur)
+            for table, statement, rows in COPY_STATEMENTS:
+                table_started = time.perf_counter()
+                stream = CopyStream(getattr(generator, rows)())
+                cur.copy_expert(statement, stream, size=COPY_READ_SIZE)
+                counts[table] = stream.rows
+                if verbose:
+                    elapsed = time.perf_counter() - table_started
+                    print(f"   COPY {table:<12} {stream.rows:>12,} rows in {elapsed:7.1f}s "
+                          f"({stream.rows / max(elapsed, 1e-9):10,.0f} rows/s)")
+
+            if fast:
+                # Neither the hash registry nor the closure trigger ran during COPY
+                low, high = namespace_range(generator.namespace)
+                cur.execute(
+                    """
+                    INSERT INTO consumed_transaction_hashes (transaction_hash, source, owner_id, user_id, consumed_at)
+                    SELECT transaction_hash, 'user_node', id, user_id, created_at
+                    FROM user_nodes WHERE user_id BETWEEN %s AND %s
+                    """,
+                    (low, high)
+                )
+                counts['consumed_transaction_hashes'] = cur.rowcount
+
+                closure_started = time.perf_counter()
+                cur.execute("SELECT rebuild_referral_closure()")
+                counts['referral_closure'] = cur.fetchone()[0]
+                if verbose:
+                    print(f"   rebuilt referral_closure {counts['referral_closure']:>8,} rows in "
+                          f"{time.perf_counter() - closure_started:7.1f}s")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    analyze(list(counts))
+    if verbose:
+        print(f"   loaded in {time.perf_counter() - started_at:.1f}s "
+              f"({'triggers skipped' if fast else 'row triggers ran'})")
+    return counts
+
+
+def teardown_dataset(seed, prefix='seed', verbose=True):
+    """Delete one dataset by id range, children first; returns {table: rows deleted}"""
+    namespace = namespace_for(seed, prefix)
+    low, high = namespace_range(namespace)
+    started_at = time.perf_counter()
+    conn = connect(autocommit=False)
+    counts = {}
+    try:
+        with conn.cursor() as cur:
+            # Children are deleted explicitly, so per-row cascades have nothing left to do
+            skip_row_triggers(cur)
+            cur.execute(
+                "DELETE FROM referral_closure WHERE ancestor_id BETWEEN %s AND %s OR descendant_id BETWEEN %s AND %s",
+                (low, high, low, high)
+            )
+            counts['referral_closure'] = cur.rowcount
+            # Seeded hashes start with the namespace, so their claims are one primary-key range
+            cur.execute(
+                "DELETE FROM consumed_transaction_hashes WHERE transaction_hash BETWEEN %s AND %s",
+                (f"{namespace:08x}", f"{namespace:08x}g")
+            )
+            counts['consumed_transaction_hashes'] = cur.rowcount
+            for table in ('purchase_jobs', 'withdrawals', 'withdrawals_archive', 'user_nodes', 'user_nodes_archive'):
+                cur.execute(f"DELETE FROM {table} WHERE user_id BETWEEN %s AND %s", (low, high))
+                counts[table] = cur.rowcount
+            cur.execute(
+                "DELETE FROM referrals WHERE referred_id BETWEEN %s AND %s OR referrer_id BETWEEN %s AND %s",
+                (low, high, low, high)
+            )
+            counts['referrals'] = cur.rowcount
+            cur.execute("DELETE FROM users WHERE id BETWEEN %s AND %s", (low, high))
+            counts['users'] = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    if verbose:
+        summary = ', '.join(f"{rows:,} {table}" for table, rows in counts.items())
+        print(f"   deleted {summary} in {time.perf_counter() - started_at:.1f}s")
+    return counts
+
+
+def analyze(tables):
+    conn = connect()
+    with conn.cursor() as cur:
+        for table in tables:
+            cur.execute(f"ANALYZE {table}")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['generate', 'teardown'])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prefix', default='seed')
+    parser.add_argument('--anchor', type=date.fromisoformat, default=None,
+                        help='last day of the generated history (YYYY-MM-DD, default today)')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    if args.command == 'generate':
+        print(f"GENERATING DATASET ({args.users:,} users, seed {args.seed}, prefix {args.prefix})")
+        print("=" * 80)
+        apply_schema()
+        generate_dataset(args.users, args.seed, args.prefix, args.anchor)
+    else:
+        print(f"TEARING DOWN DATASET (seed {args.seed}, prefix {args.prefix})")
+        print("=" * 80)
+        teardown_dataset(args.seed, args.prefix)
+
+
+if __name__ == "__main__":
+    main()
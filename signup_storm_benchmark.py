@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Signup Storm Benchmark for TRX Mining Platform
+Seeds a large users table with seed_data.py (1M users by default), then hammers
+/api/auth/signup with concurrent attempts at the same names in different letter
+cases. Checks that exactly one attempt per name wins (the rest get 409), that the
+table holds no case-insensitive duplicates, and that signin accepts any casing.
+Also compares the old ilike duplicate check with the lower(username) index lookup.
+BENCH_DATABASE_URL must be the database behind the app's local Supabase stack.
+"""
+
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import (
+    connect, apply_schema, time_query, start_server, stop_server, wait_for_server, summarize, print_result
+)
+from seed_data import generate_dataset, teardown_dataset
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Signup-Storm-Benchmark/1.0'
+}
+USERS = int(os.getenv('BENCH_USERS', '1000000'))
+SEED = int(os.getenv('BENCH_SEED', '40'))
+PREFIX = 'storm'
+NAMES = int(os.getenv('BENCH_STORM_NAMES', '200'))
+ATTEMPTS_PER_NAME = int(os.getenv('BENCH_STORM_ATTEMPTS', '5'))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', '50'))
+
+request_count = 0
+
+
+def client_headers():
+    # Distinct client IPs so the rate limiter doesn't throttle the benchmark itself
+    global request_count
+    request_count += 1
+    return {**HEADERS, 'X-Forwarded-For': f"10.40.{request_count // 250 % 250}.{request_count % 250}"}
+
+
+def casings(name):
+    """Variants of one name that must all count as the same username"""
+    variants = [name, name.upper(), name.capitalize(), name.swapcase(), f" {name} "]
+    return [variants[i % len(variants)] for i in range(ATTEMPTS_PER_NAME)]
+
+
+def post(path, body):
+    start = time.perf_counter()
+    response = requests.post(f"{BASE_URL}{path}", json=body, headers=client_headers(), timeout=30)
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"SIGNUP STORM BENCHMARK ({USERS:,} existing users, {NAMES} names x {ATTEMPTS_PER_NAME} attempts)")
+    print("=" * 80)
+    teardown_dataset(SEED, PREFIX, verbose=False)
+    generate_dataset(USERS, SEED, PREFIX)
+
+    existing = f"{PREFIX}_{SEED}_{USERS // 2}"
+    print()
+    print_result("ilike duplicate check (old)",
+                 time_query(conn, "SELECT id FROM users WHERE username ILIKE %s", (existing.upper(),), runs=5))
+    print_result("lower(username) lookup (new)",
+                 time_query(conn, "SELECT id FROM users WHERE lower(username) = lower(%s)", (existing.upper(),)))
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN SELECT id FROM users WHERE lower(username) = lower(%s)", (existing,))
+        plan = ' '.join(row[0] for row in cur.fetchall())
+    print(f"   {'✅' if 'idx_users_username_lower' in plan else '❌'} lookup plan uses idx_users_username_lower\n")
+
+    run_id = secrets.token_hex(3)
+    names = [f"storm{run_id}n{i}" for i in range(NAMES)]
+    attempts = [(name, variant) for name in names for variant in casings(name)]
+    # Interleave so concurrent requests race on the same name
+    attempts.sort(key=lambda attempt: casings(attempt[0]).index(attempt[1]))
+
+    process = start_server(PORT)
+    try:
+        wait_for_server(BASE_URL)
+        with ThreadPoolExecutor(CLIENTS) as pool:
+            # Existing names in other casings are rejected, not duplicated
+            taken = list(pool.map(lambda _: post('/auth/signup', {
+                'username': existing.swapcase(), 'password': 'stormpass123'
+            }), range(20)))
+
+            started_at = time.perf_counter()
+            results = list(pool.map(lambda attempt: post('/auth/signup', {
+                'username': attempt[1], 'password': 'stormpass123'
+            }), attempts))
+            wall = time.perf_counter() - started_at
+
+            signins = list(pool.map(lambda name: post('/auth/signin', {
+                'username': name.upper(), 'password': 'stormpass123'
+            }), names))
+    finally:
+        stop_server(process)
+
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT lower(username)) FROM users WHERE lower(username) LIKE %s",
+            (f"storm{run_id}n%",)
+        )
+        rows, distinct = cur.fetchone()
+        cur.execute("DELETE FROM users WHERE lower(username) LIKE %s", (f"storm{run_id}n%",))
+
+    teardown_dataset(SEED, PREFIX)
+    conn.close()
+
+    print_result("signup under contention", summarize([elapsed for elapsed, _ in results]))
+    print_result("signup of an existing name", summarize([elapsed for elapsed, _ in taken]))
+    print_result("signin with different casing", summarize([elapsed for elapsed, _ in signins]))
+    print()
+    print(f"   {len(attempts) / wall:8.1f} signups/s, statuses {statuses}")
+    print(f"   {'✅' if rows == distinct == NAMES else '❌'} {rows} rows for {distinct} distinct names "
+          f"(expected {NAMES}, no duplicates)")
+    print(f"   {'✅' if statuses.get(200) == NAMES and statuses.get(409) == len(attempts) - NAMES else '❌'} "
+          f"one winner per name, every other attempt 409")
+    print(f"   {'✅' if all(status == 409 for _, status in taken) else '❌'} existing name in other casing → 409")
+    print(f"   {'✅' if all(status == 200 for _, status in signins) else '❌'} "
+          f"signin accepts any casing ({sum(1 for _, s in signins if s == 200)}/{NAMES})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for TRX Mining Platform
+Starts the standalone server repeatedly and measures the time to the first
+successful /api/nodes response, plus the latency of the requests that follow
+"""
+
+import os
+import statistics
+import time
+
+import requests
+
+from benchmark_utils import SERVER_CMD, start_server, stop_server, wait_for_server
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+BASE_URL = f"http://localhost:{PORT}/api"
+RUNS = int(os.getenv('BENCH_RUNS', '10'))
+FOLLOW_UP_REQUESTS = 50
+
+
+def follow_up_latency():
+    """Latency of requests after the first, which should no longer pay for initialization"""
+    samples = []
+    for i in range(FOLLOW_UP_REQUESTS):
+        headers = {'X-Forwarded-For': f"10.29.0.{i}"}
+        start = time.perf_counter()
+        requests.get(f"{BASE_URL}/nodes", headers=headers, timeout=10)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    print("=" * 80)
+    print(f"STARTUP BENCHMARK ({RUNS} runs of: {SERVER_CMD})")
+    print("=" * 80)
+
+    first_response = []
+    for run in range(1, RUNS + 1):
+        process = start_server(PORT)
+        try:
+            elapsed = wait_for_server(BASE_URL)
+            median_ms, max_ms = follow_up_latency()
+            first_response.append(elapsed * 1000)
+            print(
+                f"   run {run:2d}: first /nodes after {elapsed * 1000:8.1f} ms   "
+                f"next {FOLLOW_UP_REQUESTS}: median {median_ms:6.2f} ms, max {max_ms:6.2f} ms"
+            )
+        finally:
+            stop_server(process)
+
+    print()
+    print(f"Time to first /nodes: median {statistics.median(first_response):.1f} ms, "
+          f"min {min(first_response):.1f} ms, max {max(first_response):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
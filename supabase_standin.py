@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Local primary/replica stand-ins for the TRX Mining Platform harnesses
+Each RestStandIn proxies the Supabase REST API of the local stack and counts the
+requests it serves per table (or rpc function), so a harness can tell which
+client the app used. With role='replica' it also answers the
+get_replication_lag probe itself and can be made stale (serve cached reads
+for `stale_ms`), lagging (report `reported_lag_ms`) or unreachable (`down`)
+through the `behaviour` dict.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# REST API of the local Supabase stack (`supabase start`)
+SUPABASE_LOCAL_URL = os.getenv('SUPABASE_LOCAL_URL', 'http://127.0.0.1:54321')
+REST_PATH = re.compile(r'^/rest/v1/([^?]+)')
+LAG_PROBE = 'rpc/get_replication_lag'
+HOP_BY_HOP = {'connection', 'keep-alive', 'transfer-encoding', 'content-encoding', 'content-length', 'host'}
+
+
+class RestStandIn:
+    """Threaded proxy in front of the local Supabase REST API"""
+
+    def __init__(self, port, role='primary', upstream=SUPABASE_LOCAL_URL, **behaviour):
+        if 'supabase.co' in upstream:
+            raise SystemExit("❌ Refusing to proxy a hosted Supabase project; point SUPABASE_LOCAL_URL at the local stack")
+        self.port = port
+        self.role = role
+        self.upstream = upstream.rstrip('/')
+        self.reads = Counter()  # table or rpc function -> requests served (lag probes excluded)
+        self.lag_probes = 0
+        self.cache = {}
+        self.behaviour = {
+            'reported_lag_ms': 0,  # lag the get_replication_lag probe reports
+            'stale_ms': 0,         # serve a cached answer to the same read for this long
+            'down': False,         # answer everything with 503
+            **behaviour
+        }
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def served(self, resource):
+        with self.lock:
+            return self.reads[resource]
+
+    def clear_cache(self):
+        with self.lock:
+            self.cache.clear()
+
+    def forward(self, method, path, headers, body):
+        request = urllib.request.Request(f"{self.upstream}{path}", data=body or None, method=method)
+        for name, value in headers.items():
+            if name.lower() not in HOP_BY_HOP and name.lower() != 'accept-encoding':
+                request.add_header(name, value)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, dict(error.headers), error.read()
+
+    def handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def respond(self, status, headers, body):
+                self.send_response(status)
+                for name, value in headers.items():
+                    if name.lower() not in HOP_BY_HOP:
+                        self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle_any(self):
+                behaviour = standin.behaviour
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                match = REST_PATH.match(self.path)
+                resource = match.group(1) if match else self.path
+
+                if behaviour['down']:
+                    self.respond(503, {'Content-Type': 'application/json'}, b'{"message":"replica unavailable"}')
+                    return
+
+                if standin.role == 'replica' and resource == LAG_PROBE:
+                    with standin.lock:
+                        standin.lag_probes += 1
+                    row = {'in_recovery': True, 'lag_ms': behaviour['reported_lag_ms']}
+                    single = 'vnd.pgrst.object' in self.headers.get('Accept', '')
+                    self.respond(200, {'Content-Type': 'application/json'}, json.dumps(row if single else [row]).encode())
+                    return
+
+                # Reads are GETs and rpc calls; a stale replica answers them from its cache
+                is_read = self.command == 'GET' or resource.startswith('rpc/')
+                if is_read:
+                    with standin.lock:
+                        standin.reads[resource] += 1
+                key = (self.command, self.path, body)
+                if is_read and behaviour['stale_ms']:
+                    with standin.lock:
+                        cached = standin.cache.get(key)
+                    if cached and time.monotonic() - cached[0] < behaviour['stale_ms'] / 1000:
+                        self.respond(*cached[1:])
+                        return
+
+                status, headers, payload = standin.forward(self.command, self.path, dict(self.headers), body)
+                if is_read and behaviour['stale_ms'] and status < 300:
+                    with standin.lock:
+                        standin.cache[key] = (time.monotonic(), status, headers, payload)
+                self.respond(status, headers, payload)
+
+            do_GET = handle_any
+            do_POST = handle_any
+            do_PATCH = handle_any
+            do_DELETE = handle_any
+            do_HEAD = handle_any
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local Supabase REST primary/replica stand-ins')
+    parser.add_argument('--primary-port', type=int, default=54331)
+    parser.add_argument('--replica-port', type=int, default=54332)
+    parser.add_argument('--reported-lag-ms', type=int, default=0)
+    parser.add_argument('--stale-ms', type=int, default=0)
+    args = parser.parse_args()
+
+    primary = RestStandIn(args.primary_port, 'primary').start()
+    replica = RestStandIn(args.replica_port, 'replica', reported_lag_ms=args.reported_lag_ms,
+                          stale_ms=args.stale_ms)
+    print(f"🗄️  Primary stand-in on {primary.url}, replica stand-in on {replica.url} → {SUPABASE_LOCAL_URL}")
+    replica.server.serve_forever()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Transaction Hash Case Testing for TRX Mining Platform
+Submits the same transaction hash in lowercase and uppercase, straight to
+claim_transaction_hash and through /nodes/purchase (one after the other, and two
+users racing), and checks that the second spelling is rejected and that the
+registry holds a single lowercase key. Also checks that an abandoned pending
+claim is taken over by the next purchase and released by the retention sweep.
+BENCH_DATABASE_URL must be the database behind the app's local Supabase stack.
+"""
+
+import os
+import secrets
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from benchmark_utils import connect, apply_schema, start_server, stop_server, wait_for_server
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Hash-Case-Test/1.0'
+}
+
+
+class TransactionHashCaseTester:
+    def __init__(self, conn):
+        self.conn = conn
+        self.test_results = []
+        self.request_count = 0
+
+    def log_test(self, test_name, success, details="", error_msg=""):
+        """Log test results"""
+        result = {
+            'test': test_name,
+            'success': success,
+            'details': details,
+            'error': error_msg,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.test_results.append(result)
+
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"   Details: {details}")
+        if error_msg:
+            print(f"   Error: {error_msg}")
+        print()
+
+    def post(self, path, body):
+        # Distinct client IPs so the rate limiter stays out of the way
+        self.request_count += 1
+        headers = {**HEADERS, 'X-Forwarded-For': f"10.41.{self.request_count // 250 % 250}.{self.request_count % 250}"}
+        return requests.post(f"{BASE_URL}{path}", json=body, headers=headers, timeout=60)
+
+    def signup(self):
+        response = self.post('/auth/signup', {'username': f"case_{secrets.token_hex(4)}", 'password': 'casepass123'})
+        response.raise_for_status()
+        return response.json()['user']['id']
+
+    def purchase(self, user_id, transaction_hash):
+        return self.post('/nodes/purchase', {'nodeId': 'node1', 'transactionHash': transaction_hash, 'userId': user_id})
+
+    def registry_keys(self, transaction_hash):
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT transaction_hash FROM consumed_transaction_hashes WHERE lower(transaction_hash) = %s",
+                        (transaction_hash.lower(),))
+            return [row[0] for row in cur.fetchall()]
+
+    def test_claim_other_casing(self):
+        """A claim on the uppercase spelling of a claimed hash is refused"""
+        transaction_hash = secrets.token_hex(32)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT claimed FROM claim_transaction_hash(%s, %s)", (transaction_hash, str(uuid.uuid4())))
+                first = cur.fetchone()[0]
+                cur.execute("SELECT claimed, source FROM claim_transaction_hash(%s, %s)",
+                            (transaction_hash.upper(), str(uuid.uuid4())))
+                second, source = cur.fetchone()
+            keys = self.registry_keys(transaction_hash)
+
+            self.log_test(
+                "Claim In Other Casing Rejected",
+                first and not second and keys == [transaction_hash],
+                f"first claim {first}, second claim {second} (held as {source}), registry keys {keys}"
+            )
+        except Exception as e:
+            self.log_test("Claim In Other Casing Rejected", False, "", str(e))
+        finally:
+            with self.conn.cursor() as cur:
+                cur.execute("DELETE FROM consumed_transaction_hashes WHERE transaction_hash = %s", (transaction_hash,))
+
+    def test_stale_claim_expiry(self):
+        """A pending claim past the timeout is taken over by another user, and the sweep releases it"""
+        held, stale = secrets.token_hex(32), secrets.token_hex(32)
+        try:
+            with self.conn.cursor() as cur:
+                for transaction_hash in (held, stale):
+                    cur.execute("SELECT claimed FROM claim_transaction_hash(%s, %s)", (transaction_hash, str(uuid.uuid4())))
+                cur.execute("UPDATE consumed_transaction_hashes SET claimed_at = NOW() - INTERVAL '1 hour' "
+                            "WHERE transaction_hash = %s", (stale,))
+                cur.execute("SELECT claimed FROM claim_transaction_hash(%s, %s, 600)", (held, str(uuid.uuid4())))
+                fresh_taken = cur.fetchone()[0]
+                cur.execute("SELECT claimed FROM claim_transaction_hash(%s, %s, 600)", (stale, str(uuid.uuid4())))
+                stale_taken = cur.fetchone()[0]
+                cur.execute("UPDATE consumed_transaction_hashes SET claimed_at = NOW() - INTERVAL '1 hour' "
+                            "WHERE transaction_hash = %s", (stale,))
+                cur.execute("SELECT release_stale_transaction_claims(600)")
+                cur.execute("SELECT transaction_hash FROM consumed_transaction_hashes WHERE transaction_hash IN (%s, %s)",
+                            (held, stale))
+                remaining = {row[0] for row in cur.fetchall()}
+
+            self.log_test(
+                "Stale Pending Claim Expires",
+                not fresh_taken and stale_taken and remaining == {held},
+                f"fresh claim taken over {fresh_taken}, stale claim taken over {stale_taken}, "
+                f"after the sweep {len(remaining)} of 2 claims remain"
+            )
+        except Exception as e:
+            self.log_test("Stale Pending Claim Expires", False, "", str(e))
+        finally:
+            with self.conn.cursor() as cur:
+                cur.execute("DELETE FROM consumed_transaction_hashes WHERE transaction_hash IN (%s, %s)", (held, stale))
+
+    def test_purchase_other_casing(self):
+        """A hash spent on a node can't buy another by changing case, for its owner or anyone else"""
+        try:
+            transaction_hash = secrets.token_hex(32)
+            owner, other = self.signup(), self.signup()
+            first = self.purchase(owner, transaction_hash)
+            same_user = self.purchase(owner, transaction_hash.upper())
+            other_user = self.purchase(other, transaction_hash.upper())
+            keys = self.registry_keys(transaction_hash)
+
+            self.log_test(
+                "Purchase In Other Casing Rejected",
+                first.status_code == 200 and same_user.status_code == 400 and other_user.status_code == 400
+                and keys == [transaction_hash],
+                f"statuses {first.status_code} (lowercase), {same_user.status_code} (uppercase, same user), "
+                f"{other_user.status_code} (uppercase, other user); registry keys {keys}"
+            )
+        except Exception as e:
+            self.log_test("Purchase In Other Casing Rejected", False, "", str(e))
+
+    def test_casing_race(self):
+        """Two users racing with the two spellings of one hash: exactly one purchase succeeds"""
+        try:
+            transaction_hash = secrets.token_hex(32)
+            buyers = [(self.signup(), transaction_hash), (self.signup(), transaction_hash.upper())]
+            with ThreadPoolExecutor(2) as pool:
+                statuses = sorted(pool.map(lambda buyer: self.purchase(*buyer).status_code, buyers))
+            keys = self.registry_keys(transaction_hash)
+
+            self.log_test(
+                "Casing Race Spends Once",
+                statuses == [200, 400] and keys == [transaction_hash],
+                f"statuses {statuses}, registry keys {keys}"
+            )
+        except Exception as e:
+            self.log_test("Casing Race Spends Once", False, "", str(e))
+
+    def run_all_tests(self):
+        """Run all transaction hash case tests"""
+        print("=" * 80)
+        print("TRANSACTION HASH CASE TESTS")
+        print("=" * 80)
+        self.test_claim_other_casing()
+        self.test_stale_claim_expiry()
+        self.test_purchase_other_casing()
+        self.test_casing_race()
+
+        passed = sum(1 for result in self.test_results if result['success'])
+        print(f"Passed: {passed}/{len(self.test_results)}")
+
+
+if __name__ == "__main__":
+    conn = connect()
+    apply_schema()
+    standin = TrongridStandIn(STANDIN_PORT).start()
+    process = start_server(PORT, {'TRX_VERIFIER': 'enhanced', 'TRONGRID_API_URL': standin.url})
+    try:
+        wait_for_server(BASE_URL)
+        TransactionHashCaseTester(conn).run_all_tests()
+    finally:
+        stop_server(process)
+        standin.stop()
+        conn.close()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Transaction Hash Registry Benchmark for TRX Mining Platform
+Seeds millions of user_nodes rows with seed_data.py, then compares the legacy
+uniqueness check (EXISTS on user_nodes and on withdrawals, in the trigger and again
+from the verifier) against consumed_transaction_hashes (one primary-key probe,
+claimed with INSERT ... ON CONFLICT DO NOTHING): duplicate-check latency, concurrent
+user_nodes insert throughput under each trigger, and end-to-end purchase throughput
+through the app, including a race of two users spending the same hash.
+BENCH_DATABASE_URL must be the database behind the app's local Supabase stack.
+"""
+
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark_utils import (
+    connect, apply_schema, start_server, stop_server, wait_for_server, summarize, print_result
+)
+from seed_data import generate_dataset, teardown_dataset, namespace_for, row_id
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Hash-Registry-Benchmark/1.0'
+}
+USERS = int(os.getenv('BENCH_USERS', '3000000'))
+SEED = int(os.getenv('BENCH_SEED', '41'))
+PREFIX = 'hashreg'
+CHECKS = int(os.getenv('BENCH_CHECKS', '200'))
+INSERTS = int(os.getenv('BENCH_INSERTS', '2000'))
+PURCHASES = int(os.getenv('BENCH_PURCHASES', '300'))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', '16'))
+
+# The check as it was before migration 0009, installed side by side for comparison
+LEGACY_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION validate_transaction_uniqueness_legacy()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM user_nodes WHERE transaction_hash = NEW.transaction_hash AND id != NEW.id) THEN
+        RAISE EXCEPTION 'Transaction hash already used: %', NEW.transaction_hash;
+    END IF;
+    IF NEW.transaction_hash IS NOT NULL AND EXISTS (SELECT 1 FROM withdrawals WHERE transaction_hash = NEW.transaction_hash) THEN
+        RAISE EXCEPTION 'Transaction hash already used in withdrawals: %', NEW.transaction_hash;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql'
+"""
+LEGACY_CHECK = [
+    "SELECT id, user_id, created_at FROM user_nodes WHERE transaction_hash = %s",
+    "SELECT id, user_id, created_at FROM withdrawals WHERE transaction_hash = %s",
+]
+REGISTRY_CHECK = "SELECT * FROM claim_transaction_hash(%s, %s)"
+
+request_count = 0
+
+
+def client_headers():
+    # Distinct client IPs so the rate limiter doesn't throttle the benchmark itself
+    global request_count
+    request_count += 1
+    return {**HEADERS, 'X-Forwarded-For': f"10.41.{request_count // 250 % 250}.{request_count % 250}"}
+
+
+def use_trigger(conn, legacy):
+    """Swap the user_nodes uniqueness trigger between the legacy function and the registry"""
+    function = 'validate_transaction_uniqueness_legacy()' if legacy else "validate_transaction_uniqueness('user_node')"
+    with conn.cursor() as cur:
+        cur.execute(LEGACY_TRIGGER_FUNCTION)
+        cur.execute("DROP TRIGGER IF EXISTS validate_unique_transaction_hash ON user_nodes")
+        cur.execute(f"""
+            CREATE TRIGGER validate_unique_transaction_hash
+            BEFORE INSERT OR UPDATE OF transaction_hash ON user_nodes
+            FOR EACH ROW EXECUTE FUNCTION {function}
+        """)
+
+
+def time_checks(conn, user_id):
+    """Duplicate-check latency for fresh hashes: legacy pair of lookups vs one registry claim"""
+    legacy, registry = [], []
+    hashes = [secrets.token_hex(32) for _ in range(CHECKS)]
+    with conn.cursor() as cur:
+        for transaction_hash in hashes:
+            start = time.perf_counter()
+            for sql in LEGACY_CHECK:
+                cur.execute(sql, (transaction_hash,))
+                cur.fetchall()
+            legacy.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            cur.execute(REGISTRY_CHECK, (transaction_hash, user_id))
+            cur.fetchall()
+            registry.append((time.perf_counter() - start) * 1000)
+        cur.execute("DELETE FROM consumed_transaction_hashes WHERE transaction_hash = ANY(%s)", (hashes,))
+    return summarize(legacy), summarize(registry)
+
+
+def insert_throughput(user_ids):
+    """Insert INSERTS user_nodes rows from CLIENTS connections; returns (rows/s, latency summary)"""
+    samples = []
+    lock = threading.Lock()
+    hashes = [secrets.token_hex(32) for _ in range(INSERTS)]
+
+    def worker(offset):
+        conn = connect()
+        local = []
+        with conn.cursor() as cur:
+            for i in range(offset, INSERTS, CLIENTS):
+                start = time.perf_counter()
+                cur.execute(
+                    """
+                    INSERT INTO user_nodes (user_id, node_id, transaction_hash, transaction_amount, status,
+                                            start_date, end_date, mining_amount, daily_mining, duration)
+                    VALUES (%s, 'node1', %s, 50, 'running', NOW(), NOW() + INTERVAL '30 days', 500, 16.67, 30)
+                    """,
+                    (user_ids[i % len(user_ids)], hashes[i])
+                )
+                local.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        with lock:
+            samples.extend(local)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        list(pool.map(worker, range(CLIENTS)))
+    wall = time.perf_counter() - started_at
+
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM user_nodes WHERE transaction_hash = ANY(%s)", (hashes,))
+        cur.execute("DELETE FROM consumed_transaction_hashes WHERE transaction_hash = ANY(%s)", (hashes,))
+    conn.close()
+    return INSERTS / wall, summarize(samples)
+
+
+def purchase(user_id, transaction_hash):
+    start = time.perf_counter()
+    response = requests.post(
+        f"{BASE_URL}/nodes/purchase",
+        json={'nodeId': 'node1', 'transactionHash': transaction_hash, 'userId': user_id},
+        headers=client_headers(),
+        timeout=60
+    )
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"TRANSACTION HASH REGISTRY BENCHMARK ({USERS:,} seeded users)")
+    print("=" * 80)
+    teardown_dataset(SEED, PREFIX, verbose=False)
+    counts = generate_dataset(USERS, SEED, PREFIX)
+    print(f"   {counts['user_nodes']:,} user_nodes, {counts['withdrawals']:,} withdrawals\n")
+
+    namespace = namespace_for(SEED, PREFIX)
+    # Users without nodes, so purchases don't trip the one-active-node-per-type rule
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM users WHERE id BETWEEN %s AND %s AND NOT has_active_mining LIMIT %s",
+                    (row_id(namespace, 'users', 0), row_id(namespace, 'users', USERS), PURCHASES + 2))
+        idle_users = [str(row[0]) for row in cur.fetchall()]
+    user_ids = [row_id(namespace, 'users', i) for i in range(0, USERS, max(1, USERS // 1000))]
+
+    standin = TrongridStandIn(STANDIN_PORT).start()
+    try:
+        legacy_check, registry_check = time_checks(conn, user_ids[0])
+        print_result("duplicate check, legacy two lookups", legacy_check)
+        print_result("duplicate check, registry claim", registry_check)
+        print()
+
+        use_trigger(conn, legacy=True)
+        legacy_rate, legacy_latency = insert_throughput(user_ids)
+        use_trigger(conn, legacy=False)
+        registry_rate, registry_latency = insert_throughput(user_ids)
+        print_result("user_nodes insert, legacy trigger", legacy_latency)
+        print(f"   {'':<40} {legacy_rate:8.0f} inserts/s")
+        print_result("user_nodes insert, registry trigger", registry_latency)
+        print(f"   {'':<40} {registry_rate:8.0f} inserts/s\n")
+
+        process = start_server(PORT, {'TRX_VERIFIER': 'enhanced', 'TRONGRID_API_URL': standin.url})
+        try:
+            wait_for_server(BASE_URL)
+            buyers = idle_users[:PURCHASES]
+            started_at = time.perf_counter()
+            with ThreadPoolExecutor(CLIENTS) as pool:
+                results = list(pool.map(lambda user_id: purchase(user_id, secrets.token_hex(32)), buyers))
+            wall = time.perf_counter() - started_at
+
+            # Two users racing to spend one hash: exactly one purchase may succeed
+            contested = secrets.token_hex(32)
+            with ThreadPoolExecutor(2) as pool:
+                race = list(pool.map(lambda user_id: purchase(user_id, contested), idle_users[-2:]))
+        finally:
+            stop_server(process)
+    finally:
+        standin.stop()
+        use_trigger(conn, legacy=False)
+        with conn.cursor() as cur:
+            cur.execute("DROP FUNCTION IF EXISTS validate_transaction_uniqueness_legacy()")
+        teardown_dataset(SEED, PREFIX)
+        conn.close()
+
+    ok = sum(1 for _, status in results if status == 200)
+    print_result("purchase through /api/nodes/purchase", summarize([elapsed for elapsed, _ in results]))
+    print(f"   {'':<40} {len(buyers) / wall:8.1f} purchases/s ({ok}/{len(buyers)} succeeded)")
+    race_statuses = sorted(status for _, status in race)
+    print(f"   {'✅' if race_statuses == [200, 400] else '❌'} same hash from two users: statuses {race_statuses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Trongrid Chaos Testing for TRX Mining Platform
+Starts the app with the real verifier pointed at the local Trongrid stand-in, then
+injects hangs, 5xx storms and 429s to check per-attempt deadlines, circuit breaker
+fail-fast and half-open recovery, and Retry-After handling through /api/nodes/purchase
+"""
+
+import os
+import secrets
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from benchmark_utils import start_server, stop_server, wait_for_server
+from metrics_test import parse_metrics, metric_total
+from trongrid_standin import TrongridStandIn
+
+# Configuration
+PORT = int(os.getenv('BENCH_PORT', '3100'))
+STANDIN_PORT = int(os.getenv('TRONGRID_STANDIN_PORT', '8090'))
+BASE_URL = f"http://localhost:{PORT}/api"
+HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'TRX-Mining-Trongrid-Chaos-Test/1.0'
+}
+TIMEOUT_MS = 1000
+MAX_ATTEMPTS = 3
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN_MS = 2000
+SERVER_ENV = {
+    'TRX_VERIFIER': 'enhanced',
+    'TRONGRID_TIMEOUT_MS': str(TIMEOUT_MS),
+    'TRONGRID_BREAKER_THRESHOLD': str(BREAKER_THRESHOLD),
+    'TRONGRID_BREAKER_COOLDOWN_MS': str(BREAKER_COOLDOWN_MS)
+}
+HEALTHY = {'latency_ms': 0, 'error_rate': 0.0, 'fail_next': 0, 'error_status': 503,
+           'retry_after': None, 'hang': False}
+
+
+class TrongridChaosTester:
+    def __init__(self, standin):
+        self.standin = standin
+        self.test_results = []
+        self.request_count = 0
+
+    def log_test(self, test_name, success, details="", error_msg=""):
+        """Log test results"""
+        result = {
+            'test': test_name,
+            'success': success,
+            'details': details,
+            'error': error_msg,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.test_results.append(result)
+
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"{status} {test_name}")
+        if details:
+            print(f"   Details: {details}")
+        if error_msg:
+            print(f"   Error: {error_msg}")
+        print()
+
+    def headers(self):
+        # Distinct client IPs so the rate limiter stays out of the way
+        self.request_count += 1
+        return {**HEADERS, 'X-Forwarded-For': f"10.32.{self.request_count // 250}.{self.request_count % 250}"}
+
+    def purchase(self, user_id=None):
+        """Buy node1 with a fresh hash; returns (elapsed seconds, response)"""
+        body = {
+            'nodeId': 'node1',
+            'transactionHash': secrets.token_hex(32),
+            'userId': user_id or str(uuid.uuid4())
+        }
+        start = time.perf_counter()
+        response = requests.post(f"{BASE_URL}/nodes/purchase", json=body, headers=self.headers(), timeout=60)
+        return time.perf_counter() - start, response
+
+    def signup(self):
+        response = requests.post(
+            f"{BASE_URL}/auth/signup",
+            json={'username': f"chaos_{secrets.token_hex(4)}", 'password': 'chaospass123'},
+            headers=self.headers(),
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json()['user']['id']
+
+    def circuit_transitions(self, state):
+        text = requests.get(f"{BASE_URL}/metrics", timeout=10).text
+        return metric_total(parse_metrics(text), 'trongrid_circuit_transitions_total', state=state)
+
+    def heal(self):
+        """Restore a healthy upstream and let the breaker close again"""
+        self.standin.behaviour.update(HEALTHY)
+        time.sleep(BREAKER_COOLDOWN_MS / 1000 + 0.2)
+        self.purchase()
+
+    def test_healthy_purchase(self):
+        """Baseline: verification goes through the pooled client"""
+        try:
+            user_id = self.signup()
+            elapsed, response = self.purchase(user_id)
+            self.log_test(
+                "Healthy Upstream Purchase",
+                response.status_code == 200,
+                f"status {response.status_code} in {elapsed * 1000:.0f} ms",
+                "" if response.status_code == 200 else response.text[:300]
+            )
+        except Exception as e:
+            self.log_test("Healthy Upstream Purchase", False, "", str(e))
+
+    def test_hanging_upstream_deadline(self):
+        """A hung Trongrid must not hang the purchase handler"""
+        try:
+            self.standin.behaviour['hang'] = True
+            elapsed, response = self.purchase()
+            # Every attempt is cut at its deadline; backoff between attempts is bounded too
+            budget = MAX_ATTEMPTS * TIMEOUT_MS / 1000 + 1.5
+            self.log_test(
+                "Hanging Upstream Hits Deadline",
+                response.status_code == 503 and elapsed < budget,
+                f"status {response.status_code} after {elapsed:.2f}s (budget {budget:.1f}s)"
+            )
+        except Exception as e:
+            self.log_test("Hanging Upstream Hits Deadline", False, "", str(e))
+        finally:
+            self.heal()
+
+    def test_breaker_fails_fast(self):
+        """Once the breaker opens, purchases fail fast without touching Trongrid"""
+        try:
+            opened_before = self.circuit_transitions('open')
+            self.standin.behaviour.update(error_rate=1.0, error_status=503)
+            self.purchase()  # consecutive 5xx attempts trip the breaker
+
+            served = self.standin.requests_served
+            samples = [self.purchase() for _ in range(10)]
+            upstream_calls = self.standin.requests_served - served
+            slowest = max(elapsed for elapsed, _ in samples)
+            statuses = {response.status_code for _, response in samples}
+            retry_after = samples[0][1].headers.get('Retry-After')
+
+            self.log_test(
+                "Open Breaker Fails Fast",
+                statuses == {503} and upstream_calls == 0 and slowest < 0.5 and retry_after is not None,
+                f"10 purchases: statuses {sorted(statuses)}, slowest {slowest * 1000:.0f} ms, "
+                f"{upstream_calls} upstream calls, Retry-After {retry_after}"
+            )
+            self.log_test(
+                "Breaker Open Transition Counted",
+                self.circuit_transitions('open') > opened_before,
+                "trongrid_circuit_transitions_total{state=\"open\"} increased"
+            )
+        except Exception as e:
+            self.log_test("Open Breaker Fails Fast", False, "", str(e))
+
+    def test_half_open_probe(self):
+        """After the cooldown a single probe goes upstream, then traffic flows again"""
+        try:
+            self.standin.behaviour.update(HEALTHY, latency_ms=300)
+            time.sleep(BREAKER_COOLDOWN_MS / 1000 + 0.2)
+
+            served = self.standin.requests_served
+            with ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(lambda _: self.purchase(), range(8)))
+            probes = self.standin.requests_served - served
+            rejected = sum(1 for _, response in results if response.status_code == 503)
+
+            self.standin.behaviour['latency_ms'] = 0
+            served = self.standin.requests_served
+            after = [self.purchase() for _ in range(3)]
+            flowing = self.standin.requests_served - served == 3 and all(
+                response.status_code != 503 for _, response in after)
+
+            self.log_test(
+                "Half-Open Single Probe",
+                probes == 1 and rejected == 7,
+                f"8 concurrent purchases while half-open: {probes} upstream call(s), {rejected} rejected"
+            )
+            self.log_test(
+                "Breaker Closes After Probe",
+                flowing and self.circuit_transitions('closed') >= 1,
+                "follow-up purchases reach Trongrid again"
+            )
+        except Exception as e:
+            self.log_test("Half-Open Single Probe", False, "", str(e))
+        finally:
+            self.standin.behaviour.update(HEALTHY)
+
+    def test_retry_after_honoured(self):
+        """A 429 with a short Retry-After is waited out, then the retry succeeds"""
+        try:
+            user_id = self.signup()
+            self.standin.behaviour.update(fail_next=1, error_status=429, retry_after=1)
+            served = self.standin.requests_served
+            elapsed, response = self.purchase(user_id)
+            calls = self.standin.requests_served - served
+
+            self.log_test(
+                "429 Retry-After Honoured",
+                response.status_code == 200 and elapsed >= 1.0 and calls == 2,
+                f"status {response.status_code} after {elapsed:.2f}s with {calls} upstream calls"
+            )
+        except Exception as e:
+            self.log_test("429 Retry-After Honoured", False, "", str(e))
+        finally:
+            self.standin.behaviour.update(HEALTHY)
+
+    def test_long_retry_after_holds_off(self):
+        """A Retry-After beyond the client's cap holds every caller off instead of hammering"""
+        try:
+            self.standin.behaviour.update(fail_next=1, error_status=429, retry_after=30)
+            elapsed, response = self.purchase()
+
+            served = self.standin.requests_served
+            _, follow_up = self.purchase()
+            held_off = self.standin.requests_served == served
+
+            self.log_test(
+                "Long Retry-After Holds Off",
+                response.status_code == 503 and elapsed < 1.0 and held_off and follow_up.status_code == 503,
+                f"first {response.status_code} in {elapsed * 1000:.0f} ms (Retry-After "
+                f"{response.headers.get('Retry-After')}), follow-up {follow_up.status_code} without an upstream call"
+            )
+        except Exception as e:
+            self.log_test("Long Retry-After Holds Off", False, "", str(e))
+        finally:
+            self.standin.behaviour.update(HEALTHY)
+
+    def run_all_tests(self):
+        """Run all chaos tests"""
+        print("=" * 80)
+        print("TRONGRID CHAOS TESTS")
+        print("=" * 80)
+        self.test_healthy_purchase()
+        self.test_hanging_upstream_deadline()
+        self.test_breaker_fails_fast()
+        self.test_half_open_probe()
+        self.test_retry_after_honoured()
+        # Leaves the breaker open for 30s, so it runs last
+        self.test_long_retry_after_holds_off()
+
+        passed = sum(1 for result in self.test_results if result['success'])
+        print(f"Passed: {passed}/{len(self.test_results)}")
+
+
+if __name__ == "__main__":
+    standin = TrongridStandIn(STANDIN_PORT).start()
+    process = start_server(PORT, {**SERVER_ENV, 'TRONGRID_API_URL': standin.url})
+    try:
+        wait_for_server(BASE_URL)
+        TrongridChaosTester(standin).run_all_tests()
+    finally:
+        stop_server(process)
+        standin.stop()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Local Trongrid stand-in for the TRX Mining Platform harnesses
+Answers GET /v1/transactions/<hash> with a successful TransferContract to the
+platform's receive address, so the real verifier (TRX_VERIFIER=enhanced with
+TRONGRID_API_URL pointed here) can run without touching the public network.
+GET /v1/accounts/<address>/transactions pages through `account_transactions`
+for the deposit ingester. Latency and failures can be injected through the
+`behaviour` dict.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RECEIVE_ADDRESS = 'TFNHcYdhEq5sgjaWPdR1Gnxgzu3RUKncwu'
+SENDER_ADDRESS = 'TLyqzVGLV1srkB7dToTAEqgDSfPtXRJZYH'
+DEFAULT_AMOUNT_SUN = 50 * 1_000_000  # node1
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+TRANSACTION_PATH = re.compile(r'^/v1/transactions/([0-9a-fA-F]{64})$')
+ACCOUNT_TRANSACTIONS_PATH = re.compile(r'^/v1/accounts/(T[1-9A-HJ-NP-Za-km-z]{33})/transactions$')
+
+
+def base58_to_hex(address):
+    """Decode a base58check TRON address to its 41-prefixed hex form"""
+    number = 0
+    for char in address:
+        number = number * 58 + BASE58_ALPHABET.index(char)
+    raw = number.to_bytes(25, 'big')
+    payload, checksum = raw[:-4], raw[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError(f"Bad checksum for {address}")
+    return payload.hex()
+
+
+def transfer_transaction(tx_hash, amount_sun=DEFAULT_AMOUNT_SUN, to_address=RECEIVE_ADDRESS,
+                         from_address=SENDER_ADDRESS, block_timestamp=None):
+    """A successful TransferContract shaped like Trongrid's transaction payload"""
+    return {
+        'txID': tx_hash,
+        'ret': [{'contractRet': 'SUCCESS'}],
+        'blockNumber': 60_000_000 + random.randint(0, 999_999),
+        'block_timestamp': block_timestamp or int(time.time() * 1000),
+        'raw_data': {
+            'contract': [{
+                'type': 'TransferContract',
+                'parameter': {
+                    'value': {
+                        'amount': amount_sun,
+                        'owner_address': base58_to_hex(from_address),
+                        'to_address': base58_to_hex(to_address)
+                    },
+                    'type_url': 'type.googleapis.com/protocol.TransferContract'
+                }
+            }]
+        },
+        'receipt': {'net_usage': 267}
+    }
+
+
+class TrongridStandIn:
+    """Threaded HTTP server; `transactions` overrides the synthesized payload per hash"""
+
+    def __init__(self, port=8090, **behaviour):
+        self.port = port
+        self.transactions = {}
+        self.account_transactions = []  # incoming transfers, sorted by block_timestamp
+        self.requests_served = 0
+        self.hash_lookups = 0
+        self.behaviour = {
+            'latency_ms': 0,        # added to every response
+            'error_rate': 0.0,      # fraction of requests answered with error_status
+            'fail_next': 0,         # answer this many upcoming requests with error_status
+            'error_status': 503,
+            'retry_after': None,    # Retry-After seconds sent with 429s
+            'hang': False,          # accept the request but never answer
+            'amount_sun': DEFAULT_AMOUNT_SUN,
+            **behaviour
+        }
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                behaviour = standin.behaviour
+                with standin.lock:
+                    standin.requests_served += 1
+                    forced_failure = behaviour['fail_next'] > 0
+                    if forced_failure:
+                        behaviour['fail_next'] -= 1
+
+                if behaviour['hang']:
+                    time.sleep(3600)
+                    return
+                if behaviour['latency_ms']:
+                    time.sleep(behaviour['latency_ms'] / 1000)
+                if forced_failure or random.random() < behaviour['error_rate']:
+                    status = behaviour['error_status']
+                    headers = {}
+                    if status == 429 and behaviour['retry_after'] is not None:
+                        headers['Retry-After'] = str(behaviour['retry_after'])
+                    self.send_json(status, {'Error': 'injected failure'}, headers)
+                    return
+
+                url = urlparse(self.path)
+                account = ACCOUNT_TRANSACTIONS_PATH.match(url.path)
+                if account:
+                    self.send_json(200, standin.account_page(parse_qs(url.query)))
+                    return
+
+                match = TRANSACTION_PATH.match(url.path)
+                if not match:
+                    self.send_json(404, {'Error': 'not found'})
+                    return
+
+                tx_hash = match.group(1)
+                with standin.lock:
+                    standin.hash_lookups += 1
+                payload = standin.transactions.get(tx_hash) or transfer_transaction(
+                    tx_hash, amount_sun=behaviour['amount_sun'])
+                self.send_json(200, payload)
+
+        return Handler
+
+    def account_page(self, query):
+        """One page of the account listing; the fingerprint is the next offset"""
+        limit = int(query.get('limit', ['200'])[0])
+        if 'fingerprint' in query:
+            start = int(query['fingerprint'][0])
+        else:
+            min_timestamp = int(query.get('min_timestamp', ['0'])[0])
+            start = bisect.bisect_left(self.account_transactions, min_timestamp,
+                                       key=lambda tx: tx['block_timestamp'])
+
+        data = self.account_transactions[start:start + limit]
+        meta = {'at': int(time.time() * 1000), 'page_size': len(data)}
+        if start + len(data) < len(self.account_transactions):
+            meta['fingerprint'] = str(start + len(data))
+        return {'data': data, 'success': True, 'meta': meta}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local Trongrid stand-in')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    standin = TrongridStandIn(args.port, latency_ms=args.latency_ms, error_rate=args.error_rate)
+    print(f"🛰️  Trongrid stand-in listening on {standin.url}")
+    standin.server.serve_forever()
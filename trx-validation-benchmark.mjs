@@ -0,0 +1,67 @@
+/**
+ * TRX validation micro-benchmark
+ * Runs validateTransactionData over the recorded Trongrid responses in
+ * fixtures/trongrid/transactions.json and reports validations per second.
+ *
+ *   node trx-validation-benchmark.mjs [seconds-per-case]
+ */
+
+import { register } from 'node:module'
+import { readFileSync } from 'node:fs'
+
+// lib/ uses extensionless ESM imports resolved by the Next.js bundler; teach Node the same
+register('data:text/javascript,' + encodeURIComponent(`
+  export async function resolve(specifier, context, next) {
+    if (specifier.startsWith('.') && !/\\.[cm]?js$/.test(specifier)) specifier += '.js'
+    const result = await next(specifier, context)
+    return result.url.includes('/lib/') ? { ...result, format: 'module' } : result
+  }
+`), import.meta.url)
+
+const { validateTransactionData } = await import('./lib/trx-transaction-validator.js')
+
+const SECONDS = Number(process.argv[2]) || 2
+const fixture = JSON.parse(readFileSync(new URL('./fixtures/trongrid/transactions.json', import.meta.url)))
+
+// Recorded timestamps are rebased to now so the 24h age check behaves as for fresh payments
+const shift = Date.now() - fixture.recorded_block_timestamp_base - 60 * 60 * 1000
+const corpus = fixture.transactions.map(({ expected_amount, kind, response }) => ({
+  expectedAmount: expected_amount,
+  kind,
+  response: { ...response, block_timestamp: response.block_timestamp + shift }
+}))
+
+function run(label, cases, readSender = false) {
+  // Warm up so the JIT has settled before timing
+  for (let i = 0; i < 20000; i++) {
+    const { response, expectedAmount } = cases[i % cases.length]
+    validateTransactionData(response, expectedAmount, fixture.receive_address)
+  }
+
+  let validations = 0
+  let mismatches = 0
+  const deadline = process.hrtime.bigint() + BigInt(SECONDS * 1e9)
+  const start = process.hrtime.bigint()
+  while (process.hrtime.bigint() < deadline) {
+    for (const { response, expectedAmount, kind } of cases) {
+      const result = validateTransactionData(response, expectedAmount, fixture.receive_address)
+      if (readSender && result.valid) result.fromAddress
+      if (result.valid !== (kind === 'valid')) mismatches++
+      validations++
+    }
+  }
+  const seconds = Number(process.hrtime.bigint() - start) / 1e9
+
+  console.log(
+    `   ${label.padEnd(44)} ${Math.round(validations / seconds).toLocaleString().padStart(12)} validations/s` +
+    `   (${(seconds * 1e9 / validations).toFixed(0)} ns each${mismatches ? `, ${mismatches} WRONG` : ''})`
+  )
+}
+
+console.log('='.repeat(80))
+console.log(`TRX VALIDATION BENCHMARK (${corpus.length} recorded responses, ${SECONDS}s per case)`)
+console.log('='.repeat(80))
+run('full corpus', corpus)
+run('valid transfers only', corpus.filter(entry => entry.kind === 'valid'))
+run('valid transfers, sender decoded', corpus.filter(entry => entry.kind === 'valid'), true)
+run('recipient mismatches only', corpus.filter(entry => entry.kind === 'wrong_recipient'))
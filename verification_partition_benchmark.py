@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Verification Partition Benchmark for TRX Mining Platform
+Seeds a year of transaction_verifications (retried hashes included) into the
+monthly-partitioned table and into an unpartitioned copy with the old layout,
+then compares a retry's audit update (old: every row for the hash; new: one row
+by its (transaction_hash, created_at) key), windowed stats queries, and
+retention (DROP of expired partitions vs DELETE of expired rows).
+"""
+
+import os
+import random
+import time
+
+from benchmark_utils import connect, apply_schema, time_query, summarize, print_result
+
+ROWS = int(os.getenv('BENCH_ROWS', '5000000'))
+RUNS = int(os.getenv('BENCH_RUNS', '10'))
+UPDATES = int(os.getenv('BENCH_UPDATES', '500'))
+RETAIN_MONTHS = int(os.getenv('BENCH_RETAIN_MONTHS', '6'))
+# Fewer hashes than rows, so about a third of the hashes were verified more than once
+HASHES = ROWS * 3 // 4
+
+FLAT_TABLE = 'transaction_verifications_flat'
+STATS_QUERY = """
+    SELECT verification_status, COUNT(*) FROM {table}
+    WHERE created_at >= NOW() - %s::interval
+    GROUP BY verification_status
+"""
+OLD_UPDATE = f"""
+    UPDATE {FLAT_TABLE}
+    SET verification_attempts = verification_attempts + 1, last_attempt_at = NOW(), verification_status = 'verified'
+    WHERE transaction_hash = %s
+"""
+# What the audit writer sends for a retry: an upsert of one row on its key
+NEW_UPSERT = """
+    INSERT INTO transaction_verifications (transaction_hash, created_at, verification_status, verification_attempts,
+                                           last_attempt_at)
+    VALUES (%s, %s, 'verified', 2, NOW())
+    ON CONFLICT (transaction_hash, created_at) DO UPDATE SET
+        verification_status = EXCLUDED.verification_status,
+        verification_attempts = EXCLUDED.verification_attempts,
+        last_attempt_at = EXCLUDED.last_attempt_at
+"""
+
+
+def seed(conn):
+    """Seed ROWS verifications spread over the last 365 days into both tables"""
+    print(f"🌱 Seeding {ROWS:,} transaction_verifications rows over 365 days...")
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE transaction_verifications")
+        cur.execute("TRUNCATE transaction_verification_counts")
+        cur.execute("SELECT ensure_verification_partitions(NOW() - INTERVAL '13 months', 3)")
+        cur.execute(
+            """
+            INSERT INTO transaction_verifications (transaction_hash, verification_status, first_attempt_at,
+                                                   last_attempt_at, created_at)
+            SELECT hash, status, created_at, created_at, created_at
+            FROM (
+                SELECT
+                    md5((g %% %s)::text) || md5((g %% %s + 1)::text) AS hash,
+                    (ARRAY['verified', 'verified', 'verified', 'failed', 'pending'])[1 + g %% 5] AS status,
+                    NOW() - (random() * INTERVAL '365 days') AS created_at
+                FROM generate_series(1, %s) AS g
+            ) seeded
+            ON CONFLICT (transaction_hash, created_at) DO NOTHING
+            """,
+            (HASHES, HASHES, ROWS)
+        )
+
+        cur.execute(f"DROP TABLE IF EXISTS {FLAT_TABLE}")
+        cur.execute(f"""
+            CREATE TABLE {FLAT_TABLE} (
+                id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+                transaction_hash VARCHAR(128) NOT NULL,
+                verification_status VARCHAR(20) NOT NULL,
+                trongrid_response JSONB,
+                verification_attempts INTEGER DEFAULT 1,
+                first_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+                last_attempt_at TIMESTAMPTZ DEFAULT NOW(),
+                verified_at TIMESTAMPTZ,
+                error_message TEXT,
+                created_at TIMESTAMPTZ DEFAULT NOW()
+            )
+        """)
+        cur.execute(f"INSERT INTO {FLAT_TABLE} SELECT * FROM transaction_verifications")
+        cur.execute(f"CREATE INDEX ON {FLAT_TABLE}(transaction_hash)")
+        cur.execute(f"CREATE INDEX ON {FLAT_TABLE}(created_at, verification_status)")
+        cur.execute("ANALYZE transaction_verifications")
+        cur.execute(f"ANALYZE {FLAT_TABLE}")
+
+        cur.execute("""
+            SELECT COUNT(*) FROM pg_inherits WHERE inhparent = 'transaction_verifications'::regclass
+        """)
+        partitions = cur.fetchone()[0]
+    print(f"   Seeded in {time.perf_counter() - start:.1f}s across {partitions} partitions\n")
+
+
+def retried_rows(conn):
+    """UPDATES (hash, created_at) keys of the newest row for hashes with several rows"""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT transaction_hash, MAX(created_at), COUNT(*)
+            FROM transaction_verifications TABLESAMPLE SYSTEM (5)
+            GROUP BY transaction_hash
+            """
+        )
+        rows = cur.fetchall()
+    random.Random(42).shuffle(rows)
+    return [(transaction_hash, created_at) for transaction_hash, created_at, _ in rows[:UPDATES]]
+
+
+def time_updates(conn, keys):
+    """Retry update latency and rows touched per update, old path then new"""
+    old, new = [], []
+    old_rows = new_rows = 0
+    with conn.cursor() as cur:
+        for transaction_hash, created_at in keys:
+            start = time.perf_counter()
+            cur.execute(OLD_UPDATE, (transaction_hash,))
+            old.append((time.perf_counter() - start) * 1000)
+            old_rows += cur.rowcount
+
+            start = time.perf_counter()
+            cur.execute(NEW_UPSERT, (transaction_hash, created_at))
+            new.append((time.perf_counter() - start) * 1000)
+            new_rows += cur.rowcount
+    return summarize(old), summarize(new), old_rows / len(keys), new_rows / len(keys)
+
+
+def scanned_partitions(conn, interval):
+    """Partitions the executor actually scans for a stats window"""
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, COSTS OFF) {STATS_QUERY.format(table='transaction_verifications')}",
+                    (interval,))
+        plan = [line for (line,) in cur.fetchall()]
+    return sum(1 for line in plan if 'on transaction_verifications_' in line and 'never executed' not in line)
+
+
+def time_retention(conn):
+    """Remove everything older than RETAIN_MONTHS: DELETE on the flat copy vs partition DROP"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT (date_trunc('month', NOW() AT TIME ZONE 'UTC') - make_interval(months => %s)) AT TIME ZONE 'UTC'",
+            (RETAIN_MONTHS,)
+        )
+        cutoff = cur.fetchone()[0]
+
+        start = time.perf_counter()
+        cur.execute(f"DELETE FROM {FLAT_TABLE} WHERE created_at < %s", (cutoff,))
+        deleted = cur.rowcount
+        delete_seconds = time.perf_counter() - start
+
+        cur.execute("SELECT COUNT(*) FROM transaction_verifications WHERE created_at < %s", (cutoff,))
+        expired = cur.fetchone()[0]
+        start = time.perf_counter()
+        cur.execute("SELECT * FROM prune_verification_partitions(%s)", (RETAIN_MONTHS,))
+        dropped = cur.fetchall()
+        drop_seconds = time.perf_counter() - start
+
+        cur.execute("SELECT COUNT(*) FROM transaction_verifications WHERE created_at < %s", (cutoff,))
+        remaining = cur.fetchone()[0]
+    return deleted, delete_seconds, expired, len(dropped), drop_seconds, remaining
+
+
+def main():
+    conn = connect()
+    apply_schema()
+
+    print("=" * 80)
+    print(f"VERIFICATION PARTITION BENCHMARK ({ROWS:,} rows, one year)")
+    print("=" * 80)
+    seed(conn)
+
+    try:
+        keys = retried_rows(conn)
+        old, new, old_touched, new_touched = time_updates(conn, keys)
+        print_result("retry update, by hash (old)", old)
+        print_result("retry upsert, by (hash, created_at)", new)
+        print(f"   rows touched per retry: {old_touched:.2f} old vs {new_touched:.2f} new")
+        print(f"   {'✅' if new_touched == 1 else '❌'} each retry writes exactly one row\n")
+
+        for label, interval in (('24h', '24 hours'), ('7d', '7 days'), ('30d', '30 days')):
+            print_result(f"stats last {label}, unpartitioned", time_query(
+                conn, STATS_QUERY.format(table=FLAT_TABLE), (interval,), runs=RUNS))
+            print_result(f"stats last {label}, partitioned rpc", time_query(
+                conn, "SELECT * FROM get_verification_stats(NOW() - %s::interval)", (interval,), runs=RUNS))
+            print(f"   {scanned_partitions(conn, interval)} partitions scanned for the {label} window")
+        print_result("stats all time (counter table)", time_query(
+            conn, "SELECT * FROM get_verification_stats(NULL)", runs=RUNS))
+        print()
+
+        deleted, delete_seconds, expired, dropped, drop_seconds, remaining = time_retention(conn)
+        print(f"   DELETE of {deleted:,} expired rows (unpartitioned):  {delete_seconds * 1000:10.1f} ms")
+        print(f"   DROP of {dropped} expired partitions ({expired:,} rows): {drop_seconds * 1000:10.1f} ms")
+        print(f"   {'✅' if remaining == 0 else '❌'} no rows older than {RETAIN_MONTHS} months remain")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {FLAT_TABLE}")
+            cur.execute("TRUNCATE transaction_verifications")
+            cur.execute("TRUNCATE transaction_verification_counts")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Verification Statistics Benchmark for TRX Mining Platform
+Seeds millions of transaction_verifications rows and compares the old
+fetch-everything-and-count path with the SQL-side get_verification_stats RPC.
+Then measures what keeping transaction_verification_counts costs the writers:
+concurrent audit inserts, one row and one flush-sized batch at a time, under the
+row-level counter trigger (migration 0010) and the statement-level one (0014).
+"""
+
+import os
+import secrets
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_utils import connect, apply_schema, time_query, summarize, print_result
+
+ROWS = int(os.getenv('BENCH_ROWS', '2000000'))
+RUNS = int(os.getenv('BENCH_RUNS', '10'))
+WRITES = int(os.getenv('BENCH_WRITES', '20000'))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', '16'))
+FLUSH_BATCH = int(os.getenv('BENCH_FLUSH_BATCH', '100'))
+
+STATEMENT_TRIGGERS = {
+    'track_transaction_verification_inserts': ('INSERT', 'NEW TABLE AS new_rows'),
+    'track_transaction_verification_updates': ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    'track_transaction_verification_deletes': ('DELETE', 'OLD TABLE AS old_rows'),
+}
+
+
+def seed(conn):
+    """Seed ROWS verifications spread over the last 90 days"""
+    print(f"🌱 Seeding {ROWS:,} transaction_verifications rows...")
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE transaction_verifications")
+        cur.execute("TRUNCATE transaction_verification_counts")
+        cur.execute(
+            """
+            INSERT INTO transaction_verifications (transaction_hash, verification_status, created_at)
+            SELECT
+                md5(g::text) || md5((g + 1)::text),
+                (ARRAY['verified', 'verified', 'verified', 'failed', 'pending'])[1 + g % 5],
+                NOW() - (random() * INTERVAL '90 days')
+            FROM generate_series(1, %s) AS g
+            """,
+            (ROWS,)
+        )
+        cur.execute("ANALYZE transaction_verifications")
+    print(f"   Seeded in {time.perf_counter() - start:.1f}s\n")
+
+
+def old_path(conn):
+    """The previous implementation: pull every status and count client-side"""
+    samples = []
+    with conn.cursor() as cur:
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            cur.execute("SELECT verification_status FROM transaction_verifications")
+            Counter(row[0] for row in cur.fetchall())
+            samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def check_counts(conn):
+    """The trigger-maintained totals must match a real GROUP BY"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT verification_status, total FROM get_verification_stats(NULL)")
+        maintained = dict(cur.fetchall())
+        cur.execute("SELECT verification_status, COUNT(*) FROM transaction_verifications GROUP BY 1")
+        actual = dict(cur.fetchall())
+    return maintained == actual, maintained, actual
+
+
+def report_counts(conn, label):
+    consistent, maintained, actual = check_counts(conn)
+    status = "✅" if consistent else "❌"
+    print(f"{status} Counter table consistent with GROUP BY {label}: {maintained}")
+    if not consistent:
+        print(f"   Actual: {actual}")
+
+
+def use_counter_trigger(conn, row_level):
+    """Swap the counter maintenance between the per-row trigger and the per-statement ones"""
+    with conn.cursor() as cur:
+        cur.execute("DROP TRIGGER IF EXISTS track_transaction_verification_counts ON transaction_verifications")
+        for name, (event, referencing) in STATEMENT_TRIGGERS.items():
+            cur.execute(f"DROP TRIGGER IF EXISTS {name} ON transaction_verifications")
+            if not row_level:
+                cur.execute(f"""
+                    CREATE TRIGGER {name} AFTER {event} ON transaction_verifications
+                    REFERENCING {referencing}
+                    FOR EACH STATEMENT EXECUTE FUNCTION track_verification_status_count_batches()
+                """)
+        if row_level:
+            cur.execute("""
+                CREATE TRIGGER track_transaction_verification_counts
+                AFTER INSERT OR UPDATE OR DELETE ON transaction_verifications
+                FOR EACH ROW EXECUTE FUNCTION track_verification_status_counts()
+            """)
+
+
+def write_throughput(batch):
+    """WRITES audit rows from CLIENTS connections, `batch` rows per INSERT; returns (rows/s, latency summary)"""
+    samples = []
+    lock = threading.Lock()
+    statuses = ['verified', 'verified', 'failed', 'pending']
+
+    def worker(offset):
+        conn = connect()
+        local = []
+        with conn.cursor() as cur:
+            for _ in range(offset, WRITES // batch, CLIENTS):
+                rows = [(secrets.token_hex(32), statuses[secrets.randbelow(len(statuses))]) for _ in range(batch)]
+                start = time.perf_counter()
+                cur.execute(
+                    "INSERT INTO transaction_verifications (transaction_hash, verification_status) "
+                    "SELECT * FROM unnest(%s::varchar[], %s::varchar[])",
+                    ([row[0] for row in rows], [row[1] for row in rows])
+                )
+                local.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        with lock:
+            samples.extend(local)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        list(pool.map(worker, range(CLIENTS)))
+    wall = time.perf_counter() - started_at
+    return len(samples) * batch / wall, summarize(samples)
+
+
+def counter_write_cost(conn):
+    print("=" * 80)
+    print(f"COUNTER MAINTENANCE UNDER CONCURRENT WRITES ({WRITES:,} rows, {CLIENTS} clients)")
+    print("=" * 80)
+    try:
+        for label, row_level in (('row trigger', True), ('statement trigger', False)):
+            use_counter_trigger(conn, row_level)
+            for batch in (1, FLUSH_BATCH):
+                rate, latency = write_throughput(batch)
+                print_result(f"{label}, {batch} row(s) per insert", latency)
+                print(f"   {'':<40} {rate:8.0f} rows/s")
+
+            # Status changes and deletes have to move the totals too
+            with conn.cursor() as cur:
+                cur.execute("UPDATE transaction_verifications SET verification_status = 'verified' "
+                            "WHERE verification_status = 'pending' AND created_at > NOW() - INTERVAL '1 minute'")
+                cur.execute("DELETE FROM transaction_verifications "
+                            "WHERE verification_status = 'failed' AND created_at > NOW() - INTERVAL '1 minute'")
+            report_counts(conn, f"after {label} writes")
+            print()
+    finally:
+        use_counter_trigger(conn, row_level=False)
+
+
+def main():
+    conn = connect()
+    apply_schema()
+    seed(conn)
+
+    report_counts(conn, "after seeding")
+    print()
+
+    print("=" * 80)
+    print(f"VERIFICATION STATS LATENCY ({ROWS:,} rows)")
+    print("=" * 80)
+    print_result("old: select all + count in client", old_path(conn))
+    print_result("rpc: all time (counter table)", time_query(
+        conn, "SELECT * FROM get_verification_stats(NULL)", runs=RUNS))
+    for label, interval in (('1h', '1 hour'), ('24h', '24 hours'), ('7d', '7 days')):
+        print_result(f"rpc: last {label} (index range scan)", time_query(
+            conn,
+            "SELECT * FROM get_verification_stats(NOW() - %s::interval)",
+            (interval,),
+            runs=RUNS
+        ))
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "EXPLAIN SELECT verification_status, COUNT(*) FROM transaction_verifications "
+            "WHERE created_at >= NOW() - INTERVAL '24 hours' GROUP BY verification_status"
+        )
+        print("\n24h window plan:")
+        for (line,) in cur.fetchall():
+            print(f"   {line}")
+    print()
+
+    counter_write_cost(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()